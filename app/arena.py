@@ -0,0 +1,276 @@
+import mmap
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Union
+from .logger import Logger
+
+class _Segment:
+    """One arena buffer: bump-allocated, with the blobs still referencing it."""
+
+    __slots__ = ('buffer', 'used', 'live', 'refs')
+
+    def __init__(self, size: int, anonymous_mmap: bool):
+        self.buffer: Any = mmap.mmap(-1, size) if anonymous_mmap else bytearray(size)
+        self.used = 0
+        self.live = 0
+        self.refs: Dict[int, 'BlobRef'] = {}  # by id(): BlobRef equality compares content
+
+class BlobRef:
+    """A value stored in a ``BlobArena``: segment, offset and length.
+
+    Compares equal to another ref or a bytes-like object with the same
+    content, so COUNTS/FIND and layer compaction work on refs directly.
+    ``sys.getsizeof`` includes the blob, so memory estimates and
+    transaction size limits count arena bytes too.
+    """
+
+    __slots__ = ('arena', 'segment', 'offset', 'length', 'text')
+
+    def __init__(self, arena: 'BlobArena', segment: _Segment, offset: int, length: int, text: bool):
+        self.arena = arena
+        self.segment = segment
+        self.offset = offset
+        self.length = length
+        self.text = text
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (BlobRef, bytes, bytearray, memoryview)):
+            return self.arena.equals(self, other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.arena.load(self))
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self.length
+
+    def __repr__(self) -> str:
+        return f"BlobRef({self.length} bytes)"
+
+StoredValue = Union[str, bytes, BlobRef]
+
+class BlobArena:
+    """Keeps large values out of the Python heap, in a few big buffers.
+
+    Values of ``threshold`` characters (or bytes) or more are appended to
+    the current segment (an anonymous mmap by default, or a ``bytearray``)
+    and the layers hold a small ``BlobRef`` instead. Freed space is not
+    reused in place: freeing a ref only counts its bytes as garbage, a
+    segment whose blobs are all freed is dropped (or, if it is the current
+    one, started over), and ``compact_step``
+    moves the live blobs out of mostly-garbage segments so those can be
+    dropped too. All access goes through the arena lock, so compaction can
+    run on a background thread (``start``).
+    """
+
+    def __init__(self, logger: Logger, threshold: int = 4096, segment_size: int = 64 * 1024 * 1024,
+                 compact_ratio: float = 0.5, anonymous_mmap: bool = True):
+        """Initialize an empty arena.
+
+        Args:
+            logger: Logger for arena events.
+            threshold: Minimum value length stored in the arena.
+            segment_size: Size of each segment; larger values get their own.
+            compact_ratio: Garbage fraction at which a segment is compacted.
+            anonymous_mmap: Allocate segments with ``mmap`` rather than ``bytearray``.
+        """
+        self._logger = logger
+        self.threshold = threshold
+        self.segment_size = segment_size
+        self.compact_ratio = compact_ratio
+        self._anonymous_mmap = anonymous_mmap
+        self._segments: List[_Segment] = []
+        self._current: Optional[_Segment] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.compacted_bytes = 0
+
+    # Value store interface (see ValueCodec)
+
+    def encode(self, value: Any) -> Any:
+        """Store a large str/bytes value and return its ref; other values pass through."""
+        if not isinstance(value, (str, bytes)) or len(value) < self.threshold:
+            return value
+        text = isinstance(value, str)
+        return self.store(value.encode('utf-8') if text else value, text)
+
+    def decode(self, stored: Any) -> Any:
+        """Read a stored value back (str or bytes, as it was given)."""
+        if not isinstance(stored, BlobRef):
+            return stored
+        data = self.load(stored)
+        return data.decode('utf-8') if stored.text else data
+
+    def probe(self, value: Any) -> Any:
+        """Build a value that compares equal to the stored form, without storing it."""
+        if isinstance(value, str) and len(value) >= self.threshold:
+            return value.encode('utf-8')
+        return value
+
+    def release(self, stored: Any) -> None:
+        """Free a stored value that left the layers (transaction manager hook)."""
+        if isinstance(stored, BlobRef):
+            self.free(stored)
+
+    # Blobs
+
+    def _allocate(self, length: int) -> _Segment:
+        segment = self._current
+        if segment is not None and segment.used + length <= len(segment.buffer):
+            return segment
+        if length > self.segment_size:
+            segment = _Segment(length, self._anonymous_mmap)
+        else:
+            segment = self._current = _Segment(self.segment_size, self._anonymous_mmap)
+        self._segments.append(segment)
+        return segment
+
+    def _place(self, ref: BlobRef, data: Any) -> None:
+        segment = self._allocate(ref.length)
+        offset = segment.used
+        segment.buffer[offset:offset + ref.length] = data
+        segment.used += ref.length
+        segment.live += ref.length
+        segment.refs[id(ref)] = ref
+        ref.segment = segment
+        ref.offset = offset
+
+    def store(self, data: bytes, text: bool = False) -> BlobRef:
+        """Append a blob.
+
+        Args:
+            data: Blob content.
+            text: The blob is UTF-8 text (``decode`` returns str).
+        Returns:
+            The ref locating the blob.
+        """
+        ref = BlobRef(self, None, 0, len(data), text)  # type: ignore
+        with self._lock:
+            self._place(ref, data)
+        return ref
+
+    def load(self, ref: BlobRef) -> bytes:
+        """Copy a blob out of the arena."""
+        with self._lock:
+            return bytes(memoryview(ref.segment.buffer)[ref.offset:ref.offset + ref.length])
+
+    def view(self, ref: BlobRef) -> memoryview:
+        """Read-only view of a blob, without copying.
+
+        The view stays valid when compaction moves the blob, but not after
+        the blob is freed (its space may be reused).
+        """
+        with self._lock:
+            return memoryview(ref.segment.buffer).toreadonly()[ref.offset:ref.offset + ref.length]
+
+    def equals(self, ref: BlobRef, other: Any) -> bool:
+        """Compare a blob with another ref or bytes-like object, without copying."""
+        if isinstance(other, BlobRef):
+            if ref is other:
+                return True
+            if ref.length != other.length:
+                return False
+            other_view = other.arena.view(other)
+        else:
+            if ref.length != len(other):
+                return False
+            other_view = other
+        return self.view(ref) == other_view
+
+    def free(self, ref: BlobRef) -> None:
+        """Release a blob; a segment left without blobs is dropped."""
+        with self._lock:
+            segment = ref.segment
+            if segment.refs.pop(id(ref), None) is None:
+                return
+            segment.live -= ref.length
+            if segment.refs:
+                return
+            if segment is self._current:
+                segment.used = 0  # nothing left to keep: start over
+            else:
+                self._segments.remove(segment)
+
+    def compact_step(self, budget: int = 1024 * 1024) -> int:
+        """Move live blobs out of one mostly-garbage segment.
+
+        Args:
+            budget: Maximum bytes copied in this step.
+        Returns:
+            Bytes of segments dropped (0 if nothing was done or the
+            segment is not empty yet).
+        """
+        with self._lock:
+            victim = None
+            for segment in self._segments:
+                if (segment is not self._current and segment.used
+                        and (segment.used - segment.live) >= self.compact_ratio * segment.used):
+                    victim = segment
+                    break
+            if victim is None:
+                return 0
+            moved = 0
+            for ref in list(victim.refs.values()):
+                if moved >= budget:
+                    return 0
+                data = bytes(memoryview(victim.buffer)[ref.offset:ref.offset + ref.length])
+                del victim.refs[id(ref)]
+                victim.live -= ref.length
+                self._place(ref, data)
+                moved += ref.length
+            self._segments.remove(victim)
+            self.compacted_bytes += len(victim.buffer)
+            self._logger.info(f"ARENA: compacted a {len(victim.buffer)} byte segment")
+            return len(victim.buffer)
+
+    def compact(self) -> int:
+        """Compact every segment above the garbage ratio.
+
+        Returns:
+            Bytes of segments dropped.
+        """
+        total = 0
+        while True:
+            freed = self.compact_step(budget=sys.maxsize)
+            if not freed:
+                return total
+            total += freed
+
+    def start(self, interval: float = 1.0) -> None:
+        """Run ``compact_step`` every ``interval`` seconds on a background thread."""
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                while self.compact_step():
+                    pass
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name='arena-compact', daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop background compaction."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Arena counters.
+
+        Returns:
+            Dict with segments, reserved (allocated buffer bytes), used,
+            live and garbage bytes, blobs and compacted bytes.
+        """
+        with self._lock:
+            used = sum(s.used for s in self._segments)
+            live = sum(s.live for s in self._segments)
+            return {
+                'segments': len(self._segments),
+                'reserved': sum(len(s.buffer) for s in self._segments),
+                'used': used,
+                'live': live,
+                'garbage': used - live,
+                'blobs': sum(len(s.refs) for s in self._segments),
+                'compacted': self.compacted_bytes,
+            }
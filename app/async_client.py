@@ -0,0 +1,222 @@
+import asyncio
+import socket
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Optional, Sequence
+from .client import RECV_SIZE, Commands, _raise_errors
+from .protocol import INCOMPLETE, Reader, encode_command_into
+from .replication import parse_address
+
+class AsyncConnection:
+    """One asyncio connection to a server (see ``client.Connection``)."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._stream = reader
+        self._writer = writer
+        self._reader = Reader()
+        self._out = bytearray()
+
+    @classmethod
+    async def open(cls, address: str) -> 'AsyncConnection':
+        """Connect to a server at ``address`` ("host:port" or "unix:/path")."""
+        family, addr = parse_address(address)
+        if family == socket.AF_UNIX:
+            reader, writer = await asyncio.open_unix_connection(addr)
+        else:
+            reader, writer = await asyncio.open_connection(*addr)
+            writer.get_extra_info('socket').setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return cls(reader, writer)
+
+    async def execute(self, commands: Sequence[Sequence[str]]) -> List[Any]:
+        """Send a batch of commands and read one reply per command.
+
+        Returns:
+            The replies; error replies are ``ReplyError`` instances.
+        """
+        out = self._out
+        del out[:]
+        for command in commands:
+            encode_command_into(out, command)
+        self._writer.write(out)
+        await self._writer.drain()
+        replies: List[Any] = []
+        while len(replies) < len(commands):
+            reply = self._reader.get()
+            if reply is INCOMPLETE:
+                data = await self._stream.read(RECV_SIZE)
+                if not data:
+                    raise ConnectionError("Server closed the connection")
+                self._reader.feed(data)
+            else:
+                replies.append(reply)
+        return replies
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except OSError:
+            pass
+
+class AsyncConnectionPool:
+    """Pool of asyncio connections; callers wait when ``max_connections`` are busy."""
+
+    def __init__(self, address: str, max_connections: int = 10):
+        """Initialize the pool.
+
+        Args:
+            address: Server address ("host:port" or "unix:/path").
+            max_connections: Maximum number of open connections.
+        """
+        self.address = address
+        self.max_connections = max_connections
+        self._idle: List[AsyncConnection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def acquire(self) -> AsyncConnection:
+        """Take an idle connection, opening one if the pool is not full."""
+        if self._slots is None:
+            # Created lazily so it belongs to the running event loop
+            self._slots = asyncio.Semaphore(self.max_connections)
+        await self._slots.acquire()
+        if self._idle:
+            return self._idle.pop()
+        try:
+            return await AsyncConnection.open(self.address)
+        except OSError:
+            self._slots.release()
+            raise
+
+    async def release(self, connection: AsyncConnection, broken: bool = False) -> None:
+        """Return a connection to the pool (or close it if ``broken``)."""
+        if broken:
+            await connection.close()
+        else:
+            self._idle.append(connection)
+        self._slots.release()  # type: ignore
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[AsyncConnection]:
+        """Borrow a connection for the duration of an ``async with`` block."""
+        connection = await self.acquire()
+        broken = False
+        try:
+            yield connection
+        except (OSError, asyncio.CancelledError):
+            # A cancelled request may leave replies unread on the connection
+            broken = True
+            raise
+        finally:
+            await self.release(connection, broken)
+
+    async def close(self) -> None:
+        """Close the idle connections."""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await connection.close()
+
+class AsyncClient(Commands):
+    """asyncio version of ``client.Client``; command methods are awaitable."""
+
+    def __init__(self, address: str = '127.0.0.1:7379', max_connections: int = 10,
+                 pool: Optional[AsyncConnectionPool] = None):
+        """Initialize the client.
+
+        Args:
+            address: Server address ("host:port" or "unix:/path").
+            max_connections: Pool size.
+            pool: Pool to use instead of creating one.
+        """
+        self.pool = pool or AsyncConnectionPool(address, max_connections)
+
+    async def execute_command(self, *args: str) -> Any:
+        """Run one command.
+
+        Raises:
+            ReplyError: If the server answered with an error.
+        """
+        async with self.pool.connection() as connection:
+            return _raise_errors(await connection.execute([args]))[0]
+
+    def pipeline(self) -> 'AsyncPipeline':
+        """Create a pipeline sending queued commands in one batch."""
+        return AsyncPipeline(self.pool)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator['AsyncTransaction']:
+        """Run an ``async with`` block in a server transaction (see ``Client.transaction``)."""
+        async with self.pool.connection() as connection:
+            transaction = AsyncTransaction(connection)
+            try:
+                yield transaction
+            except BaseException:
+                try:
+                    await transaction.rollback()
+                except OSError:
+                    pass  # the server rolls back when the connection drops
+                raise
+            await transaction.commit()
+
+    async def close(self) -> None:
+        """Close idle pooled connections."""
+        await self.pool.close()
+
+class AsyncPipeline(Commands):
+    """Queues commands and sends them in one batch with ``await execute()``."""
+
+    def __init__(self, pool: AsyncConnectionPool):
+        self._pool = pool
+        self._queue: List[Sequence[str]] = []
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def execute_command(self, *args: str) -> 'AsyncPipeline':
+        self._queue.append(args)
+        return self
+
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        """Send the queued commands and return their replies in order."""
+        queue, self._queue = self._queue, []
+        if not queue:
+            return []
+        async with self._pool.connection() as connection:
+            replies = await connection.execute(queue)
+        return _raise_errors(replies) if raise_on_error else replies
+
+class AsyncTransaction(Commands):
+    """Commands of an ``AsyncClient.transaction()`` block, pinned to one connection."""
+
+    def __init__(self, connection: AsyncConnection):
+        self._connection = connection
+        self._queue: List[Sequence[str]] = []
+        self._begun = False
+        self.results: List[Any] = []
+
+    def execute_command(self, *args: str) -> 'AsyncTransaction':
+        self._queue.append(args)
+        return self
+
+    async def _send(self, trailer: Sequence[Sequence[str]] = ()) -> List[Any]:
+        batch = ([] if self._begun else [('begin',)]) + self._queue + list(trailer)
+        replies = await self._connection.execute(batch)
+        if not self._begun:
+            replies = replies[1:]
+            self._begun = True
+        count = len(self._queue)
+        self._queue = []
+        self.results.extend(replies[:count])
+        return replies
+
+    async def execute(self) -> List[Any]:
+        """Send the queued commands inside the transaction and return their replies."""
+        count = len(self._queue)
+        return _raise_errors((await self._send())[:count]) if count else []
+
+    async def commit(self) -> None:
+        if self._queue or self._begun:
+            _raise_errors(await self._send([('commit',)]))
+
+    async def rollback(self) -> None:
+        self._queue = []
+        if self._begun:
+            await self._connection.execute([('rollback',)])
@@ -0,0 +1,270 @@
+import asyncio
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from .base import Database
+from .logger import Logger
+
+Layer = Dict[str, Optional[str]]
+
+# Transaction stack with the task that owns it. A child task inherits the
+# context of its creator, so a stack owned by another task is treated as
+# empty: the child neither sees nor commits its creator's open transaction.
+_transaction: ContextVar[Tuple[Optional['asyncio.Task[Any]'], Tuple[Layer, ...]]] = \
+    ContextVar('transaction', default=(None, ()))
+
+def _stack() -> Tuple[Layer, ...]:
+    """Transaction stack of the current task."""
+    owner, stack = _transaction.get()
+    return stack if owner is asyncio.current_task() else ()
+
+def _set_stack(stack: Tuple[Layer, ...]) -> None:
+    _transaction.set((asyncio.current_task(), stack))
+
+class AsyncDatabase:
+    """Awaitable facade over a database for asyncio applications.
+
+    Point reads and writes run inline. Scans (COUNTS/FIND) yield to the
+    event loop between chunks, and large commits are applied in an
+    executor. Transactions are per task: BEGIN/COMMIT/ROLLBACK only affect
+    the calling task, and its writes reach the database on the outermost
+    COMMIT. Tasks created inside a transaction start outside of it.
+
+    Commits are atomic to readers: the outermost COMMIT waits until no
+    other task is in a scan or snapshot, and new scans wait for it. A task
+    that is itself in a scan or snapshot never waits for a commit (it would
+    wait for itself); its own writes and commits are applied inline, which
+    no other task can interleave with.
+    """
+
+    def __init__(self, database: Database, logger: Logger, chunk_size: int = 1000,
+                 executor: Optional[Executor] = None):
+        """Initialize the facade.
+
+        Args:
+            database: Wrapped database.
+            logger: Logger for facade operations.
+            chunk_size: Keys processed between event loop yields, and the
+                commit size above which a commit runs in the executor.
+            executor: Executor for blocking work (default loop executor if None).
+        """
+        self._database = database
+        self._logger = logger
+        self._chunk_size = chunk_size
+        self._executor = executor
+        self._write_lock = asyncio.Lock()
+        # Tasks in a scan or snapshot -> how many they have open
+        self._readers: Dict[Optional['asyncio.Task[Any]'], int] = {}
+        self._readers_left = asyncio.Event()
+        self._logger.info("AsyncDatabase initialized")
+
+    @property
+    def database(self) -> Database:
+        """The wrapped synchronous database."""
+        return self._database
+
+    async def run_in_executor(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking callable in the facade's executor.
+
+        Args:
+            func: Callable to run.
+            *args: Positional arguments.
+
+        Returns:
+            The callable's result.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _is_reading(self) -> bool:
+        """Whether the current task is in a scan or snapshot."""
+        return asyncio.current_task() in self._readers
+
+    async def _wait_for_writer(self) -> None:
+        """Wait for a commit that is being applied in the executor."""
+        if self._write_lock.locked() and not self._is_reading():
+            async with self._write_lock:
+                pass
+
+    @asynccontextmanager
+    async def _reading(self) -> AsyncIterator[None]:
+        """Register the current task as a reader that commits must not interleave with."""
+        task = asyncio.current_task()
+        if task in self._readers:
+            # Nested scan: a pending commit is already waiting for this task
+            self._readers[task] += 1
+        else:
+            # Waits for a commit being applied or waiting for readers to finish
+            async with self._write_lock:
+                self._readers[task] = 1
+        try:
+            yield
+        finally:
+            if self._readers[task] == 1:
+                del self._readers[task]
+            else:
+                self._readers[task] -= 1
+            self._readers_left.set()
+
+    async def _wait_for_readers(self) -> None:
+        """Wait until no task is reading; call with the write lock held."""
+        while self._readers:
+            self._readers_left.clear()
+            await self._readers_left.wait()
+
+    async def set(self, key: str, value: str) -> None:
+        """Set a key-value pair."""
+        stack = _stack()
+        if stack:
+            stack[-1][key] = value
+            return
+        if self._is_reading():
+            self._database.set(key, value)
+            return
+        async with self._write_lock:
+            self._database.set(key, value)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Get a value by key, seeing the task's uncommitted writes."""
+        for layer in reversed(_stack()):
+            if key in layer:
+                return layer[key]
+        await self._wait_for_writer()
+        return self._database.get(key)
+
+    async def unset(self, key: str) -> None:
+        """Remove a key."""
+        stack = _stack()
+        if stack:
+            stack[-1][key] = None
+            return
+        if self._is_reading():
+            self._database.unset(key)
+            return
+        async with self._write_lock:
+            self._database.unset(key)
+
+    async def scan(self) -> AsyncIterator[List[Tuple[str, str]]]:
+        """Iterate over visible key-value pairs in chunks, yielding to the loop.
+
+        Yields:
+            Lists of (key, value) pairs.
+        """
+        stack = _stack()
+        overlay: Layer = {}
+        for layer in stack:
+            overlay.update(layer)
+        async with self._reading():
+            for chunk in self._database.scan(self._chunk_size):
+                if overlay:
+                    chunk = [(k, v) for k, v in chunk if k not in overlay]
+                yield chunk
+                await asyncio.sleep(0)
+        if overlay:
+            yield [(k, v) for k, v in overlay.items() if v is not None]  # type: ignore
+
+    async def counts(self, value: str) -> int:
+        """Count how many keys have a value."""
+        result = 0
+        async for chunk in self.scan():
+            result += sum(1 for _, v in chunk if v == value)
+        self._logger.info(f"ASYNC COUNTS: {value} = {result}")
+        return result
+
+    async def find(self, value: str) -> List[str]:
+        """Find all keys that have a value."""
+        found: List[str] = []
+        async for chunk in self.scan():
+            found.extend(k for k, v in chunk if v == value)
+        self._logger.info(f"ASYNC FIND: {value} = {len(found)} keys")
+        return found
+
+    async def begin(self) -> None:
+        """Begin a transaction for the current task."""
+        _set_stack(_stack() + ({},))
+
+    async def rollback(self) -> bool:
+        """Rollback the current task's innermost transaction.
+
+        Returns:
+            True if rolled back, False if no transaction.
+        """
+        stack = _stack()
+        if not stack:
+            return False
+        _set_stack(stack[:-1])
+        return True
+
+    async def commit(self) -> bool:
+        """Commit the current task's innermost transaction.
+
+        Nested commits merge into the enclosing transaction; the outermost
+        commit applies the changes to the database.
+
+        Returns:
+            True if committed, False if no transaction.
+        """
+        stack = _stack()
+        if not stack:
+            return False
+        top = stack[-1]
+        _set_stack(stack[:-1])
+        if len(stack) > 1:
+            stack[-2].update(top)
+            return True
+        if self._is_reading():
+            # Inline: no other task runs until the whole commit is applied
+            self._apply(top)
+        else:
+            async with self._write_lock:
+                await self._wait_for_readers()
+                if len(top) > self._chunk_size:
+                    await self.run_in_executor(self._apply, top)
+                else:
+                    self._apply(top)
+        self._logger.info(f"ASYNC COMMIT: {len(top)} changes")
+        return True
+
+    def _apply(self, changes: Layer) -> None:
+        """Write committed changes to the database."""
+        database = self._database
+        for k, v in changes.items():
+            if v is None:
+                database.unset(k)
+            else:
+                database.set(k, v)
+
+    async def get_transaction_depth(self) -> int:
+        """Get the current task's transaction depth."""
+        return len(_stack())
+
+    async def snapshot(self) -> Dict[str, str]:
+        """Get a copy of the committed data, built in the executor."""
+        async with self._reading():
+            return await self.run_in_executor(self._database.snapshot)
+
+    def transaction(self) -> '_TransactionContext':
+        """Async context manager: commit on success, rollback on error.
+
+        Example:
+            async with adb.transaction():
+                await adb.set('A', '10')
+        """
+        return _TransactionContext(self)
+
+class _TransactionContext:
+    """Task-local transaction block returned by ``AsyncDatabase.transaction``."""
+
+    def __init__(self, database: AsyncDatabase):
+        self._database = database
+
+    async def __aenter__(self) -> AsyncDatabase:
+        await self._database.begin()
+        return self._database
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self._database.commit()
+        else:
+            await self._database.rollback()
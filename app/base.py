@@ -1,5 +1,18 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List, Protocol
+from typing import Any, Optional, List, Dict, Iterator, Tuple, Protocol
+
+def to_bytes(data: Any) -> bytes:
+    """Normalize a binary-mode key or value.
+
+    ``bytes`` pass through unchanged, ``str`` is encoded as UTF-8 and other
+    buffers (bytearray, memoryview) are copied, so later changes by the
+    caller cannot reach the stored value.
+    """
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode('utf-8')
+    return bytes(data)
 
 class KeyValueStore(Protocol):
     """Interface for basic key-value operations."""
@@ -26,6 +39,10 @@ class SearchableStore(Protocol):
     def find(self, value: str) -> List[str]:
         """Find keys with a specific value."""
         ...
+    
+    def scan(self, chunk_size: int = 1000) -> Iterator[List[Tuple[str, str]]]:
+        """Iterate over visible key-value pairs in chunks."""
+        ...
 
 class TransactionalStore(Protocol):
     """Interface for transaction operations."""
@@ -46,7 +63,14 @@ class TransactionalStore(Protocol):
         """Get current transaction depth."""
         ...
 
-class Database(KeyValueStore, SearchableStore, TransactionalStore):
+class SnapshotStore(Protocol):
+    """Interface for exporting committed data."""
+    
+    def snapshot(self) -> Dict[str, str]:
+        """Get a copy of the committed (base layer) data."""
+        ...
+
+class Database(KeyValueStore, SearchableStore, TransactionalStore, SnapshotStore):
     """Complete database interface combining all operations."""
     pass
 
@@ -77,6 +101,10 @@ class BaseDB(ABC):
     def find(self, value: str) -> List[str]:
         pass
 
+    @abstractmethod
+    def scan(self, chunk_size: int = 1000) -> Iterator[List[Tuple[str, str]]]:
+        pass
+
     @abstractmethod
     def begin(self) -> None:
         pass
@@ -91,4 +119,8 @@ class BaseDB(ABC):
 
     @abstractmethod
     def get_transaction_depth(self) -> int:
+        pass
+
+    @abstractmethod
+    def snapshot(self) -> Dict[str, str]:
         pass 
\ No newline at end of file
@@ -0,0 +1,209 @@
+import bisect
+import random
+import threading
+import time
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Sequence
+from .client import Connection
+from .server import Session
+
+# command -> weight; 'tx' is BEGIN, two SETs and COMMIT
+DEFAULT_MIX = {'set': 30, 'get': 50, 'unset': 5, 'counts': 2, 'find': 1, 'tx': 12}
+DISTRIBUTIONS = ('uniform', 'zipf')
+PERCENTILES = (50, 90, 99, 99.9)
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Parse a command mix such as "set=30,get=70".
+
+    Args:
+        text: Comma separated ``command=weight`` pairs.
+
+    Returns:
+        Command weights.
+    """
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip().lower()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown bench command: {name}")
+        mix[name] = int(weight)
+    return mix
+
+class KeyChooser:
+    """Picks key indexes uniformly or with a Zipf distribution (s=0.99)."""
+
+    def __init__(self, keys: int, distribution: str, rng: random.Random):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution: {distribution}")
+        self._keys = keys
+        self._rng = rng
+        self._cumulative: Optional[List[float]] = None
+        if distribution == 'zipf':
+            self._cumulative = list(accumulate(1.0 / (i + 1) ** 0.99 for i in range(keys)))
+
+    def next(self) -> int:
+        if self._cumulative is None:
+            return self._rng.randrange(self._keys)
+        point = self._rng.random() * self._cumulative[-1]
+        return min(bisect.bisect_left(self._cumulative, point), self._keys - 1)
+
+def generate(ops: int, keys: int, distribution: str = 'uniform',
+             mix: Optional[Dict[str, int]] = None, value_size: int = 8,
+             values: int = 100, seed: int = 1) -> List[List[str]]:
+    """Build a command stream.
+
+    Args:
+        ops: Number of operations ('tx' counts as one).
+        keys: Key space size.
+        distribution: Key popularity, 'uniform' or 'zipf'.
+        mix: Command weights (DEFAULT_MIX if None).
+        value_size: Length of generated values.
+        values: Number of distinct values, so COUNTS/FIND match keys.
+        seed: Random seed.
+
+    Returns:
+        Commands as ``[name, *args]`` lists.
+    """
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    names = list(mix)
+    weights = list(accumulate(mix.values()))
+    chooser = KeyChooser(keys, distribution, rng)
+    pool = [str(i).rjust(value_size, 'v') for i in range(values)]
+    commands: List[List[str]] = []
+    for _ in range(ops):
+        name = names[bisect.bisect_right(weights, rng.random() * weights[-1])]
+        key = f'key:{chooser.next()}'
+        if name == 'set':
+            commands.append(['set', key, rng.choice(pool)])
+        elif name in ('get', 'unset'):
+            commands.append([name, key])
+        elif name in ('counts', 'find'):
+            commands.append([name, rng.choice(pool)])
+        else:
+            commands.append(['begin'])
+            commands.append(['set', key, rng.choice(pool)])
+            commands.append(['set', f'key:{chooser.next()}', rng.choice(pool)])
+            commands.append(['commit'])
+    return commands
+
+def _deal(commands: List[List[str]], workers: int) -> List[List[List[str]]]:
+    """Split a command stream between workers, keeping each transaction on one worker."""
+    streams: List[List[List[str]]] = [[] for _ in range(workers)]
+    depth = 0
+    turn = 0
+    for command in commands:
+        streams[turn % workers].append(command)
+        if command[0] == 'begin':
+            depth += 1
+        elif command[0] in ('commit', 'rollback') and depth:
+            depth -= 1
+        if not depth:
+            turn += 1
+    return streams
+
+def _batches(commands: List[List[str]], pipeline: int) -> List[List[List[str]]]:
+    return [commands[i:i + pipeline] for i in range(0, len(commands), pipeline)]
+
+class BenchResult:
+    """Throughput and latency of a bench run."""
+
+    def __init__(self, commands: int, elapsed: float, latencies: Dict[str, List[float]],
+                 errors: int):
+        self.commands = commands
+        self.elapsed = elapsed
+        self.latencies = latencies
+        self.errors = errors
+
+    @property
+    def throughput(self) -> float:
+        """Commands per second."""
+        return self.commands / self.elapsed if self.elapsed else 0.0
+
+    @staticmethod
+    def percentiles(samples: List[float]) -> Dict[str, float]:
+        """Latency percentiles and maximum, in milliseconds."""
+        ordered = sorted(samples)
+        if not ordered:
+            return {}
+        result = {f"p{p:g}": ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)] * 1000
+                  for p in PERCENTILES}
+        result['max'] = ordered[-1] * 1000
+        return result
+
+    def report(self) -> str:
+        """Human readable summary."""
+        everything = [s for samples in self.latencies.values() for s in samples]
+        lines = [f"{self.commands} commands in {self.elapsed:.2f}s: "
+                 f"{self.throughput:,.0f} commands/s, {self.errors} errors"]
+        columns = ['p50', 'p90', 'p99', 'p99.9', 'max']
+        lines.append(f"{'latency ms':<12}" + ''.join(f"{c:>10}" for c in columns))
+        rows = [('all', everything)] + sorted(self.latencies.items())
+        for name, samples in rows:
+            stats = self.percentiles(samples)
+            lines.append(f"{name:<12}" + ''.join(f"{stats[c]:>10.3f}" for c in columns))
+        return '\n'.join(lines)
+
+def run(commands: List[List[str]], session_factory: Any, concurrency: int = 1,
+        pipeline: int = 1) -> BenchResult:
+    """Run a command stream and measure it.
+
+    Operations are dealt out round-robin to ``concurrency`` workers (a
+    transaction stays with one worker), and each worker sends its share in
+    batches of ``pipeline`` commands. Each command's latency is the round
+    trip of its batch.
+
+    Args:
+        commands: Commands from ``generate``.
+        session_factory: Callable returning an object with
+            ``execute(batch) -> results`` and ``close()``.
+        concurrency: Number of worker threads, each with its own session.
+        pipeline: Commands sent per batch.
+
+    Returns:
+        The measurements.
+    """
+    shares = [_batches(stream, max(pipeline, 1)) for stream in _deal(commands, concurrency)]
+    latencies: List[Dict[str, List[float]]] = [{} for _ in range(concurrency)]
+    errors = [0] * concurrency
+    sessions = [session_factory() for _ in range(concurrency)]
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(index: int) -> None:
+        session = sessions[index]
+        samples = latencies[index]
+        barrier.wait()
+        for batch in shares[index]:
+            start = time.perf_counter()
+            results = session.execute(batch)
+            elapsed = time.perf_counter() - start
+            for command, result in zip(batch, results):
+                samples.setdefault(command[0], []).append(elapsed)
+                if isinstance(result, Exception):
+                    errors[index] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    for session in sessions:
+        session.close()
+    merged: Dict[str, List[float]] = {}
+    for samples in latencies:
+        for name, values in samples.items():
+            merged.setdefault(name, []).extend(values)
+    return BenchResult(len(commands), elapsed, merged, sum(errors))
+
+def in_process(registry: Any, database: Any) -> Any:
+    """Session factory executing commands directly against a registry."""
+    lock = threading.Lock()
+    return lambda: Session(registry, database, lock)
+
+def remote(address: str) -> Any:
+    """Session factory connecting to a server at ``address``."""
+    return lambda: Connection(address)
@@ -1,15 +1,22 @@
+import atexit
 import click
+import os
 import sys
+import tempfile
+import time
 from .database_factory import DatabaseFactory
-from .commands import CommandRegistry
+from .commands import CommandRegistry, CommandSpec
 from .interactive import InteractiveMode
 from .config import Config
 from .base import Database
 from .logger import Logger
+from .logger import NullLogger
 from .plugins.plugin_manager import PluginManager
-from .plugins.echo_plugin import EchoPlugin
 from typing import Optional
 
+# Servers, replication, bench and trace are imported by the commands that
+# use them, so one-shot commands such as GET start without them.
+
 class CLI:
     """CLI application following SOLID principles with dependency injection."""
     
@@ -29,8 +36,22 @@ class CLI:
         self._interactive_mode = interactive_mode
         self._logger = logger
         self._plugin_manager = plugin_manager
+        self._plugins_loaded = False
         self._logger.info("CLI initialized")
 
+    def load_plugins(self) -> None:
+        """Declare plugin commands found through entry points (once).
+
+        Only sessions that accept arbitrary commands need them; one-shot
+        commands skip the entry point scan.
+        """
+        if self._plugins_loaded:
+            return
+        self._plugins_loaded = True
+        # Plugins are imported the first time one of their commands runs
+        self._plugin_manager.discover()
+        self._plugin_manager.initialize_all(Config(), self._command_registry)
+
 @click.group()
 def cli():
     """In-Memory Database CLI Application"""
@@ -47,8 +68,7 @@ def set(key, value):
 @click.argument('key')
 def get(key):
     """Get a value by key from the database"""
-    val = _get_cli_instance()._command_registry.execute('get', key)
-    click.echo(val if val is not None else 'NULL')
+    _run_command('get', key)
 
 @cli.command()
 @click.argument('key')
@@ -57,18 +77,28 @@ def unset(key):
     _get_cli_instance()._command_registry.execute('unset', key)
 
 @cli.command()
-@click.argument('value')
-def counts(value):
-    """Count how many times a value appears in the database"""
-    result = _get_cli_instance()._command_registry.execute('counts', value)
-    click.echo(result)
+@click.argument('values', nargs=-1, required=True)
+def counts(values):
+    """Count how many times each value appears in the database (one pass for several)"""
+    _run_command('counts', *values)
 
 @cli.command()
 @click.argument('value')
-def find(value):
+@click.option('--cursor', type=int, default=None, help='Page through results: 0 to start, then the returned cursor')
+@click.option('--count', type=int, default=None, help='Keys per page (with --cursor)')
+def find(value, cursor, count):
     """Find all keys that have the specified value"""
-    found = _get_cli_instance()._command_registry.execute('find', value)
-    click.echo(' '.join(found) if found else 'NULL')
+    args = [value]
+    if cursor is not None:
+        args += ['cursor', str(cursor)]
+    if count is not None:
+        args += ['count', str(count)]
+    printed = False
+    for fragment in _get_cli_instance()._command_registry.dispatch_stream('find', args):
+        click.echo(fragment, nl=False)
+        printed = True
+    if printed:
+        click.echo()
 
 @cli.command()
 def begin():
@@ -78,14 +108,12 @@ def begin():
 @cli.command()
 def rollback():
     """Rollback the current transaction"""
-    if not _get_cli_instance()._command_registry.execute('rollback'):
-        click.echo('NO TRANSACTION')
+    _run_command('rollback')
 
 @cli.command()
 def commit():
     """Commit the current transaction"""
-    if not _get_cli_instance()._command_registry.execute('commit'):
-        click.echo('NO TRANSACTION')
+    _run_command('commit')
 
 @cli.command()
 def end():
@@ -96,14 +124,173 @@ def end():
 @cli.command()
 def status():
     """Show database status"""
-    transaction_depth = _get_cli_instance()._command_registry.execute('status')
-    click.echo(f"Transaction depth: {transaction_depth}")
+    transaction_depth = _run_command('status')
     _get_cli_instance()._logger.info(f"STATUS: Transaction depth = {transaction_depth}")
 
 @cli.command()
-def interactive():
+@click.option('--replicate', 'replicate_address', default=None,
+              help='Serve replicas on HOST:PORT or unix:/path')
+@click.option('--publish', is_flag=True, default=False,
+              help='Publish committed data to shared memory readers')
+def interactive(replicate_address, publish):
     """Start interactive mode"""
-    _get_cli_instance()._interactive_mode.run()
+    instance = _get_cli_instance()
+    instance.load_plugins()
+    primary = None
+    publisher = None
+    if publish:
+        from .shm_replica import SharedMemoryPublisher
+        config = Config()
+        publisher = SharedMemoryPublisher(instance._database, instance._logger,
+                                          config.get('shared_memory.name', 'inmemory_db'))
+        publisher.start(config.get('shared_memory.interval', 0.5))
+        click.echo(f"Publishing to shared memory as {publisher.name}")
+    if replicate_address:
+        from .replication import ReplicationPrimary
+        config = Config()
+        primary = ReplicationPrimary(
+            instance._database, instance._logger, replicate_address,  # type: ignore
+            backlog_size=config.get('replication.backlog_size', 10000),
+            ping_interval=config.get('replication.ping_interval', 1.0),
+        )
+        primary.start()
+        click.echo(f"Serving replicas on {primary.address}")
+    try:
+        instance._interactive_mode.run()
+    finally:
+        if primary is not None:
+            primary.stop()
+        if publisher is not None:
+            publisher.close()
+
+@cli.command()
+@click.argument('address')
+def replica(address):
+    """Start a read-only interactive replica of a primary at ADDRESS"""
+    from .replication import Replica
+    config = Config()
+    logger = DatabaseFactory.create_logger(config)
+    replica_node = Replica(address, logger, binary=config.get('database.binary', False))
+    registry = CommandRegistry(replica_node.database, logger)
+    registry.register('lag', replica_node.lag, 'Show replication lag',
+                      CommandSpec(formatter=lambda lag: ' '.join(f"{k}={v}" for k, v in lag.items())))
+    replica_node.start()
+    try:
+        InteractiveMode(registry, logger).run()
+    finally:
+        replica_node.stop()
+
+@cli.command()
+@click.argument('name', required=False)
+def reader(name):
+    """Start a read-only interactive session on data published to shared memory"""
+    from .shm_replica import SharedMemoryReader
+    config = Config()
+    logger = DatabaseFactory.create_logger(config)
+    shm_reader = SharedMemoryReader(name or config.get('shared_memory.name', 'inmemory_db'))
+    registry = CommandRegistry(shm_reader, logger)  # type: ignore
+    registry.register('epoch', lambda: shm_reader.epoch, 'Show the published epoch being read')
+    try:
+        InteractiveMode(registry, logger).run()
+    finally:
+        shm_reader.close()
+
+@cli.command()
+@click.argument('address', required=False)
+def serve(address):
+    """Serve the database to network clients on ADDRESS (HOST:PORT or unix:/path)"""
+    from .server import DEFAULT_TRANSACTION_TIMEOUT, Server
+    instance = _get_cli_instance()
+    instance.load_plugins()
+    config = Config()
+    server = Server(instance._command_registry, instance._database, instance._logger,
+                    address or config.get('server.address', '127.0.0.1:7379'),
+                    config.get('server.transaction_timeout', DEFAULT_TRANSACTION_TIMEOUT))
+    server.start()
+    click.echo(f"Serving on {server.address} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+@cli.command()
+@click.option('--ops', default=100000, show_default=True, help='Operations to run')
+@click.option('--keys', default=10000, show_default=True, help='Key space size')
+# Choices mirror bench.DISTRIBUTIONS; bench is imported only when it runs
+@click.option('--distribution', type=click.Choice(['uniform', 'zipf']), default='uniform',
+              show_default=True, help='Key popularity')
+@click.option('--concurrency', '-c', default=1, show_default=True, help='Parallel clients')
+@click.option('--pipeline', '-P', default=1, show_default=True, help='Commands per request batch')
+@click.option('--mix', default=None, help='Command weights, e.g. set=30,get=60,tx=10')
+@click.option('--value-size', default=8, show_default=True, help='Value length')
+@click.option('--server', 'address', default=None, help='Bench a server at HOST:PORT instead of in-process')
+@click.option('--seed', default=1, show_default=True, help='Random seed')
+def bench(ops, keys, distribution, concurrency, pipeline, mix, value_size, address, seed):
+    """Run a load test and print throughput and latency percentiles"""
+    from . import bench as load
+    commands = load.generate(ops, keys, distribution, load.parse_mix(mix) if mix else None,
+                             value_size=value_size, seed=seed)
+    if address:
+        factory = load.remote(address)
+        target = address
+    else:
+        # A fresh database without logging, so the numbers measure the engine
+        logger = NullLogger()
+        database = DatabaseFactory.create_database(Config(), logger)
+        factory = load.in_process(CommandRegistry(database, logger), database)
+        target = 'in-process'
+    click.echo(f"{target}: {ops} ops, {keys} keys ({distribution}), "
+               f"concurrency {concurrency}, pipeline {pipeline}")
+    result = load.run(commands, factory, concurrency=concurrency, pipeline=pipeline)
+    click.echo(result.report())
+
+@cli.command()
+@click.argument('trace_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--engine', type=click.Choice(['inmemory', 'mmap', 'sqlite']), default=None,
+              help='Engine to replay against (default: database.type)')
+@click.option('--timing', type=click.Choice(['fast', 'original']), default='fast',
+              show_default=True, help='Run back to back or keep the recorded timing')
+@click.option('--speed', default=1.0, show_default=True, help='Time scale for original timing')
+def replay(trace_file, engine, timing, speed):
+    """Replay a TRACE file against a fresh database and compare results and latencies"""
+    from .trace import read_trace, replay as replay_trace
+    config = Config()
+    if engine:
+        config.set('database.type', engine)
+    with tempfile.TemporaryDirectory() as directory:
+        # File engines start from empty files, as the database did when the trace started
+        config.set('database.storage.path', os.path.join(directory, 'replay.mmap'))
+        config.set('database.sqlite.path', os.path.join(directory, 'replay.sqlite'))
+        logger = NullLogger()
+        database = DatabaseFactory.create_database(config, logger)
+        try:
+            result = replay_trace(read_trace(trace_file), CommandRegistry(database, logger),
+                                  timing=timing, speed=speed)
+        finally:
+            if hasattr(database, 'close'):
+                database.close()  # type: ignore
+    click.echo(f"{trace_file} on {config.get('database.type', 'inmemory')}:")
+    click.echo(result.report())
+
+def _run_command(name: str, *args: str):
+    """Execute a registered command and echo its formatted result.
+
+    Args:
+        name: Command name.
+        *args: Command arguments.
+
+    Returns:
+        Raw command result.
+    """
+    registry = _get_cli_instance()._command_registry
+    result = registry.execute(name, *args)
+    output = registry.format_result(name, result)
+    if output is not None:
+        click.echo(output)
+    return result
 
 # Global CLI instance for Click commands
 _cli_instance: Optional[CLI] = None
@@ -120,11 +307,36 @@ def _create_cli_instance() -> CLI:
     config = Config()
     database, logger, _ = DatabaseFactory.create_with_dependencies(config)
     command_registry = CommandRegistry(database, logger)
-    interactive_mode = InteractiveMode(command_registry, logger)
     plugin_manager = PluginManager()
-    # Регистрируем плагины
-    plugin_manager.register(EchoPlugin())
-    plugin_manager.initialize_all(config, command_registry)
+    # atexit runs these last first: plugins and the pool stop before the database closes
+    if hasattr(database, 'close'):
+        # File engines batch writes: commit them when a one-shot command exits
+        atexit.register(database.close)  # type: ignore
+    atexit.register(command_registry.shutdown_offload)
+    atexit.register(plugin_manager.cleanup_all)
+
+    def create_offload_executor():
+        from .offload import OffloadExecutor
+        return OffloadExecutor(
+            logger,
+            max_workers=config.get('plugins.offload.max_workers'),
+            max_pending=config.get('plugins.offload.max_pending', 16),
+            result_ttl=config.get('plugins.offload.result_ttl', 600.0),
+        )
+    # The executor, procedures and hot-key tracker are built when first used
+    command_registry.attach_offload(create_offload_executor)
+    command_registry.configure_procedures(
+        default_budget=config.get('plugins.procedures.time_budget', 1.0))
+    command_registry.configure_hotkeys(
+        sample_rate=config.get('hotkeys.sample_rate', 0.01),
+        k=config.get('hotkeys.top', 32),
+        width=config.get('hotkeys.width', 2048),
+        depth=config.get('hotkeys.depth', 4),
+        half_life=config.get('hotkeys.half_life', 60.0),
+    )
+    if config.get('hotkeys.enabled', False):
+        command_registry.hotkeys().start()
+    interactive_mode = InteractiveMode(command_registry, logger)
     return CLI(database, command_registry, interactive_mode, logger, plugin_manager)
 
 def main():
@@ -0,0 +1,330 @@
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Sequence
+from .protocol import INCOMPLETE, Reader, ReplyError, encode_command_into
+from .replication import parse_address
+
+# Size of the receive buffer each connection reads into
+RECV_SIZE = 65536
+
+class Commands:
+    """Database commands on top of ``execute_command``.
+
+    ``Client`` sends each command at once, ``Pipeline`` queues it, and the
+    asyncio classes return awaitables, so they all share these methods.
+    """
+
+    def execute_command(self, *args: str) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str) -> Any:
+        return self.execute_command('set', key, value)
+
+    def get(self, key: str) -> Any:
+        return self.execute_command('get', key)
+
+    def unset(self, key: str) -> Any:
+        return self.execute_command('unset', key)
+
+    def counts(self, value: str, *values: str) -> Any:
+        return self.execute_command('counts', value, *values)
+
+    def values_top(self, n: int = 10) -> Any:
+        return self.execute_command('values', 'top', str(n))
+
+    def find(self, value: str, cursor: Optional[int] = None, count: Optional[int] = None) -> Any:
+        options = []
+        if cursor is not None:
+            options += ['cursor', str(cursor)]
+        if count is not None:
+            options += ['count', str(count)]
+        return self.execute_command('find', value, *options)
+
+    def scan(self, cursor: int = 0, count: Optional[int] = None) -> Any:
+        options = ['count', str(count)] if count is not None else []
+        return self.execute_command('scan', str(cursor), *options)
+
+    def incr(self, key: str, amount: int = 1) -> Any:
+        return self.execute_command('incr', key, str(amount))
+
+    def decr(self, key: str, amount: int = 1) -> Any:
+        return self.execute_command('decr', key, str(amount))
+
+    def append(self, key: str, suffix: str) -> Any:
+        return self.execute_command('append', key, suffix)
+
+    def getset(self, key: str, value: str) -> Any:
+        return self.execute_command('getset', key, value)
+
+    def call(self, name: str, *args: str) -> Any:
+        return self.execute_command('call', name, *args)
+
+    def ping(self) -> Any:
+        return self.execute_command('ping')
+
+class Connection:
+    """One blocking connection to a server.
+
+    Requests are encoded into a reused buffer and replies are received
+    into a preallocated one, so a batch costs one write and as few reads
+    as the replies need.
+    """
+
+    def __init__(self, address: str, timeout: Optional[float] = None):
+        """Connect to a server.
+
+        Args:
+            address: Server address ("host:port" or "unix:/path").
+            timeout: Socket timeout in seconds (None to block).
+        """
+        family, addr = parse_address(address)
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(addr)
+        if family == socket.AF_INET:
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = Reader()
+        self._out = bytearray()
+        self._in = bytearray(RECV_SIZE)
+        self._view = memoryview(self._in)
+
+    def execute(self, commands: Sequence[Sequence[str]]) -> List[Any]:
+        """Send a batch of commands and read one reply per command.
+
+        Args:
+            commands: Commands as ``[name, *args]`` lists.
+
+        Returns:
+            The replies; error replies are ``ReplyError`` instances.
+        """
+        out = self._out
+        del out[:]
+        for command in commands:
+            encode_command_into(out, command)
+        self._sock.sendall(out)
+        replies: List[Any] = []
+        while len(replies) < len(commands):
+            reply = self._reader.get()
+            if reply is INCOMPLETE:
+                received = self._sock.recv_into(self._in)
+                if not received:
+                    raise ConnectionError("Server closed the connection")
+                self._reader.feed(self._view[:received])
+            else:
+                replies.append(reply)
+        return replies
+
+    def close(self) -> None:
+        self._sock.close()
+
+class ConnectionPool:
+    """Thread-safe pool of connections to one server.
+
+    Connections are opened on demand up to ``max_connections``; further
+    callers wait for one to be released. A connection that fails is
+    closed instead of going back to the pool.
+    """
+
+    def __init__(self, address: str, max_connections: int = 10, timeout: Optional[float] = None):
+        """Initialize the pool.
+
+        Args:
+            address: Server address ("host:port" or "unix:/path").
+            max_connections: Maximum number of open connections.
+            timeout: Socket timeout of each connection.
+        """
+        self.address = address
+        self.max_connections = max_connections
+        self._timeout = timeout
+        self._idle: List[Connection] = []
+        self._open = 0
+        self._available = threading.Condition()
+
+    def acquire(self) -> Connection:
+        """Take an idle connection, opening one if the pool is not full."""
+        with self._available:
+            while not self._idle and self._open >= self.max_connections:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+        try:
+            return Connection(self.address, self._timeout)
+        except OSError:
+            self._discard()
+            raise
+
+    def release(self, connection: Connection, broken: bool = False) -> None:
+        """Return a connection to the pool (or close it if ``broken``)."""
+        if broken:
+            connection.close()
+            self._discard()
+            return
+        with self._available:
+            self._idle.append(connection)
+            self._available.notify()
+
+    def _discard(self) -> None:
+        with self._available:
+            self._open -= 1
+            self._available.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        """Borrow a connection for the duration of a ``with`` block."""
+        connection = self.acquire()
+        broken = False
+        try:
+            yield connection
+        except OSError:
+            broken = True
+            raise
+        finally:
+            self.release(connection, broken)
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        with self._available:
+            for connection in self._idle:
+                connection.close()
+            self._open -= len(self._idle)
+            self._idle.clear()
+
+def _raise_errors(replies: List[Any]) -> List[Any]:
+    for reply in replies:
+        if isinstance(reply, ReplyError):
+            raise reply
+    return replies
+
+class Client(Commands):
+    """Client for a database served with ``python main.py serve``.
+
+    Every command is one round trip on a pooled connection; use
+    ``pipeline()`` to send many commands in one, and ``transaction()`` for
+    BEGIN/COMMIT blocks. Safe to share between threads.
+    """
+
+    def __init__(self, address: str = '127.0.0.1:7379', max_connections: int = 10,
+                 timeout: Optional[float] = None, pool: Optional[ConnectionPool] = None):
+        """Initialize the client.
+
+        Args:
+            address: Server address ("host:port" or "unix:/path").
+            max_connections: Pool size.
+            timeout: Socket timeout in seconds.
+            pool: Pool to use instead of creating one.
+        """
+        self.pool = pool or ConnectionPool(address, max_connections, timeout)
+
+    def execute_command(self, *args: str) -> Any:
+        """Run one command.
+
+        Raises:
+            ReplyError: If the server answered with an error.
+        """
+        with self.pool.connection() as connection:
+            return _raise_errors(connection.execute([args]))[0]
+
+    def pipeline(self) -> 'Pipeline':
+        """Create a pipeline sending queued commands in one batch."""
+        return Pipeline(self.pool)
+
+    @contextmanager
+    def transaction(self) -> Iterator['Transaction']:
+        """Run a ``with`` block in a server transaction.
+
+        Commands are queued and sent with BEGIN and COMMIT in one batch when
+        the block ends; ``execute()`` inside the block sends what is queued
+        so far (and BEGIN) to read intermediate results. If the block
+        raises, a transaction already opened on the server is rolled back.
+        Results are in ``results`` after the block; error replies are
+        raised after the COMMIT.
+        """
+        with self.pool.connection() as connection:
+            transaction = Transaction(connection)
+            try:
+                yield transaction
+            except BaseException:
+                try:
+                    transaction.rollback()
+                except OSError:
+                    pass  # the server rolls back when the connection drops
+                raise
+            transaction.commit()
+
+    def close(self) -> None:
+        """Close idle pooled connections."""
+        self.pool.close()
+
+class Pipeline(Commands):
+    """Queues commands and sends them in one batch with ``execute``."""
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+        self._queue: List[Sequence[str]] = []
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __enter__(self) -> 'Pipeline':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._queue = []
+
+    def execute_command(self, *args: str) -> 'Pipeline':
+        self._queue.append(args)
+        return self
+
+    def execute(self, raise_on_error: bool = True) -> List[Any]:
+        """Send the queued commands and return their replies in order.
+
+        Args:
+            raise_on_error: Raise the first error reply (after reading all
+                of them) instead of returning ``ReplyError`` instances.
+        """
+        queue, self._queue = self._queue, []
+        if not queue:
+            return []
+        with self._pool.connection() as connection:
+            replies = connection.execute(queue)
+        return _raise_errors(replies) if raise_on_error else replies
+
+class Transaction(Commands):
+    """Commands of a ``Client.transaction()`` block, pinned to one connection."""
+
+    def __init__(self, connection: Connection):
+        self._connection = connection
+        self._queue: List[Sequence[str]] = []
+        self._begun = False
+        self.results: List[Any] = []
+
+    def execute_command(self, *args: str) -> 'Transaction':
+        self._queue.append(args)
+        return self
+
+    def _send(self, trailer: Sequence[Sequence[str]] = ()) -> List[Any]:
+        batch = ([] if self._begun else [('begin',)]) + self._queue + list(trailer)
+        replies = self._connection.execute(batch)
+        if not self._begun:
+            replies = replies[1:]
+            self._begun = True
+        count = len(self._queue)
+        self._queue = []
+        self.results.extend(replies[:count])
+        return replies
+
+    def execute(self) -> List[Any]:
+        """Send the queued commands inside the transaction and return their replies."""
+        count = len(self._queue)
+        return _raise_errors(self._send()[:count]) if count else []
+
+    def commit(self) -> None:
+        if self._queue or self._begun:
+            _raise_errors(self._send([('commit',)]))
+
+    def rollback(self) -> None:
+        self._queue = []
+        if self._begun:
+            self._connection.execute([('rollback',)])
@@ -0,0 +1,170 @@
+import hashlib
+import lzma
+import sys
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Union
+
+ZLIB = 'zlib'
+LZMA = 'lzma'
+_RAW = 'raw'
+
+class CompressedValue:
+    """A large value kept compressed in a transaction layer.
+
+    Equality and hashing use a content digest, so COUNTS/FIND can compare
+    stored values against a probe without decompressing either side.
+    """
+
+    __slots__ = ('data', 'method', 'digest', 'size', 'text')
+
+    def __init__(self, data: bytes, method: str, digest: bytes, size: int, text: bool = True):
+        self.data = data
+        self.method = method
+        self.digest = digest
+        self.size = size
+        self.text = text
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CompressedValue):
+            return self.digest == other.digest
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sys.getsizeof(self.data) + sys.getsizeof(self.digest)
+
+    def __repr__(self) -> str:
+        return f"CompressedValue({self.method}, {self.size} -> {len(self.data)} bytes)"
+
+StoredValue = Union[str, bytes, CompressedValue]
+
+def _digest(raw: bytes) -> bytes:
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+class ValueCodec:
+    """Compresses values at or above a size threshold.
+
+    Every value of ``threshold`` characters or more is stored as a
+    ``CompressedValue`` (raw bytes if compression doesn't help), so a probe
+    built from the same text always compares equal to the stored form.
+    """
+
+    def __init__(self, threshold: int = 1024, algorithm: str = ZLIB, level: int = 6,
+                 dictionary: Optional[bytes] = None):
+        """Initialize the codec.
+
+        Args:
+            threshold: Minimum value length (characters) to compress.
+            algorithm: 'zlib' or 'lzma'.
+            level: Compression level (zlib 0-9, lzma preset 0-9).
+            dictionary: Shared zlib dictionary (see ``train``); ignored for lzma.
+        """
+        if algorithm not in (ZLIB, LZMA):
+            raise ValueError(f"Unknown compression algorithm: {algorithm}")
+        self.threshold = threshold
+        self.algorithm = algorithm
+        self.level = level
+        self.dictionary = dictionary if algorithm == ZLIB else None
+        self.values_encoded = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.compress_seconds = 0.0
+        self.values_decoded = 0
+        self.decompress_seconds = 0.0
+
+    @staticmethod
+    def train(samples: Iterable[str], size: int = 32 * 1024, segment: int = 32) -> bytes:
+        """Build a shared zlib dictionary from sample values.
+
+        Picks the most common fixed-size segments; the most frequent ones
+        go last because zlib finds matches at short distances cheapest.
+
+        Args:
+            samples: Representative values.
+            size: Dictionary size in bytes.
+            segment: Segment length in bytes.
+
+        Returns:
+            Dictionary bytes for ``ValueCodec(dictionary=...)``.
+        """
+        counter: Counter = Counter()
+        for sample in samples:
+            raw = sample.encode('utf-8')
+            for i in range(0, max(len(raw) - segment + 1, 1), segment // 2):
+                counter[raw[i:i + segment]] += 1
+        chosen = [seg for seg, count in counter.most_common(size // segment) if count > 1]
+        return b''.join(reversed(chosen))[-size:]
+
+    def encode(self, value: Union[str, bytes]) -> StoredValue:
+        """Convert a value (text, or bytes in binary mode) to its stored form."""
+        if len(value) < self.threshold:
+            return value
+        start = time.perf_counter()
+        text = isinstance(value, str)
+        raw = value.encode('utf-8') if text else value  # type: ignore
+        if self.algorithm == ZLIB:
+            if self.dictionary:
+                compressor = zlib.compressobj(self.level, zdict=self.dictionary)
+            else:
+                compressor = zlib.compressobj(self.level)
+            data = compressor.compress(raw) + compressor.flush()
+        else:
+            data = lzma.compress(raw, preset=self.level)
+        method = self.algorithm
+        if len(data) >= len(raw):
+            data, method = raw, _RAW
+        stored = CompressedValue(data, method, _digest(raw), len(raw), text)
+        self.compress_seconds += time.perf_counter() - start
+        self.values_encoded += 1
+        self.raw_bytes += len(raw)
+        self.stored_bytes += len(data)
+        return stored
+
+    def decode(self, stored: Optional[StoredValue]) -> Optional[Union[str, bytes]]:
+        """Convert a stored value back to text (or bytes, if it was encoded from bytes)."""
+        if not isinstance(stored, CompressedValue):
+            return stored
+        start = time.perf_counter()
+        if stored.method == ZLIB:
+            if self.dictionary:
+                decompressor = zlib.decompressobj(zdict=self.dictionary)
+                raw = decompressor.decompress(stored.data) + decompressor.flush()
+            else:
+                raw = zlib.decompress(stored.data)
+        elif stored.method == LZMA:
+            raw = lzma.decompress(stored.data)
+        else:
+            raw = stored.data
+        self.decompress_seconds += time.perf_counter() - start
+        self.values_decoded += 1
+        return raw.decode('utf-8') if stored.text else raw
+
+    def probe(self, value: Union[str, bytes]) -> StoredValue:
+        """Build a value that compares equal to the stored form, without compressing."""
+        if len(value) < self.threshold:
+            return value
+        raw = value.encode('utf-8') if isinstance(value, str) else value
+        return CompressedValue(b'', '', _digest(raw), len(raw))
+
+    def stats(self) -> Dict[str, Any]:
+        """Compression counters since the codec was created.
+
+        Returns:
+            Dict with values encoded/decoded, raw and stored bytes, bytes
+            saved and the CPU seconds spent compressing and decompressing.
+        """
+        return {
+            'algorithm': self.algorithm,
+            'threshold': self.threshold,
+            'values_encoded': self.values_encoded,
+            'raw_bytes': self.raw_bytes,
+            'stored_bytes': self.stored_bytes,
+            'saved_bytes': self.raw_bytes - self.stored_bytes,
+            'compress_seconds': round(self.compress_seconds, 6),
+            'values_decoded': self.values_decoded,
+            'decompress_seconds': round(self.decompress_seconds, 6),
+        }
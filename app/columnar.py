@@ -0,0 +1,216 @@
+import math
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+from .logger import Logger
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: pure-Python fallback below
+    np = None
+
+# Sorts after every character a key can continue with, to end a prefix range
+_PREFIX_END = chr(0x10FFFF)
+
+def parse_number(value: Optional[str]) -> Optional[float]:
+    """Return the value as a finite float, or None if it isn't numeric."""
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+class NumericColumn:
+    """Columnar mirror of the committed numeric values of a database.
+
+    Numeric values live in one dense float64 column (a NumPy array when
+    NumPy is installed, ``array('d')`` otherwise) with a parallel key list.
+    The mirror is updated from the database's commit listener; removals
+    move the last entry into the hole, so the column stays dense and every
+    update is O(1). Aggregates are a single pass over the column. Prefix
+    filters use a sorted copy of the keys, rebuilt when the key set has
+    changed since the last filter, and select the matching range with two
+    binary searches.
+    """
+
+    def __init__(self, logger: Logger, use_numpy: Optional[bool] = None):
+        """Initialize an empty column.
+
+        Args:
+            logger: Logger for mirror events.
+            use_numpy: Force NumPy on or off (default: use it when installed).
+        """
+        if use_numpy and np is None:
+            raise RuntimeError("NumPy is not installed")
+        self._logger = logger
+        self._numpy = np is not None if use_numpy is None else use_numpy
+        self._index: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._values: Any = np.empty(1024) if self._numpy else array('d')
+        self._lock = threading.Lock()
+        self._database: Any = None
+        # Keys in sorted order and their column positions (None: rebuild)
+        self._sorted: Any = None
+        self._order: Any = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def vectorized(self) -> bool:
+        """True if aggregates run on NumPy."""
+        return self._numpy
+
+    def attach(self, database: Any) -> None:
+        """Load the committed data of a database and follow its commits.
+
+        Args:
+            database: Database with ``snapshot`` and ``add_listener``.
+        """
+        # Follow commits before taking the snapshot, so none falls in between;
+        # one that lands while loading waits for the lock and is reapplied
+        database.add_listener(self.apply)
+        self._database = database
+        with self._lock:
+            self._index.clear()
+            self._keys.clear()
+            self._values = np.empty(1024) if self._numpy else array('d')
+            self._order = None
+            for key, value in database.snapshot().items():
+                self._put(key, parse_number(value))
+        self._logger.info(f"COLUMNS: mirroring {len(self._keys)} numeric values")
+
+    def detach(self) -> None:
+        """Stop following the database."""
+        if self._database is not None:
+            self._database.remove_listener(self.apply)
+            self._database = None
+
+    def apply(self, changes: Dict[str, Optional[str]]) -> None:
+        """Apply committed changes (database change listener)."""
+        with self._lock:
+            for key, value in changes.items():
+                self._put(key, parse_number(value))
+
+    def _put(self, key: str, number: Optional[float]) -> None:
+        index = self._index.get(key)
+        if number is None:
+            if index is not None:
+                self._remove(key, index)
+            return
+        if index is not None:
+            self._values[index] = number
+            return
+        index = len(self._keys)
+        if self._numpy:
+            if index == len(self._values):
+                grown = np.empty(2 * len(self._values))
+                grown[:index] = self._values
+                self._values = grown
+            self._values[index] = number
+        else:
+            self._values.append(number)
+        self._index[key] = index
+        self._keys.append(key)
+        self._order = None
+
+    def _remove(self, key: str, index: int) -> None:
+        del self._index[key]
+        last = len(self._keys) - 1
+        if index != last:
+            moved = self._keys[last]
+            self._keys[index] = moved
+            self._values[index] = self._values[last]
+            self._index[moved] = index
+        self._keys.pop()
+        if not self._numpy:
+            self._values.pop()
+        self._order = None
+
+    def _sorted_keys(self) -> Tuple[Any, Any]:
+        """Sorted keys and the column position of each, rebuilt if stale."""
+        if self._order is None:
+            keys = self._keys
+            if self._numpy:
+                unsorted = np.array(keys, dtype=str)
+                self._order = np.argsort(unsorted, kind='stable')
+                self._sorted = unsorted[self._order]
+            else:
+                self._order = sorted(range(len(keys)), key=keys.__getitem__)
+                self._sorted = list(map(keys.__getitem__, self._order))
+        return self._sorted, self._order
+
+    def _select(self, prefix: str) -> Any:
+        """Values of keys starting with ``prefix`` (all values for '')."""
+        count = len(self._keys)
+        if not prefix:
+            return self._values[:count]
+        keys, order = self._sorted_keys()
+        if self._numpy:
+            low, high = np.searchsorted(keys, [prefix, prefix + _PREFIX_END])
+            return self._values[order[low:high]]
+        low = bisect_left(keys, prefix)
+        high = bisect_left(keys, prefix + _PREFIX_END, low)
+        return array('d', map(self._values.__getitem__, order[low:high]))
+
+    def sum(self, prefix: str = '') -> float:
+        """Sum of the numeric values."""
+        with self._lock:
+            values = self._select(prefix)
+            return float(values.sum()) if self._numpy else math.fsum(values)
+
+    def avg(self, prefix: str = '') -> Optional[float]:
+        """Mean of the numeric values, None if there are none."""
+        with self._lock:
+            values = self._select(prefix)
+            if not len(values):
+                return None
+            return float(values.mean()) if self._numpy else math.fsum(values) / len(values)
+
+    def min(self, prefix: str = '') -> Optional[float]:
+        """Smallest numeric value, None if there are none."""
+        with self._lock:
+            values = self._select(prefix)
+            if not len(values):
+                return None
+            return float(values.min()) if self._numpy else min(values)
+
+    def max(self, prefix: str = '') -> Optional[float]:
+        """Largest numeric value, None if there are none."""
+        with self._lock:
+            values = self._select(prefix)
+            if not len(values):
+                return None
+            return float(values.max()) if self._numpy else max(values)
+
+    def histogram(self, buckets: int = 10, prefix: str = '') -> List[Tuple[float, float, int]]:
+        """Counts of values in equal-width buckets between the minimum and maximum.
+
+        Args:
+            buckets: Number of buckets.
+            prefix: Key prefix filter.
+
+        Returns:
+            ``(low, high, count)`` per bucket; the last bucket includes ``high``.
+        """
+        if buckets < 1:
+            raise ValueError("HISTOGRAM needs at least one bucket")
+        with self._lock:
+            values = self._select(prefix)
+            if not len(values):
+                return []
+            if self._numpy:
+                counts, edges = np.histogram(values, bins=buckets)
+                return [(float(edges[i]), float(edges[i + 1]), int(counts[i]))
+                        for i in range(buckets)]
+            low, high = min(values), max(values)
+            width = (high - low) / buckets
+            result = [0] * buckets
+            for value in values:
+                index = int((value - low) / width) if width else 0
+                result[min(index, buckets - 1)] += 1
+            edges = [low + i * width for i in range(buckets)] + [high]
+            return [(edges[i], edges[i + 1], result[i]) for i in range(buckets)]
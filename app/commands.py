@@ -1,7 +1,270 @@
-from typing import Callable, Dict, Any, Optional
+import inspect
+import itertools
+from collections import Counter
+import time
+from typing import (TYPE_CHECKING, Callable, Dict, Any, Generator, Iterator, List, Optional,
+                    Sequence, Tuple, Union)
 from .base import Database
 from .logger import Logger
 
+if TYPE_CHECKING:
+    # Imported where first used, so one-shot commands start without them
+    from .offload import OffloadExecutor
+    from .memory import MemoryProfiler
+    from .trace import TraceRecorder
+    from .columnar import NumericColumn
+    from .procedures import ProcedureRegistry, Procedure
+    from .hotkeys import HotKeyTracker
+    from .cursors import CursorTable
+
+Converter = Callable[[str], Any]
+Formatter = Callable[[Any], Optional[str]]
+Streamer = Callable[..., Iterator[str]]
+PreHook = Callable[[str, Tuple[Any, ...]], Any]
+PostHook = Callable[[str, Tuple[Any, ...], Any], None]
+ErrorHook = Callable[[str, Tuple[Any, ...], Exception], None]
+
+UNKNOWN_COMMAND = 'UNKNOWN COMMAND'
+INVALID_ARGUMENTS = 'INVALID ARGUMENTS'
+
+def format_default(result: Any) -> Optional[str]:
+    """Display any non-None result as text."""
+    return None if result is None else str(result)
+
+def format_silent(result: Any) -> Optional[str]:
+    """Commands that never produce output."""
+    return None
+
+def format_value(result: Optional[str]) -> str:
+    """Display a single value, NULL when missing."""
+    return result if result is not None else 'NULL'
+
+def format_keys(result: Sequence[str]) -> str:
+    """Display a list of keys, NULL when empty."""
+    return ' '.join(result) if result else 'NULL'
+
+def format_counts(result: Any) -> str:
+    """Display COUNTS: a number, or one "value count" line per value."""
+    if isinstance(result, dict):
+        return '\n'.join(f"{value} {count}" for value, count in result.items())
+    return str(result)
+
+def format_distribution(result: Sequence[Tuple[Any, int]]) -> str:
+    """Display (value, count) pairs one per line, NULL when empty."""
+    if not result:
+        return 'NULL'
+    return '\n'.join(f"{value} {count}" for value, count in result)
+
+def format_page(result: Any) -> str:
+    """Display FIND/SCAN results: a key list, or a cursor line and a key list."""
+    if isinstance(result, tuple):
+        cursor, keys = result
+        return f"{cursor}\n{format_keys(keys)}"
+    return format_keys(result)
+
+class StreamedResult(int):
+    """What post hooks see for streamed output: the number of items produced.
+
+    An ``int``, so a trace records it as an integer reply.
+    """
+
+def stream_keys(keys: Iterator[Any], chunk_size: int = 1000) -> Generator[str, None, StreamedResult]:
+    """Display keys like ``format_keys``, in fragments as they are produced.
+
+    Returns:
+        The number of keys, as the generator's return value.
+    """
+    separator = ''
+    count = 0
+    while True:
+        chunk = list(itertools.islice(keys, chunk_size))
+        if not chunk:
+            break
+        count += len(chunk)
+        yield separator + ' '.join(map(str, chunk))
+        separator = ' '
+    if not separator:
+        yield 'NULL'
+    return StreamedResult(count)
+
+def format_transaction(result: bool) -> Optional[str]:
+    """Display NO TRANSACTION when COMMIT/ROLLBACK had nothing to do."""
+    return None if result else 'NO TRANSACTION'
+
+def format_status(result: int) -> str:
+    """Display the transaction depth."""
+    return f"Transaction depth: {result}"
+
+def format_info(result: Dict[str, Any]) -> str:
+    """Display transaction depth, limits and per-layer counters."""
+    limit = f" (max {result['max_depth']})" if result['max_depth'] else ''
+    lines = [f"depth: {result['depth']}{limit}"]
+    if result['max_bytes']:
+        lines.append(f"transaction size limit: {result['max_bytes']} bytes")
+    for depth, layer in enumerate(result['layers']):
+        name = f"layer {depth}" if depth else 'base'
+        spilled = f" spilled={layer['spilled']}" if 'spilled' in layer else ''
+        lines.append(f"{name}: keys={layer['keys']} tombstones={layer['tombstones']} "
+                     f"bytes={layer['bytes']}{spilled}")
+    if 'compression' in result:
+        lines.append('compression: ' + ' '.join(f"{k}={v}" for k, v in result['compression'].items()))
+    if 'arena' in result:
+        lines.append('arena: ' + ' '.join(f"{k}={v}" for k, v in result['arena'].items()))
+    return '\n'.join(lines)
+
+def format_memory(result: Any) -> str:
+    """Display MEMORY results: bytes, (key, bytes) lines or a message."""
+    if result is None:
+        return 'NULL'
+    if isinstance(result, list):
+        return '\n'.join(f"{key} {size}" for key, size in result) if result else 'NULL'
+    return str(result)
+
+def format_number(result: Optional[float]) -> str:
+    """Display an aggregate, NULL when there were no numeric values."""
+    if result is None:
+        return 'NULL'
+    if result.is_integer() and abs(result) < 2 ** 53:
+        return str(int(result))
+    return repr(result)
+
+def format_histogram(result: Sequence[Tuple[float, float, int]]) -> str:
+    """Display histogram buckets one per line."""
+    if not result:
+        return 'NULL'
+    return '\n'.join(f"{low:g}..{high:g} {count}" for low, high, count in result)
+
+def format_events(result: Sequence[Any]) -> str:
+    """Display change events one per line, NULL when there are none."""
+    if not result:
+        return 'NULL'
+    return '\n'.join(f"SET {e.key} {e.value}" if e.value is not None else f"UNSET {e.key}"
+                     for e in result)
+
+def format_procedures(result: Dict[str, Dict[str, Any]]) -> str:
+    """Display per-procedure stats one per line, NULL when there are none."""
+    if not result:
+        return 'NULL'
+    return '\n'.join(f"{name} " + ' '.join(f"{k}={v}" for k, v in stats.items())
+                     for name, stats in sorted(result.items()))
+
+def format_hotkeys(result: Any) -> str:
+    """Display HOTKEYS rankings, or the message of a start/stop/reset."""
+    if isinstance(result, str):
+        return result
+    lines = []
+    for name in ('reads', 'writes'):
+        lines.append(f"{name}:")
+        lines.extend(f"  {key} {count}" for key, count in result[name])
+    return '\n'.join(lines)
+
+def format_job(result: Any) -> Optional[str]:
+    """Display the id of a submitted offload job."""
+    return f"JOB {result.id}" if hasattr(result, 'id') else format_default(result)
+
+class CommandSpec:
+    """Signature of a command: argument converters and output formatter.
+
+    Every argument arrives as a string; each converter turns it into the
+    value passed to the handler (``str`` means no conversion).
+
+    A command may also have a streamer: a second handler taking the same
+    arguments that yields display text in fragments, used by
+    ``dispatch_stream`` so large results are printed as they are produced.
+    The value it returns is the result post hooks see.
+
+    Offloaded commands run in the registry's process pool. Their handler
+    must be a picklable module-level function ``handler(snapshot, *args)``
+    where ``snapshot`` is a read-only dict of the committed data.
+    """
+
+    def __init__(self, args: Sequence[Converter] = (), optional: Sequence[Converter] = (),
+                 varargs: Optional[Converter] = None, formatter: Formatter = format_default,
+                 offload: bool = False, stream: Optional[Streamer] = None):
+        """Initialize a command spec.
+
+        Args:
+            args: Converters for required positional arguments.
+            optional: Converters for optional positional arguments.
+            varargs: Converter for any number of trailing arguments, or None.
+            formatter: Turns the handler result into display text (None for no output).
+            offload: Run the command in the process pool.
+            stream: Handler yielding display fragments, or None.
+        """
+        self.args = tuple(args)
+        self.optional = tuple(optional)
+        self.varargs = varargs
+        self.formatter = formatter
+        self.offload = offload
+        self.stream = stream
+
+    @classmethod
+    def from_handler(cls, handler: Callable, formatter: Formatter = format_default) -> 'CommandSpec':
+        """Derive a string-only spec from a handler signature.
+
+        Args:
+            handler: Command handler function.
+            formatter: Output formatter for the command.
+
+        Returns:
+            Spec with the handler's arity.
+        """
+        required, optional, varargs = 0, 0, False
+        try:
+            parameters = inspect.signature(handler).parameters.values()
+        except (TypeError, ValueError):
+            return cls(varargs=str, formatter=formatter)
+        for param in parameters:
+            if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+                if param.default is param.empty:
+                    required += 1
+                else:
+                    optional += 1
+            elif param.kind == param.VAR_POSITIONAL:
+                varargs = True
+        return cls((str,) * required, (str,) * optional, str if varargs else None, formatter)
+
+class CompiledCommand:
+    """Dispatch table entry: a command with its spec resolved for fast binding."""
+
+    __slots__ = ('name', 'handler', 'help', 'min_args', 'max_args',
+                 'converters', 'varargs', 'formatter', 'plain', 'stream')
+
+    def __init__(self, name: str, handler: Callable, help_text: str, spec: CommandSpec):
+        self.name = name
+        self.handler = handler
+        self.help = help_text
+        self.converters = spec.args + spec.optional
+        self.varargs = spec.varargs
+        self.min_args = len(spec.args)
+        self.max_args = None if spec.varargs is not None else len(self.converters)
+        self.formatter = spec.formatter
+        self.stream = spec.stream
+        # Nothing to convert: bind only has to check the arity
+        self.plain = all(c is str for c in self.converters) and spec.varargs in (None, str)
+
+    def bind(self, args: Sequence[str]) -> Optional[Tuple[Any, ...]]:
+        """Validate and convert raw arguments.
+
+        Args:
+            args: Raw string arguments.
+
+        Returns:
+            Converted arguments, or None if they don't match the spec.
+        """
+        count = len(args)
+        if count < self.min_args or (self.max_args is not None and count > self.max_args):
+            return None
+        if self.plain:
+            return tuple(args)
+        converters = self.converters
+        try:
+            bound = [converters[i](arg) if i < len(converters) else self.varargs(arg)  # type: ignore
+                     for i, arg in enumerate(args)]
+        except (TypeError, ValueError):
+            return None
+        return tuple(bound)
+
 class CommandRegistry:
     """Registry for database commands following Single Responsibility Principle."""
     
@@ -14,34 +277,315 @@ class CommandRegistry:
         """
         self._database = database
         self._logger = logger
-        self._commands: Dict[str, Dict[str, Any]] = {}
+        self._commands: Dict[str, CompiledCommand] = {}
+        self._lazy: Dict[str, Tuple[Callable[[], None], str]] = {}
+        self._pre_hooks: List[PreHook] = []
+        self._post_hooks: List[PostHook] = []
+        self._error_hooks: List[ErrorHook] = []
+        self._hooked = False
+        self._offload: Optional['OffloadExecutor'] = None
+        self._offload_factory: Optional[Callable[[], 'OffloadExecutor']] = None
+        self._profiler: Optional['MemoryProfiler'] = None
+        self._tracer: Optional['TraceRecorder'] = None
+        self._columns: Optional['NumericColumn'] = None
+        self._procedures: Optional['ProcedureRegistry'] = None
+        self._procedure_options: Dict[str, Any] = {}
+        self._hotkeys: Optional['HotKeyTracker'] = None
+        self._hotkey_options: Dict[str, Any] = {}
+        self._cursors: Optional['CursorTable'] = None
         self._register_default_commands()
     
     def _register_default_commands(self) -> None:
         """Register all default database commands."""
-        self.register('set', self._cmd_set, 'Set a key-value pair')
-        self.register('get', self._cmd_get, 'Get value by key')
-        self.register('unset', self._cmd_unset, 'Remove a key')
-        self.register('counts', self._cmd_counts, 'Count occurrences of value')
-        self.register('find', self._cmd_find, 'Find keys with value')
-        self.register('begin', self._cmd_begin, 'Start transaction')
-        self.register('rollback', self._cmd_rollback, 'Rollback transaction')
-        self.register('commit', self._cmd_commit, 'Commit transaction')
-        self.register('status', self._cmd_status, 'Show database status')
+        self.register('set', self._cmd_set, 'Set a key-value pair',
+                      CommandSpec((str, str), formatter=format_silent))
+        self.register('get', self._cmd_get, 'Get value by key',
+                      CommandSpec((str,), formatter=format_value))
+        self.register('unset', self._cmd_unset, 'Remove a key',
+                      CommandSpec((str,), formatter=format_silent))
+        self.register('counts', self._cmd_counts, 'Count occurrences of one or more values',
+                      CommandSpec((str,), varargs=str, formatter=format_counts))
+        self.register('values', self._cmd_values, 'Most common values (VALUES TOP [n])',
+                      CommandSpec((str,), (int,), formatter=format_distribution))
+        self.register('find', self._cmd_find, 'Find keys with value (FIND value [CURSOR c] [COUNT n])',
+                      CommandSpec((str,), varargs=str, formatter=format_page, stream=self._stream_find))
+        self.register('scan', self._cmd_scan, 'Iterate over keys (SCAN cursor [COUNT n])',
+                      CommandSpec((int,), varargs=str, formatter=format_page))
+        self.register('begin', self._cmd_begin, 'Start transaction',
+                      CommandSpec(formatter=format_silent))
+        self.register('rollback', self._cmd_rollback, 'Rollback transaction',
+                      CommandSpec(formatter=format_transaction))
+        self.register('commit', self._cmd_commit, 'Commit transaction',
+                      CommandSpec(formatter=format_transaction))
+        self.register('status', self._cmd_status, 'Show database status',
+                      CommandSpec(formatter=format_status))
+        if hasattr(self._database, 'info'):
+            self.register('info', self._cmd_info, 'Show per-layer key, tombstone and memory counters',
+                          CommandSpec(formatter=format_info))
+        self.register('memory', self._cmd_memory,
+                      'Memory introspection (MEMORY USAGE key | TOP [n] | PROFILE start|stop [path])',
+                      CommandSpec((str,), varargs=str, formatter=format_memory))
+        self.register('trace', self._cmd_trace,
+                      'Record executed commands for REPLAY (TRACE start [path] | stop)',
+                      CommandSpec((str,), (str,)))
+        self.register('hotkeys', self._cmd_hotkeys,
+                      'Sampled hottest keys by reads and writes (HOTKEYS [n] | start [rate] | stop | reset)',
+                      CommandSpec(optional=(str, str), formatter=format_hotkeys))
+        self.register('call', self._cmd_call, 'Run a stored procedure atomically (CALL name [args...])',
+                      CommandSpec((str,), varargs=str))
+        self.register('procedures', self._cmd_procedures, 'Show stored procedure call stats',
+                      CommandSpec(formatter=format_procedures))
+        if hasattr(self._database, 'incr'):
+            self.register('incr', self._cmd_incr, 'Add to an integer value (INCR key [amount])',
+                          CommandSpec((str,), (int,)))
+            self.register('decr', self._cmd_decr, 'Subtract from an integer value (DECR key [amount])',
+                          CommandSpec((str,), (int,)))
+            self.register('append', self._cmd_append, 'Append to a value, returning its new length',
+                          CommandSpec((str, str)))
+            self.register('getset', self._cmd_getset, 'Set a value, returning the previous one',
+                          CommandSpec((str, str), formatter=format_value))
+        if hasattr(self._database, 'add_listener'):
+            for name, help_text in (('sum', 'Sum of numeric values'),
+                                    ('avg', 'Average of numeric values'),
+                                    ('min', 'Smallest numeric value'),
+                                    ('max', 'Largest numeric value')):
+                self.register(name, self._aggregate(name), f"{help_text} ({name.upper()} [prefix])",
+                              CommandSpec(optional=(str,), formatter=format_number))
+            self.register('histogram', self._cmd_histogram,
+                          'Bucket counts of numeric values (HISTOGRAM buckets [prefix])',
+                          CommandSpec((int,), (str,), formatter=format_histogram))
+        if hasattr(self._database, 'subscribe'):
+            self.register('subscribe', self._cmd_subscribe,
+                          'Subscribe to committed changes (SUBSCRIBE [prefix] [capacity] [policy])',
+                          CommandSpec(optional=(str, int, str)))
+            self.register('poll', self._cmd_poll, 'Take events of a subscription (POLL id [max])',
+                          CommandSpec((int,), (int,), formatter=format_events))
+            self.register('unsubscribe', self._cmd_unsubscribe, 'Cancel a subscription',
+                          CommandSpec((int,), formatter=format_silent))
     
-    def register(self, name: str, handler: Callable, help_text: str = "") -> None:
+    def register(self, name: str, handler: Callable, help_text: str = "",
+                 spec: Optional[CommandSpec] = None) -> None:
         """Register a new command.
         
         Args:
             name: Command name.
             handler: Command handler function.
             help_text: Help text for the command.
+            spec: Argument and output spec. Derived from the handler
+                signature when omitted.
         """
-        self._commands[name] = {
-            'handler': handler,
-            'help': help_text
-        }
+        if spec is None:
+            spec = CommandSpec.from_handler(handler)
+        if spec.offload:
+            handler = self._offloaded(name, handler, spec.formatter)
+            spec = CommandSpec(spec.args, spec.optional, spec.varargs, format_job)
+        self._commands[name] = CompiledCommand(name, handler, help_text, spec)
+        self._lazy.pop(name, None)
         self._logger.debug(f"Registered command: {name}")
+
+    def register_lazy(self, name: str, loader: Callable[[], None], help_text: str = "") -> None:
+        """Register a placeholder for a command that is loaded on first use.
+
+        Args:
+            name: Command name.
+            loader: Called once on first use; must ``register`` the real command.
+            help_text: Help text shown until the command is loaded.
+        """
+        if name in self._commands:
+            return
+        self._lazy[name] = (loader, help_text)
+        self._logger.debug(f"Registered lazy command: {name}")
+
+    def _load_lazy(self, name: str) -> Optional[CompiledCommand]:
+        """Run the loader of a lazy command and return the real command.
+
+        The entry is kept if the loader fails, so a later call retries it.
+        """
+        entry = self._lazy.get(name)
+        if entry is None:
+            return None
+        self._logger.debug(f"Loading lazy command: {name}")
+        try:
+            entry[0]()
+        except Exception as e:
+            self._logger.error(f"Loading command {name} failed: {e}")
+            raise
+        self._lazy.pop(name, None)
+        return self._commands.get(name)
+
+    def add_hook(self, pre: Optional[PreHook] = None, post: Optional[PostHook] = None,
+                 error: Optional[ErrorHook] = None) -> None:
+        """Install command hooks.
+
+        Pre hooks get ``(name, args)`` before the handler runs. If one
+        returns anything other than None, the handler is skipped and that
+        value becomes the result (e.g. for caching). Post hooks get
+        ``(name, args, result)``; error hooks get ``(name, args, exception)``
+        when the handler raises, before the exception propagates. With no
+        hooks installed dispatch skips the hook path entirely.
+
+        Args:
+            pre: Hook called before the handler.
+            post: Hook called after the handler.
+            error: Hook called when the handler raises.
+        """
+        if pre is not None:
+            self._pre_hooks.append(pre)
+        if post is not None:
+            self._post_hooks.append(post)
+        if error is not None:
+            self._error_hooks.append(error)
+        self._hooked = bool(self._pre_hooks or self._post_hooks or self._error_hooks)
+
+    def remove_hook(self, pre: Optional[PreHook] = None, post: Optional[PostHook] = None,
+                    error: Optional[ErrorHook] = None) -> None:
+        """Remove previously installed command hooks.
+
+        Args:
+            pre: Pre hook to remove.
+            post: Post hook to remove.
+            error: Error hook to remove.
+        """
+        if pre is not None and pre in self._pre_hooks:
+            self._pre_hooks.remove(pre)
+        if post is not None and post in self._post_hooks:
+            self._post_hooks.remove(post)
+        if error is not None and error in self._error_hooks:
+            self._error_hooks.remove(error)
+        self._hooked = bool(self._pre_hooks or self._post_hooks or self._error_hooks)
+
+    def _invoke_hooked(self, command: CompiledCommand, args: Tuple[Any, ...],
+                       kwargs: Dict[str, Any]) -> Any:
+        """Run a command through the installed pre/post hooks."""
+        result = None
+        for hook in self._pre_hooks:
+            result = hook(command.name, args)
+            if result is not None:
+                break
+        if result is None:
+            try:
+                result = command.handler(*args, **kwargs)
+            except Exception as e:
+                for hook in self._error_hooks:
+                    hook(command.name, args, e)
+                raise
+        for post in self._post_hooks:
+            post(command.name, args, result)
+        return result
+
+    def _offloaded(self, name: str, func: Callable, formatter: Formatter) -> Callable:
+        """Wrap an offloadable function into a handler that submits a job.
+
+        Without an attached executor the function runs inline.
+        """
+        def handler(*args: Any) -> Any:
+            snapshot = self._database.snapshot()
+            executor = self.offload_executor()
+            if executor is None:
+                return func(snapshot, *args)
+            return executor.submit(name, func, snapshot, args, formatter)
+        return handler
+
+    def procedures(self) -> 'ProcedureRegistry':
+        """Stored procedures run by CALL, created on first use."""
+        if self._procedures is None:
+            from .procedures import ProcedureRegistry
+            self._procedures = ProcedureRegistry(self._database, self._logger,
+                                                 **self._procedure_options)
+        return self._procedures
+
+    def configure_procedures(self, **options: Any) -> None:
+        """Set ``ProcedureRegistry`` options for the registry created on first use.
+
+        Args:
+            **options: Keyword arguments of ``ProcedureRegistry``.
+        """
+        self._procedure_options = options
+
+    def register_procedure(self, name: str, procedure: 'Procedure', help_text: str = "",
+                           budget: Optional[float] = None) -> None:
+        """Register a stored procedure (see ``ProcedureRegistry.register``).
+
+        Args:
+            name: Procedure name used with CALL.
+            procedure: ``procedure(handle, *args)`` run inside a transaction.
+            help_text: Description of the procedure.
+            budget: Time budget in seconds (None for the default, 0 for no limit).
+        """
+        self.procedures().register(name, procedure, help_text, budget)
+
+    def cursors(self) -> 'CursorTable':
+        """Open FIND/SCAN cursors; sessions scope their cursors with ``owned_by``."""
+        if self._cursors is None:
+            from .cursors import CursorTable
+            self._cursors = CursorTable()
+        return self._cursors
+
+    def hotkeys(self) -> 'HotKeyTracker':
+        """Hot-key tracker used by HOTKEYS, created (stopped) on first use."""
+        if self._hotkeys is None:
+            from .hotkeys import HotKeyTracker
+            self._hotkeys = HotKeyTracker(self, self._logger, **self._hotkey_options)
+        return self._hotkeys
+
+    def configure_hotkeys(self, **options: Any) -> None:
+        """Set ``HotKeyTracker`` options for the tracker created on first use.
+
+        Args:
+            **options: Keyword arguments of ``HotKeyTracker``.
+        """
+        self._hotkey_options = options
+
+    def attach_hotkeys(self, tracker: 'HotKeyTracker') -> None:
+        """Use a configured hot-key tracker, replacing the current one.
+
+        Args:
+            tracker: Tracker for this registry.
+        """
+        if self._hotkeys is not None:
+            self._hotkeys.stop()
+        self._hotkeys = tracker
+
+    def attach_offload(self, executor: Union['OffloadExecutor', Callable[[], 'OffloadExecutor']]) -> None:
+        """Run offloaded commands in a process pool and register job commands.
+
+        Args:
+            executor: Executor for offloaded commands, or a callable that
+                creates it when an offloaded command first runs.
+        """
+        if callable(executor):
+            self._offload, self._offload_factory = None, executor
+        else:
+            self._offload, self._offload_factory = executor, None
+        self.register('jobs', self._cmd_jobs, 'List offloaded jobs',
+                      CommandSpec(formatter=format_keys))
+        self.register('result', self._cmd_result, 'Get offloaded job result (RESULT id [timeout])',
+                      CommandSpec((int,), (float,)))
+        self.register('cancel', self._cmd_cancel, 'Cancel a pending offloaded job',
+                      CommandSpec((int,), formatter=lambda ok: 'CANCELLED' if ok else 'NOT CANCELLED'))
+
+    def offload_executor(self) -> Optional['OffloadExecutor']:
+        """The attached offload executor (created now if attached as a factory), or None."""
+        if self._offload is None and self._offload_factory is not None:
+            self._offload = self._offload_factory()
+            self._offload_factory = None
+        return self._offload
+
+    def shutdown_offload(self) -> None:
+        """Stop the offload executor's pool, if one was created."""
+        if self._offload is not None:
+            self._offload.shutdown()
+
+    def lookup(self, name: str) -> Optional[CompiledCommand]:
+        """Get the compiled command for a name.
+
+        Args:
+            name: Command name.
+
+        Returns:
+            Compiled command, or None if not registered.
+        """
+        return self._commands.get(name) or self._load_lazy(name)
     
     def execute(self, name: str, *args, **kwargs) -> Any:
         """Execute a command by name.
@@ -56,13 +600,108 @@ class CommandRegistry:
             
         Raises:
             ValueError: If command not found.
+            TypeError: If arguments don't match the command spec.
         """
-        if name not in self._commands:
+        command = self._commands.get(name) or self._load_lazy(name)
+        if command is None:
             raise ValueError(f"Unknown command: {name}")
         
-        command = self._commands[name]
+        bound = command.bind(args)
+        if bound is None:
+            raise TypeError(f"Invalid arguments for command '{name}': {args}")
         self._logger.debug(f"Executing command: {name} with args: {args}")
-        return command['handler'](*args, **kwargs)
+        if self._hooked:
+            return self._invoke_hooked(command, bound, kwargs)
+        return command.handler(*bound, **kwargs)
+
+    def dispatch(self, name: str, args: Sequence[str]) -> Optional[str]:
+        """Execute a command from raw string arguments and format its result.
+
+        Unknown commands and bad arguments are reported as display text
+        rather than exceptions.
+
+        Args:
+            name: Command name (lowercase).
+            args: Raw string arguments.
+
+        Returns:
+            Text to display, or None if the command produces no output.
+        """
+        command = self._commands.get(name) or self._load_lazy(name)
+        if command is None:
+            self._logger.warning(f"Unknown command: {name}")
+            return UNKNOWN_COMMAND
+        bound = command.bind(args)
+        if bound is None:
+            self._logger.warning(f"Invalid arguments for command '{name}': {args}")
+            return INVALID_ARGUMENTS
+        if self._hooked:
+            return command.formatter(self._invoke_hooked(command, bound, {}))
+        return command.formatter(command.handler(*bound))
+
+    def dispatch_stream(self, name: str, args: Sequence[str]) -> Iterator[str]:
+        """Like ``dispatch``, but yields the output in fragments.
+
+        Commands with a streamer produce their output incrementally; the
+        caller prints the fragments without separators and ends the line.
+        Hooks run around the streamer; post hooks get the value it returns
+        (for FIND a ``StreamedResult`` count) instead of the full result.
+
+        Args:
+            name: Command name (lowercase).
+            args: Raw string arguments.
+
+        Yields:
+            Display text fragments (nothing if the command has no output).
+        """
+        command = self._commands.get(name) or self._load_lazy(name)
+        if command is not None and command.stream is not None:
+            bound = command.bind(args)
+            if bound is not None:
+                self._logger.debug(f"Streaming command: {name} with args: {args}")
+                if self._hooked:
+                    yield from self._stream_hooked(command, bound)
+                else:
+                    yield from command.stream(*bound)
+                return
+        output = self.dispatch(name, args)
+        if output is not None:
+            yield output
+
+    def _stream_hooked(self, command: CompiledCommand, args: Tuple[Any, ...]) -> Iterator[str]:
+        """Stream a command through the installed hooks (see ``_invoke_hooked``)."""
+        result = None
+        for hook in self._pre_hooks:
+            result = hook(command.name, args)
+            if result is not None:
+                break
+        if result is not None:
+            output = command.formatter(result)
+            if output is not None:
+                yield output
+        else:
+            try:
+                result = yield from command.stream(*args)
+            except Exception as e:
+                for hook in self._error_hooks:
+                    hook(command.name, args, e)
+                raise
+        for post in self._post_hooks:
+            post(command.name, args, result)
+
+    def format_result(self, name: str, result: Any) -> Optional[str]:
+        """Format a command result with the command's formatter.
+
+        Args:
+            name: Command name.
+            result: Command result.
+
+        Returns:
+            Text to display, or None if there is no output.
+        """
+        command = self.lookup(name)
+        formatter = command.formatter if command is not None else format_default
+        return formatter(result)
     
     def get_help(self, name: Optional[str] = None) -> str:
         """Get help text for commands.
@@ -75,12 +714,16 @@ class CommandRegistry:
         """
         if name:
             if name in self._commands:
-                return self._commands[name]['help']
+                return self._commands[name].help
+            if name in self._lazy:
+                return self._lazy[name][1]
             return f"Unknown command: {name}"
         
+        entries = {cmd_name: command.help for cmd_name, command in self._commands.items()}
+        entries.update((cmd_name, entry[1]) for cmd_name, entry in self._lazy.items())
         help_text = "Available commands:\n"
-        for cmd_name, cmd_info in sorted(self._commands.items()):
-            help_text += f"  {cmd_name.upper():<12} - {cmd_info['help']}\n"
+        for cmd_name, cmd_help in sorted(entries.items()):
+            help_text += f"  {cmd_name.upper():<12} - {cmd_help}\n"
         return help_text
     
     def list_commands(self) -> list[str]:
@@ -89,7 +732,7 @@ class CommandRegistry:
         Returns:
             List of command names.
         """
-        return list(self._commands.keys())
+        return list(self._commands.keys()) + list(self._lazy.keys())
     
     # Command handlers
     def _cmd_set(self, key: str, value: str) -> None:
@@ -104,13 +747,89 @@ class CommandRegistry:
         """Unset command handler."""
         self._database.unset(key)
     
-    def _cmd_counts(self, value: str) -> int:
+    def _cmd_counts(self, value: str, *values: str) -> Any:
         """Counts command handler."""
-        return self._database.counts(value)
+        if not values:
+            return self._database.counts(value)
+        values = (value,) + values
+        counts_many = getattr(self._database, 'counts_many', None)
+        if counts_many is not None:
+            return counts_many(list(values))
+        return {v: self._database.counts(v) for v in values}
     
-    def _cmd_find(self, value: str) -> list[str]:
+    def _cmd_values(self, subcommand: str, top: int = 10) -> List[Tuple[Any, int]]:
+        """Values command handler."""
+        if subcommand.lower() != 'top' or top < 1:
+            raise ValueError(f"Invalid VALUES arguments: {subcommand} {top}")
+        value_counts = getattr(self._database, 'value_counts', None)
+        if value_counts is not None:
+            return value_counts(top)
+        counter: Counter = Counter()
+        for chunk in self._database.scan():
+            counter.update(v for _, v in chunk)
+        return counter.most_common(top)
+
+    def _cmd_find(self, value: str, *options: str) -> Any:
         """Find command handler."""
-        return self._database.find(value)
+        if not options:
+            return self._database.find(value)
+        cursor, count = self._page_options(options, cursor_keyword=True)
+        return self.cursors().page(cursor, count, lambda: self._iter_find(value))
+
+    def _cmd_scan(self, cursor: int, *options: str) -> Tuple[int, List[Any]]:
+        """Scan command handler."""
+        _, count = self._page_options(options, cursor_keyword=False)
+        return self.cursors().page(cursor, count, self._iter_keys)
+
+    def _stream_find(self, value: str, *options: str) -> Generator[str, None, Any]:
+        """Find command streamer: paged results are formatted as a whole."""
+        if options:
+            result = self._cmd_find(value, *options)
+            yield format_page(result)
+            return result
+        return (yield from stream_keys(self._iter_find(value)))
+
+    def _iter_find(self, value: str) -> Iterator[Any]:
+        """Matching keys, lazily when the engine supports it."""
+        iter_find = getattr(self._database, 'iter_find', None)
+        return iter_find(value) if iter_find is not None else iter(self._database.find(value))
+
+    def _iter_keys(self) -> Iterator[Any]:
+        """Visible keys, read chunk by chunk."""
+        for chunk in self._database.scan():
+            for key, _ in chunk:
+                yield key
+
+    @staticmethod
+    def _page_options(options: Sequence[str], cursor_keyword: bool) -> Tuple[int, int]:
+        """Parse ``[CURSOR c] [COUNT n]`` options into (cursor, count)."""
+        from .cursors import DEFAULT_COUNT
+        allowed = ('cursor', 'count') if cursor_keyword else ('count',)
+        values = {'cursor': 0, 'count': DEFAULT_COUNT}
+        if len(options) % 2:
+            raise ValueError(f"Invalid options: {' '.join(options)}")
+        for keyword, number in zip(options[::2], options[1::2]):
+            keyword = keyword.lower()
+            if keyword not in allowed or not number.isdigit():
+                raise ValueError(f"Invalid options: {' '.join(options)}")
+            values[keyword] = int(number)
+        return values['cursor'], values['count']
+
+    def _cmd_incr(self, key: str, amount: int = 1) -> int:
+        """Incr command handler."""
+        return self._database.incr(key, amount)  # type: ignore
+
+    def _cmd_decr(self, key: str, amount: int = 1) -> int:
+        """Decr command handler."""
+        return self._database.decr(key, amount)  # type: ignore
+
+    def _cmd_append(self, key: str, suffix: str) -> int:
+        """Append command handler."""
+        return self._database.append(key, suffix)  # type: ignore
+
+    def _cmd_getset(self, key: str, value: str) -> Optional[str]:
+        """Getset command handler."""
+        return self._database.getset(key, value)  # type: ignore
     
     def _cmd_begin(self) -> None:
         """Begin command handler."""
@@ -126,4 +845,122 @@ class CommandRegistry:
     
     def _cmd_status(self) -> int:
         """Status command handler."""
-        return self._database.get_transaction_depth() 
\ No newline at end of file
+        return self._database.get_transaction_depth() 
+
+    def _cmd_info(self) -> Dict[str, Any]:
+        """Info command handler."""
+        return self._database.info()  # type: ignore
+
+    def _cmd_memory(self, subcommand: str, *args: str) -> Any:
+        """Memory command handler."""
+        subcommand = subcommand.lower()
+        if subcommand in ('usage', 'top') and not hasattr(self._database, 'memory_usage'):
+            raise ValueError(f"MEMORY {subcommand.upper()} is not supported by this engine")
+        if subcommand == 'usage' and len(args) == 1:
+            return self._database.memory_usage(args[0])  # type: ignore
+        if subcommand == 'top' and len(args) <= 1:
+            return self._database.memory_top(int(args[0]) if args else 10)  # type: ignore
+        if subcommand == 'profile' and args and args[0].lower() == 'start' and len(args) == 1:
+            if self._profiler is None:
+                from .memory import MemoryProfiler
+                self._profiler = MemoryProfiler(self, self._logger)
+            self._profiler.start()
+            return 'PROFILING'
+        if subcommand == 'profile' and args and args[0].lower() == 'stop' and len(args) <= 2:
+            if self._profiler is None or not self._profiler.running:
+                raise ValueError("Memory profile not running")
+            path = args[1] if len(args) == 2 else f"logs/memory_{time.strftime('%Y%m%d_%H%M%S')}.txt"
+            return self._profiler.stop(path)
+        raise ValueError(f"Invalid MEMORY arguments: {subcommand} {' '.join(args)}".rstrip())
+
+    def _cmd_trace(self, action: str, path: Optional[str] = None) -> str:
+        """Trace command handler."""
+        action = action.lower()
+        if action == 'start':
+            if self._tracer is None:
+                from .trace import TraceRecorder
+                self._tracer = TraceRecorder(self, self._logger)
+            self._tracer.start(path or f"logs/trace_{time.strftime('%Y%m%d_%H%M%S')}.trc")
+            return 'TRACING'
+        if action == 'stop' and path is None:
+            if self._tracer is None or not self._tracer.running:
+                raise ValueError("Trace not running")
+            path, count = self._tracer.stop()
+            return f"{count} commands written to {path}"
+        raise ValueError(f"Invalid TRACE arguments: {action} {path or ''}".rstrip())
+
+    def _cmd_hotkeys(self, action: str = '10', arg: Optional[str] = None) -> Any:
+        """Hotkeys command handler."""
+        tracker = self.hotkeys()
+        action = action.lower()
+        if action == 'start':
+            tracker.start(float(arg) if arg is not None else None)
+            return 'TRACKING'
+        if action == 'stop' and arg is None:
+            tracker.stop()
+            return 'STOPPED'
+        if action == 'reset' and arg is None:
+            tracker.reset()
+            return 'RESET'
+        if action.isdigit() and arg is None:
+            return tracker.top(int(action))
+        raise ValueError(f"Invalid HOTKEYS arguments: {action} {arg or ''}".rstrip())
+
+    def _cmd_call(self, name: str, *args: str) -> Any:
+        """Call command handler."""
+        return self.procedures().call(name, *args)
+
+    def _cmd_procedures(self) -> Dict[str, Dict[str, Any]]:
+        """Procedures command handler."""
+        return self.procedures().stats()
+
+    def columns(self) -> 'NumericColumn':
+        """Columnar mirror of committed numeric values, built on first use."""
+        if self._columns is None:
+            from .columnar import NumericColumn
+            self._columns = NumericColumn(self._logger)
+            self._columns.attach(self._database)
+        return self._columns
+
+    def _aggregate(self, name: str) -> Callable[..., Optional[float]]:
+        """Build the handler of an aggregate command."""
+        def handler(prefix: str = '') -> Optional[float]:
+            return getattr(self.columns(), name)(prefix)
+        return handler
+
+    def _cmd_histogram(self, buckets: int, prefix: str = '') -> list:
+        """Histogram command handler."""
+        return self.columns().histogram(buckets, prefix)
+
+    def _cmd_subscribe(self, prefix: str = '', capacity: int = 1024,
+                       policy: str = 'drop_oldest') -> int:
+        """Subscribe command handler."""
+        return self._database.subscribe(prefix, capacity, policy).id  # type: ignore
+
+    def _cmd_poll(self, sub_id: int, max_events: Optional[int] = None) -> list:
+        """Poll command handler."""
+        subscription = self._database.get_subscription(sub_id)  # type: ignore
+        if subscription is None:
+            raise ValueError(f"Unknown subscription: {sub_id}")
+        return subscription.poll(max_events)
+
+    def _cmd_unsubscribe(self, sub_id: int) -> bool:
+        """Unsubscribe command handler."""
+        return self._database.unsubscribe(sub_id)  # type: ignore
+
+    def _cmd_jobs(self) -> list[str]:
+        """Jobs command handler."""
+        return [f"{job.id}:{job.name}:{job.status}" for job in self.offload_executor().jobs()]  # type: ignore
+
+    def _cmd_result(self, job_id: int, timeout: float = 0) -> Optional[str]:
+        """Result command handler."""
+        executor = self.offload_executor()
+        job = executor.get_job(job_id)  # type: ignore
+        status, result = executor.result(job_id, timeout)  # type: ignore
+        if status != 'DONE':
+            return status if result is None else f"{status}: {result}"
+        return job.formatter(result)
+
+    def _cmd_cancel(self, job_id: int) -> bool:
+        """Cancel command handler."""
+        return self.offload_executor().cancel(job_id)  # type: ignore
@@ -54,13 +54,69 @@ class Config:
             },
             'database': {
                 'type': 'inmemory',
+                'binary': False,
                 'transaction': {
                     'max_depth': 100,
+                    'max_bytes': 0,
+                    'spill_bytes': 0,
+                    'spill_dir': None,
                     'auto_commit': False
                 },
+                'sqlite': {
+                    'path': 'data/db.sqlite',
+                    'batch_size': 1000
+                },
+                'async': {
+                    'chunk_size': 1000
+                },
                 'storage': {
                     'persistence': False,
-                    'backup_interval': 300
+                    'backup_interval': 300,
+                    'path': 'data/db.mmap'
+                },
+                'compression': {
+                    'enabled': False,
+                    'threshold': 1024,
+                    'algorithm': 'zlib',
+                    'level': 6,
+                    'dictionary_path': None
+                },
+                'arena': {
+                    'enabled': False,
+                    'threshold': 4096,
+                    'segment_size': 67108864,
+                    'compact_ratio': 0.5,
+                    'compact_interval': 1.0
+                }
+            },
+            'replication': {
+                'backlog_size': 10000,
+                'ping_interval': 1.0
+            },
+            'shared_memory': {
+                'name': 'inmemory_db',
+                'interval': 0.5
+            },
+            'server': {
+                'address': '127.0.0.1:7379',
+                'transaction_timeout': 30.0
+            },
+            'hotkeys': {
+                'enabled': False,
+                'sample_rate': 0.01,
+                'top': 32,
+                'width': 2048,
+                'depth': 4,
+                'half_life': 60.0
+            },
+            'plugins': {
+                'offload': {
+                    'max_workers': 2,
+                    'max_pending': 16,
+                    'result_ttl': 600.0
+                },
+                'procedures': {
+                    'time_budget': 1.0
                 }
             },
             'cli': {
@@ -95,7 +151,20 @@ class Config:
             return value
         except (KeyError, TypeError):
             return default
-    
+
+    def set(self, key: str, value: Any) -> None:
+        """Set a configuration value, creating missing sections.
+
+        Args:
+            key: Configuration key (dot-separated for nested keys).
+            value: New value.
+        """
+        keys = key.split('.')
+        section = self._config
+        for k in keys[:-1]:
+            section = section.setdefault(k, {})
+        section[keys[-1]] = value
+
     def get_logging_config(self) -> Dict[str, Any]:
         """Get logging configuration."""
         return self._config.get('logging', {})
@@ -0,0 +1,143 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Tuple
+
+DEFAULT_COUNT = 100
+MAX_CURSORS = 1024
+# Seconds a cursor may stay unused before it is dropped
+IDLE_TIMEOUT = 300.0
+
+class _Cursor:
+    """An open iteration: its owner, iterator and last use."""
+
+    __slots__ = ('owner', 'iterator', 'used')
+
+    def __init__(self, owner: Any, iterator: Iterator[Any]):
+        self.owner = owner
+        self.iterator = iterator
+        self.used = time.monotonic()
+
+class CursorTable:
+    """Open result iterators addressed by integer cursors.
+
+    ``page(0, ...)`` starts a new iteration and later calls continue it by
+    the returned cursor, which is 0 once the iterator is exhausted. The
+    iterators decide what a stable cursor means; for FIND and SCAN every
+    key that exists for the whole iteration is returned exactly once.
+    Whether keys added or removed meanwhile are returned depends on the
+    engine: ``InMemoryDB`` snapshots key lists when the iteration starts,
+    ``MmapDB`` resumes from a bucket position of its file.
+
+    A cursor belongs to the owner current when it was opened (see
+    ``owned_by``, e.g. a server session) and only that owner can continue
+    it. Cursors unused for ``idle_timeout`` seconds are dropped, as is the
+    least recently used one beyond ``max_cursors``.
+    """
+
+    def __init__(self, max_cursors: int = MAX_CURSORS, idle_timeout: float = IDLE_TIMEOUT):
+        """Initialize an empty table.
+
+        Args:
+            max_cursors: Open cursors kept before the oldest is dropped.
+            idle_timeout: Seconds an unused cursor is kept (0 for no limit).
+        """
+        self.max_cursors = max_cursors
+        self.idle_timeout = idle_timeout
+        self._cursors: 'OrderedDict[int, _Cursor]' = OrderedDict()
+        self._next_id = itertools.count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    @contextmanager
+    def owned_by(self, owner: Any) -> Iterator[None]:
+        """Open and continue cursors as ``owner`` in the current thread."""
+        previous = getattr(self._local, 'owner', None)
+        self._local.owner = owner
+        try:
+            yield
+        finally:
+            self._local.owner = previous
+
+    def close_owner(self, owner: Any) -> int:
+        """Drop every cursor of an owner (e.g. when its session ends).
+
+        Returns:
+            Number of cursors dropped.
+        """
+        with self._lock:
+            owned = [cid for cid, entry in self._cursors.items() if entry.owner is owner]
+            dropped = [self._cursors.pop(cid).iterator for cid in owned]
+        self._close_all(dropped)
+        return len(dropped)
+
+    def page(self, cursor: int, count: int, start: Any) -> Tuple[int, List[Any]]:
+        """Take the next items of an iteration.
+
+        Args:
+            cursor: 0 to start, or a cursor returned by a previous call.
+            count: Maximum number of items to return.
+            start: Called without arguments to create the iterator when
+                ``cursor`` is 0.
+        Returns:
+            (next cursor, items); the next cursor is 0 when there are no more.
+        Raises:
+            ValueError: If the cursor is unknown, finished, expired or
+                belongs to another owner.
+        """
+        if count < 1:
+            raise ValueError(f"COUNT must be positive: {count}")
+        owner = getattr(self._local, 'owner', None)
+        with self._lock:
+            dropped = self._expire()
+            entry = self._cursors.pop(cursor, None) if cursor else None
+            if entry is not None and entry.owner is not owner:
+                self._cursors[cursor] = entry
+                entry = None
+        self._close_all(dropped)
+        if cursor == 0:
+            iterator = iter(start())
+            cursor = next(self._next_id)
+        elif entry is None:
+            raise ValueError(f"Unknown or expired cursor: {cursor}")
+        else:
+            iterator = entry.iterator
+        items = list(itertools.islice(iterator, count))
+        if len(items) < count:
+            self._close(iterator)
+            return 0, items
+        with self._lock:
+            self._cursors[cursor] = _Cursor(owner, iterator)
+            while len(self._cursors) > self.max_cursors:
+                dropped.append(self._cursors.popitem(last=False)[1].iterator)
+        self._close_all(dropped)
+        return cursor, items
+
+    def _expire(self) -> List[Iterator[Any]]:
+        """Remove idle cursors (least recently used first); call with the lock held."""
+        dropped: List[Iterator[Any]] = []
+        if self.idle_timeout:
+            deadline = time.monotonic() - self.idle_timeout
+            while self._cursors:
+                cid, entry = next(iter(self._cursors.items()))
+                if entry.used > deadline:
+                    break
+                dropped.append(self._cursors.pop(cid).iterator)
+        return dropped
+
+    @classmethod
+    def _close_all(cls, iterators: List[Iterator[Any]]) -> None:
+        for iterator in iterators:
+            cls._close(iterator)
+
+    @staticmethod
+    def _close(iterator: Iterator[Any]) -> None:
+        """Release what a dropped generator holds (snapshots, pinned images)."""
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
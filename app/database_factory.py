@@ -1,10 +1,17 @@
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from .base import BaseDB, Database
 from .db import InMemoryDB
 from .transaction_manager import TransactionManager
 from .logger import Logger, FileLogger, ConsoleLogger, CompositeLogger, NullLogger
 from .config import Config
 
+if TYPE_CHECKING:
+    # Imported by the factory methods that need them, so the configured
+    # engine is the only one loaded
+    from .async_db import AsyncDatabase
+    from .arena import BlobArena
+    from .codec import ValueCodec
+
 class DatabaseFactory:
     """Factory for creating database instances with proper dependency injection."""
     
@@ -34,16 +41,75 @@ class DatabaseFactory:
             return FileLogger()
     
     @staticmethod
-    def create_transaction_manager(logger: Logger) -> TransactionManager:
+    def create_transaction_manager(logger: Logger, config: Optional[Config] = None) -> TransactionManager:
         """Create a transaction manager instance.
         
         Args:
             logger: Logger instance for transaction logging.
+            config: Optional configuration with transaction limits.
             
         Returns:
             Configured transaction manager.
         """
-        return TransactionManager(logger)
+        if config is None:
+            return TransactionManager(logger)
+        return TransactionManager(
+            logger,
+            max_depth=config.get('database.transaction.max_depth', 0),
+            max_bytes=config.get('database.transaction.max_bytes', 0),
+            spill_bytes=config.get('database.transaction.spill_bytes', 0),
+            spill_dir=config.get('database.transaction.spill_dir'),
+        )
+    
+    @staticmethod
+    def create_codec(config: Config) -> Optional['ValueCodec']:
+        """Create the value codec if compression is enabled.
+        
+        Args:
+            config: Application configuration.
+            
+        Returns:
+            Configured codec, or None when compression is disabled.
+        """
+        if not config.get('database.compression.enabled', False):
+            return None
+        from .codec import ValueCodec
+        dictionary = None
+        dictionary_path = config.get('database.compression.dictionary_path')
+        if dictionary_path:
+            with open(dictionary_path, 'rb') as f:
+                dictionary = f.read()
+        return ValueCodec(
+            threshold=config.get('database.compression.threshold', 1024),
+            algorithm=config.get('database.compression.algorithm', 'zlib'),
+            level=config.get('database.compression.level', 6),
+            dictionary=dictionary,
+        )
+    
+    @staticmethod
+    def create_arena(config: Config, logger: Logger) -> Optional['BlobArena']:
+        """Create the large-value arena if it is enabled.
+        
+        Args:
+            config: Application configuration.
+            logger: Logger for arena events.
+            
+        Returns:
+            Arena with background compaction started, or None when disabled.
+        """
+        if not config.get('database.arena.enabled', False):
+            return None
+        from .arena import BlobArena
+        arena = BlobArena(
+            logger,
+            threshold=config.get('database.arena.threshold', 4096),
+            segment_size=config.get('database.arena.segment_size', 64 * 1024 * 1024),
+            compact_ratio=config.get('database.arena.compact_ratio', 0.5),
+        )
+        interval = config.get('database.arena.compact_interval', 1.0)
+        if interval > 0:
+            arena.start(interval)
+        return arena
     
     @staticmethod
     def create_database(config: Config, logger: Optional[Logger] = None) -> Database:
@@ -62,13 +128,49 @@ class DatabaseFactory:
         db_type = config.get('database.type', 'inmemory')
         
         if db_type == 'inmemory':
-            transaction_manager = DatabaseFactory.create_transaction_manager(logger)
-            return InMemoryDB(transaction_manager, logger)  # type: ignore
+            transaction_manager = DatabaseFactory.create_transaction_manager(logger, config)
+            codec = DatabaseFactory.create_codec(config)
+            arena = DatabaseFactory.create_arena(config, logger)
+            return InMemoryDB(transaction_manager, logger, codec=codec,
+                              binary=config.get('database.binary', False),
+                              arena=arena)  # type: ignore
+        elif db_type == 'mmap':
+            from .mmap_db import MmapDB
+            transaction_manager = DatabaseFactory.create_transaction_manager(logger, config)
+            path = config.get('database.storage.path', 'data/db.mmap')
+            return MmapDB(path, transaction_manager, logger,
+                          binary=config.get('database.binary', False))  # type: ignore
+        elif db_type == 'sqlite':
+            from .sqlite_db import SQLiteDB
+            return SQLiteDB(
+                config.get('database.sqlite.path', 'data/db.sqlite'),
+                logger,
+                batch_size=config.get('database.sqlite.batch_size', 1000),
+                max_depth=config.get('database.transaction.max_depth', 0),
+            )  # type: ignore
         else:
             # Default to in-memory database
-            transaction_manager = DatabaseFactory.create_transaction_manager(logger)
+            transaction_manager = DatabaseFactory.create_transaction_manager(logger, config)
             return InMemoryDB(transaction_manager, logger)  # type: ignore
     
+    @staticmethod
+    def create_async_database(config: Config, logger: Optional[Logger] = None) -> 'AsyncDatabase':
+        """Create an asyncio facade over a database built from configuration.
+        
+        Args:
+            config: Application configuration.
+            logger: Optional logger instance. If not provided, one will be created.
+            
+        Returns:
+            Configured async database.
+        """
+        from .async_db import AsyncDatabase
+        if logger is None:
+            logger = DatabaseFactory.create_logger(config)
+        database = DatabaseFactory.create_database(config, logger)
+        chunk_size = config.get('database.async.chunk_size', 1000)
+        return AsyncDatabase(database, logger, chunk_size=chunk_size)
+    
     @staticmethod
     def create_with_dependencies(config: Config) -> tuple[Database, Logger, TransactionManager]:
         """Create all database-related dependencies.
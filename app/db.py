@@ -1,27 +1,68 @@
-from .base import BaseDB, Database
-from .transaction_manager import TransactionManager
+import random
+from collections import Counter
+from .base import BaseDB, Database, to_bytes
+from .transaction_manager import TransactionManager, ChangeListener, entry_size
 from .logger import Logger
-from typing import Optional, List
+from .pubsub import ChangeFeed, Subscription, DROP_OLDEST
+from .spill import SpillLayer, SpillSnapshot
+from typing import TYPE_CHECKING, Any, Optional, List, Dict, Iterator, Tuple
+
+if TYPE_CHECKING:
+    # Only databases configured with them load the codec and the arena
+    from .codec import ValueCodec
+    from .arena import BlobArena
 
 class InMemoryDB(BaseDB, Database):
     """In-memory key-value database with transaction support.
     Implements BaseDB interface and follows Dependency Inversion Principle.
+    
+    In binary mode keys and values are ``bytes``: any buffer is accepted
+    (``str`` is encoded as UTF-8), values are returned as the stored
+    ``bytes`` objects and ``get_view`` exposes them without copying.
+    
+    Values pass through the optional codec and then the optional blob
+    arena on the way into the layers, and back in reverse order.
     """
     
-    def __init__(self, transaction_manager: TransactionManager, logger: Logger) -> None:
+    def __init__(self, transaction_manager: TransactionManager, logger: Logger,
+                 codec: Optional['ValueCodec'] = None, binary: bool = False,
+                 arena: Optional['BlobArena'] = None) -> None:
         """Initialize the database with dependencies.
         
         Args:
             transaction_manager: Manager for transaction operations.
             logger: Logger for database operations.
+            codec: Optional codec that stores large values compressed.
+            binary: Store keys and values as bytes.
+            arena: Optional arena that stores large values off the heap.
         """
         self._transaction_manager = transaction_manager
         self._logger = logger
+        self._codec = codec
+        self._binary = binary
+        self._arena = arena
+        self._stores: List[Any] = [store for store in (codec, arena) if store is not None]
+        if arena is not None:
+            # Arena space is freed as soon as a value leaves the layers
+            transaction_manager.set_release(arena.release)
+        self._listeners: Dict[ChangeListener, ChangeListener] = {}
+        self._feed: Optional[ChangeFeed] = None
         self._logger.info("InMemoryDB initialized")
 
-    def _current(self) -> dict[str, Optional[str]]:
-        """Return the current transaction layer."""
-        return self._transaction_manager.get_current_layer()
+    def _encode(self, value: Any) -> Any:
+        for store in self._stores:
+            value = store.encode(value)
+        return value
+
+    def _decode(self, stored: Any) -> Any:
+        for store in reversed(self._stores):
+            stored = store.decode(stored)
+        return stored
+
+    def _probe(self, value: Any) -> Any:
+        for store in self._stores:
+            value = store.probe(value)
+        return value
 
     def set(self, key: str, value: str) -> None:
         """Set a key-value pair in the database.
@@ -30,7 +71,10 @@ class InMemoryDB(BaseDB, Database):
             key: The key to set.
             value: The value to assign.
         """
-        self._current()[key] = value
+        if self._binary:
+            key, value = to_bytes(key), to_bytes(value)
+        stored = self._encode(value) if self._stores else value
+        self._transaction_manager.write(key, stored)
         self._logger.info(f"SET: {key} = {value}")
 
     def get(self, key: str) -> Optional[str]:
@@ -41,23 +85,179 @@ class InMemoryDB(BaseDB, Database):
         Returns:
             The value if found, else None.
         """
+        if self._binary:
+            key = to_bytes(key)
         for layer in reversed(self._transaction_manager.get_all_layers()):
             if key in layer:
                 value = layer[key]
+                if self._stores:
+                    value = self._decode(value)
                 self._logger.info(f"GET: {key} = {value}")
                 return value
         self._logger.info(f"GET: {key} = NULL (not found)")
         return None
 
+    def _read_stored(self, key: Any) -> Any:
+        """Stored value visible for an already normalized key, or None."""
+        for layer in reversed(self._transaction_manager.get_all_layers()):
+            if key in layer:
+                return layer[key]
+        return None
+
+    def _read(self, key: Any) -> Any:
+        """Decoded value visible for an already normalized key, or None."""
+        value = self._read_stored(key)
+        return self._decode(value) if self._stores and value is not None else value
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        """Add to an integer value in one step (a missing key counts as 0).
+
+        The new value is written to the current transaction layer, like SET.
+
+        Args:
+            key: The key to change.
+            amount: Amount to add (negative to subtract).
+        Returns:
+            The new value.
+        Raises:
+            ValueError: If the current value is not an integer.
+        """
+        if self._binary:
+            key = to_bytes(key)
+        current = self._read(key)
+        try:
+            result = (int(current) if current is not None else 0) + amount
+        except ValueError:
+            raise ValueError(f"Value of {key!r} is not an integer") from None
+        stored = str(result).encode('ascii') if self._binary else str(result)
+        self._transaction_manager.write(key, self._encode(stored) if self._stores else stored)
+        self._logger.info(f"INCR: {key} = {result}")
+        return result
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        """Subtract from an integer value in one step; see ``incr``."""
+        return self.incr(key, -amount)
+
+    def append(self, key: str, suffix: str) -> int:
+        """Append to a value in one step (a missing key starts empty).
+
+        Args:
+            key: The key to change.
+            suffix: Text (or bytes in binary mode) to append.
+        Returns:
+            Length of the new value.
+        """
+        if self._binary:
+            key, suffix = to_bytes(key), to_bytes(suffix)
+        current = self._read(key)
+        value = current + suffix if current is not None else suffix
+        self._transaction_manager.write(key, self._encode(value) if self._stores else value)
+        self._logger.info(f"APPEND: {key} = {value}")
+        return len(value)
+
+    def getset(self, key: str, value: str) -> Optional[str]:
+        """Set a value and return the one it replaced, in one step.
+
+        Args:
+            key: The key to set.
+            value: The new value.
+        Returns:
+            The previous value, or None if the key was not set.
+        """
+        if self._binary:
+            key, value = to_bytes(key), to_bytes(value)
+        old = self._read(key)
+        self._transaction_manager.write(key, self._encode(value) if self._stores else value)
+        self._logger.info(f"GETSET: {key} = {value} (was {old})")
+        return old
+
+    def get_view(self, key: Any) -> Optional[memoryview]:
+        """Get a value as a read-only view of the stored bytes (binary mode).
+
+        The view shares memory with the stored value (arena blobs
+        included); only compressed values are decompressed into a new buffer.
+
+        Args:
+            key: The key to retrieve.
+        Returns:
+            A memoryview of the value, or None if not found.
+        """
+        if not self._binary:
+            raise TypeError("get_view needs a database in binary mode")
+        if self._arena is not None and self._codec is None:
+            from .arena import BlobRef
+            key = to_bytes(key)
+            for layer in reversed(self._transaction_manager.get_all_layers()):
+                if key in layer:
+                    if isinstance(layer[key], BlobRef):
+                        return self._arena.view(layer[key])  # type: ignore
+                    break
+        value = self.get(key)
+        return memoryview(value) if value is not None else None  # type: ignore
+
     def unset(self, key: str) -> None:
         """Unset a key from the database.
 
         Args:
             key: The key to remove.
         """
-        self._current()[key] = None
+        if self._binary:
+            key = to_bytes(key)
+        self._transaction_manager.write(key, None)
         self._logger.info(f"UNSET: {key}")
 
+    def scan(self, chunk_size: int = 1000) -> Iterator[List[Tuple[str, str]]]:
+        """Iterate over visible key-value pairs in chunks.
+
+        Key lists are snapshotted up front, so the database may be modified
+        between chunks; values are read when their chunk is produced.
+
+        Args:
+            chunk_size: Maximum number of pairs per chunk.
+        Yields:
+            Lists of (key, value) pairs.
+        """
+        for chunk in self._scan_stored(chunk_size):
+            if self._stores:
+                chunk = [(k, self._decode(v)) for k, v in chunk]
+            yield chunk
+
+    def _scan_stored(self, chunk_size: int = 1000) -> Iterator[List[Tuple[str, Any]]]:
+        """Like ``scan``, but yields values in their stored (compressed or arena) form."""
+        # Spilled layers are streamed from snapshots of their runs, not listed
+        snapshots = [layer.snapshot() if isinstance(layer, SpillLayer) else list(layer)
+                     for layer in self._transaction_manager.get_all_layers()]
+        # Only keys of transaction layers can come up again in a later layer;
+        # for spilled layers that is checked per key instead of collected
+        recurring = set().union(*(keys for keys in snapshots[1:] if isinstance(keys, list)))
+        spilled = [(index, keys) for index, keys in enumerate(snapshots)
+                   if isinstance(keys, SpillSnapshot)]
+        seen: set = set()
+        chunk: List[Tuple[str, Any]] = []
+        top_down: Optional[List[Dict[str, Optional[str]]]] = None
+        for index, keys in enumerate(snapshots):
+            above = [snapshot for i, snapshot in spilled if i > index]
+            for k in keys:
+                if k in seen:
+                    continue
+                if k in recurring or any(k in snapshot for snapshot in above):
+                    seen.add(k)
+                if top_down is None:
+                    # Layers may have changed while the previous chunk was consumed
+                    top_down = self._transaction_manager.get_all_layers()[::-1]
+                for layer in top_down:
+                    if k in layer:
+                        val = layer[k]
+                        if val is not None:
+                            chunk.append((k, val))
+                        break
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+                    top_down = None
+        if chunk:
+            yield chunk
+
     def counts(self, value: str) -> int:
         """Count how many times a value appears in the database.
 
@@ -66,18 +266,55 @@ class InMemoryDB(BaseDB, Database):
         Returns:
             The number of keys with the given value.
         """
+        if self._binary:
+            value = to_bytes(value)
+        probe = self._probe(value) if self._stores else value
         result = 0
-        seen = set()
-        for layer in self._transaction_manager.get_all_layers():
-            for k, v in layer.items():
-                if k not in seen:
-                    seen.add(k)
-                    val = self.get(k)
-                    if val == value:
-                        result += 1
+        for chunk in self._scan_stored():
+            for _, v in chunk:
+                if v == probe:
+                    result += 1
         self._logger.info(f"COUNTS: {value} = {result}")
         return result
 
+    def counts_many(self, values: List[str]) -> Dict[str, int]:
+        """Count several values in one pass over the visible keys.
+
+        Args:
+            values: The values to count.
+        Returns:
+            Value -> number of keys with that value, in the order given.
+        """
+        if self._binary:
+            values = [to_bytes(value) for value in values]
+        wanted = {(self._probe(value) if self._stores else value): value for value in values}
+        result = dict.fromkeys(values, 0)
+        lookup = wanted.get
+        for chunk in self._scan_stored():
+            for _, v in chunk:
+                value = lookup(v)
+                if value is not None:
+                    result[value] += 1
+        self._logger.info(f"COUNTS: {len(result)} values in one pass")
+        return result
+
+    def value_counts(self, top: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Distribution of the visible values, most common first.
+
+        Args:
+            top: Number of values to return (None for all).
+        Returns:
+            List of (value, number of keys).
+        """
+        counter: Counter = Counter()
+        for chunk in self._scan_stored():
+            counter.update(v for _, v in chunk)
+        ranked = counter.most_common(top)
+        if self._stores:
+            ranked = [(self._decode(v), n) for v, n in ranked]
+        self._logger.info(f"VALUES: {len(counter)} distinct values")
+        return ranked
+
     def find(self, value: str) -> List[str]:
         """Find all keys that have the specified value.
 
@@ -86,18 +323,35 @@ class InMemoryDB(BaseDB, Database):
         Returns:
             List of keys with the given value.
         """
-        found = []
-        seen = set()
-        for layer in self._transaction_manager.get_all_layers():
-            for k in layer:
-                if k not in seen:
-                    seen.add(k)
-                    val = self.get(k)
-                    if val == value:
-                        found.append(k)
-        self._logger.info(f"FIND: {value} = {found}")
+        found = list(self.iter_find(value))
+        self._logger.info(f"FIND: {value} = {len(found)} keys")
         return found
 
+    def iter_find(self, value: str, chunk_size: int = 1000) -> Iterator[str]:
+        """Yield the keys that have the specified value, as they are found.
+
+        Key lists are snapshotted when iteration starts (see ``scan``), so
+        the database may change while the generator is paused: keys that
+        hold the value throughout are yielded exactly once, and a match is
+        checked again just before it is yielded, so keys changed or removed
+        in the meantime are skipped.
+
+        Args:
+            value: The value to search for.
+            chunk_size: Keys examined between re-reads of the layers.
+        Yields:
+            Matching keys.
+        """
+        if self._binary:
+            value = to_bytes(value)
+        probe = self._probe(value) if self._stores else value
+        for chunk in self._scan_stored(chunk_size):
+            for k, v in chunk:
+                if v == probe:
+                    current = self._read_stored(k)
+                    if current is v or current == probe:
+                        yield k
+
     def begin(self) -> None:
         """Begin a new transaction."""
         self._transaction_manager.begin()
@@ -118,6 +372,150 @@ class InMemoryDB(BaseDB, Database):
         """
         return self._transaction_manager.commit()
 
+    def add_listener(self, listener: ChangeListener) -> None:
+        """Subscribe to changes committed to the base layer.
+
+        Args:
+            listener: Callable receiving ``{key: value}`` (None for removed keys).
+        """
+        if self._stores:
+            inner = listener
+            decode = self._decode
+            def listener(changes: Dict[str, Optional[Any]]) -> None:
+                inner({k: decode(v) for k, v in changes.items()})
+            self._listeners[inner] = listener
+        self._transaction_manager.add_listener(listener)
+
+    def remove_listener(self, listener: ChangeListener) -> None:
+        """Unsubscribe from committed changes."""
+        self._transaction_manager.remove_listener(self._listeners.pop(listener, listener))
+
+    def subscribe(self, prefix: str = '', capacity: int = 1024,
+                  policy: str = DROP_OLDEST) -> Subscription:
+        """Subscribe to committed SET/UNSET events.
+
+        Args:
+            prefix: Only keys starting with this prefix are delivered.
+            capacity: Size of the subscriber's ring buffer.
+            policy: What to do when the buffer is full (drop_oldest,
+                drop_newest or disconnect).
+        Returns:
+            The subscription to poll for events.
+        """
+        if self._binary:
+            prefix = to_bytes(prefix)  # type: ignore
+        if self._feed is None:
+            self._feed = ChangeFeed(self._logger)
+            self.add_listener(self._feed.publish)
+        return self._feed.subscribe(prefix, capacity, policy)
+
+    def unsubscribe(self, sub_id: int) -> bool:
+        """Cancel a subscription.
+
+        Args:
+            sub_id: Subscription id.
+        Returns:
+            True if the subscription existed.
+        """
+        if self._feed is None or not self._feed.unsubscribe(sub_id):
+            return False
+        if not len(self._feed):
+            # No subscribers left: stop paying for fan-out on every write
+            self.remove_listener(self._feed.publish)
+            self._feed = None
+        return True
+
+    def get_subscription(self, sub_id: int) -> Optional[Subscription]:
+        """Get an active subscription by id."""
+        return self._feed.get(sub_id) if self._feed is not None else None
+
+    def snapshot(self) -> Dict[str, str]:
+        """Get a copy of the committed data, ignoring open transactions.
+
+        Returns:
+            Dictionary of committed key-value pairs.
+        """
+        # dict() copies atomically, so other threads may call this while writes happen
+        base = dict(self._transaction_manager.get_all_layers()[0])
+        if self._stores:
+            return {k: self._decode(v) for k, v in base.items() if v is not None}
+        return {k: v for k, v in base.items() if v is not None}
+
+    def info(self) -> Dict[str, Any]:
+        """Report transaction depth, limits and per-layer counters.
+
+        Returns:
+            Dict with ``depth``, ``max_depth``, ``max_bytes``, ``layers``
+            (base first; keys, tombstones and estimated bytes each) and,
+            when compression is on, ``compression`` counters.
+        """
+        tm = self._transaction_manager
+        info: Dict[str, Any] = {
+            'depth': tm.get_transaction_depth(),
+            'max_depth': tm.max_depth,
+            'max_bytes': tm.max_bytes,
+            'layers': tm.layer_stats(),
+        }
+        if self._codec is not None:
+            info['compression'] = self._codec.stats()
+        if self._arena is not None:
+            info['arena'] = self._arena.stats()
+        return info
+
+    def memory_usage(self, key: str) -> Optional[int]:
+        """Estimate the memory held by a key across all layers.
+
+        Every version of the key counts, including values shadowed by open
+        transactions and tombstones.
+
+        Args:
+            key: The key to measure.
+        Returns:
+            Estimated bytes, or None if no layer holds the key.
+        """
+        if self._binary:
+            key = to_bytes(key)
+        sizes = [entry_size(key, layer[key])
+                 for layer in self._transaction_manager.get_all_layers() if key in layer]
+        return sum(sizes) if sizes else None
+
+    def memory_top(self, count: int = 10, samples: int = 10000) -> List[Tuple[str, int]]:
+        """Find the largest keys among a random sample.
+
+        The sample is drawn in one pass over the layers with reservoir
+        sampling, so only ``samples`` keys are held however large the
+        database is.
+
+        Args:
+            count: Number of keys to return.
+            samples: Keys measured; the answer is exact for smaller databases.
+        Returns:
+            (key, estimated bytes) pairs, largest first.
+        """
+        layers = self._transaction_manager.get_all_layers()
+        reservoir: List[Any] = []
+        seen = 0
+        for index, layer in enumerate(layers):
+            above = layers[index + 1:]
+            for k in layer:
+                # A key in several layers is counted in the topmost one only
+                if above and any(k in upper for upper in above):
+                    continue
+                seen += 1
+                if len(reservoir) < samples:
+                    reservoir.append(k)
+                else:
+                    slot = random.randrange(seen)
+                    if slot < samples:
+                        reservoir[slot] = k
+        sized = [(k, self.memory_usage(k) or 0) for k in reservoir]
+        sized.sort(key=lambda item: item[1], reverse=True)
+        return sized[:count]
+
+    def codec_stats(self) -> Optional[Dict[str, Any]]:
+        """Compression counters, or None if no codec is configured."""
+        return self._codec.stats() if self._codec is not None else None
+
     def get_transaction_depth(self) -> int:
         """Get current transaction depth.
 
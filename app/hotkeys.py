@@ -0,0 +1,255 @@
+import heapq
+import math
+import random
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+from .logger import Logger
+
+READ_COMMANDS = frozenset({'get'})
+WRITE_COMMANDS = frozenset({'set', 'unset', 'incr', 'decr', 'append', 'getset'})
+
+# Forward decay weights grow with time; rescale before floats lose precision
+_RESCALE_AT = 2.0 ** 40
+
+class CountMinSketch:
+    """Approximate counters for an unbounded key set in fixed memory.
+
+    ``depth`` rows of ``width`` float counters; a key adds to one counter
+    per row and its estimate is the smallest of them, which never
+    undercounts and overcounts by about ``total / width`` at worst.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        """Initialize zeroed counters.
+
+        Args:
+            width: Counters per row.
+            depth: Number of rows (independent hashes).
+        """
+        self.width = width
+        self.depth = depth
+        self._rows = [array('d', bytes(8 * width)) for _ in range(depth)]
+
+    def _slots(self, key: Any) -> List[int]:
+        h1 = hash(key)
+        h2 = hash((key, 0x9E3779B9)) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key: Any, amount: float = 1.0) -> float:
+        """Count a key and return its new estimate."""
+        estimate = math.inf
+        for row, slot in zip(self._rows, self._slots(key)):
+            row[slot] += amount
+            estimate = min(estimate, row[slot])
+        return estimate
+
+    def estimate(self, key: Any) -> float:
+        """Estimated count of a key."""
+        return min(row[slot] for row, slot in zip(self._rows, self._slots(key)))
+
+    def scale(self, factor: float) -> None:
+        """Multiply every counter by ``factor``."""
+        for row in self._rows:
+            for i in range(self.width):
+                row[i] *= factor
+
+    def clear(self) -> None:
+        for row in self._rows:
+            for i in range(self.width):
+                row[i] = 0.0
+
+class TopKeys:
+    """The ``k`` keys with the highest decayed counts in a count-min sketch.
+
+    Time decay is forward decay: an event at time ``t`` counts
+    ``2 ** (t / half_life)``, so older events weigh exponentially less
+    relative to new ones without touching the counters on every tick.
+    Candidates sit in a min-heap with lazily dropped stale entries.
+    """
+
+    def __init__(self, k: int = 32, width: int = 2048, depth: int = 4, half_life: float = 60.0):
+        """Initialize an empty tracker.
+
+        Args:
+            k: Number of keys kept.
+            width: Count-min sketch width.
+            depth: Count-min sketch depth.
+            half_life: Seconds after which an event counts half (0 for no decay).
+        """
+        self.k = k
+        self.half_life = half_life
+        self.sketch = CountMinSketch(width, depth)
+        self._top: Dict[Any, float] = {}
+        self._heap: List[Tuple[float, Any]] = []
+        self._origin = time.monotonic()
+
+    def _weight(self, now: float) -> float:
+        if not self.half_life:
+            return 1.0
+        return 2.0 ** ((now - self._origin) / self.half_life)
+
+    def add(self, key: Any, now: Optional[float] = None) -> None:
+        """Count one event for a key."""
+        weight = self._weight(time.monotonic() if now is None else now)
+        if weight > _RESCALE_AT:
+            self._rescale(weight)
+            weight = 1.0
+        estimate = self.sketch.add(key, weight)
+        top, heap = self._top, self._heap
+        if key in top or len(top) < self.k:
+            top[key] = estimate
+            heapq.heappush(heap, (estimate, key))
+            if len(heap) > 4 * self.k:
+                self._rebuild()
+            return
+        # Estimates only grow, so a heap entry is stale iff it differs from top
+        while top.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        if estimate > heap[0][0]:
+            _, evicted = heapq.heappop(heap)
+            del top[evicted]
+            top[key] = estimate
+            heapq.heappush(heap, (estimate, key))
+
+    def _rebuild(self) -> None:
+        self._heap = [(estimate, key) for key, estimate in self._top.items()]
+        heapq.heapify(self._heap)
+
+    def _rescale(self, weight: float) -> None:
+        # Move the origin to now: every weight so far shrinks by the same factor
+        self._origin += self.half_life * math.log2(weight)
+        self.sketch.scale(1.0 / weight)
+        for key in self._top:
+            self._top[key] /= weight
+        self._rebuild()
+
+    def top(self, n: Optional[int] = None, now: Optional[float] = None) -> List[Tuple[Any, float]]:
+        """Hottest keys with their decayed counts, hottest first.
+
+        Args:
+            n: Number of keys (default all ``k``).
+            now: Time to decay to (default now).
+        Returns:
+            List of (key, decayed event count).
+        """
+        weight = self._weight(time.monotonic() if now is None else now)
+        ranked = sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+        return [(key, estimate / weight) for key, estimate in ranked[:n or self.k]]
+
+    def clear(self) -> None:
+        self.sketch.clear()
+        self._top.clear()
+        self._heap.clear()
+        self._origin = time.monotonic()
+
+class HotKeyTracker:
+    """Samples GET and write commands into read and write ``TopKeys``.
+
+    Installed as a registry pre hook while running, so it costs nothing
+    when stopped. Only about one command in ``1 / sample_rate`` is
+    counted (the gap between samples is randomized to avoid aliasing
+    with periodic traffic); reported counts are scaled back up, so they
+    estimate real commands per key with decay applied. Memory is fixed:
+    two sketches and ``2 * k`` candidates.
+    """
+
+    def __init__(self, registry: Any, logger: Logger, sample_rate: float = 0.01, k: int = 32,
+                 width: int = 2048, depth: int = 4, half_life: float = 60.0):
+        """Initialize a stopped tracker.
+
+        Args:
+            registry: ``CommandRegistry`` whose commands are sampled.
+            logger: Logger for tracker events.
+            sample_rate: Fraction of commands counted (1 counts all).
+            k: Keys kept per ranking.
+            width: Count-min sketch width.
+            depth: Count-min sketch depth.
+            half_life: Decay half-life in seconds (0 for no decay).
+        """
+        self._registry = registry
+        self._logger = logger
+        self._lock = threading.Lock()
+        self.reads = TopKeys(k, width, depth, half_life)
+        self.writes = TopKeys(k, width, depth, half_life)
+        self.sample_rate = sample_rate
+        self._running = False
+        self._countdown = 1
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def sample_rate(self) -> float:
+        return self._sample_rate
+
+    @sample_rate.setter
+    def sample_rate(self, rate: float) -> None:
+        if not 0 < rate <= 1:
+            raise ValueError(f"Sample rate must be in (0, 1]: {rate}")
+        self._sample_rate = rate
+        self._interval = max(1, round(1 / rate))
+
+    def start(self, sample_rate: Optional[float] = None) -> None:
+        """Start sampling commands.
+
+        Args:
+            sample_rate: New sample rate (default: keep the current one).
+        """
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if self._running:
+            return
+        self._running = True
+        self._registry.add_hook(pre=self._pre)
+        self._logger.info(f"HOTKEYS: sampling {self._sample_rate:g} of commands")
+
+    def stop(self) -> None:
+        """Stop sampling; collected counts are kept."""
+        if not self._running:
+            return
+        self._running = False
+        self._registry.remove_hook(pre=self._pre)
+        self._logger.info("HOTKEYS: stopped")
+
+    def reset(self) -> None:
+        """Forget all counts."""
+        with self._lock:
+            self.reads.clear()
+            self.writes.clear()
+
+    def _pre(self, name: str, args: Tuple[Any, ...]) -> None:
+        self._countdown -= 1
+        if self._countdown > 0:
+            return None
+        interval = self._interval
+        self._countdown = random.randint(1, 2 * interval - 1) if interval > 1 else 1
+        if not args:
+            return None
+        if name in READ_COMMANDS:
+            ranking = self.reads
+        elif name in WRITE_COMMANDS:
+            ranking = self.writes
+        else:
+            return None
+        with self._lock:
+            ranking.add(args[0])
+        return None
+
+    def top(self, n: int = 10) -> Dict[str, List[Tuple[Any, int]]]:
+        """Hottest keys by reads and by writes.
+
+        Args:
+            n: Keys per ranking.
+        Returns:
+            Dict with 'reads' and 'writes' lists of (key, estimated commands).
+        """
+        with self._lock:
+            now = time.monotonic()
+            return {
+                name: [(key, round(count * self._interval))
+                       for key, count in ranking.top(n, now)]
+                for name, ranking in (('reads', self.reads), ('writes', self.writes))
+            }
@@ -80,39 +80,15 @@ class InteractiveMode:
         click.echo(help_text)
     
     def _execute_command(self, cmd: str, args: list[str]) -> None:
-        """Execute a database command.
+        """Execute a database command and display its formatted result.
         
         Args:
             cmd: Command name.
             args: Command arguments.
         """
-        try:
-            result = self._command_registry.execute(cmd, *args)
-            self._format_and_display_result(cmd, result)
-        except ValueError as e:
-            self._logger.warning(f"Unknown command: {cmd}")
-            click.echo('UNKNOWN COMMAND')
-        except TypeError as e:
-            self._logger.warning(f"Invalid arguments for command '{cmd}': {e}")
-            click.echo('INVALID ARGUMENTS')
-    
-    def _format_and_display_result(self, cmd: str, result) -> None:
-        """Format and display command result.
-        
-        Args:
-            cmd: Command name.
-            result: Command result.
-        """
-        if cmd == 'get':
-            click.echo(result if result is not None else 'NULL')
-        elif cmd == 'counts':
-            click.echo(result)
-        elif cmd == 'find':
-            click.echo(' '.join(result) if result else 'NULL')
-        elif cmd == 'rollback' and not result:
-            click.echo('NO TRANSACTION')
-        elif cmd == 'commit' and not result:
-            click.echo('NO TRANSACTION')
-        elif cmd == 'status':
-            click.echo(f"Transaction depth: {result}")
-        # Other commands (set, unset, begin) don't produce output 
\ No newline at end of file
+        printed = False
+        for fragment in self._command_registry.dispatch_stream(cmd, args):
+            click.echo(fragment, nl=False)
+            printed = True
+        if printed:
+            click.echo()
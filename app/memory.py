@@ -0,0 +1,116 @@
+import os
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+from .logger import Logger
+
+# Allocation diffs written by MemoryProfiler.stop
+TOP_DIFFS = 50
+
+class CommandAllocations:
+    """Allocation totals of one command type during a profile."""
+
+    __slots__ = ('calls', 'net_bytes', 'peak_bytes')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.net_bytes = 0
+        self.peak_bytes = 0
+
+class MemoryProfiler:
+    """Attributes traced allocations to commands of a ``CommandRegistry``.
+
+    While running, a pre/post hook pair records how much traced memory
+    each command kept (net) and its largest temporary allocation (peak).
+    ``stop`` writes the per-command totals and the top tracemalloc
+    snapshot differences to a file.
+    """
+
+    def __init__(self, registry: Any, logger: Logger, frames: int = 1):
+        """Initialize the profiler.
+
+        Args:
+            registry: Command registry whose commands are profiled.
+            logger: Logger for profiler events.
+            frames: Stack frames stored per traced allocation.
+        """
+        self._registry = registry
+        self._logger = logger
+        self._frames = frames
+        self._owns_tracing = False
+        self._start_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_at = 0.0
+        self._before = 0
+        self._commands: Dict[str, CommandAllocations] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._start_snapshot is not None
+
+    def start(self) -> None:
+        """Start tracing allocations and attributing them to commands."""
+        if self.running:
+            raise RuntimeError("Memory profile already running")
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._frames)
+            self._owns_tracing = True
+        self._commands = {}
+        self._start_snapshot = tracemalloc.take_snapshot()
+        self._started_at = time.perf_counter()
+        self._registry.add_hook(pre=self._pre, post=self._post)
+        self._logger.info("MEMORY PROFILE: started")
+
+    def _pre(self, name: str, args: Tuple[Any, ...]) -> None:
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        self._before = tracemalloc.get_traced_memory()[0]
+
+    def _post(self, name: str, args: Tuple[Any, ...], result: Any) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        stats = self._commands.get(name)
+        if stats is None:
+            stats = self._commands[name] = CommandAllocations()
+        stats.calls += 1
+        stats.net_bytes += current - self._before
+        stats.peak_bytes = max(stats.peak_bytes, peak - self._before)
+
+    def stop(self, path: str) -> str:
+        """Stop profiling and write the report.
+
+        Args:
+            path: Report file path.
+
+        Returns:
+            The report path.
+        """
+        if self._start_snapshot is None:
+            raise RuntimeError("Memory profile not running")
+        self._registry.remove_hook(pre=self._pre, post=self._post)
+        snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__),
+                  tracemalloc.Filter(False, '<frozen importlib._bootstrap>')]
+        diffs = snapshot.filter_traces(ignore).compare_to(
+            self._start_snapshot.filter_traces(ignore), 'lineno')
+        elapsed = time.perf_counter() - self._started_at
+        self._start_snapshot = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"# memory profile, {elapsed:.1f}s\n")
+            f.write("# command calls net_bytes peak_bytes\n")
+            for name, stats in sorted(self._commands.items(), key=lambda item: -item[1].net_bytes):
+                f.write(f"{name} {stats.calls} {stats.net_bytes} {stats.peak_bytes}\n")
+            f.write(f"# top {TOP_DIFFS} allocation differences\n")
+            for diff in diffs[:TOP_DIFFS]:
+                f.write(f"{diff}\n")
+        self._logger.info(f"MEMORY PROFILE: report written to {path}")
+        return path
+
+    def command_stats(self) -> List[Tuple[str, int, int, int]]:
+        """Per-command ``(name, calls, net_bytes, peak_bytes)`` collected so far."""
+        return [(name, s.calls, s.net_bytes, s.peak_bytes) for name, s in self._commands.items()]
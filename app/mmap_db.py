@@ -0,0 +1,449 @@
+import hashlib
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .base import BaseDB, Database, to_bytes
+from .logger import Logger
+from .transaction_manager import TransactionManager, ChangeListener
+
+MAGIC = b'IMDBMMAP'
+VERSION = 1
+# magic, version, reserved, capacity, count, used slots, heap end, garbage bytes
+HEADER = struct.Struct('<8sIIQQQQQ')
+HEADER_SIZE = 64
+SLOT = struct.Struct('<QQ')  # key hash, record offset
+RECORD = struct.Struct('<II')  # key length, value length
+EMPTY = 0
+DELETED = 1
+MAX_LOAD = 0.7
+MIN_CAPACITY = 1024
+
+def _hash(key: bytes) -> int:
+    """Stable 64-bit key hash; 0 and 1 are reserved slot markers."""
+    h = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+    return h if h > DELETED else h + 2
+
+def _next_bucket(cursor: int, bits: int) -> int:
+    """Advance a reverse-binary bucket cursor (0 once every bucket was visited)."""
+    reverse = int(format(cursor, f'0{bits}b')[::-1], 2) + 1
+    if reverse >> bits:
+        return 0
+    return int(format(reverse, f'0{bits}b')[::-1], 2)
+
+def _utf8(text: str) -> bytes:
+    return text.encode('utf-8')
+
+def _text(data: bytes) -> str:
+    return data.decode('utf-8')
+
+class MmapDB(BaseDB, Database):
+    """Key-value database stored in a memory-mapped file.
+
+    The file holds an open-addressing hash table of (hash, offset) slots
+    followed by an append-only heap of key/value records. Only the pages
+    that are touched are read, so memory use is bounded by the OS page
+    cache and reopening a large file is just an ``mmap`` call.
+
+    Open transactions live in ``TransactionManager`` layers on top of the
+    file; changes are written to the file when they are committed to the
+    base layer. In binary mode keys and values are ``bytes`` and records
+    are written and read without any text encoding.
+    """
+
+    def __init__(self, path: str, transaction_manager: TransactionManager, logger: Logger,
+                 initial_capacity: int = MIN_CAPACITY, binary: bool = False) -> None:
+        """Open or create the database file.
+
+        Args:
+            path: Database file path.
+            transaction_manager: Manager for the transaction overlay.
+            logger: Logger for database operations.
+            initial_capacity: Hash table slots for a new file (rounded up to a power of two).
+            binary: Store keys and values as bytes.
+        """
+        self._path = path
+        self._binary = binary
+        # Record bytes <-> keys and values
+        self._encode: Any = to_bytes if binary else _utf8
+        self._decode: Any = bytes if binary else _text
+        self._transaction_manager = transaction_manager
+        self._logger = logger
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        capacity = MIN_CAPACITY
+        while capacity < initial_capacity:
+            capacity *= 2
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            self._create(path, capacity)
+        self._file = open(path, 'r+b')
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self._read_header()
+        # Committed changes leave the base layer and go to the file
+        self._transaction_manager.add_listener(self._write_through)
+        self._transaction_manager.set_backing_store(self._file_contains)
+        self._logger.info(f"MmapDB opened {path} ({self._count} keys)")
+
+    @staticmethod
+    def _create(path: str, capacity: int) -> None:
+        """Write an empty database file."""
+        heap_start = HEADER_SIZE + capacity * SLOT.size
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, capacity, 0, 0, heap_start, 0).ljust(HEADER_SIZE, b'\0'))
+            f.truncate(heap_start + 4096)
+
+    def _read_header(self) -> None:
+        magic, version, _, capacity, count, used, heap_end, garbage = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self._path} is not a database file")
+        self._capacity = capacity
+        self._count = count
+        self._used = used
+        self._heap_end = heap_end
+        self._garbage = garbage
+
+    def _write_header(self) -> None:
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, 0, self._capacity, self._count,
+                         self._used, self._heap_end, self._garbage)
+
+    # File-level operations
+
+    def _probe(self, key: bytes, h: int) -> Tuple[int, int]:
+        """Find the slot of a key.
+
+        Returns:
+            Tuple of (slot index of the key or -1, slot index to insert into).
+        """
+        mm = self._mm
+        mask = self._capacity - 1
+        i = h & mask
+        insert = -1
+        while True:
+            slot_hash, offset = SLOT.unpack_from(mm, HEADER_SIZE + i * SLOT.size)
+            if slot_hash == EMPTY:
+                return -1, insert if insert >= 0 else i
+            if slot_hash == DELETED:
+                if insert < 0:
+                    insert = i
+            elif slot_hash == h and self._record_key(offset) == key:
+                return i, i
+            i = (i + 1) & mask
+
+    def _record_key(self, offset: int) -> bytes:
+        key_len, _ = RECORD.unpack_from(self._mm, offset)
+        start = offset + RECORD.size
+        return self._mm[start:start + key_len]
+
+    def _record(self, offset: int) -> Tuple[bytes, bytes]:
+        key_len, value_len = RECORD.unpack_from(self._mm, offset)
+        start = offset + RECORD.size
+        return self._mm[start:start + key_len], self._mm[start + key_len:start + key_len + value_len]
+
+    def _record_size(self, offset: int) -> int:
+        key_len, value_len = RECORD.unpack_from(self._mm, offset)
+        return RECORD.size + key_len + value_len
+
+    def _file_contains(self, key: str) -> bool:
+        kb = self._encode(key)
+        return self._probe(kb, _hash(kb))[0] >= 0
+
+    def _file_get(self, key: str) -> Optional[str]:
+        kb = self._encode(key)
+        index, _ = self._probe(kb, _hash(kb))
+        if index < 0:
+            return None
+        _, offset = SLOT.unpack_from(self._mm, HEADER_SIZE + index * SLOT.size)
+        return self._decode(self._record(offset)[1])
+
+    def _ensure_size(self, size: int) -> None:
+        if size <= len(self._mm):
+            return
+        new_size = max(size, len(self._mm) * 2)
+        self._mm.close()
+        self._file.truncate(new_size)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def _append(self, kb: bytes, vb: bytes) -> int:
+        offset = self._heap_end
+        size = RECORD.size + len(kb) + len(vb)
+        self._ensure_size(offset + size)
+        RECORD.pack_into(self._mm, offset, len(kb), len(vb))
+        self._mm[offset + RECORD.size:offset + size] = kb + vb
+        self._heap_end = offset + size
+        return offset
+
+    def _file_put(self, key: str, value: str) -> None:
+        kb = self._encode(key)
+        h = _hash(kb)
+        index, insert = self._probe(kb, h)
+        if index >= 0:
+            _, old = SLOT.unpack_from(self._mm, HEADER_SIZE + index * SLOT.size)
+            self._garbage += self._record_size(old)
+        else:
+            if (self._used + 1) > self._capacity * MAX_LOAD:
+                self._rebuild(self._capacity * 2)
+                self._file_put(key, value)
+                return
+            slot_hash, _ = SLOT.unpack_from(self._mm, HEADER_SIZE + insert * SLOT.size)
+            if slot_hash == EMPTY:
+                self._used += 1
+            self._count += 1
+            index = insert
+        offset = self._append(kb, self._encode(value))
+        SLOT.pack_into(self._mm, HEADER_SIZE + index * SLOT.size, h, offset)
+        self._write_header()
+
+    def _file_delete(self, key: str) -> None:
+        kb = self._encode(key)
+        index, _ = self._probe(kb, _hash(kb))
+        if index < 0:
+            return
+        _, offset = SLOT.unpack_from(self._mm, HEADER_SIZE + index * SLOT.size)
+        self._garbage += self._record_size(offset)
+        SLOT.pack_into(self._mm, HEADER_SIZE + index * SLOT.size, DELETED, 0)
+        self._count -= 1
+        self._write_header()
+
+    def _iter_file(self) -> Iterator[Tuple[bytes, bytes]]:
+        """Iterate over records of the live keys in the file."""
+        mm = self._mm
+        for i in range(self._capacity):
+            slot_hash, offset = SLOT.unpack_from(mm, HEADER_SIZE + i * SLOT.size)
+            if slot_hash > DELETED:
+                yield self._record(offset)
+
+    def _scan_file(self, cursor: int, count: int) -> Tuple[int, List[Tuple[bytes, bytes]]]:
+        """Read the records of the live keys in the next home buckets of a scan.
+
+        A key's home bucket is its hash masked to the table size; its slot
+        lies in the probe run starting there. Buckets are visited in
+        reverse-binary order of their index (as in Redis SCAN), so the
+        cursor stays valid when the table is rebuilt with more slots: the
+        buckets of the larger table that hold keys of already visited
+        buckets are exactly the ones visited before. Keys present for the
+        whole scan are returned once. Nothing is kept between calls, so the
+        file may grow or be rebuilt between pages.
+
+        Args:
+            cursor: 0 to start, or the cursor returned by the previous call.
+            count: Records to collect before returning (more if a bucket
+                holds several keys).
+
+        Returns:
+            Tuple of (next cursor, 0 when done; records as (key, value) bytes).
+        """
+        mm = self._mm
+        mask = self._capacity - 1
+        bits = mask.bit_length()
+        cursor &= mask
+        records: List[Tuple[bytes, bytes]] = []
+        while True:
+            i = cursor
+            while True:
+                slot_hash, offset = SLOT.unpack_from(mm, HEADER_SIZE + i * SLOT.size)
+                if slot_hash == EMPTY:
+                    break
+                if slot_hash > DELETED and slot_hash & mask == cursor:
+                    records.append(self._record(offset))
+                i = (i + 1) & mask
+                if i == cursor:
+                    break
+            cursor = _next_bucket(cursor, bits)
+            if not cursor or len(records) >= count:
+                return cursor, records
+
+    def _rebuild(self, capacity: int) -> None:
+        """Rewrite the file with a new table size, dropping garbage."""
+        tmp_path = self._path + '.tmp'
+        self._create(tmp_path, capacity)
+        with open(tmp_path, 'r+b') as f:
+            mm = mmap.mmap(f.fileno(), 0)
+            mask = capacity - 1
+            heap_end = HEADER_SIZE + capacity * SLOT.size
+            count = 0
+            for kb, vb in self._iter_file():
+                size = RECORD.size + len(kb) + len(vb)
+                if heap_end + size > len(mm):
+                    mm.close()
+                    f.truncate(max(heap_end + size, (heap_end + size) * 2))
+                    mm = mmap.mmap(f.fileno(), 0)
+                RECORD.pack_into(mm, heap_end, len(kb), len(vb))
+                mm[heap_end + RECORD.size:heap_end + size] = kb + vb
+                h = _hash(kb)
+                i = h & mask
+                while SLOT.unpack_from(mm, HEADER_SIZE + i * SLOT.size)[0] != EMPTY:
+                    i = (i + 1) & mask
+                SLOT.pack_into(mm, HEADER_SIZE + i * SLOT.size, h, heap_end)
+                heap_end += size
+                count += 1
+            HEADER.pack_into(mm, 0, MAGIC, VERSION, 0, capacity, count, count, heap_end, 0)
+            mm.flush()
+            mm.close()
+        self._mm.close()
+        self._file.close()
+        os.replace(tmp_path, self._path)
+        self._file = open(self._path, 'r+b')
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self._read_header()
+        self._logger.info(f"MmapDB rebuilt with {capacity} slots")
+
+    def _write_through(self, changes: Dict[str, Optional[str]]) -> None:
+        """Change listener: move committed changes from the base layer to the file."""
+        for k, v in changes.items():
+            if v is None:
+                self._file_delete(k)
+            else:
+                self._file_put(k, v)
+            self._transaction_manager.discard_base(k)
+
+    # Database interface
+
+    def _overlay(self) -> List[Dict[str, Optional[str]]]:
+        """Transaction layers above the file, innermost first."""
+        return self._transaction_manager.get_all_layers()[:0:-1]
+
+    def set(self, key: str, value: str) -> None:
+        """Set a key-value pair in the database."""
+        if self._binary:
+            key, value = to_bytes(key), to_bytes(value)
+        self._transaction_manager.write(key, value)
+        self._logger.info(f"SET: {key} = {value}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a value by key from the database."""
+        if self._binary:
+            key = to_bytes(key)
+        for layer in self._overlay():
+            if key in layer:
+                value = layer[key]
+                break
+        else:
+            value = self._file_get(key)
+        self._logger.info(f"GET: {key} = {value if value is not None else 'NULL (not found)'}")
+        return value
+
+    def unset(self, key: str) -> None:
+        """Unset a key from the database."""
+        if self._binary:
+            key = to_bytes(key)
+        self._transaction_manager.write(key, None)
+        self._logger.info(f"UNSET: {key}")
+
+    def scan(self, chunk_size: int = 1000) -> Iterator[List[Tuple[str, str]]]:
+        """Iterate over visible key-value pairs in chunks.
+
+        Keys of open transactions come first; the file is then read a chunk
+        at a time with ``_scan_file``, so the database may be modified (and
+        the file grown or rebuilt) while the iterator is paused.
+        """
+        seen: set = set()
+        chunk: List[Tuple[str, str]] = []
+        for layer in self._overlay():
+            for k, v in list(layer.items()):
+                if k in seen:
+                    continue
+                seen.add(k)
+                if v is not None:
+                    chunk.append((k, v))
+        cursor = 0
+        while True:
+            cursor, records = self._scan_file(cursor, chunk_size)
+            for kb, vb in records:
+                k = self._decode(kb)
+                if k not in seen:
+                    chunk.append((k, self._decode(vb)))
+            if len(chunk) >= chunk_size or (chunk and not cursor):
+                yield chunk
+                chunk = []
+            if not cursor:
+                break
+
+    def counts(self, value: str) -> int:
+        """Count how many times a value appears in the database."""
+        if self._binary:
+            value = to_bytes(value)
+        result = sum(1 for chunk in self.scan() for _, v in chunk if v == value)
+        self._logger.info(f"COUNTS: {value} = {result}")
+        return result
+
+    def find(self, value: str) -> List[str]:
+        """Find all keys that have the specified value."""
+        if self._binary:
+            value = to_bytes(value)
+        found = [k for chunk in self.scan() for k, v in chunk if v == value]
+        self._logger.info(f"FIND: {value} = {len(found)} keys")
+        return found
+
+    def iter_find(self, value: str, chunk_size: int = 1000) -> Iterator[str]:
+        """Yield the keys that have the specified value, as ``scan`` reaches them."""
+        if self._binary:
+            value = to_bytes(value)
+        for chunk in self.scan(chunk_size):
+            for k, v in chunk:
+                if v == value:
+                    yield k
+
+    def begin(self) -> None:
+        """Begin a new transaction."""
+        self._transaction_manager.begin()
+
+    def rollback(self) -> bool:
+        """Rollback the current transaction."""
+        return self._transaction_manager.rollback()
+
+    def commit(self) -> bool:
+        """Commit the current transaction."""
+        return self._transaction_manager.commit()
+
+    def get_transaction_depth(self) -> int:
+        """Get current transaction depth."""
+        return self._transaction_manager.get_transaction_depth()
+
+    def snapshot(self) -> Dict[str, str]:
+        """Get a copy of the committed data."""
+        return {self._decode(kb): self._decode(vb) for kb, vb in self._iter_file()}
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        """Subscribe to changes committed to the file."""
+        self._transaction_manager.add_listener(listener)
+
+    def remove_listener(self, listener: ChangeListener) -> None:
+        """Unsubscribe from committed changes."""
+        self._transaction_manager.remove_listener(listener)
+
+    def info(self) -> Dict[str, Any]:
+        """Report transaction depth, limits and per-layer counters.
+
+        The base entry describes the file: committed keys and live heap bytes.
+        """
+        tm = self._transaction_manager
+        layers = tm.layer_stats()
+        layers[0] = {'keys': self._count, 'tombstones': 0, 'bytes': self._heap_end - self._garbage}
+        return {
+            'depth': tm.get_transaction_depth(),
+            'max_depth': tm.max_depth,
+            'max_bytes': tm.max_bytes,
+            'layers': layers,
+        }
+
+    def __len__(self) -> int:
+        """Number of committed keys."""
+        return self._count
+
+    def compact(self) -> None:
+        """Rewrite the file without the space of overwritten and removed values."""
+        self._rebuild(self._capacity)
+
+    def sync(self) -> None:
+        """Flush dirty pages to disk."""
+        self._mm.flush()
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self._transaction_manager.remove_listener(self._write_through)
+        self._transaction_manager.set_backing_store(None)
+        self._mm.flush()
+        self._mm.close()
+        self._file.close()
+        self._logger.info(f"MmapDB closed {self._path}")
@@ -0,0 +1,261 @@
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, CancelledError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .logger import Logger
+from .shm_replica import ImageView, build_image
+
+# Seconds a finished job's result is kept for RESULT
+RESULT_TTL = 600.0
+
+class OffloadQueueFull(RuntimeError):
+    """Raised when too many offloaded commands are already pending."""
+
+def _run_offloaded(func: Callable, shm_name: str, size: int, args: Tuple[Any, ...]) -> Any:
+    """Worker entry point: map the snapshot image and run the command on it."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buf = shm.buf[:size]
+    try:
+        return func(ImageView(buf), *args)
+    finally:
+        buf.release()
+        shm.close()
+
+class OffloadJob:
+    """An offloaded command submitted to the process pool."""
+
+    def __init__(self, job_id: int, name: str, future: Future,
+                 formatter: Callable[[Any], Optional[str]]):
+        self.id = job_id
+        self.name = name
+        self.future = future
+        self.formatter = formatter
+        # The pool's future, once the snapshot is published and the job handed over
+        self.task: Optional[Future] = None
+        # time.monotonic() when the job finished
+        self.finished: Optional[float] = None
+        future.add_done_callback(self._done)
+
+    def _done(self, future: Future) -> None:
+        self.finished = time.monotonic()
+
+    @property
+    def status(self) -> str:
+        """Job state: PENDING, RUNNING, DONE, FAILED or CANCELLED."""
+        future = self.future
+        if future.cancelled():
+            return 'CANCELLED'
+        if not future.done():
+            task = self.task
+            return 'RUNNING' if task is not None and task.running() else 'PENDING'
+        return 'FAILED' if future.exception() is not None else 'DONE'
+
+class OffloadExecutor:
+    """Runs CPU-heavy commands in a managed process pool.
+
+    Each job gets a read-only snapshot of the committed data. A publisher
+    thread, so the submitting thread gets the job back at once, writes the
+    snapshot into a shared memory segment as a hash-indexed image (see
+    ``shm_replica.build_image``). The worker maps the segment and reads it
+    through an ``ImageView`` without copying it into a dict, and large
+    snapshots stay out of the pool's call queue.
+
+    Results that are not collected are dropped ``result_ttl`` seconds
+    after their job finished.
+    """
+
+    def __init__(self, logger: Logger, max_workers: Optional[int] = None, max_pending: int = 16,
+                 result_ttl: float = RESULT_TTL):
+        """Initialize the executor. The process pool is started on first use.
+
+        Args:
+            logger: Logger for job logging.
+            max_workers: Pool size (defaults to the CPU count).
+            max_pending: Maximum number of unfinished jobs.
+            result_ttl: Seconds a finished job is kept for ``result`` (0 keeps it
+                until collected).
+        """
+        self._logger = logger
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._result_ttl = result_ttl
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._publisher: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[int, OffloadJob] = {}
+        self._ids = itertools.count(1)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._max_workers)
+        return self._pool
+
+    def _get_publisher(self) -> ThreadPoolExecutor:
+        if self._publisher is None:
+            self._publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='offload-publish')
+        return self._publisher
+
+    def submit(self, name: str, func: Callable, snapshot: Dict[str, str], args: Tuple[Any, ...],
+               formatter: Callable[[Any], Optional[str]]) -> OffloadJob:
+        """Submit a command to the pool.
+
+        Args:
+            name: Command name.
+            func: Picklable module-level function ``func(snapshot, *args)``.
+            snapshot: Committed data to hand to the worker, which gets it as
+                a read-only mapping; it is read by the publisher thread
+                later, so it must not change afterwards.
+            args: Converted command arguments.
+            formatter: Formatter for the command result.
+
+        Returns:
+            The submitted job.
+
+        Raises:
+            OffloadQueueFull: If ``max_pending`` jobs are unfinished.
+        """
+        self._expire()
+        with self._lock:
+            if self._pending >= self._max_pending:
+                raise OffloadQueueFull(f"Too many pending jobs ({self._pending})")
+            self._pending += 1
+
+        job = OffloadJob(next(self._ids), name, Future(), formatter)
+        try:
+            self._get_publisher().submit(self._publish, job, func, snapshot, args)
+        except BaseException:
+            self._release(None)
+            raise
+        self._jobs[job.id] = job
+        self._logger.info(f"OFFLOAD: job {job.id} ({name}) submitted")
+        return job
+
+    def _publish(self, job: OffloadJob, func: Callable, snapshot: Dict[str, str],
+                 args: Tuple[Any, ...]) -> None:
+        """Publisher thread: write a job's snapshot image to shared memory and hand it to the pool."""
+        if job.future.cancelled():
+            self._release(None)
+            return
+        shm: Optional[shared_memory.SharedMemory] = None
+        try:
+            image = build_image(snapshot)
+            size = len(image)
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            shm.buf[:size] = image
+            del image
+            task = self._get_pool().submit(_run_offloaded, func, shm.name, size, args)
+        except BaseException as e:
+            self._release(shm)
+            if not job.future.cancelled():
+                job.future.set_exception(e)
+            return
+        job.task = task
+        task.add_done_callback(lambda done: self._finish(job, shm, done))
+        if job.future.cancelled():
+            task.cancel()
+
+    def _finish(self, job: OffloadJob, shm: shared_memory.SharedMemory, task: Future) -> None:
+        """Pass the pool's outcome to the job and free its resources."""
+        self._release(shm)
+        if job.future.cancelled():
+            return
+        if task.cancelled():
+            job.future.cancel()
+        elif task.exception() is not None:
+            job.future.set_exception(task.exception())  # type: ignore
+        else:
+            job.future.set_result(task.result())
+
+    def _release(self, shm: Optional[shared_memory.SharedMemory]) -> None:
+        """Free a job's pending slot and its snapshot segment, if it was created."""
+        with self._lock:
+            self._pending -= 1
+        if shm is None:
+            return
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def get_job(self, job_id: int) -> Optional[OffloadJob]:
+        """Get a job by id."""
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[OffloadJob]:
+        """All jobs whose results have not been collected (or expired) yet."""
+        self._expire()
+        return list(self._jobs.values())
+
+    def _expire(self) -> None:
+        """Forget finished jobs whose results were not collected within ``result_ttl``."""
+        if not self._result_ttl:
+            return
+        deadline = time.monotonic() - self._result_ttl
+        for job in list(self._jobs.values()):
+            if job.finished is not None and job.finished < deadline:
+                self._jobs.pop(job.id, None)
+                self._logger.info(f"OFFLOAD: job {job.id} result expired")
+
+    def result(self, job_id: int, timeout: Optional[float] = 0) -> Tuple[str, Any]:
+        """Collect a job result.
+
+        Args:
+            job_id: Job id.
+            timeout: Seconds to wait (None waits until done).
+
+        Returns:
+            Tuple of (status, result). The job is forgotten once its
+            result has been collected.
+        """
+        self._expire()
+        job = self._jobs.get(job_id)
+        if job is None:
+            return 'UNKNOWN', None
+        try:
+            result = job.future.result(timeout=timeout)
+        except CancelledError:
+            del self._jobs[job_id]
+            return 'CANCELLED', None
+        except FutureTimeoutError:
+            return job.status, None
+        except Exception as e:
+            del self._jobs[job_id]
+            self._logger.error(f"OFFLOAD: job {job_id} failed: {e}")
+            return 'FAILED', e
+        del self._jobs[job_id]
+        return 'DONE', result
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job that has not started running yet.
+
+        Args:
+            job_id: Job id.
+
+        Returns:
+            True if the job was cancelled.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or (job.task is not None and not job.task.cancel()):
+            return False
+        if not job.future.cancel():
+            return False
+        self._logger.info(f"OFFLOAD: job {job_id} cancelled")
+        return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the process pool, cancelling jobs that have not started."""
+        # Cancelled here rather than with shutdown(cancel_futures=True), which needs Python 3.9
+        for job in list(self._jobs.values()):
+            if job.task is None or job.task.cancel():
+                job.future.cancel()
+        if self._publisher is not None:
+            self._publisher.shutdown(wait=wait)
+            self._publisher = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
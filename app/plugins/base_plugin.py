@@ -2,10 +2,17 @@ from typing import Protocol
 from app.config import Config
 
 class BasePlugin(Protocol):
+    """Plugin interface.
+
+    ``register`` receives the ``CommandRegistry`` and should pass a
+    ``CommandSpec`` for each command so arguments are validated and
+    results formatted the same way as built-in commands. Stored procedures
+    for CALL are registered there too, with ``registry.register_procedure``.
+    """
     name: str
     def initialize(self, config: Config) -> None:
         ...
     def register(self, registry) -> None:
         ...
     def cleanup(self) -> None:
-        ... 
\ No newline at end of file
+        ... 
@@ -1,13 +1,14 @@
 from app.plugins.base_plugin import BasePlugin
 from app.config import Config
+from app.commands import CommandSpec
 
 class EchoPlugin:
     name = "echo"
     def initialize(self, config: Config) -> None:
         pass
     def register(self, registry):
-        registry.register('echo', self.echo, 'Echo input')
+        registry.register('echo', self.echo, 'Echo input', CommandSpec(varargs=str))
     def cleanup(self) -> None:
         pass
     def echo(self, *args):
-        return ' '.join(args) 
\ No newline at end of file
+        return ' '.join(args) 
@@ -1,20 +1,117 @@
-from typing import Dict
+import importlib
+from importlib import metadata
+from typing import Callable, Dict, List, Optional
 from .base_plugin import BasePlugin
 from app.config import Config
 from app.commands import CommandRegistry
 
+# Entry point group: each entry point name is a command, its value the
+# plugin class providing it ("module:Class"). Several commands may point
+# to the same plugin.
+ENTRY_POINT_GROUP = 'inmemory_db.commands'
+
+# Plugins shipped with the package, used when it is run from a source
+# tree without installed entry points.
+BUILTIN_COMMANDS: Dict[str, str] = {
+    'echo': 'app.plugins.echo_plugin:EchoPlugin',
+    'valuestats': 'app.plugins.stats_plugin:StatsPlugin',
+}
+
+def discover_commands() -> Dict[str, str]:
+    """Map plugin command names to their plugin targets without importing them.
+
+    Returns:
+        Command name -> "module:Class" target.
+    """
+    commands = dict(BUILTIN_COMMANDS)
+    try:
+        eps = metadata.entry_points()
+        if hasattr(eps, 'select'):
+            group = eps.select(group=ENTRY_POINT_GROUP)
+        else:  # Python < 3.10
+            group = eps.get(ENTRY_POINT_GROUP, [])  # type: ignore
+    except Exception:
+        return commands
+    for ep in group:
+        commands[ep.name] = ep.value
+    return commands
+
+def load_target(target: str) -> Callable[[], BasePlugin]:
+    """Import a "module:Class" plugin target.
+
+    Args:
+        target: Entry point value.
+
+    Returns:
+        The plugin factory.
+    """
+    module_name, _, attr = target.partition(':')
+    obj = importlib.import_module(module_name)
+    for part in attr.split('.'):
+        obj = getattr(obj, part)
+    return obj  # type: ignore
+
 class PluginManager:
     def __init__(self):
         self._plugins: Dict[str, BasePlugin] = {}
+        self._lazy: Dict[str, List[str]] = {}
+        self._config: Optional[Config] = None
+        self._registry: Optional[CommandRegistry] = None
 
     def register(self, plugin: BasePlugin):
         self._plugins[plugin.name] = plugin
 
+    def register_lazy(self, target: str, commands: List[str]):
+        """Declare a plugin that is imported when one of its commands is first used.
+
+        Args:
+            target: "module:Class" of the plugin.
+            commands: Commands the plugin provides.
+        """
+        self._lazy.setdefault(target, []).extend(commands)
+
+    def discover(self):
+        """Declare every plugin found through entry points as lazy."""
+        for command, target in discover_commands().items():
+            self.register_lazy(target, [command])
+
     def initialize_all(self, config: Config, registry: CommandRegistry):
+        self._config = config
+        self._registry = registry
         for plugin in self._plugins.values():
             plugin.initialize(config)
             plugin.register(registry)
+        for target, commands in self._lazy.items():
+            for command in commands:
+                registry.register_lazy(command, self._loader(target),
+                                       f"Plugin command ({target.partition(':')[0]})")
+
+    def _loader(self, target: str) -> Callable[[], None]:
+        def load() -> None:
+            self.load(target)
+        return load
+
+    def load(self, target: str) -> BasePlugin:
+        """Import, initialize and register a lazily declared plugin.
+
+        Args:
+            target: "module:Class" of the plugin.
+
+        Returns:
+            The loaded plugin.
+        """
+        plugin = load_target(target)()
+        self._lazy.pop(target, None)
+        self._plugins[plugin.name] = plugin
+        if self._registry is not None:
+            plugin.initialize(self._config)  # type: ignore
+            plugin.register(self._registry)
+        return plugin
+
+    def loaded(self) -> List[str]:
+        """Names of plugins that are currently loaded."""
+        return list(self._plugins.keys())
 
     def cleanup_all(self):
         for plugin in self._plugins.values():
-            plugin.cleanup() 
\ No newline at end of file
+            plugin.cleanup()
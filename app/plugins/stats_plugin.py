@@ -0,0 +1,35 @@
+from collections import Counter
+from typing import Mapping
+from app.config import Config
+from app.commands import CommandSpec
+
+def value_stats(snapshot: Mapping[str, str], top: int = 5) -> str:
+    """Compute value statistics over the committed keyspace.
+
+    Runs in a worker process; ``snapshot`` is a read-only mapping of the
+    committed data.
+    """
+    counter = Counter(snapshot.values())
+    numeric = []
+    for value in snapshot.values():
+        try:
+            numeric.append(float(value))
+        except ValueError:
+            pass
+    parts = [f"keys={len(snapshot)}", f"distinct={len(counter)}"]
+    if numeric:
+        parts.append(f"numeric={len(numeric)}")
+        parts.append(f"mean={sum(numeric) / len(numeric):g}")
+    top_values = ','.join(f"{value}:{count}" for value, count in counter.most_common(top))
+    parts.append(f"top={top_values}")
+    return ' '.join(parts)
+
+class StatsPlugin:
+    name = "stats"
+    def initialize(self, config: Config) -> None:
+        pass
+    def register(self, registry):
+        registry.register('valuestats', value_stats, 'Value statistics over committed data (VALUESTATS [top])',
+                          CommandSpec(optional=(int,), offload=True))
+    def cleanup(self) -> None:
+        pass
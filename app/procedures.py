@@ -0,0 +1,214 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from .base import Database
+from .logger import Logger
+
+Procedure = Callable[..., Any]
+
+DEFAULT_BUDGET = 1.0
+
+class ProcedureTimeout(TimeoutError):
+    """A procedure ran past its time budget; its changes were rolled back."""
+
+class ProcedureHandle:
+    """Restricted view of the database passed to a running procedure.
+
+    Only reads and single-key writes are exposed: the procedure already
+    runs in its own transaction, so it cannot BEGIN, COMMIT or ROLLBACK.
+    Every call checks the time budget, which is how a runaway procedure
+    is stopped (Python code cannot be interrupted from outside).
+    """
+
+    __slots__ = ('_database', '_name', '_deadline')
+
+    def __init__(self, database: Database, name: str, deadline: float):
+        self._database = database
+        self._name = name
+        self._deadline = deadline
+
+    def remaining(self) -> float:
+        """Seconds left in the budget (negative once it is exceeded)."""
+        return self._deadline - time.perf_counter()
+
+    def check(self) -> None:
+        """Raise ``ProcedureTimeout`` if the budget is exceeded.
+
+        Long computations between database calls should call this now and then.
+        """
+        if time.perf_counter() > self._deadline:
+            raise ProcedureTimeout(f"Procedure {self._name} exceeded its time budget")
+
+    def get(self, key: str) -> Optional[str]:
+        self.check()
+        return self._database.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self.check()
+        self._database.set(key, value)
+
+    def unset(self, key: str) -> None:
+        self.check()
+        self._database.unset(key)
+
+    def counts(self, value: str) -> int:
+        self.check()
+        return self._database.counts(value)
+
+    def find(self, value: str) -> List[str]:
+        self.check()
+        return self._database.find(value)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        self.check()
+        return self._database.incr(key, amount)  # type: ignore
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        self.check()
+        return self._database.decr(key, amount)  # type: ignore
+
+    def append(self, key: str, suffix: str) -> int:
+        self.check()
+        return self._database.append(key, suffix)  # type: ignore
+
+    def getset(self, key: str, value: str) -> Optional[str]:
+        self.check()
+        return self._database.getset(key, value)  # type: ignore
+
+class ProcedureStats:
+    """Execution counters of one procedure."""
+
+    __slots__ = ('calls', 'errors', 'timeouts', 'total_time', 'max_time')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'avg_ms': round(self.total_time / self.calls * 1000, 3) if self.calls else 0.0,
+            'max_ms': round(self.max_time * 1000, 3),
+        }
+
+class ProcedureRegistry:
+    """Stored procedures: multi-command operations run inside the database.
+
+    ``call`` wraps the procedure in a transaction (nested, if one is
+    already open) and commits it only if the procedure returns within its
+    budget; an exception or a timeout rolls every change back. Together
+    with the server running each command under its shared lock, a CALL is
+    atomic and costs one round trip however many keys it touches.
+    """
+
+    def __init__(self, database: Database, logger: Logger, default_budget: float = DEFAULT_BUDGET):
+        """Initialize an empty registry.
+
+        Args:
+            database: Database procedures run against.
+            logger: Logger for procedure events.
+            default_budget: Time budget in seconds for procedures registered
+                without one (0 for no limit).
+        """
+        self._database = database
+        self._logger = logger
+        self.default_budget = default_budget
+        self._procedures: Dict[str, Procedure] = {}
+        self._budgets: Dict[str, Optional[float]] = {}
+        self._help: Dict[str, str] = {}
+        self._stats: Dict[str, ProcedureStats] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, procedure: Procedure, help_text: str = "",
+                 budget: Optional[float] = None) -> None:
+        """Register a procedure.
+
+        Args:
+            name: Procedure name used with CALL.
+            procedure: ``procedure(handle, *args)``; ``handle`` is a
+                ``ProcedureHandle`` and args are the CALL arguments as strings.
+            help_text: Description shown by PROCEDURES.
+            budget: Time budget in seconds (None for the default, 0 for no limit).
+        """
+        self._procedures[name] = procedure
+        self._budgets[name] = budget
+        self._help[name] = help_text
+        self._stats.setdefault(name, ProcedureStats())
+        self._logger.debug(f"Registered procedure: {name}")
+
+    def unregister(self, name: str) -> None:
+        """Remove a procedure and its stats."""
+        self._procedures.pop(name, None)
+        self._budgets.pop(name, None)
+        self._help.pop(name, None)
+        self._stats.pop(name, None)
+
+    def names(self) -> List[str]:
+        """Registered procedure names."""
+        return list(self._procedures)
+
+    def call(self, name: str, *args: str) -> Any:
+        """Run a procedure atomically.
+
+        Args:
+            name: Procedure name.
+            *args: Arguments passed to the procedure.
+
+        Returns:
+            The procedure's return value.
+
+        Raises:
+            ValueError: If the procedure is not registered.
+            ProcedureTimeout: If it ran past its budget.
+            Exception: Anything the procedure raised (after rollback).
+        """
+        procedure = self._procedures.get(name)
+        if procedure is None:
+            raise ValueError(f"Unknown procedure: {name}")
+        budget = self._budgets[name]
+        if budget is None:
+            budget = self.default_budget
+        start = time.perf_counter()
+        handle = ProcedureHandle(self._database, name, start + budget if budget else float('inf'))
+        depth = self._database.get_transaction_depth()
+        self._database.begin()
+        try:
+            result = procedure(handle, *args)
+            handle.check()  # computing past the budget without touching the database
+        except BaseException as e:
+            while self._database.get_transaction_depth() > depth:
+                self._database.rollback()
+            self._record(name, time.perf_counter() - start, e)
+            self._logger.warning(f"CALL: {name} rolled back: {e}")
+            raise
+        self._database.commit()
+        self._record(name, time.perf_counter() - start, None)
+        self._logger.info(f"CALL: {name} {' '.join(args)}".rstrip())
+        return result
+
+    def _record(self, name: str, elapsed: float, error: Optional[BaseException]) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                return
+            stats.calls += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            if isinstance(error, ProcedureTimeout):
+                stats.timeouts += 1
+            elif error is not None:
+                stats.errors += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-procedure counters.
+
+        Returns:
+            Procedure name -> dict with calls, errors, timeouts, avg_ms and max_ms.
+        """
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
@@ -0,0 +1,176 @@
+from typing import Any, List, Sequence
+
+# Wire format: a subset of RESP2. Requests are arrays of bulk strings
+# (or inline "SET A 10" lines); replies are simple strings, errors,
+# integers, bulk strings (null for missing values) and arrays.
+
+CRLF = b'\r\n'
+NULL_BULK = b'$-1\r\n'
+
+class ProtocolError(ValueError):
+    """Raised on malformed protocol data."""
+
+class ReplyError(Exception):
+    """An error reply sent by the server."""
+
+class _Incomplete:
+    """Marker for data that does not yet hold a complete item."""
+
+INCOMPLETE = _Incomplete()
+
+def encode_command_into(buffer: bytearray, args: Sequence[str]) -> None:
+    """Append an encoded request to ``buffer``.
+
+    Clients reuse one buffer for every batch, so encoding a pipeline does
+    not allocate a bytes object per part.
+
+    Args:
+        buffer: Output buffer.
+        args: Command name followed by its arguments.
+    """
+    buffer += b'*%d\r\n' % len(args)
+    for arg in args:
+        data = arg.encode('utf-8')
+        buffer += b'$%d\r\n' % len(data)
+        buffer += data
+        buffer += CRLF
+
+def encode_command(args: Sequence[str]) -> bytes:
+    """Encode a request as an array of bulk strings.
+
+    Args:
+        args: Command name followed by its arguments.
+
+    Returns:
+        Encoded request.
+    """
+    buffer = bytearray()
+    encode_command_into(buffer, args)
+    return bytes(buffer)
+
+def _encode_reply(value: Any, parts: List[bytes]) -> None:
+    if value is None:
+        parts.append(NULL_BULK)
+    elif isinstance(value, bool):
+        parts.append(b':1\r\n' if value else b':0\r\n')
+    elif isinstance(value, int):
+        parts.append(b':%d\r\n' % value)
+    elif isinstance(value, Exception):
+        message = str(value).replace('\r', ' ').replace('\n', ' ')
+        parts.append(b'-ERR ' + message.encode('utf-8') + CRLF)
+    elif isinstance(value, (list, tuple)):
+        parts.append(b'*%d\r\n' % len(value))
+        for item in value:
+            _encode_reply(item, parts)
+    elif isinstance(value, dict):
+        parts.append(b'*%d\r\n' % (2 * len(value)))
+        for key, item in value.items():
+            _encode_reply(str(key), parts)
+            _encode_reply(item, parts)
+    else:
+        data = value if isinstance(value, bytes) else str(value).encode('utf-8')
+        parts.append(b'$%d\r\n' % len(data))
+        parts.append(data)
+        parts.append(CRLF)
+
+def encode_reply(value: Any) -> bytes:
+    """Encode a command result.
+
+    None becomes a null bulk string, bools and ints become integers,
+    exceptions become error replies, lists/tuples and dicts (flattened to
+    key, value pairs) become arrays, anything else a bulk string.
+    """
+    parts: List[bytes] = []
+    _encode_reply(value, parts)
+    return b''.join(parts)
+
+class Reader:
+    """Incremental parser for requests and replies.
+
+    Data is appended with ``feed``; ``get`` returns the next complete item
+    or ``INCOMPLETE``. Bulk strings are decoded as UTF-8 and error replies
+    are returned (not raised) as ``ReplyError``.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._pos = 0
+
+    def feed(self, data: bytes) -> None:
+        """Append received data."""
+        if self._pos and self._pos == len(self._buffer):
+            self._buffer.clear()
+            self._pos = 0
+        elif self._pos > 65536:
+            del self._buffer[:self._pos]
+            self._pos = 0
+        self._buffer += data
+
+    def _line(self, pos: int) -> Any:
+        end = self._buffer.find(CRLF, pos)
+        if end < 0:
+            return INCOMPLETE, pos
+        return bytes(self._buffer[pos:end]), end + 2
+
+    def _parse(self, pos: int, inline: bool) -> Any:
+        buffer = self._buffer
+        if pos >= len(buffer):
+            return INCOMPLETE, pos
+        kind = buffer[pos]
+        if kind == 0x24:  # $ bulk string
+            line, start = self._line(pos + 1)
+            if line is INCOMPLETE:
+                return INCOMPLETE, pos
+            length = int(line)
+            if length < 0:
+                return None, start
+            end = start + length
+            if len(buffer) < end + 2:
+                return INCOMPLETE, pos
+            return buffer[start:end].decode('utf-8'), end + 2
+        if kind == 0x2a:  # * array
+            line, next_pos = self._line(pos + 1)
+            if line is INCOMPLETE:
+                return INCOMPLETE, pos
+            count = int(line)
+            if count < 0:
+                return None, next_pos
+            items = []
+            for _ in range(count):
+                item, next_pos = self._parse(next_pos, False)
+                if item is INCOMPLETE:
+                    return INCOMPLETE, pos
+                items.append(item)
+            return items, next_pos
+        if kind in (0x3a, 0x2b, 0x2d):
+            line, next_pos = self._line(pos + 1)
+            if line is INCOMPLETE:
+                return INCOMPLETE, pos
+            if kind == 0x3a:  # : integer
+                return int(line), next_pos
+            if kind == 0x2b:  # + simple string
+                return line.decode('utf-8'), next_pos
+            return ReplyError(line.decode('utf-8')), next_pos  # - error
+        if inline:
+            # Typed by hand (telnet, nc): a line ending in \n or \r\n
+            end = buffer.find(b'\n', pos)
+            if end < 0:
+                return INCOMPLETE, pos
+            return buffer[pos:end].decode('utf-8').split(), end + 1
+        raise ProtocolError(f"Unexpected type byte {chr(kind)!r}")
+
+    def get(self, inline: bool = False) -> Any:
+        """Parse the next complete item.
+
+        Args:
+            inline: Accept plain text lines (requests typed by hand).
+
+        Returns:
+            The item, or ``INCOMPLETE`` if more data is needed.
+        """
+        try:
+            item, pos = self._parse(self._pos, inline)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ProtocolError(str(e)) from e
+        self._pos = pos
+        return item
@@ -0,0 +1,207 @@
+import threading
+from typing import Dict, List, NamedTuple, Optional, Set
+from .logger import Logger
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+DISCONNECT = 'disconnect'
+POLICIES = (DROP_OLDEST, DROP_NEWEST, DISCONNECT)
+
+class ChangeEvent(NamedTuple):
+    """A committed change. ``value`` is None for UNSET."""
+    seq: int
+    key: str
+    value: Optional[str]
+
+    @property
+    def op(self) -> str:
+        return 'UNSET' if self.value is None else 'SET'
+
+class Subscription:
+    """Bounded ring buffer of change events for one subscriber.
+
+    Publishing never blocks: when the buffer is full the slow-consumer
+    policy decides whether the oldest event is overwritten, the new event
+    is dropped, or the subscription is closed.
+    """
+
+    def __init__(self, sub_id: int, prefix: str, capacity: int, policy: str):
+        """Initialize a subscription.
+
+        Args:
+            sub_id: Subscription id.
+            prefix: Key prefix filter ('' for all keys).
+            capacity: Ring buffer size.
+            policy: One of drop_oldest, drop_newest, disconnect.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+        if capacity < 1:
+            raise ValueError("Subscription capacity must be positive")
+        self.id = sub_id
+        self.prefix = prefix
+        self.policy = policy
+        self.capacity = capacity
+        self.dropped = 0
+        self.closed = False
+        self._buffer: List[Optional[ChangeEvent]] = [None] * capacity
+        self._head = 0
+        self._count = 0
+        self._ready = threading.Condition(threading.Lock())
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _push(self, event: ChangeEvent) -> bool:
+        """Add an event (publisher side).
+
+        Returns:
+            False if the subscription is closed and should be removed.
+        """
+        with self._ready:
+            if self.closed:
+                return False
+            if self._count == self.capacity:
+                self.dropped += 1
+                if self.policy == DROP_NEWEST:
+                    return True
+                if self.policy == DISCONNECT:
+                    self.closed = True
+                    self._ready.notify_all()
+                    return False
+                # DROP_OLDEST: overwrite the slot at the head
+                self._buffer[self._head] = event
+                self._head = (self._head + 1) % self.capacity
+            else:
+                self._buffer[(self._head + self._count) % self.capacity] = event
+                self._count += 1
+            self._ready.notify()
+        return True
+
+    def poll(self, max_events: Optional[int] = None, timeout: Optional[float] = 0) -> List[ChangeEvent]:
+        """Take buffered events, oldest first.
+
+        Args:
+            max_events: Maximum number of events to return (all if None).
+            timeout: Seconds to wait for an event when the buffer is empty
+                (None waits until an event arrives or the subscription closes).
+
+        Returns:
+            List of events.
+        """
+        with self._ready:
+            if not self._count and not self.closed and timeout != 0:
+                self._ready.wait_for(lambda: self._count or self.closed, timeout)
+            n = self._count if max_events is None else min(max_events, self._count)
+            events = []
+            for _ in range(n):
+                events.append(self._buffer[self._head])
+                self._buffer[self._head] = None
+                self._head = (self._head + 1) % self.capacity
+            self._count -= n
+        return events  # type: ignore
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        with self._ready:
+            self.closed = True
+            self._ready.notify_all()
+
+class ChangeFeed:
+    """Fans committed changes out to subscriptions filtered by key prefix.
+
+    Subscriptions are grouped by prefix, and each key is matched with one
+    dict lookup per distinct prefix length, so publishing cost does not
+    grow with the number of subscribers sharing a prefix.
+    """
+
+    def __init__(self, logger: Logger):
+        """Initialize the feed.
+
+        Args:
+            logger: Logger for subscription events.
+        """
+        self._logger = logger
+        self._by_prefix: Dict[str, List[Subscription]] = {}
+        self._lengths: List[int] = []
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._next_id = 1
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, prefix: str = '', capacity: int = 1024,
+                  policy: str = DROP_OLDEST) -> Subscription:
+        """Create a subscription.
+
+        Args:
+            prefix: Only keys starting with this prefix are delivered.
+            capacity: Ring buffer size.
+            policy: Slow consumer policy.
+
+        Returns:
+            The new subscription.
+        """
+        with self._lock:
+            subscription = Subscription(self._next_id, prefix, capacity, policy)
+            self._next_id += 1
+            self._subscriptions[subscription.id] = subscription
+            # Groups are replaced, never mutated, so publish can iterate without the lock
+            self._by_prefix[prefix] = self._by_prefix.get(prefix, []) + [subscription]
+            self._update_lengths()
+        self._logger.info(f"SUBSCRIBE: {subscription.id} prefix={prefix!r}")
+        return subscription
+
+    def get(self, sub_id: int) -> Optional[Subscription]:
+        """Get a subscription by id."""
+        return self._subscriptions.get(sub_id)
+
+    def unsubscribe(self, sub_id: int) -> bool:
+        """Remove a subscription.
+
+        Returns:
+            True if it existed.
+        """
+        with self._lock:
+            subscription = self._subscriptions.pop(sub_id, None)
+            if subscription is None:
+                return False
+            group = [s for s in self._by_prefix[subscription.prefix] if s is not subscription]
+            if group:
+                self._by_prefix[subscription.prefix] = group
+            else:
+                del self._by_prefix[subscription.prefix]
+            self._update_lengths()
+        subscription.close()
+        self._logger.info(f"UNSUBSCRIBE: {sub_id}")
+        return True
+
+    def _update_lengths(self) -> None:
+        self._lengths = sorted({len(prefix) for prefix in self._by_prefix})
+
+    def publish(self, changes: Dict[str, Optional[str]]) -> None:
+        """Deliver committed changes (used as a database change listener).
+
+        Args:
+            changes: ``{key: value}`` with None for removed keys.
+        """
+        by_prefix = self._by_prefix
+        lengths = self._lengths
+        closed: Set[int] = set()
+        for key, value in changes.items():
+            self._seq += 1
+            event = ChangeEvent(self._seq, key, value)
+            for length in lengths:
+                if length > len(key):
+                    break
+                group = by_prefix.get(key[:length])
+                if group is None:
+                    continue
+                for subscription in group:
+                    if not subscription._push(event):
+                        closed.add(subscription.id)
+        for sub_id in closed:
+            self._logger.warning(f"SUBSCRIBE: {sub_id} disconnected (slow consumer)")
+            self.unsubscribe(sub_id)
@@ -0,0 +1,375 @@
+import base64
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from .db import InMemoryDB
+from .logger import Logger
+from .transaction_manager import TransactionManager, ReadOnlyError
+
+Changes = List[Tuple[str, Optional[str]]]
+
+def parse_address(address: str) -> Tuple[int, Any]:
+    """Parse "host:port" or "unix:/path/to/socket".
+
+    Args:
+        address: Address string.
+
+    Returns:
+        Tuple of (socket family, socket address).
+    """
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+# Binary-mode keys and values travel as {"$b": "<base64>"}
+_BYTES_TAG = '$b'
+
+def _encode_bytes(value: Any) -> Dict[str, str]:
+    """``json.dumps`` hook for the bytes of a binary-mode database."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {_BYTES_TAG: base64.b64encode(value).decode('ascii')}
+    raise TypeError(f"Cannot replicate a value of type {type(value).__name__}")
+
+def _decode_bytes(obj: Dict[str, Any]) -> Any:
+    """``json.loads`` hook reversing ``_encode_bytes``."""
+    if len(obj) == 1 and _BYTES_TAG in obj:
+        return base64.b64decode(obj[_BYTES_TAG])
+    return obj
+
+def _send(sock: socket.socket, message: Dict[str, Any]) -> None:
+    sock.sendall(json.dumps(message, separators=(',', ':'), default=_encode_bytes)
+                 .encode('utf-8') + b'\n')
+
+def _receive(line: bytes) -> Dict[str, Any]:
+    return json.loads(line, object_hook=_decode_bytes)
+
+class ReplicationBacklog:
+    """Bounded log of committed change batches, addressed by offset."""
+
+    def __init__(self, size: int):
+        """Initialize the backlog.
+
+        Args:
+            size: Maximum number of change batches kept.
+        """
+        self._entries: Deque[Tuple[int, Changes]] = deque(maxlen=size)
+        self.offset = 0
+
+    def append(self, changes: Changes) -> int:
+        """Append a change batch and return its offset."""
+        self.offset += 1
+        self._entries.append((self.offset, changes))
+        return self.offset
+
+    def since(self, offset: int) -> Optional[List[Tuple[int, Changes]]]:
+        """Get the batches after an offset.
+
+        Args:
+            offset: Last offset the replica applied.
+
+        Returns:
+            Batches after ``offset``, or None if they are no longer in the backlog.
+        """
+        if offset == self.offset:
+            return []
+        if offset > self.offset or not self._entries or offset < self._entries[0][0] - 1:
+            return None
+        return [entry for entry in self._entries if entry[0] > offset]
+
+class _ReplicaConnection:
+    """Primary-side state of one connected replica."""
+
+    def __init__(self, sock: socket.socket, max_queued: int):
+        self.sock = sock
+        self.queue: 'queue.Queue[Optional[Dict[str, Any]]]' = queue.Queue(maxsize=max_queued)
+
+class ReplicationPrimary:
+    """Streams committed changes of an ``InMemoryDB`` to replicas.
+
+    A replica first asks for a sync with the replication id and offset it
+    has. If the primary still holds every batch after that offset in its
+    backlog it sends only those (partial resync); otherwise it sends a
+    full snapshot. Afterwards each committed batch is pushed as it happens,
+    with periodic pings carrying the primary offset for lag reporting.
+    Applying a batch twice is harmless, so a snapshot may overlap the
+    batches that follow it. Keys and values of a binary-mode database are
+    sent base64-encoded; its replicas must be binary too.
+    """
+
+    def __init__(self, database: InMemoryDB, logger: Logger, address: str,
+                 backlog_size: int = 10000, ping_interval: float = 1.0):
+        """Initialize the primary.
+
+        Args:
+            database: Database whose committed changes are replicated.
+            logger: Logger for replication events.
+            address: Listen address ("host:port", port 0 picks a free one, or "unix:/path").
+            backlog_size: Number of change batches kept for partial resync.
+            ping_interval: Seconds between pings on an idle connection.
+        """
+        self._database = database
+        self._logger = logger
+        self._address = address
+        self._backlog = ReplicationBacklog(backlog_size)
+        self._backlog_size = backlog_size
+        self._ping_interval = ping_interval
+        self.replid = uuid.uuid4().hex
+        self._replicas: List[_ReplicaConnection] = []
+        self._lock = threading.Lock()
+        self._server: Optional[socket.socket] = None
+        self._running = False
+
+    @property
+    def offset(self) -> int:
+        """Offset of the last committed change batch."""
+        return self._backlog.offset
+
+    @property
+    def address(self) -> str:
+        """Address replicas should connect to."""
+        if self._server is not None and self._server.family == socket.AF_INET:
+            host, port = self._server.getsockname()[:2]
+            return f"{host}:{port}"
+        return self._address
+
+    def start(self) -> None:
+        """Start listening for replicas."""
+        family, addr = parse_address(self._address)
+        if family == socket.AF_UNIX and os.path.exists(addr):
+            os.unlink(addr)
+        self._server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(addr)
+        self._server.listen()
+        self._running = True
+        self._database.add_listener(self._on_commit)
+        threading.Thread(target=self._accept_loop, name='replication-accept', daemon=True).start()
+        self._logger.info(f"REPLICATION: primary listening on {self.address}")
+
+    def stop(self) -> None:
+        """Stop accepting replicas and disconnect the connected ones."""
+        self._running = False
+        self._database.remove_listener(self._on_commit)
+        if self._server is not None:
+            self._server.close()
+        with self._lock:
+            for replica in self._replicas:
+                self._disconnect(replica)
+            self._replicas.clear()
+
+    def _disconnect(self, replica: _ReplicaConnection) -> None:
+        try:
+            replica.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        replica.sock.close()
+
+    def _on_commit(self, changes: Dict[str, Optional[str]]) -> None:
+        """Database listener: record a committed batch and queue it for replicas."""
+        with self._lock:
+            batch = list(changes.items())
+            offset = self._backlog.append(batch)
+            message = {'op': 'apply', 'offset': offset, 'changes': batch}
+            for replica in list(self._replicas):
+                try:
+                    replica.queue.put_nowait(message)
+                except queue.Full:
+                    # Too far behind; it will resync partially from the backlog
+                    self._logger.warning("REPLICATION: dropping slow replica")
+                    self._replicas.remove(replica)
+                    self._disconnect(replica)
+
+    def _accept_loop(self) -> None:
+        while self._running:
+            try:
+                sock, _ = self._server.accept()  # type: ignore
+            except OSError:
+                break
+            threading.Thread(target=self._serve_replica, args=(sock,),
+                             name='replication-sender', daemon=True).start()
+
+    def _serve_replica(self, sock: socket.socket) -> None:
+        replica = None
+        try:
+            request = _receive(sock.makefile('rb').readline() or b'{}')
+            replica = _ReplicaConnection(sock, self._backlog_size)
+            with self._lock:
+                pending = None
+                if request.get('replid') == self.replid:
+                    pending = self._backlog.since(int(request.get('offset', 0)))
+                if pending is None:
+                    # Pairs rather than an object: JSON object keys cannot be bytes
+                    initial = [{'op': 'full', 'replid': self.replid, 'offset': self.offset,
+                                'data': list(self._database.snapshot().items())}]
+                    self._logger.info(f"REPLICATION: full sync at offset {self.offset}")
+                else:
+                    initial = [{'op': 'continue', 'replid': self.replid, 'offset': self.offset}]
+                    initial += [{'op': 'apply', 'offset': offset, 'changes': changes}
+                                for offset, changes in pending]
+                    self._logger.info(f"REPLICATION: partial resync of {len(pending)} batches")
+                self._replicas.append(replica)
+            for message in initial:
+                _send(sock, message)
+            self._send_loop(replica)
+        except (OSError, ValueError) as e:
+            self._logger.warning(f"REPLICATION: replica connection closed: {e}")
+        finally:
+            with self._lock:
+                if replica in self._replicas:
+                    self._replicas.remove(replica)  # type: ignore
+            sock.close()
+
+    def _send_loop(self, replica: _ReplicaConnection) -> None:
+        while self._running:
+            try:
+                message = replica.queue.get(timeout=self._ping_interval)
+            except queue.Empty:
+                message = {'op': 'ping', 'offset': self.offset}
+            if message is None:
+                return
+            _send(replica.sock, message)
+
+class ReplicaDatabase(InMemoryDB):
+    """Read-only ``InMemoryDB`` fed by replication.
+
+    The transaction manager is put in read-only mode, so every mutator
+    (SET, UNSET, INCR, APPEND, ... and BEGIN) raises ``ReadOnlyError``;
+    only replicated batches reach the layers.
+    """
+
+    def __init__(self, transaction_manager: TransactionManager, logger: Logger, **kwargs: Any) -> None:
+        super().__init__(transaction_manager, logger, **kwargs)
+        transaction_manager.read_only = True
+
+    def rollback(self) -> bool:
+        raise ReadOnlyError("Replica is read-only")
+
+    def commit(self) -> bool:
+        raise ReadOnlyError("Replica is read-only")
+
+    def load(self, data: Dict[str, str]) -> None:
+        """Replace all data (full sync)."""
+        self._transaction_manager.load_base(data)
+
+    def apply(self, changes: Changes) -> None:
+        """Apply a replicated change batch."""
+        self._transaction_manager.apply(changes)
+
+class Replica:
+    """Read-only replica of a ``ReplicationPrimary``.
+
+    Reconnects after disconnects, asking for a partial resync from the
+    last applied offset.
+    """
+
+    def __init__(self, address: str, logger: Logger, reconnect_delay: float = 0.5,
+                 binary: bool = False):
+        """Initialize the replica.
+
+        Args:
+            address: Primary address ("host:port" or "unix:/path").
+            logger: Logger for replication events.
+            reconnect_delay: Seconds to wait before reconnecting.
+            binary: Replicate a binary-mode database (bytes keys and values).
+        """
+        self._address = address
+        self._logger = logger
+        self._reconnect_delay = reconnect_delay
+        self.database = ReplicaDatabase(TransactionManager(logger), logger, binary=binary)
+        self.replid: Optional[str] = None
+        self.offset = 0
+        self.primary_offset = 0
+        self.full_syncs = 0
+        self._last_contact: Optional[float] = None
+        self._sock: Optional[socket.socket] = None
+        self._running = False
+        self._connected = threading.Event()
+        self._applied = threading.Condition()
+
+    def start(self) -> None:
+        """Start replicating in a background thread."""
+        self._running = True
+        threading.Thread(target=self._run, name='replica', daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop replicating."""
+        self._running = False
+        self.disconnect()
+
+    def disconnect(self) -> None:
+        """Drop the current connection; the replica reconnects if running."""
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def lag(self) -> Dict[str, Any]:
+        """Replication lag.
+
+        Returns:
+            Dict with applied and primary offsets, lag in batches, seconds
+            since the last message from the primary and connection state.
+        """
+        since = None if self._last_contact is None else time.monotonic() - self._last_contact
+        return {
+            'connected': self._connected.is_set(),
+            'offset': self.offset,
+            'primary_offset': self.primary_offset,
+            'lag': max(self.primary_offset - self.offset, 0),
+            'seconds_since_contact': since,
+        }
+
+    def wait_for_offset(self, offset: int, timeout: Optional[float] = None) -> bool:
+        """Block until a primary offset has been applied.
+
+        Returns:
+            True if the offset was reached before the timeout.
+        """
+        with self._applied:
+            return self._applied.wait_for(lambda: self.offset >= offset, timeout)
+
+    def _run(self) -> None:
+        while self._running:
+            family, addr = parse_address(self._address)
+            try:
+                with socket.socket(family, socket.SOCK_STREAM) as sock:
+                    sock.connect(addr)
+                    self._sock = sock
+                    _send(sock, {'op': 'sync', 'replid': self.replid, 'offset': self.offset})
+                    self._connected.set()
+                    for line in sock.makefile('rb'):
+                        self._handle(_receive(line))
+            except (OSError, ValueError) as e:
+                self._logger.warning(f"REPLICATION: connection to primary lost: {e}")
+            finally:
+                self._sock = None
+                self._connected.clear()
+            if self._running:
+                time.sleep(self._reconnect_delay)
+
+    def _handle(self, message: Dict[str, Any]) -> None:
+        self._last_contact = time.monotonic()
+        op = message['op']
+        with self._applied:
+            if op == 'apply':
+                self.database.apply(message['changes'])
+                self.offset = message['offset']
+            elif op == 'full':
+                self.database.load(dict(message['data']))
+                self.replid = message['replid']
+                self.offset = message['offset']
+                self.full_syncs += 1
+            elif op == 'continue':
+                self.replid = message['replid']
+            self.primary_offset = max(self.primary_offset, message['offset'])
+            self._applied.notify_all()
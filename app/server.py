@@ -0,0 +1,248 @@
+import os
+import socket
+import threading
+from typing import Any, Callable, List, Optional, Sequence, Set
+from .base import Database
+from .commands import CommandRegistry
+from .logger import Logger
+from .protocol import INCOMPLETE, ProtocolError, Reader, encode_reply
+from .replication import parse_address
+
+# Seconds a session may sit idle in an open transaction
+DEFAULT_TRANSACTION_TIMEOUT = 30.0
+
+class TransactionTimeout(TimeoutError):
+    """A session stayed idle in a transaction too long; it was rolled back."""
+
+class Session:
+    """One client's view of a database shared by several clients.
+
+    Each batch of commands runs while holding the shared lock, so a
+    pipelined batch is atomic. A session that leaves a transaction open
+    keeps the lock until its transactions are committed or rolled back
+    (or the session closes), so other clients never see or write into
+    another client's transaction. If the session sends nothing for
+    ``transaction_timeout`` seconds meanwhile, its transactions are
+    rolled back, the lock is released and the session is finished: every
+    later command fails with ``TransactionTimeout``. FIND/SCAN cursors
+    opened by a session belong to it and are dropped when it closes.
+    """
+
+    def __init__(self, registry: CommandRegistry, database: Database, lock: threading.Lock,
+                 transaction_timeout: float = DEFAULT_TRANSACTION_TIMEOUT,
+                 on_timeout: Optional[Callable[[], None]] = None):
+        """Initialize the session.
+
+        Args:
+            registry: Registry commands are executed with.
+            database: The registry's database (for the transaction depth).
+            lock: Lock shared by all sessions of the database.
+            transaction_timeout: Idle seconds allowed in an open transaction
+                (0 for no limit).
+            on_timeout: Called after a timed out transaction was rolled back
+                (e.g. to disconnect the client).
+        """
+        self._registry = registry
+        self._database = database
+        self._lock = lock
+        self._transaction_timeout = transaction_timeout
+        self._on_timeout = on_timeout
+        self._holding = False
+        self._timed_out = False
+        # Serializes batches and close with the timeout timer
+        self._state = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._batches = 0
+
+    def execute(self, commands: Sequence[Sequence[str]]) -> List[Any]:
+        """Execute a batch of commands atomically.
+
+        Args:
+            commands: Commands as ``[name, *args]`` lists.
+
+        Returns:
+            One result per command; failed commands yield their exception.
+        """
+        with self._state:
+            self._batches += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._timed_out:
+                error = TransactionTimeout("Transaction rolled back after the idle timeout")
+                return [error for _ in commands]
+            if not self._holding:
+                self._lock.acquire()
+                self._holding = True
+            results: List[Any] = []
+            try:
+                with self._registry.cursors().owned_by(self):
+                    for command in commands:
+                        name = command[0].lower()
+                        try:
+                            if name == 'ping':
+                                results.append('PONG')
+                            else:
+                                results.append(self._registry.execute(name, *command[1:]))
+                        except Exception as e:
+                            results.append(e)
+            finally:
+                if self._database.get_transaction_depth() == 0:
+                    self._holding = False
+                    self._lock.release()
+                elif self._transaction_timeout:
+                    self._timer = threading.Timer(self._transaction_timeout, self._expire,
+                                                  args=(self._batches,))
+                    self._timer.daemon = True
+                    self._timer.start()
+            return results
+
+    def close(self) -> None:
+        """Roll back transactions left open by this session, drop its cursors and release the lock."""
+        self._registry.cursors().close_owner(self)
+        with self._state:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._rollback()
+
+    def _expire(self, batch: int) -> None:
+        """Roll back a transaction left idle since ``batch`` (timer thread)."""
+        with self._state:
+            if batch != self._batches or not self._holding:
+                return
+            self._rollback()
+            self._timed_out = True
+        if self._on_timeout is not None:
+            self._on_timeout()
+
+    def _rollback(self) -> None:
+        """Roll back open transactions and release the lock; call with ``_state`` held."""
+        if self._holding:
+            while self._database.get_transaction_depth():
+                self._database.rollback()
+            self._holding = False
+            self._lock.release()
+
+class Server:
+    """Serves a ``CommandRegistry`` to network clients.
+
+    Speaks the RESP-style protocol of ``app.protocol`` over TCP or a Unix
+    socket, one thread per connection. Every complete request found in a
+    read is executed as one batch, so pipelined requests are answered with
+    a single write.
+    """
+
+    def __init__(self, registry: CommandRegistry, database: Database, logger: Logger,
+                 address: str, transaction_timeout: float = DEFAULT_TRANSACTION_TIMEOUT):
+        """Initialize the server.
+
+        Args:
+            registry: Registry whose commands are served.
+            database: The registry's database.
+            logger: Logger for connection events.
+            address: Listen address ("host:port", port 0 picks a free one, or "unix:/path").
+            transaction_timeout: Idle seconds a client may keep a transaction
+                (and so the database) open before it is rolled back and the
+                client disconnected (0 for no limit).
+        """
+        self._registry = registry
+        self._database = database
+        self._logger = logger
+        self._address = address
+        self._transaction_timeout = transaction_timeout
+        self._lock = threading.Lock()
+        self._server: Optional[socket.socket] = None
+        self._clients: Set[socket.socket] = set()
+        self._running = False
+
+    @property
+    def address(self) -> str:
+        """Address clients should connect to."""
+        if self._server is not None and self._server.family == socket.AF_INET:
+            host, port = self._server.getsockname()[:2]
+            return f"{host}:{port}"
+        return self._address
+
+    def session(self, on_timeout: Optional[Callable[[], None]] = None) -> Session:
+        """Create an in-process session sharing the server's lock."""
+        return Session(self._registry, self._database, self._lock,
+                       self._transaction_timeout, on_timeout)
+
+    def start(self) -> None:
+        """Start accepting clients."""
+        family, addr = parse_address(self._address)
+        if family == socket.AF_UNIX and os.path.exists(addr):
+            os.unlink(addr)
+        self._server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(addr)
+        self._server.listen(128)
+        self._running = True
+        threading.Thread(target=self._accept_loop, name='server-accept', daemon=True).start()
+        self._logger.info(f"SERVER: listening on {self.address}")
+
+    def stop(self) -> None:
+        """Stop accepting clients and disconnect the connected ones."""
+        self._running = False
+        if self._server is not None:
+            self._server.close()
+        for sock in list(self._clients):
+            self._disconnect(sock)
+
+    @staticmethod
+    def _disconnect(sock: socket.socket) -> None:
+        """Shut a client connection down; its serving thread then cleans up."""
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _accept_loop(self) -> None:
+        while self._running:
+            try:
+                sock, _ = self._server.accept()  # type: ignore
+            except OSError:
+                break
+            if sock.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._clients.add(sock)
+            threading.Thread(target=self._serve_client, args=(sock,),
+                             name='server-client', daemon=True).start()
+
+    def _on_timeout(self, sock: socket.socket) -> None:
+        self._logger.warning("SERVER: transaction idle timeout, client disconnected")
+        self._disconnect(sock)
+
+    def _serve_client(self, sock: socket.socket) -> None:
+        session = self.session(lambda: self._on_timeout(sock))
+        reader = Reader()
+        try:
+            while self._running:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                reader.feed(data)
+                commands = []
+                while True:
+                    request = reader.get(inline=True)
+                    if request is INCOMPLETE:
+                        break
+                    if request:
+                        commands.append(request)
+                if commands:
+                    results = session.execute(commands)
+                    sock.sendall(b''.join(encode_reply(result) for result in results))
+        except ProtocolError as e:
+            self._logger.warning(f"SERVER: protocol error: {e}")
+            try:
+                sock.sendall(encode_reply(e))
+            except OSError:
+                pass
+        except OSError as e:
+            self._logger.warning(f"SERVER: client connection closed: {e}")
+        finally:
+            session.close()
+            self._clients.discard(sock)
+            sock.close()
@@ -0,0 +1,465 @@
+import struct
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from collections.abc import ItemsView, Mapping, ValuesView
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from .base import Database
+from .logger import Logger
+from .mmap_db import RECORD, SLOT, _hash
+from .replication import ReadOnlyError
+
+MAGIC = b'IMDBSHM1'
+VERSION = 1
+# magic, version, flags, key count, key slots, value slots, value table offset
+HEADER = struct.Struct('<8sIIQQQQ')
+HEADER_SIZE = 64
+# Header flag: keys and values are raw bytes (binary-mode database), not UTF-8 text
+FLAG_BYTES = 1
+GROUP = struct.Struct('<II')  # value length, number of keys
+# seq (odd while the writer updates it), epoch, image size, image name length
+CONTROL = struct.Struct('<QQQI')
+CONTROL_SIZE = 128
+MAX_NAME = CONTROL_SIZE - CONTROL.size
+
+def _capacity(count: int) -> int:
+    """Slots for ``count`` entries at a load factor of at most 0.5."""
+    capacity = 8
+    while capacity < count * 2:
+        capacity *= 2
+    return capacity
+
+def _place(table: bytearray, start: int, capacity: int, h: int, offset: int) -> None:
+    """Insert a (hash, offset) slot with linear probing."""
+    mask = capacity - 1
+    i = h & mask
+    while SLOT.unpack_from(table, start + i * SLOT.size)[1]:
+        i = (i + 1) & mask
+    SLOT.pack_into(table, start + i * SLOT.size, h, offset)
+
+def build_image(data: Dict[Any, Any]) -> bytes:
+    """Serialize committed data into an immutable hash-indexed image.
+
+    Layout: header, key slots (hash, record offset), value slots (hash,
+    group offset), key/value records, then one group per distinct value
+    listing the record offsets of its keys, so COUNTS and FIND are a
+    single lookup.
+
+    Args:
+        data: Committed key-value pairs, all str or (binary mode) all bytes.
+
+    Returns:
+        Image bytes.
+    """
+    binary = bool(data) and isinstance(next(iter(data)), bytes)
+    key_capacity = _capacity(len(data))
+    records = bytearray()
+    by_value: Dict[bytes, List[int]] = {}
+    offsets: List[Tuple[bytes, int]] = []
+    for key, value in data.items():
+        kb = bytes(key) if binary else key.encode('utf-8')
+        vb = bytes(value) if binary else value.encode('utf-8')
+        offset = len(records)
+        records += RECORD.pack(len(kb), len(vb))
+        records += kb
+        records += vb
+        offsets.append((kb, offset))
+        by_value.setdefault(vb, []).append(offset)
+    value_capacity = _capacity(len(by_value))
+    value_table = HEADER_SIZE + key_capacity * SLOT.size
+    record_base = value_table + value_capacity * SLOT.size
+    group_base = record_base + len(records)
+
+    groups = bytearray()
+    group_offsets: List[Tuple[bytes, int]] = []
+    for vb, keys in by_value.items():
+        group_offsets.append((vb, group_base + len(groups)))
+        groups += GROUP.pack(len(vb), len(keys))
+        groups += vb
+        groups += struct.pack(f'<{len(keys)}Q', *(record_base + o for o in keys))
+
+    image = bytearray(record_base)
+    HEADER.pack_into(image, 0, MAGIC, VERSION, FLAG_BYTES if binary else 0, len(data),
+                     key_capacity, value_capacity, value_table)
+    for kb, offset in offsets:
+        _place(image, HEADER_SIZE, key_capacity, _hash(kb), record_base + offset)
+    for vb, offset in group_offsets:
+        _place(image, value_table, value_capacity, _hash(vb), offset)
+    image += records
+    image += groups
+    return bytes(image)
+
+def _lookup(buf: memoryview, table: int, capacity: int, entry: struct.Struct, data: bytes) -> int:
+    """Find the offset stored for ``data`` in a slot table of an image (0 if absent).
+
+    ``entry`` is the struct at each offset (RECORD or GROUP); its first
+    field is the length of the bytes that follow it.
+    """
+    h = _hash(data)
+    mask = capacity - 1
+    i = h & mask
+    while True:
+        slot_hash, offset = SLOT.unpack_from(buf, table + i * SLOT.size)
+        if not offset:
+            return 0
+        if slot_hash == h:
+            length = entry.unpack_from(buf, offset)[0]
+            start = offset + entry.size
+            if buf[start:start + length] == data:
+                return offset
+        i = (i + 1) & mask
+
+class _ImageItems(ItemsView):
+    def __iter__(self) -> Iterator[Tuple[Any, Any]]:
+        return self._mapping.iter_items()  # type: ignore
+
+class _ImageValues(ValuesView):
+    def __iter__(self) -> Iterator[Any]:
+        return (value for _, value in self._mapping.iter_items())  # type: ignore
+
+class ImageView(Mapping):
+    """Read-only mapping over an image from ``build_image``, with zero copy.
+
+    Lookups probe the image's key slots and iteration walks them, decoding
+    only the entries that are read, so processes mapping one shared image
+    do not each build a copy. The buffer must stay valid while the view
+    is used.
+    """
+
+    def __init__(self, buf: memoryview):
+        """Wrap an image.
+
+        Args:
+            buf: The image bytes (e.g. a slice of a shared memory buffer).
+        """
+        self._buf = buf
+        flags, self._len, self._key_capacity = HEADER.unpack_from(buf, 0)[2:5]
+        self._binary = bool(flags & FLAG_BYTES)
+
+    def _decode(self, data: memoryview) -> Any:
+        return bytes(data) if self._binary else str(data, 'utf-8')
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, str) and not self._binary:
+            data = key.encode('utf-8')
+        elif isinstance(key, bytes) and self._binary:
+            data = key
+        else:
+            raise KeyError(key)
+        buf = self._buf
+        offset = _lookup(buf, HEADER_SIZE, self._key_capacity, RECORD, data)
+        if not offset:
+            raise KeyError(key)
+        key_len, value_len = RECORD.unpack_from(buf, offset)
+        start = offset + RECORD.size + key_len
+        return self._decode(buf[start:start + value_len])
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Any]:
+        return (key for key, _ in self.iter_items())
+
+    def items(self) -> ItemsView:  # type: ignore
+        return _ImageItems(self)
+
+    def values(self) -> ValuesView:  # type: ignore
+        return _ImageValues(self)
+
+    def iter_items(self) -> Iterator[Tuple[Any, Any]]:
+        """Stream (key, value) pairs in slot order."""
+        buf, decode = self._buf, self._decode
+        for i in range(self._key_capacity):
+            offset = SLOT.unpack_from(buf, HEADER_SIZE + i * SLOT.size)[1]
+            if not offset:
+                continue
+            key_len, value_len = RECORD.unpack_from(buf, offset)
+            start = offset + RECORD.size
+            yield (decode(buf[start:start + key_len]),
+                   decode(buf[start + key_len:start + key_len + value_len]))
+
+# Segments published by this process (or, after a fork, by its parent,
+# whose resource tracker it shares)
+_published: Set[str] = set()
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a segment owned by a publisher."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)  # type: ignore
+    segment = shared_memory.SharedMemory(name=name)
+    if name not in _published:
+        # Attaching registers the segment with the resource tracker, which
+        # would unlink it when this process exits; the publisher owns its
+        # lifetime. A tracker shared with the publisher must keep it.
+        resource_tracker.unregister(segment._name, 'shared_memory')  # type: ignore
+    return segment
+
+class SharedMemoryPublisher:
+    """Publishes the committed data of a database into shared memory.
+
+    Each publish writes a new immutable image segment and then swaps the
+    epoch in a small control segment (a seqlock), so readers never see a
+    half-written image and never take a lock. The previous image is
+    unlinked right away; readers that already mapped it keep using it
+    until they notice the new epoch.
+    """
+
+    def __init__(self, database: Database, logger: Logger, name: str = 'inmemory_db'):
+        """Initialize the publisher.
+
+        Args:
+            database: Database whose committed data is published.
+            logger: Logger for publish events.
+            name: Control segment name readers attach to.
+        """
+        self._database = database
+        self._logger = logger
+        self.name = name
+        self.epoch = 0
+        self._control: Optional[shared_memory.SharedMemory] = None
+        self._image: Optional[shared_memory.SharedMemory] = None
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self) -> int:
+        """Publish the current committed data as a new epoch.
+
+        Returns:
+            The new epoch.
+        """
+        image = build_image(self._database.snapshot())
+        epoch = self.epoch + 1
+        segment = shared_memory.SharedMemory(name=f"{self.name}_{epoch}", create=True,
+                                             size=max(len(image), 1))
+        segment.buf[:len(image)] = image
+        _published.add(segment.name)
+        segment_name = segment.name.encode('utf-8')
+        if len(segment_name) > MAX_NAME:
+            raise ValueError(f"Shared memory name too long: {self.name}")
+        if self._control is None:
+            try:
+                self._control = shared_memory.SharedMemory(name=self.name, create=True,
+                                                           size=CONTROL_SIZE)
+            except FileExistsError:
+                # Left behind by a writer that crashed
+                stale = shared_memory.SharedMemory(name=self.name)
+                stale.unlink()
+                stale.close()
+                self._control = shared_memory.SharedMemory(name=self.name, create=True,
+                                                           size=CONTROL_SIZE)
+            _published.add(self._control.name)
+        buf = self._control.buf
+        seq = CONTROL.unpack_from(buf, 0)[0]
+        CONTROL.pack_into(buf, 0, seq + 1, self.epoch, 0, 0)
+        buf[CONTROL.size:CONTROL.size + len(segment_name)] = segment_name
+        CONTROL.pack_into(buf, 0, seq + 2, epoch, len(image), len(segment_name))
+        if self._image is not None:
+            self._image.close()
+            self._image.unlink()
+            _published.discard(self._image.name)
+        self._image = segment
+        self.epoch = epoch
+        self._logger.info(f"SHM: published epoch {epoch} ({len(image)} bytes)")
+        return epoch
+
+    def _on_commit(self, changes: Dict[str, Optional[str]]) -> None:
+        self._dirty.set()
+
+    def start(self, interval: float = 0.5) -> None:
+        """Publish now, then republish in the background after commits.
+
+        Args:
+            interval: Minimum seconds between publishes.
+        """
+        self.publish()
+        self._database.add_listener(self._on_commit)  # type: ignore
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,),
+                                        name='shm-publisher', daemon=True)
+        self._thread.start()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.is_set():
+            if self._dirty.wait(interval) and not self._stop.is_set():
+                self._dirty.clear()
+                try:
+                    self.publish()
+                except Exception as e:
+                    self._logger.error(f"SHM: publish failed: {e}")
+                self._stop.wait(interval)
+
+    def close(self) -> None:
+        """Stop republishing and remove the shared memory segments."""
+        if self._thread is not None:
+            self._database.remove_listener(self._on_commit)  # type: ignore
+            self._stop.set()
+            self._dirty.set()
+            self._thread.join()
+            self._thread = None
+        for segment in (self._image, self._control):
+            if segment is not None:
+                segment.close()
+                segment.unlink()
+                _published.discard(segment.name)
+        self._image = self._control = None
+
+class SharedMemoryReader:
+    """Read-only view of a published image, attached with zero copy.
+
+    Every call checks the control segment's sequence number and switches
+    to a new image when the writer has published one. An image replaced
+    while a ``scan`` is still open stays mapped until the last open scan
+    finishes, so a paused scan keeps reading the epoch it started on.
+    """
+
+    def __init__(self, name: str = 'inmemory_db', retries: int = 100):
+        """Attach to a publisher.
+
+        Args:
+            name: Control segment name used by the publisher.
+            retries: Attempts to read a consistent control block before giving up.
+        """
+        self.name = name
+        self._retries = retries
+        self._control = _attach(name)
+        self._seq = -1
+        self.epoch = 0
+        self._image: Optional[shared_memory.SharedMemory] = None
+        self._buf: Optional[memoryview] = None
+        self._scans = 0
+        self._retired: List[Tuple[shared_memory.SharedMemory, memoryview]] = []
+        self._refresh()
+
+    def _refresh(self) -> memoryview:
+        """Return the current image, attaching a newer epoch if there is one."""
+        control = self._control.buf
+        seq = CONTROL.unpack_from(control, 0)[0]
+        if seq == self._seq and self._buf is not None:
+            return self._buf
+        for _ in range(self._retries):
+            seq, epoch, size, name_len = CONTROL.unpack_from(control, 0)
+            if seq % 2 or not epoch:
+                time.sleep(0.001)
+                continue
+            segment_name = bytes(control[CONTROL.size:CONTROL.size + name_len]).decode('utf-8')
+            if CONTROL.unpack_from(control, 0)[0] != seq:
+                continue
+            try:
+                image = _attach(segment_name)
+            except FileNotFoundError:
+                # Already replaced by a newer epoch
+                continue
+            self._release()
+            self._image = image
+            self._buf = image.buf[:size]
+            self._seq = seq
+            self.epoch = epoch
+            return self._buf
+        raise RuntimeError(f"No consistent image published under {self.name}")
+
+    def _release(self) -> None:
+        """Detach the current image, or keep it for open scans until they finish."""
+        if self._image is not None:
+            self._retired.append((self._image, self._buf))  # type: ignore
+            self._image = self._buf = None
+        if not self._scans:
+            self._drop_retired()
+
+    def _drop_retired(self) -> None:
+        for image, buf in self._retired:
+            buf.release()
+            image.close()
+        self._retired = []
+
+    def __len__(self) -> int:
+        return HEADER.unpack_from(self._refresh(), 0)[3]
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a committed value by key."""
+        buf = self._refresh()
+        key_capacity = HEADER.unpack_from(buf, 0)[4]
+        offset = _lookup(buf, HEADER_SIZE, key_capacity, RECORD, key.encode('utf-8'))
+        if not offset:
+            return None
+        key_len, value_len = RECORD.unpack_from(buf, offset)
+        start = offset + RECORD.size + key_len
+        return str(buf[start:start + value_len], 'utf-8')
+
+    def _group(self, value: str) -> Tuple[memoryview, int]:
+        buf = self._refresh()
+        value_capacity, value_table = HEADER.unpack_from(buf, 0)[5:]
+        return buf, _lookup(buf, value_table, value_capacity, GROUP, value.encode('utf-8'))
+
+    def counts(self, value: str) -> int:
+        """Count keys holding a value."""
+        buf, offset = self._group(value)
+        return GROUP.unpack_from(buf, offset)[1] if offset else 0
+
+    def find(self, value: str) -> List[str]:
+        """Find keys holding a value."""
+        buf, offset = self._group(value)
+        if not offset:
+            return []
+        value_len, count = GROUP.unpack_from(buf, offset)
+        records = struct.unpack_from(f'<{count}Q', buf, offset + GROUP.size + value_len)
+        keys = []
+        for record in records:
+            key_len = RECORD.unpack_from(buf, record)[0]
+            start = record + RECORD.size
+            keys.append(str(buf[start:start + key_len], 'utf-8'))
+        return keys
+
+    def scan(self, chunk_size: int = 1000) -> Iterator[List[Tuple[str, str]]]:
+        """Iterate over the key-value pairs of the image current when the scan starts."""
+        buf = self._refresh()
+        self._scans += 1  # keeps the image mapped if a newer epoch arrives meanwhile
+        try:
+            key_capacity = HEADER.unpack_from(buf, 0)[4]
+            chunk: List[Tuple[str, str]] = []
+            for i in range(key_capacity):
+                offset = SLOT.unpack_from(buf, HEADER_SIZE + i * SLOT.size)[1]
+                if not offset:
+                    continue
+                key_len, value_len = RECORD.unpack_from(buf, offset)
+                start = offset + RECORD.size
+                chunk.append((str(buf[start:start + key_len], 'utf-8'),
+                              str(buf[start + key_len:start + key_len + value_len], 'utf-8')))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+        finally:
+            self._scans -= 1
+            if not self._scans:
+                self._drop_retired()
+
+    def snapshot(self) -> Dict[str, str]:
+        """Copy of the current image."""
+        return {k: v for chunk in self.scan() for k, v in chunk}
+
+    def set(self, key: str, value: str) -> None:
+        raise ReadOnlyError("Shared memory reader is read-only")
+
+    def unset(self, key: str) -> None:
+        raise ReadOnlyError("Shared memory reader is read-only")
+
+    def begin(self) -> None:
+        raise ReadOnlyError("Shared memory reader is read-only")
+
+    def rollback(self) -> bool:
+        raise ReadOnlyError("Shared memory reader is read-only")
+
+    def commit(self) -> bool:
+        raise ReadOnlyError("Shared memory reader is read-only")
+
+    def get_transaction_depth(self) -> int:
+        return 0
+
+    def close(self) -> None:
+        """Detach from the shared memory."""
+        self._scans = 0
+        self._release()
+        self._control.close()
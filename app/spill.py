@@ -0,0 +1,410 @@
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+from bisect import bisect_right
+from collections.abc import ItemsView, MutableMapping, ValuesView
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Records of a run: key length, value tag, value length, then the encoded
+# key (a type tag byte and the raw key) and the raw value
+_RECORD = struct.Struct('<IBI')
+
+_STR, _BYTES, _NONE, _REMOVED_TAG = 0, 1, 2, 3
+
+# Records between sparse index entries: one block is read per lookup
+INDEX_INTERVAL = 16
+# Runs kept per layer before they are merged into one
+MAX_RUNS = 8
+
+_MISSING = object()
+# In a layer, marks a key removed after its value was spilled to a run
+_REMOVED = object()
+
+def encode_key(key: Any) -> bytes:
+    """Sortable byte form of a str or bytes key."""
+    if isinstance(key, str):
+        return b'\x00' + key.encode('utf-8')
+    if isinstance(key, bytes):
+        return b'\x01' + key
+    raise TypeError(f"Cannot spill key of type {type(key).__name__}")
+
+def _decode_key(data: bytes) -> Any:
+    return data[1:].decode('utf-8') if data[0] == _STR else data[1:]
+
+def spillable(value: Any) -> bool:
+    """Whether a layer value can be written to a run (others stay in memory)."""
+    return value is None or value is _REMOVED or isinstance(value, (str, bytes))
+
+class BloomFilter:
+    """Fixed-size bloom filter over Python hashes of encoded keys.
+
+    Hashes are only stable within one process, which is as long as a
+    spill file lives.
+    """
+
+    __slots__ = ('bits', 'size', 'hashes')
+
+    def __init__(self, capacity: int, bits_per_key: int = 10):
+        """Initialize an empty filter.
+
+        Args:
+            capacity: Expected number of keys.
+            bits_per_key: Filter bits per key (10 gives about 1% false positives).
+        """
+        self.size = max(64, capacity * bits_per_key)
+        self.hashes = max(1, round(bits_per_key * 0.69))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key: Any) -> None:
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        position, step, size, bits = h & 0xFFFFFFFF, (h >> 32) | 1, self.size, self.bits
+        for _ in range(self.hashes):
+            position %= size
+            bits[position >> 3] |= 1 << (position & 7)
+            position += step
+
+    def __contains__(self, key: Any) -> bool:
+        return self.contains_hash(hash(key))
+
+    def contains_hash(self, h: int) -> bool:
+        """Membership test for a key given its ``hash()``."""
+        h &= 0xFFFFFFFFFFFFFFFF
+        position, step, size, bits = h & 0xFFFFFFFF, (h >> 32) | 1, self.size, self.bits
+        for _ in range(self.hashes):
+            position %= size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position += step
+        return True
+
+class SortedRun:
+    """One immutable spill file: records sorted by encoded key.
+
+    A sparse index (every ``INDEX_INTERVAL``-th key and its offset) and a
+    bloom filter stay in memory, so a lookup of an absent key usually
+    costs no I/O and a present one reads a single block. The file is
+    read through ``mmap``, leaving caching to the OS page cache.
+    """
+
+    def __init__(self, path: str, records: Iterable[Tuple[bytes, Any]], capacity: int):
+        """Write a run file.
+
+        Args:
+            path: File to create.
+            records: (encoded key, value) pairs in ascending key order;
+                values are str, bytes, None or the removal marker.
+            capacity: Upper bound of the number of records (sizes the filter).
+        """
+        self.path = path
+        self.bloom = BloomFilter(capacity)
+        self._index_keys: List[bytes] = []
+        self._index_offsets: List[int] = []
+        self.count = 0
+        offset = 0
+        pack = _RECORD.pack
+        with open(path, 'wb') as f:
+            for enc, value in records:
+                if value is None:
+                    tag, raw = _NONE, b''
+                elif value is _REMOVED:
+                    tag, raw = _REMOVED_TAG, b''
+                elif isinstance(value, str):
+                    tag, raw = _STR, value.encode('utf-8')
+                else:
+                    tag, raw = _BYTES, value
+                if self.count % INDEX_INTERVAL == 0:
+                    self._index_keys.append(enc)
+                    self._index_offsets.append(offset)
+                self.bloom.add(enc)
+                f.write(pack(len(enc), tag, len(raw)))
+                f.write(enc)
+                f.write(raw)
+                offset += _RECORD.size + len(enc) + len(raw)
+                self.count += 1
+        self.size = offset
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if offset else b''
+
+    @staticmethod
+    def _value(tag: int, raw: bytes) -> Any:
+        if tag == _STR:
+            return raw.decode('utf-8')
+        if tag == _BYTES:
+            return raw
+        return None if tag == _NONE else _REMOVED
+
+    def _parse(self, pos: int, end: int) -> Iterator[Tuple[bytes, Any]]:
+        data, unpack_from, header, value = self._map, _RECORD.unpack_from, _RECORD.size, self._value
+        while pos < end:
+            key_length, tag, value_length = unpack_from(data, pos)
+            pos += header + key_length
+            yield data[pos - key_length:pos], value(tag, data[pos:pos + value_length])
+            pos += value_length
+
+    def _block_end(self, index: int) -> int:
+        return self._index_offsets[index + 1] if index + 1 < len(self._index_offsets) else self.size
+
+    def lookup(self, enc: bytes, h: Optional[int] = None) -> Any:
+        """Value of an encoded key in this run, or ``_MISSING``.
+
+        Args:
+            enc: Key as returned by ``encode_key``.
+            h: ``hash(enc)``, when the caller probes several runs.
+        """
+        if not self.bloom.contains_hash(hash(enc) if h is None else h):
+            return _MISSING
+        index = bisect_right(self._index_keys, enc) - 1
+        if index < 0:
+            return _MISSING
+        # Compare keys in place; only the matching value is copied out
+        data, unpack_from, header = self._map, _RECORD.unpack_from, _RECORD.size
+        pos, end, length = self._index_offsets[index], self._block_end(index), len(enc)
+        while pos < end:
+            key_length, tag, value_length = unpack_from(data, pos)
+            pos += header
+            if key_length == length and data[pos:pos + length] == enc:
+                pos += length
+                return self._value(tag, data[pos:pos + value_length])
+            pos += key_length + value_length
+        return _MISSING
+
+    def records(self) -> Iterator[Tuple[bytes, Any]]:
+        """Stream all (encoded key, value) records in key order."""
+        return self._parse(0, self.size)
+
+    def close(self) -> None:
+        """Delete the run file.
+
+        The mapping is released with the run object, so streams and
+        snapshots still holding the run keep reading it.
+        """
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+def _lookup_runs(runs: List[SortedRun], key: Any) -> Any:
+    """Newest value of a key in runs ordered newest first, or ``_MISSING``."""
+    enc = encode_key(key)
+    h = hash(enc)
+    for run in runs:
+        value = run.lookup(enc, h)
+        if value is not _MISSING:
+            return value
+    return _MISSING
+
+def _merge_records(sources: List[Iterable[Tuple[bytes, Any]]]) -> Iterator[Tuple[bytes, Any]]:
+    """Merge sorted record streams, newest first; the newest record of a key wins."""
+    streams = [((enc, priority, value) for enc, value in source)
+               for priority, source in enumerate(sources)]
+    last = None
+    for enc, _, value in heapq.merge(*streams, key=lambda r: (r[0], r[1])):
+        if enc != last:
+            last = enc
+            yield enc, value
+
+def _iter_items(memory: Dict[Any, Any], runs: List[SortedRun]) -> Iterator[Tuple[Any, Any]]:
+    """Stream the (key, value) pairs of in-memory entries over runs, in key order."""
+    sources = [sorted(((encode_key(k), v) for k, v in memory.items()), key=lambda r: r[0])]
+    sources.extend(run.records() for run in runs)
+    return ((_decode_key(enc), value) for enc, value in _merge_records(sources)  # type: ignore
+            if value is not _REMOVED)
+
+class SpillSnapshot:
+    """Read-only copy of a ``SpillLayer`` taken at one moment.
+
+    The in-memory entries are copied and the immutable runs shared, so
+    later writes, merges and ``close`` of the layer do not change it and
+    it holds only what the layer kept in memory.
+    """
+
+    __slots__ = ('_memory', '_runs')
+
+    def __init__(self, memory: Dict[Any, Any], runs: List[SortedRun]):
+        self._memory = dict(memory)
+        self._runs = list(runs)
+
+    def __contains__(self, key: Any) -> bool:
+        value = self._memory.get(key, _MISSING)
+        if value is _MISSING and self._runs:
+            value = _lookup_runs(self._runs, key)
+        return value is not _MISSING and value is not _REMOVED
+
+    def __iter__(self) -> Iterator[Any]:
+        return (key for key, _ in self.iter_items())
+
+    def iter_items(self) -> Iterator[Tuple[Any, Any]]:
+        """Stream (key, value) pairs in key order."""
+        return _iter_items(self._memory, self._runs)
+
+class _SpillItems(ItemsView):
+    def __iter__(self) -> Iterator[Tuple[Any, Any]]:
+        return self._mapping.iter_items()  # type: ignore
+
+class _SpillValues(ValuesView):
+    def __iter__(self) -> Iterator[Any]:
+        return (value for _, value in self._mapping.iter_items())  # type: ignore
+
+class SpillLayer(MutableMapping):
+    """A transaction layer kept mostly on disk, usable wherever a layer dict is.
+
+    New writes go to an in-memory dict; when it holds ``flush_entries``
+    entries its str/bytes/None values are written to a new ``SortedRun``
+    (other values, such as arena refs or compressed values, stay in
+    memory). Lookups check the dict, then the runs newest first. Iterating
+    merges the runs and the dict in key order without loading them, which
+    is how COMMIT streams a spilled layer into the one below. Runs are
+    merged into one when there are more than ``MAX_RUNS``.
+    """
+
+    def __init__(self, directory: Optional[str], flush_entries: int):
+        """Initialize an empty layer.
+
+        Args:
+            directory: Directory for run files (None for the system temp dir).
+            flush_entries: In-memory entries that trigger writing a run.
+        """
+        self._directory = tempfile.mkdtemp(prefix='spill-', dir=directory)
+        self.flush_entries = max(1, flush_entries)
+        self._flush_at = self.flush_entries
+        self._memory: Dict[Any, Any] = {}
+        self._runs: List[SortedRun] = []  # newest first
+        self._len = 0
+        self._serial = 0
+        self._cached: Tuple[Any, Any] = (_MISSING, _MISSING)
+
+    @classmethod
+    def from_layer(cls, layer: Dict[Any, Any], directory: Optional[str]) -> 'SpillLayer':
+        """Move a layer dict to disk; later flushes happen at the same size."""
+        spilled = cls(directory, len(layer))
+        spilled._memory = layer
+        spilled._len = len(layer)
+        spilled.flush()
+        return spilled
+
+    @property
+    def disk_bytes(self) -> int:
+        """Bytes held in run files."""
+        return sum(run.size for run in self._runs)
+
+    @property
+    def runs(self) -> int:
+        return len(self._runs)
+
+    def _lookup(self, key: Any) -> Any:
+        if self._cached[0] is key:
+            return self._cached[1]
+        value = self._memory.get(key, _MISSING)
+        if value is _MISSING and self._runs:
+            value = _lookup_runs(self._runs, key)
+        if value is _REMOVED:
+            value = _MISSING
+        self._cached = (key, value)
+        return value
+
+    def __contains__(self, key: Any) -> bool:
+        return self._lookup(key) is not _MISSING
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def _in_runs(self, key: Any) -> bool:
+        value = _lookup_runs(self._runs, key)
+        return value is not _MISSING and value is not _REMOVED
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if self._lookup(key) is _MISSING:
+            self._len += 1
+        self._memory[key] = value
+        self._cached = (_MISSING, _MISSING)
+        if len(self._memory) >= self._flush_at:
+            self.flush()
+
+    def __delitem__(self, key: Any) -> None:
+        if self._lookup(key) is _MISSING:
+            raise KeyError(key)
+        self._memory.pop(key, None)
+        if self._in_runs(key):
+            self._memory[key] = _REMOVED
+        self._len -= 1
+        self._cached = (_MISSING, _MISSING)
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        value = self._lookup(key)
+        if value is _MISSING:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        del self[key]
+        return value
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Any]:
+        return (key for key, _ in self.iter_items())
+
+    def items(self) -> ItemsView:  # type: ignore
+        return _SpillItems(self)
+
+    def values(self) -> ValuesView:  # type: ignore
+        return _SpillValues(self)
+
+    def resident_values(self) -> List[Any]:
+        """Values still in memory (spilled values are plain str/bytes)."""
+        return [value for value in self._memory.values() if value is not _REMOVED]
+
+    def iter_items(self) -> Iterator[Tuple[Any, Any]]:
+        """Stream (key, value) pairs in key order."""
+        return _iter_items(self._memory, self._runs)
+
+    def snapshot(self) -> SpillSnapshot:
+        """Read-only copy of the current contents (see ``SpillSnapshot``)."""
+        return SpillSnapshot(self._memory, self._runs)
+
+    def flush(self) -> None:
+        """Write the spillable in-memory entries to a new run."""
+        spill = [(encode_key(k), v) for k, v in self._memory.items() if spillable(v)]
+        if spill:
+            spill.sort(key=lambda r: r[0])
+            self._runs.insert(0, SortedRun(self._next_path(), spill, len(spill)))
+            self._memory = {k: v for k, v in self._memory.items() if not spillable(v)}
+            self._cached = (_MISSING, _MISSING)
+        # Resident values do not count towards the next run
+        self._flush_at = len(self._memory) + self.flush_entries
+        if len(self._runs) > MAX_RUNS:
+            self._merge_runs()
+
+    def _merge_runs(self) -> None:
+        """Merge every run into one, dropping removal markers (nothing older remains)."""
+        old = self._runs
+        records = ((enc, value) for enc, value in _merge_records([run.records() for run in old])
+                   if value is not _REMOVED)
+        self._runs = [SortedRun(self._next_path(), records, sum(run.count for run in old))]
+        for run in old:
+            run.close()
+
+    def _next_path(self) -> str:
+        self._serial += 1
+        return os.path.join(self._directory, f'run{self._serial:06d}.dat')
+
+    def close(self) -> None:
+        """Delete the run files; the layer must not be used afterwards."""
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self._memory = {}
+        self._len = 0
+        try:
+            os.rmdir(self._directory)
+        except OSError:
+            pass
@@ -0,0 +1,174 @@
+import os
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Tuple
+from .base import BaseDB, Database
+from .logger import Logger
+from .transaction_manager import TransactionLimitError
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS kv_value ON kv (value)",
+)
+# Statements are kept as constants so sqlite3's statement cache reuses
+# the prepared form on every call.
+_GET = "SELECT value FROM kv WHERE key = ?"
+_SET = "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)"
+_UNSET = "DELETE FROM kv WHERE key = ?"
+_COUNTS = "SELECT COUNT(*) FROM kv WHERE value = ?"
+_FIND = "SELECT key FROM kv WHERE value = ?"
+_SCAN = "SELECT key, value FROM kv"
+
+class SQLiteDB(BaseDB, Database):
+    """Key-value database backed by SQLite (stdlib ``sqlite3``) in WAL mode.
+
+    Nested transactions map onto SAVEPOINTs. Writes outside a transaction
+    are grouped into one SQLite transaction of up to ``batch_size`` writes;
+    the batch is committed when it is full, before a BEGIN and on close.
+    COUNTS/FIND use an index on the value column. ``max_depth`` limits
+    the savepoint stack like it limits ``TransactionManager`` layers.
+    """
+
+    def __init__(self, path: str, logger: Logger, batch_size: int = 1000,
+                 statement_cache: int = 64, max_depth: int = 0) -> None:
+        """Open or create the database.
+
+        Args:
+            path: Database file path (':memory:' for a private in-memory database).
+            logger: Logger for database operations.
+            batch_size: Writes outside transactions grouped per SQLite commit.
+            statement_cache: Number of prepared statements kept by sqlite3.
+            max_depth: Maximum number of nested transactions (0 for no limit).
+        """
+        self._path = path
+        self._logger = logger
+        self._batch_size = batch_size
+        self.max_depth = max_depth
+        directory = os.path.dirname(path)
+        if directory and path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode: transactions are managed explicitly below
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False,
+                                     cached_statements=statement_cache)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._depth = 0
+        self._pending = 0
+        self._logger.info(f"SQLiteDB opened {path}")
+
+    def _write(self, sql: str, params: Tuple[str, ...]) -> None:
+        if self._depth == 0:
+            if not self._pending:
+                self._conn.execute("BEGIN")
+            self._pending += 1
+            self._conn.execute(sql, params)
+            if self._pending >= self._batch_size:
+                self.flush()
+        else:
+            self._conn.execute(sql, params)
+
+    def flush(self) -> None:
+        """Commit the pending batch of writes made outside transactions."""
+        if self._pending:
+            self._conn.execute("COMMIT")
+            self._pending = 0
+
+    def set(self, key: str, value: str) -> None:
+        """Set a key-value pair in the database."""
+        self._write(_SET, (key, value))
+        self._logger.info(f"SET: {key} = {value}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a value by key from the database."""
+        row = self._conn.execute(_GET, (key,)).fetchone()
+        value = row[0] if row is not None else None
+        self._logger.info(f"GET: {key} = {value if value is not None else 'NULL (not found)'}")
+        return value
+
+    def unset(self, key: str) -> None:
+        """Unset a key from the database."""
+        self._write(_UNSET, (key,))
+        self._logger.info(f"UNSET: {key}")
+
+    def counts(self, value: str) -> int:
+        """Count how many times a value appears in the database."""
+        result = self._conn.execute(_COUNTS, (value,)).fetchone()[0]
+        self._logger.info(f"COUNTS: {value} = {result}")
+        return result
+
+    def find(self, value: str) -> List[str]:
+        """Find all keys that have the specified value."""
+        found = [row[0] for row in self._conn.execute(_FIND, (value,))]
+        self._logger.info(f"FIND: {value} = {len(found)} keys")
+        return found
+
+    def scan(self, chunk_size: int = 1000) -> Iterator[List[Tuple[str, str]]]:
+        """Iterate over visible key-value pairs in chunks."""
+        cursor = self._conn.execute(_SCAN)
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def begin(self) -> None:
+        """Begin a new transaction (SAVEPOINT).
+
+        Raises:
+            TransactionLimitError: If ``max_depth`` transactions are open.
+        """
+        if self.max_depth and self._depth >= self.max_depth:
+            raise TransactionLimitError(f"Transaction depth limit reached ({self.max_depth})")
+        if self._depth == 0:
+            self.flush()
+        self._depth += 1
+        self._conn.execute(f"SAVEPOINT sp{self._depth}")
+        self._logger.info("BEGIN: New transaction started")
+
+    def rollback(self) -> bool:
+        """Rollback the current transaction (ROLLBACK TO SAVEPOINT)."""
+        if self._depth == 0:
+            self._logger.warning("ROLLBACK: No active transaction")
+            return False
+        self._conn.execute(f"ROLLBACK TO sp{self._depth}")
+        self._conn.execute(f"RELEASE sp{self._depth}")
+        self._depth -= 1
+        self._logger.info("ROLLBACK: Transaction rolled back")
+        return True
+
+    def commit(self) -> bool:
+        """Commit the current transaction (RELEASE SAVEPOINT)."""
+        if self._depth == 0:
+            self._logger.warning("COMMIT: No active transaction")
+            return False
+        self._conn.execute(f"RELEASE sp{self._depth}")
+        self._depth -= 1
+        self._logger.info("COMMIT: Transaction committed")
+        return True
+
+    def get_transaction_depth(self) -> int:
+        """Get current transaction depth."""
+        return self._depth
+
+    def snapshot(self) -> Dict[str, str]:
+        """Get a copy of the committed data, ignoring open transactions."""
+        if self._depth == 0:
+            self.flush()
+            return dict(self._conn.execute(_SCAN))
+        if self._path == ':memory:':
+            raise RuntimeError("Snapshot inside a transaction needs a file-backed database")
+        # A second connection sees the last committed state (WAL readers don't block)
+        reader = sqlite3.connect(self._path)
+        try:
+            return dict(reader.execute(_SCAN))
+        finally:
+            reader.close()
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        while self._depth:
+            self.rollback()
+        self.flush()
+        self._conn.close()
+        self._logger.info(f"SQLiteDB closed {self._path}")
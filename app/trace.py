@@ -0,0 +1,256 @@
+import os
+import struct
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from .logger import Logger
+from .protocol import Reader, encode_command, encode_reply
+
+MAGIC = b'IMDBTRC1'
+HEADER = struct.Struct('<8sd')  # magic, wall clock start time
+# start offset (s), duration (s), session id, request length, reply length
+RECORD = struct.Struct('<ddIII')
+# Commands that control tracing itself are never recorded
+UNTRACED = frozenset({'trace'})
+
+class TraceRecord:
+    """One traced command: timing, session, request and encoded reply."""
+
+    __slots__ = ('offset', 'duration', 'session', 'command', 'reply')
+
+    def __init__(self, offset: float, duration: float, session: int, command: List[str],
+                 reply: bytes):
+        self.offset = offset
+        self.duration = duration
+        self.session = session
+        self.command = command
+        self.reply = reply
+
+def _decode(data: bytes) -> Any:
+    reader = Reader()
+    reader.feed(data)
+    return reader.get()
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    """Read the records of a trace file in recording order.
+
+    Args:
+        path: Trace file written by ``TraceRecorder``.
+
+    Yields:
+        The records.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size or HEADER.unpack(header)[0] != MAGIC:
+            raise ValueError(f"{path} is not a trace file")
+        while True:
+            fixed = f.read(RECORD.size)
+            if len(fixed) < RECORD.size:
+                # A recorder that did not stop cleanly may leave a partial record
+                return
+            offset, duration, session, request_len, reply_len = RECORD.unpack(fixed)
+            payload = f.read(request_len + reply_len)
+            if len(payload) < request_len + reply_len:
+                return
+            yield TraceRecord(offset, duration, session, _decode(payload[:request_len]),
+                              payload[request_len:])
+
+class TraceRecorder:
+    """Records the commands executed by a ``CommandRegistry`` to a binary file.
+
+    Each record holds the start time relative to the trace start, the
+    handler duration, a session id, the request and its reply, both in the
+    wire encoding of ``app.protocol``. Sessions are the threads issuing
+    commands (one per server connection), numbered in order of appearance.
+    Only commands whose arguments were accepted reach the hooks, so
+    unknown commands and bad arguments are not recorded.
+    """
+
+    def __init__(self, registry: Any, logger: Logger):
+        """Initialize the recorder.
+
+        Args:
+            registry: Command registry whose commands are recorded.
+            logger: Logger for trace events.
+        """
+        self._registry = registry
+        self._logger = logger
+        self._file: Optional[BinaryIO] = None
+        self._path = ''
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions: Dict[int, int] = {}
+        self._start = 0.0
+        self._count = 0
+
+    @property
+    def running(self) -> bool:
+        return self._file is not None
+
+    def start(self, path: str) -> None:
+        """Start recording to ``path`` (overwritten)."""
+        if self.running:
+            raise RuntimeError("Trace already running")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, time.time()))
+        self._path = path
+        self._sessions = {}
+        self._count = 0
+        self._start = time.perf_counter()
+        self._registry.add_hook(pre=self._pre, post=self._post, error=self._error)
+        self._logger.info(f"TRACE: recording to {path}")
+
+    def stop(self) -> Tuple[str, int]:
+        """Stop recording.
+
+        Returns:
+            The trace path and the number of recorded commands.
+        """
+        if self._file is None:
+            raise RuntimeError("Trace not running")
+        self._registry.remove_hook(pre=self._pre, post=self._post, error=self._error)
+        with self._lock:
+            self._file.close()
+            self._file = None
+        self._logger.info(f"TRACE: {self._count} commands written to {self._path}")
+        return self._path, self._count
+
+    def _started(self) -> List[float]:
+        starts = getattr(self._local, 'starts', None)
+        if starts is None:
+            starts = self._local.starts = []
+        return starts
+
+    def _pre(self, name: str, args: Tuple[Any, ...]) -> None:
+        if name not in UNTRACED:
+            # A stack, as a handler may execute other commands
+            self._started().append(time.perf_counter())
+
+    def _post(self, name: str, args: Tuple[Any, ...], result: Any) -> None:
+        if name not in UNTRACED:
+            self._record(name, args, encode_reply(result))
+
+    def _error(self, name: str, args: Tuple[Any, ...], error: Exception) -> None:
+        if name not in UNTRACED:
+            self._record(name, args, encode_reply(error))
+
+    def _record(self, name: str, args: Tuple[Any, ...], reply: bytes) -> None:
+        end = time.perf_counter()
+        starts = self._started()
+        # Missing when an earlier pre hook answered the command
+        start = starts.pop() if starts else end
+        request = encode_command([name, *(str(a) for a in args)])
+        with self._lock:
+            if self._file is None:
+                return
+            thread = threading.get_ident()
+            session = self._sessions.get(thread)
+            if session is None:
+                session = self._sessions[thread] = len(self._sessions)
+            self._file.write(RECORD.pack(start - self._start, end - start, session,
+                                         len(request), len(reply)))
+            self._file.write(request)
+            self._file.write(reply)
+            self._count += 1
+
+class Divergence:
+    """A replayed command whose reply differs from the recorded one."""
+
+    __slots__ = ('index', 'command', 'expected', 'actual')
+
+    def __init__(self, index: int, command: List[str], expected: Any, actual: Any):
+        self.index = index
+        self.command = command
+        self.expected = expected
+        self.actual = actual
+
+    def __str__(self) -> str:
+        return (f"#{self.index} {' '.join(self.command)}: "
+                f"recorded {self.expected!r}, replayed {self.actual!r}")
+
+class ReplayResult:
+    """Divergences and original vs replayed latencies of a replay."""
+
+    def __init__(self, commands: int, sessions: int, elapsed: float,
+                 original: Dict[str, List[float]], replayed: Dict[str, List[float]],
+                 divergences: List[Divergence]):
+        self.commands = commands
+        self.sessions = sessions
+        self.elapsed = elapsed
+        self.original = original
+        self.replayed = replayed
+        self.divergences = divergences
+
+    def report(self, max_divergences: int = 10) -> str:
+        """Human readable summary."""
+        from .bench import BenchResult  # bench -> server -> commands imports this module
+        lines = [f"{self.commands} commands from {self.sessions} sessions replayed in "
+                 f"{self.elapsed:.2f}s, {len(self.divergences)} divergences"]
+        for divergence in self.divergences[:max_divergences]:
+            lines.append(f"  {divergence}")
+        if len(self.divergences) > max_divergences:
+            lines.append(f"  ... {len(self.divergences) - max_divergences} more")
+        columns = ['p50', 'p99', 'max']
+        lines.append(f"{'latency ms':<12}{'calls':>8}" + ''.join(
+            f"{'rec ' + c:>11}{'replay ' + c:>12}" for c in columns))
+        for name in sorted(self.original):
+            recorded = BenchResult.percentiles(self.original[name])
+            replayed = BenchResult.percentiles(self.replayed[name])
+            lines.append(f"{name:<12}{len(self.original[name]):>8}" + ''.join(
+                f"{recorded[c]:>11.3f}{replayed[c]:>12.3f}" for c in columns))
+        return '\n'.join(lines)
+
+def replay(records: Iterator[TraceRecord], registry: Any, timing: str = 'fast',
+           speed: float = 1.0) -> ReplayResult:
+    """Re-execute a trace and compare replies and latencies.
+
+    Commands run one at a time in recording order, which is the order they
+    ran in: server sessions hold the database lock for whole batches and
+    open transactions.
+
+    Args:
+        records: Records from ``read_trace``.
+        registry: Command registry to execute them with.
+        timing: 'fast' to run back to back, 'original' to keep the recorded
+            start times.
+        speed: Time scale for 'original' timing (2.0 replays twice as fast).
+
+    Returns:
+        The comparison.
+    """
+    if timing not in ('fast', 'original'):
+        raise ValueError(f"Unknown replay timing: {timing}")
+    original: Dict[str, List[float]] = {}
+    replayed: Dict[str, List[float]] = {}
+    divergences: List[Divergence] = []
+    sessions = set()
+    count = 0
+    start = time.perf_counter()
+    for record in records:
+        if timing == 'original':
+            delay = start + record.offset / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        name, args = record.command[0], record.command[1:]
+        began = time.perf_counter()
+        try:
+            result = registry.execute(name, *args)
+        except Exception as e:
+            result = e
+        elapsed = time.perf_counter() - began
+        reply = encode_reply(result)
+        # Streamed FIND output is recorded as its key count (StreamedResult)
+        if reply != record.reply and not (isinstance(result, list)
+                                          and record.reply == encode_reply(len(result))):
+            divergences.append(Divergence(count, record.command, _decode(record.reply),
+                                          _decode(reply)))
+        original.setdefault(name, []).append(record.duration)
+        replayed.setdefault(name, []).append(elapsed)
+        sessions.add(record.session)
+        count += 1
+    return ReplayResult(count, len(sessions), time.perf_counter() - start, original,
+                        replayed, divergences)
@@ -1,17 +1,269 @@
-from typing import List, Dict, Optional
+import sys
+from collections import deque
+from typing import Any, Callable, Deque, List, Dict, Optional, Tuple
 from .logger import Logger
+from .spill import SpillLayer
+
+ChangeListener = Callable[[Dict[str, Optional[str]]], None]
+
+# Keys re-examined by each write while merged layers await compaction
+COMPACT_STEP = 16
+# Stands for a value held beneath the base layer (see ``set_backing_store``)
+_BACKED = object()
+
+class TransactionLimitError(RuntimeError):
+    """Raised when a BEGIN or write would exceed the configured transaction limits."""
+
+class ReadOnlyError(RuntimeError):
+    """Raised when a write is attempted on a read-only database (a replica)."""
+
+def entry_size(key: str, value: Any) -> int:
+    """Estimated memory of one layer entry (key and value objects)."""
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+class LayerStats:
+    """Counters for one layer, updated on every write."""
+
+    __slots__ = ('keys', 'tombstones', 'bytes')
+
+    def __init__(self) -> None:
+        self.keys = 0
+        self.tombstones = 0
+        self.bytes = 0
+
+    def add(self, key: str, value: Any, sign: int = 1) -> None:
+        """Count an entry in (sign=1) or out (sign=-1) of the layer."""
+        if value is None:
+            self.tombstones += sign
+        else:
+            self.keys += sign
+        self.bytes += sign * entry_size(key, value)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'keys': self.keys, 'tombstones': self.tombstones, 'bytes': self.bytes}
 
 class TransactionManager:
-    """Manages database transactions independently from the main database logic."""
+    """Manages database transactions independently from the main database logic.
+    
+    Layers only hold entries that change what is visible: unsetting a key
+    in the base layer deletes it, and a transaction layer records a
+    tombstone only when a lower layer still holds a value for the key.
+    Committing into an enclosing transaction can leave entries that no
+    longer hide anything (an unset of a key the outer layers never had, or
+    a value equal to the one below); those keys are queued and compacted a
+    few at a time on later writes, so long-lived deep transactions stay
+    small without a pause at COMMIT.
+    
+    With ``spill_bytes`` set, a transaction layer that grows beyond it is
+    replaced by a ``SpillLayer`` that keeps its entries in sorted run files,
+    and COMMIT streams those runs into the layer below.
+    """
     
-    def __init__(self, logger: Logger):
+    def __init__(self, logger: Logger, max_depth: int = 0, max_bytes: int = 0,
+                 spill_bytes: int = 0, spill_dir: Optional[str] = None):
+        """Initialize the transaction manager.
+        
+        Args:
+            logger: Logger for transaction operations.
+            max_depth: Maximum number of nested transactions (0 for no limit).
+            max_bytes: Maximum estimated size of one transaction layer
+                (0 for no limit).
+            spill_bytes: Estimated size at which a transaction layer moves
+                to disk (0 to keep layers in memory).
+            spill_dir: Directory for spill files (None for the system temp dir).
+        """
         self._layers: List[Dict[str, Optional[str]]] = [{}]
+        self._stats: List[LayerStats] = [LayerStats()]
+        self._listeners: List[ChangeListener] = []
+        self._backing: Optional[Callable[[str], bool]] = None
+        self._release: Optional[Callable[[Any], None]] = None
+        self._pending: Deque[Tuple[int, List[str]]] = deque()
         self._logger = logger
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.spill_bytes = spill_bytes
+        self.spill_dir = spill_dir
+        # Set by replicas: only ``apply`` may change the layers then
+        self.read_only = False
         self._logger.info("TransactionManager initialized")
     
+    def add_listener(self, listener: ChangeListener) -> None:
+        """Subscribe to committed changes.
+        
+        The listener is called with ``{key: value}`` (None for removed keys)
+        each time changes reach the base layer: a write outside any
+        transaction, or the outermost COMMIT. Rolled back writes are never
+        reported.
+        
+        Args:
+            listener: Callable receiving the committed changes.
+        """
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: ChangeListener) -> None:
+        """Unsubscribe from committed changes."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _publish(self, changes: Dict[str, Optional[str]]) -> None:
+        """Notify listeners of changes committed to the base layer."""
+        for listener in self._listeners:
+            listener(changes)
+    
+    def set_backing_store(self, contains: Optional[Callable[[str], bool]]) -> None:
+        """Declare committed data kept beneath the base layer.
+        
+        Engines that move committed data out of the base layer (see
+        ``discard_base``) must report which keys they hold, so unsets in a
+        transaction still leave tombstones for them.
+        
+        Args:
+            contains: Returns True if the backing store holds the key.
+        """
+        self._backing = contains
+    
+    def set_release(self, release: Optional[Callable[[Any], None]]) -> None:
+        """Install a callback for values that leave the layers.
+        
+        It is called with every value dropped from a layer: overwritten,
+        unset, merged over by a COMMIT, compacted away or rolled back. Used
+        by value stores that must free what they allocated.
+        
+        Args:
+            release: Callable receiving the dropped value (possibly None).
+        """
+        self._release = release
+    
+    def _visible_below(self, index: int, key: str) -> Any:
+        """Value of a key as seen from beneath layer ``index`` (None if absent)."""
+        for layer in self._layers[index - 1::-1] if index else ():
+            if key in layer:
+                return layer[key]
+        if self._backing is not None and self._backing(key):
+            return _BACKED
+        return None
+    
+    def write(self, key: str, value: Optional[str]) -> None:
+        """Write a value (None to unset) into the current layer.
+        
+        Args:
+            key: The key to write.
+            value: The value, or None to mark the key as removed.
+        Raises:
+            ReadOnlyError: If the manager is read-only.
+            TransactionLimitError: If the transaction layer would grow
+                beyond ``max_bytes``.
+        """
+        if self.read_only:
+            raise ReadOnlyError("Database is read-only")
+        self._write(key, value)
+    
+    def apply(self, changes: List[Tuple[str, Optional[str]]]) -> None:
+        """Write a batch of replicated changes, even when read-only.
+        
+        Args:
+            changes: ``(key, value)`` pairs, value None for removed keys.
+        """
+        for key, value in changes:
+            self._write(key, value)
+    
+    def _write(self, key: str, value: Optional[str]) -> None:
+        if self._pending:
+            self._compact_step(COMPACT_STEP)
+        layer = self._layers[-1]
+        stats = self._stats[-1]
+        old = layer.get(key, layer)
+        depth = len(self._layers) - 1
+        if value is None and (depth == 0 or self._visible_below(depth, key) is None):
+            # Nothing below to hide: delete instead of writing a tombstone
+            if old is not layer:
+                stats.add(key, layer.pop(key), -1)
+                if self._release is not None:
+                    self._release(old)
+            elif depth or self._backing is None or not self._backing(key):
+                # Nothing was removed, so there is no change to publish
+                return
+        else:
+            self._store(layer, stats, key, value, old)
+        if self._listeners and depth == 0:
+            self._publish({key: value})
+    
+    def _store(self, layer: Dict[str, Optional[str]], stats: LayerStats, key: str,
+               value: Optional[str], old: Any) -> None:
+        """Put an entry into the current layer, enforcing ``max_bytes``."""
+        if self.max_bytes and len(self._layers) > 1:
+            size = stats.bytes + entry_size(key, value)
+            if old is not layer:
+                size -= entry_size(key, old)
+            if size > self.max_bytes:
+                raise TransactionLimitError(
+                    f"Transaction size limit reached ({self.max_bytes} bytes)")
+        if old is not layer:
+            stats.add(key, old, -1)
+        stats.add(key, value)
+        layer[key] = value
+        if self._release is not None and old is not layer and old is not value:
+            self._release(old)
+        if self.spill_bytes and stats.bytes > self.spill_bytes and layer is self._layers[-1]:
+            self._spill(len(self._layers) - 1)
+    
+    def _spill(self, index: int) -> None:
+        """Move a transaction layer to disk unless it is already there."""
+        layer = self._layers[index]
+        if index == 0 or isinstance(layer, SpillLayer):
+            return
+        self._layers[index] = SpillLayer.from_layer(layer, self.spill_dir)  # type: ignore
+        self._logger.info(f"SPILL: layer {index} with {len(layer)} entries moved to disk")
+    
+    @staticmethod
+    def _discard(layer: Dict[str, Optional[str]]) -> None:
+        """Delete the files of a spilled layer that left the stack."""
+        if isinstance(layer, SpillLayer):
+            layer.close()
+    
+    def load_base(self, data: Dict[str, str]) -> None:
+        """Replace the base layer, dropping any open transactions.
+        
+        Args:
+            data: New committed data.
+        """
+        for layer in self._layers:
+            if self._release is not None:
+                self._release_layer(layer)
+            self._discard(layer)
+        self._layers = [dict(data)]
+        stats = LayerStats()
+        for k, v in data.items():
+            stats.add(k, v)
+        self._stats = [stats]
+        self._pending.clear()
+        self._logger.info(f"LOAD: {len(data)} keys")
+    
+    def discard_base(self, key: str) -> None:
+        """Remove a key from the base layer without publishing it.
+        
+        Used by engines that move committed data out of the base layer.
+        """
+        base = self._layers[0]
+        if key in base:
+            value = base.pop(key)
+            self._stats[0].add(key, value, -1)
+            if self._release is not None:
+                self._release(value)
+    
     def begin(self) -> None:
-        """Begin a new transaction."""
+        """Begin a new transaction.
+        
+        Raises:
+            ReadOnlyError: If the manager is read-only.
+            TransactionLimitError: If ``max_depth`` transactions are open.
+        """
+        if self.read_only:
+            raise ReadOnlyError("Database is read-only")
+        if self.max_depth and len(self._layers) > self.max_depth:
+            raise TransactionLimitError(f"Transaction depth limit reached ({self.max_depth})")
         self._layers.append({})
+        self._stats.append(LayerStats())
         self._logger.info("BEGIN: New transaction started")
     
     def rollback(self) -> bool:
@@ -23,7 +275,13 @@ class TransactionManager:
         if len(self._layers) == 1:
             self._logger.warning("ROLLBACK: No active transaction")
             return False
-        self._layers.pop()
+        top = self._layers.pop()
+        self._stats.pop()
+        try:
+            if self._release is not None:
+                self._release_layer(top)
+        finally:
+            self._discard(top)
         self._logger.info("ROLLBACK: Transaction rolled back")
         return True
     
@@ -38,19 +296,88 @@ class TransactionManager:
             return False
         
         top = self._layers.pop()
-        for k, v in top.items():
-            if v is None:
-                # Unset - remove from all layers
-                for layer in self._layers:
-                    if k in layer:
-                        del layer[k]
-            else:
-                # Set - update the current layer
-                self._layers[-1][k] = v
-        
+        self._stats.pop()
+        if isinstance(top, SpillLayer):
+            # Stream the runs into the parent; a transaction parent has to
+            # be on disk too to take them without growing in memory
+            self._spill(len(self._layers) - 1)
+        parent = self._layers[-1]
+        stats = self._stats[-1]
+        # Merge into the enclosing transaction, keeping unsets as tombstones
+        # so they still hide lower layers and roll back with it; the base
+        # layer has nothing below it, so unsets there just delete
+        keep_tombstones = len(self._layers) > 1
+        release = self._release
+        spilled = isinstance(top, SpillLayer)
+        publish = bool(self._listeners) and not keep_tombstones and bool(top)
+        # Listeners may keep the mapping, so a spilled layer (whose files
+        # are deleted below) is published as a dict built during the merge
+        changes: Dict[str, Optional[str]] = {} if publish and spilled else top  # type: ignore
+        try:
+            for k, v in top.items():
+                old = parent.get(k, parent)
+                if old is not parent:
+                    stats.add(k, old, -1)
+                if v is None and not keep_tombstones:
+                    parent.pop(k, None)
+                else:
+                    parent[k] = v
+                    stats.add(k, v)
+                if release is not None and old is not parent:
+                    release(old)
+                if changes is not top:
+                    changes[k] = v
+            if keep_tombstones and top and not spilled:
+                self._pending.append((len(self._layers) - 1, list(top)))
+            
+            if publish:
+                self._publish(changes)
+        finally:
+            self._discard(top)
+        if self.spill_bytes and stats.bytes > self.spill_bytes:
+            self._spill(len(self._layers) - 1)
         self._logger.info("COMMIT: Transaction committed")
         return True
     
+    def compact(self, budget: int = 0) -> int:
+        """Drop entries of transaction layers that no longer change what is visible.
+        
+        Only keys merged by a COMMIT into an enclosing transaction are
+        examined; writes run this in small steps on their own.
+        
+        Args:
+            budget: Maximum number of keys to examine (0 for all pending).
+        Returns:
+            Number of entries removed.
+        """
+        return self._compact_step(budget or sum(len(keys) for _, keys in self._pending))
+    
+    def _release_layer(self, layer: Dict[str, Optional[str]]) -> None:
+        """Pass every value of a dropped layer to the release callback."""
+        # Spilled values are plain str/bytes: only resident ones need releasing
+        values = layer.resident_values() if isinstance(layer, SpillLayer) else layer.values()
+        for value in values:
+            self._release(value)  # type: ignore
+    
+    def _compact_step(self, budget: int) -> int:
+        removed = 0
+        while budget > 0 and self._pending:
+            index, keys = self._pending[0]
+            if index >= len(self._layers) or not keys:
+                # Finished, or the layer was rolled back or committed since
+                self._pending.popleft()
+                continue
+            key = keys.pop()
+            budget -= 1
+            layer = self._layers[index]
+            if key in layer and layer[key] == self._visible_below(index, key):
+                value = layer.pop(key)
+                self._stats[index].add(key, value, -1)
+                if self._release is not None:
+                    self._release(value)
+                removed += 1
+        return removed
+    
     def get_transaction_depth(self) -> int:
         """Get current transaction depth.
         
@@ -59,6 +386,20 @@ class TransactionManager:
         """
         return len(self._layers) - 1
     
+    def layer_stats(self) -> List[Dict[str, int]]:
+        """Get per-layer counters, base layer first.
+        
+        Returns:
+            List of ``{'keys', 'tombstones', 'bytes'}`` dicts, one per layer.
+        """
+        result = []
+        for layer, stats in zip(self._layers, self._stats):
+            counters = stats.as_dict()
+            if isinstance(layer, SpillLayer):
+                counters['spilled'] = layer.disk_bytes
+            result.append(counters)
+        return result
+    
     def get_current_layer(self) -> Dict[str, Optional[str]]:
         """Get the current transaction layer.
         
@@ -0,0 +1,74 @@
+"""Heap size, GC pauses and churn with large values on and off the heap.
+
+Loads N values of --size bytes, then measures the traced Python heap, a
+full ``gc.collect()`` and a churn phase (overwrites inside transactions
+that are rolled back or committed) with and without a BlobArena.
+
+Usage:
+    python benchmarks/bench_arena.py [--keys N] [--size BYTES] [--rounds N]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.arena import BlobArena
+from app.db import InMemoryDB
+from app.logger import NullLogger
+from app.transaction_manager import TransactionManager
+
+def _run(keys: int, size: int, rounds: int, use_arena: bool) -> None:
+    logger = NullLogger()
+    arena = BlobArena(logger, threshold=1024, segment_size=16 * 1024 * 1024) if use_arena else None
+    db = InMemoryDB(TransactionManager(logger), logger, arena=arena)
+    # Many small containers next to the values, as a GC workload
+    side = [[i] for i in range(keys * 4)]
+    tracemalloc.start()
+    for i in range(keys):
+        db.set(f'k{i}', chr(97 + i % 26) * size)
+    heap = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    gc.collect()
+    gc_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for round_ in range(rounds):
+        db.begin()
+        for i in range(0, keys, 2):
+            db.set(f'k{i}', chr(65 + (i + round_) % 26) * size)
+        if round_ % 2:
+            db.commit()
+        else:
+            db.rollback()
+        if arena is not None:
+            arena.compact()
+    churn_ms = (time.perf_counter() - start) * 1000
+
+    label = 'arena' if use_arena else 'heap'
+    extra = ''
+    if arena is not None:
+        stats = arena.stats()
+        extra = f"  segments={stats['segments']} live={stats['live'] // 1024}KiB garbage={stats['garbage'] // 1024}KiB"
+    print(f"{label:>6} {heap / 1024 / 1024:>10.1f} {gc_ms:>8.1f} {churn_ms:>9.1f}{extra}")
+    del side
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--keys', type=int, default=5000)
+    parser.add_argument('--size', type=int, default=16384)
+    parser.add_argument('--rounds', type=int, default=6)
+    args = parser.parse_args()
+
+    print(f"{args.keys} values of {args.size} bytes, {args.rounds} churn rounds")
+    print(f"{'store':>6} {'heap MiB':>10} {'gc ms':>8} {'churn ms':>9}")
+    _run(args.keys, args.size, args.rounds, use_arena=False)
+    _run(args.keys, args.size, args.rounds, use_arena=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Memory use under churn: keys that are written and removed again.
+
+Every round writes a batch of new keys and unsets them again, outside any
+transaction and inside a long-lived transaction that commits nested
+transactions into it. With tombstones dropped from the base layer and
+compacted out of transaction layers, memory stays flat across rounds.
+
+Usage:
+    python benchmarks/bench_churn.py [--rounds N] [--keys N]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import InMemoryDB
+from app.logger import NullLogger
+from app.transaction_manager import TransactionManager
+
+def _churn(db: InMemoryDB, round_: int, keys: int, nested: bool) -> None:
+    if nested:
+        db.begin()
+    for i in range(keys):
+        db.set(f'r{round_}:{i}', 'value')
+    if nested:
+        # Commit the writes, then unset them one level up
+        db.commit()
+        db.begin()
+    for i in range(keys):
+        db.unset(f'r{round_}:{i}')
+    if nested:
+        db.commit()
+
+def _run(rounds: int, keys: int, in_transaction: bool) -> None:
+    logger = NullLogger()
+    tm = TransactionManager(logger)
+    db = InMemoryDB(tm, logger)
+    for i in range(keys):
+        db.set(f'stable{i}', 'value')
+    if in_transaction:
+        db.begin()
+    label = 'inside a transaction' if in_transaction else 'no transaction'
+    print(f"{label}:")
+    print(f"{'round':>6} {'traced KiB':>11} {'entries':>8} {'tombstones':>11} {'ms':>8}")
+    tracemalloc.start()
+    for round_ in range(1, rounds + 1):
+        start = time.perf_counter()
+        _churn(db, round_, keys, in_transaction)
+        elapsed = time.perf_counter() - start
+        stats = tm.layer_stats()
+        entries = sum(s['keys'] + s['tombstones'] for s in stats)
+        tombstones = sum(s['tombstones'] for s in stats)
+        print(f"{round_:>6} {tracemalloc.get_traced_memory()[0] / 1024:>11.1f} "
+              f"{entries:>8} {tombstones:>11} {elapsed * 1000:>8.1f}")
+    tracemalloc.stop()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--keys', type=int, default=10000)
+    args = parser.parse_args()
+
+    _run(args.rounds, args.keys, in_transaction=False)
+    _run(args.rounds, args.keys, in_transaction=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Client throughput with and without pipelining against a local server.
+
+Without --server a server with logging disabled is started in a child
+process, so client and server do not share the GIL.
+
+Usage:
+    python benchmarks/bench_client.py [--ops N] [--server HOST:PORT]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.async_client import AsyncClient
+from app.client import Client
+from app.commands import CommandRegistry
+from app.db import InMemoryDB
+from app.logger import NullLogger
+from app.server import Server
+from app.transaction_manager import TransactionManager
+
+def _serve(port, ready) -> None:
+    logger = NullLogger()
+    db = InMemoryDB(TransactionManager(logger), logger)
+    server = Server(CommandRegistry(db, logger), db, logger, '127.0.0.1:0')  # type: ignore
+    server.start()
+    port.value = int(server.address.rpartition(':')[2])
+    ready.set()
+    while True:
+        time.sleep(1)
+
+def _sync(client: Client, ops: int, pipeline: int) -> float:
+    start = time.perf_counter()
+    if pipeline == 1:
+        for i in range(ops):
+            client.set(f'k{i % 1000}', 'value')
+    else:
+        pipe = client.pipeline()
+        for i in range(ops):
+            pipe.set(f'k{i % 1000}', 'value')
+            if len(pipe) == pipeline:
+                pipe.execute()
+        pipe.execute()
+    return ops / (time.perf_counter() - start)
+
+async def _async(address: str, ops: int, pipeline: int) -> float:
+    client = AsyncClient(address, max_connections=1)
+    start = time.perf_counter()
+    if pipeline == 1:
+        for i in range(ops):
+            await client.get(f'k{i % 1000}')
+    else:
+        pipe = client.pipeline()
+        for i in range(ops):
+            pipe.get(f'k{i % 1000}')
+            if len(pipe) == pipeline:
+                await pipe.execute()
+        await pipe.execute()
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return ops / elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=20000)
+    parser.add_argument('--server', default=None)
+    args = parser.parse_args()
+
+    process = None
+    address = args.server
+    if address is None:
+        port = multiprocessing.Value('i', 0)
+        ready = multiprocessing.Event()
+        process = multiprocessing.Process(target=_serve, args=(port, ready), daemon=True)
+        process.start()
+        ready.wait()
+        address = f'127.0.0.1:{port.value}'
+    try:
+        client = Client(address, max_connections=1)
+        print(f"{args.ops} commands against {address}")
+        print(f"{'pipeline':>8} {'sync SET/s':>12} {'async GET/s':>12}")
+        for pipeline in (1, 10, 100, 1000):
+            sync_rate = _sync(client, args.ops, pipeline)
+            async_rate = asyncio.run(_async(address, args.ops, pipeline))
+            print(f"{pipeline:>8} {sync_rate:>12,.0f} {async_rate:>12,.0f}")
+        client.close()
+    finally:
+        if process is not None:
+            process.terminate()
+
+if __name__ == '__main__':
+    main()
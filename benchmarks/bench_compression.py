@@ -0,0 +1,76 @@
+"""Memory and CPU cost of transparent value compression.
+
+Usage:
+    python benchmarks/bench_compression.py [--keys N] [--size BYTES] [--algorithm zlib|lzma]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.codec import ValueCodec
+from app.db import InMemoryDB
+from app.logger import NullLogger
+from app.transaction_manager import TransactionManager
+
+def _values(keys: int, size: int, seed: int = 1):
+    rng = random.Random(seed)
+    values = []
+    for i in range(keys):
+        doc = {'id': i, 'status': rng.choice(['active', 'idle', 'banned']), 'events': []}
+        while len(json.dumps(doc)) < size:
+            doc['events'].append({'type': rng.choice(['login', 'logout', 'view']),
+                                  'ts': 1700000000 + rng.randrange(10 ** 6)})
+        values.append(json.dumps(doc))
+    return values
+
+def _run(codec, values):
+    logger = NullLogger()
+    tracemalloc.start()
+    db = InMemoryDB(TransactionManager(logger), logger, codec=codec)
+    start = time.perf_counter()
+    for i, value in enumerate(values):
+        # A fresh copy, so values kept as text are counted by tracemalloc
+        db.set(f'key{i}', value[:-1] + value[-1])
+    set_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for i in range(len(values)):
+        db.get(f'key{i}')
+    get_time = time.perf_counter() - start
+    start = time.perf_counter()
+    db.counts(values[0])
+    counts_time = time.perf_counter() - start
+    return memory, set_time, get_time, counts_time
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--keys', type=int, default=5000)
+    parser.add_argument('--size', type=int, default=4096)
+    parser.add_argument('--algorithm', default='zlib')
+    args = parser.parse_args()
+
+    values = _values(args.keys, args.size)
+    print(f"{args.keys} values of ~{args.size} bytes")
+    print(f"{'mode':<12}{'memory MB':>12}{'set s':>10}{'get s':>10}{'counts s':>10}")
+    codecs = [
+        ('plain', None),
+        (args.algorithm, ValueCodec(algorithm=args.algorithm)),
+    ]
+    if args.algorithm == 'zlib':
+        dictionary = ValueCodec.train(values[:200])
+        codecs.append(('zlib+dict', ValueCodec(dictionary=dictionary)))
+    for name, codec in codecs:
+        memory, set_time, get_time, counts_time = _run(codec, values)
+        print(f"{name:<12}{memory / 2 ** 20:>12.1f}{set_time:>10.3f}{get_time:>10.3f}{counts_time:>10.3f}")
+        if codec is not None:
+            print(f"  {codec.stats()}")
+
+if __name__ == '__main__':
+    main()
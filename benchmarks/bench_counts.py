@@ -0,0 +1,50 @@
+"""One COUNTS per value vs a single multi-value COUNTS vs VALUES TOP.
+
+Usage:
+    python benchmarks/bench_counts.py [--keys N] [--values N] [--depth N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import InMemoryDB
+from app.logger import NullLogger
+from app.transaction_manager import TransactionManager
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--keys', type=int, default=200_000)
+    parser.add_argument('--values', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=3, help='Open transactions holding some writes')
+    args = parser.parse_args()
+
+    logger = NullLogger()
+    db = InMemoryDB(TransactionManager(logger), logger)
+    statuses = [f'status{i}' for i in range(args.values)]
+    for i in range(args.keys):
+        db.set(f'k{i}', statuses[i % args.values])
+    for level in range(args.depth):
+        db.begin()
+        for i in range(level, args.keys, 100):
+            db.set(f'k{i}', statuses[(i + 1) % args.values])
+
+    print(f"{args.keys} keys, {args.values} values, {args.depth} open transactions")
+    start = time.perf_counter()
+    separate = {value: db.counts(value) for value in statuses}
+    one_by_one = time.perf_counter() - start
+    start = time.perf_counter()
+    together = db.counts_many(statuses)
+    single_pass = time.perf_counter() - start
+    start = time.perf_counter()
+    db.value_counts(args.values)
+    distribution = time.perf_counter() - start
+    assert separate == together
+    print(f"{'COUNTS x' + str(args.values):>16} {one_by_one * 1000:>9.1f} ms")
+    print(f"{'COUNTS multi':>16} {single_pass * 1000:>9.1f} ms")
+    print(f"{'VALUES TOP':>16} {distribution * 1000:>9.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Same command mix against the InMemoryDB, SQLite and mmap engines.
+
+Usage:
+    python benchmarks/bench_engines.py [--keys N] [--ops N]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import InMemoryDB
+from app.logger import NullLogger
+from app.mmap_db import MmapDB
+from app.sqlite_db import SQLiteDB
+from app.transaction_manager import TransactionManager
+
+# command -> weight
+MIX = {'set': 30, 'get': 50, 'unset': 5, 'counts': 1, 'find': 1, 'tx': 13}
+
+def _engines(directory):
+    logger = NullLogger()
+    yield 'inmemory', lambda: InMemoryDB(TransactionManager(logger), logger)
+    yield 'sqlite', lambda: SQLiteDB(os.path.join(directory, 'bench.sqlite'), logger)
+    yield 'mmap', lambda: MmapDB(os.path.join(directory, 'bench.mmap'), TransactionManager(logger), logger)
+
+def _workload(keys: int, ops: int, seed: int = 1):
+    rng = random.Random(seed)
+    names = list(MIX)
+    weights = list(MIX.values())
+    return [(rng.choices(names, weights)[0], f'key{rng.randrange(keys)}', str(rng.randrange(100)))
+            for _ in range(ops)]
+
+def _run(db, workload) -> float:
+    start = time.perf_counter()
+    for command, key, value in workload:
+        if command == 'set':
+            db.set(key, value)
+        elif command == 'get':
+            db.get(key)
+        elif command == 'unset':
+            db.unset(key)
+        elif command == 'counts':
+            db.counts(value)
+        elif command == 'find':
+            db.find(value)
+        else:
+            db.begin()
+            db.set(key, value)
+            db.get(key)
+            db.commit()
+    return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--keys', type=int, default=10_000)
+    parser.add_argument('--ops', type=int, default=20_000)
+    args = parser.parse_args()
+
+    workload = _workload(args.keys, args.ops)
+    preload = [(f'key{i}', str(i % 100)) for i in range(args.keys)]
+    directory = tempfile.mkdtemp()
+    try:
+        print(f"{'engine':<10} {'ops/s':>10} {'us/op':>8}")
+        for name, factory in _engines(directory):
+            db = factory()
+            for key, value in preload:
+                db.set(key, value)
+            elapsed = _run(db, workload)
+            print(f"{name:<10} {args.ops / elapsed:>10,.0f} {elapsed / args.ops * 1e6:>8.1f}")
+            if hasattr(db, 'close'):
+                db.close()
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""FIND over many matching keys: full result vs streamed output vs cursor pages.
+
+Measures time to the first output, total time and the peak traced
+memory of producing the display text for every matching key.
+
+Usage:
+    python benchmarks/bench_find.py [--keys N]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.commands import CommandRegistry, format_page
+from app.db import InMemoryDB
+from app.logger import NullLogger
+from app.transaction_manager import TransactionManager
+
+def _full(registry: CommandRegistry):
+    yield registry.dispatch('find', ['x'])
+
+def _stream(registry: CommandRegistry):
+    return registry.dispatch_stream('find', ['x'])
+
+def _pages(registry: CommandRegistry):
+    cursor = 0
+    while True:
+        cursor, keys = registry.execute('find', 'x', 'cursor', str(cursor), 'count', '1000')
+        yield format_page((cursor, keys))
+        if not cursor:
+            break
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--keys', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    logger = NullLogger()
+    database = InMemoryDB(TransactionManager(logger), logger)
+    for i in range(args.keys):
+        database.set(f'key:{i:08d}', 'x')
+    registry = CommandRegistry(database, logger)
+
+    print(f"FIND over {args.keys} matching keys")
+    print(f"{'mode':>8} {'first ms':>9} {'total ms':>9} {'peak MiB':>9}")
+    for label, run in (('full', _full), ('stream', _stream), ('pages', _pages)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        first = None
+        for fragment in run(registry):
+            if first is None:
+                first = time.perf_counter() - start
+            del fragment  # discarded as if written to the terminal
+        total = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{label:>8} {first * 1000:>9.1f} {total * 1000:>9.1f} {peak / 1024 / 1024:>9.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Command dispatch overhead with 0, 1 and 10 hooks installed.
+
+Usage:
+    python benchmarks/bench_hooks.py [--ops N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.commands import CommandRegistry
+from app.db import InMemoryDB
+from app.logger import NullLogger
+from app.transaction_manager import TransactionManager
+
+def _registry() -> CommandRegistry:
+    logger = NullLogger()
+    database = InMemoryDB(TransactionManager(logger), logger)  # type: ignore
+    registry = CommandRegistry(database, logger)
+    registry.execute('set', 'A', '10')
+    return registry
+
+def _run(registry: CommandRegistry, ops: int) -> float:
+    execute = registry.execute
+    start = time.perf_counter()
+    for _ in range(ops):
+        execute('get', 'A')
+    return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=200_000)
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'hooks':>5} {'ops/s':>12} {'ns/op':>8} {'overhead':>9}")
+    for hooks in (0, 1, 10):
+        registry = _registry()
+        counter = [0]
+        for _ in range(hooks):
+            def post(name, call_args, result, counter=counter):
+                counter[0] += 1
+            registry.add_hook(post=post)
+        elapsed = min(_run(registry, args.ops) for _ in range(3))
+        per_op = elapsed / args.ops * 1e9
+        if baseline is None:
+            baseline = per_op
+        print(f"{hooks:>5} {args.ops / elapsed:>12,.0f} {per_op:>8.0f} "
+              f"{(per_op / baseline - 1) * 100:>8.1f}%")
+
+if __name__ == '__main__':
+    main()
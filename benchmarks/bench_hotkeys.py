@@ -0,0 +1,60 @@
+"""Hot-key tracking overhead per command and ranking accuracy on Zipf traffic.
+
+Runs the same GET/SET stream with tracking off and at several sample
+rates, then compares the tracked top keys with the exact counts.
+
+Usage:
+    python benchmarks/bench_hotkeys.py [--ops N] [--keys N] [--top N]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import bench as load
+from app.commands import CommandRegistry
+from app.db import InMemoryDB
+from app.hotkeys import HotKeyTracker
+from app.logger import NullLogger
+from app.transaction_manager import TransactionManager
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=200_000)
+    parser.add_argument('--keys', type=int, default=100_000)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    commands = load.generate(args.ops, args.keys, 'zipf', {'get': 80, 'set': 20})
+    exact = Counter(c[1] for c in commands if c[0] == 'get')
+    truth = [key for key, _ in exact.most_common(args.top)]
+
+    print(f"{args.ops} commands over {args.keys} zipf keys")
+    print(f"{'sampling':>9} {'ns/op':>8} {'overhead':>9} {'top-%d recall' % args.top:>14}")
+    baseline = None
+    for rate in (None, 0.001, 0.01, 0.1, 1.0):
+        logger = NullLogger()
+        database = InMemoryDB(TransactionManager(logger), logger)
+        registry = CommandRegistry(database, logger)
+        tracker = HotKeyTracker(registry, logger, sample_rate=rate or 1.0, half_life=0)
+        if rate is not None:
+            tracker.start()
+        execute = registry.execute
+        start = time.perf_counter()
+        for command in commands:
+            execute(*command)
+        per_op = (time.perf_counter() - start) / len(commands) * 1e9
+        if baseline is None:
+            baseline = per_op
+        label = 'off' if rate is None else f'{rate:g}'
+        recall = '-'
+        if rate is not None:
+            found = {key for key, _ in tracker.top(args.top)['reads']}
+            recall = f"{len(found.intersection(truth)) / len(truth):.0%}"
+        print(f"{label:>9} {per_op:>8.0f} {per_op / baseline - 1:>9.1%} {recall:>14}")
+
+if __name__ == '__main__':
+    main()
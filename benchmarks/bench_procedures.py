@@ -0,0 +1,90 @@
+"""Multi-key operations as separate commands, a transaction pipeline and one CALL.
+
+Each operation reads --width keys, sums them and writes the total back
+to every key. It runs as individual commands (one round trip each), as a
+pipelined BEGIN..COMMIT block and as a stored procedure, against a server
+started in a child process.
+
+Usage:
+    python benchmarks/bench_procedures.py [--ops N] [--width N]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.client import Client
+from app.commands import CommandRegistry
+from app.db import InMemoryDB
+from app.logger import NullLogger
+from app.server import Server
+from app.transaction_manager import TransactionManager
+
+def rebalance(db, *keys: str) -> int:
+    """Write the sum of the keys back to each of them."""
+    total = sum(int(db.get(key) or 0) for key in keys)
+    for key in keys:
+        db.set(key, str(total % 1000))
+    return total
+
+def _serve(port, ready) -> None:
+    logger = NullLogger()
+    db = InMemoryDB(TransactionManager(logger), logger)
+    registry = CommandRegistry(db, logger)
+    registry.register_procedure('rebalance', rebalance)
+    server = Server(registry, db, logger, '127.0.0.1:0')  # type: ignore
+    server.start()
+    port.value = int(server.address.rpartition(':')[2])
+    ready.set()
+    while True:
+        time.sleep(1)
+
+def _commands(client: Client, keys) -> None:
+    total = sum(int(client.get(key) or 0) for key in keys)
+    for key in keys:
+        client.set(key, str(total % 1000))
+
+def _pipeline(client: Client, keys) -> None:
+    # Values must be read before the writes are known, so two round trips
+    pipe = client.pipeline()
+    for key in keys:
+        pipe.get(key)
+    total = sum(int(v or 0) for v in pipe.execute())
+    pipe.execute_command('begin')
+    for key in keys:
+        pipe.set(key, str(total % 1000))
+    pipe.execute_command('commit')
+    pipe.execute()
+
+def _call(client: Client, keys) -> None:
+    client.call('rebalance', *keys)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=2000)
+    parser.add_argument('--width', type=int, default=10)
+    args = parser.parse_args()
+
+    port = multiprocessing.Value('i', 0)
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=_serve, args=(port, ready), daemon=True)
+    process.start()
+    ready.wait()
+    try:
+        client = Client(f'127.0.0.1:{port.value}', max_connections=1)
+        print(f"{args.ops} operations over {args.width} keys")
+        print(f"{'mode':>10} {'ops/s':>10}")
+        for label, run in (('commands', _commands), ('pipeline', _pipeline), ('call', _call)):
+            start = time.perf_counter()
+            for i in range(args.ops):
+                run(client, [f'k{(i + j) % 100}' for j in range(args.width)])
+            print(f"{label:>10} {args.ops / (time.perf_counter() - start):>10,.0f}")
+        client.close()
+    finally:
+        process.terminate()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Memory and time of one large transaction with and without spilling.
+
+Runs a backfill of N keys inside a single BEGIN ... COMMIT, reading a
+sample of keys back before committing, and reports the traced Python
+heap peak while the transaction is open, the time of the writes, the
+reads and the COMMIT, with layers kept in memory and with layers
+spilled to disk beyond --spill-bytes.
+
+Usage:
+    python benchmarks/bench_spill.py [--keys N] [--size BYTES] [--spill-bytes BYTES]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import InMemoryDB
+from app.logger import NullLogger
+from app.transaction_manager import TransactionManager
+
+def _run(keys: int, size: int, spill_bytes: int) -> None:
+    logger = NullLogger()
+    tm = TransactionManager(logger, spill_bytes=spill_bytes)
+    db = InMemoryDB(tm, logger)
+    sample = random.Random(1).sample(range(keys), min(keys, 10000))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    db.begin()
+    for i in range(keys):
+        db.set(f'k{i}', chr(97 + i % 26) * size)
+    write_s = time.perf_counter() - start
+    open_peak = tracemalloc.get_traced_memory()[1]
+    spilled = tm.layer_stats()[1].get('spilled', 0)
+
+    start = time.perf_counter()
+    for i in sample:
+        db.get(f'k{i}')
+    read_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+    start = time.perf_counter()
+    db.commit()
+    commit_s = time.perf_counter() - start
+    tracemalloc.stop()
+
+    label = 'spill' if spill_bytes else 'memory'
+    print(f"{label:>7} {open_peak / 1024 / 1024:>10.1f} {write_s:>8.2f} {read_us:>9.1f} "
+          f"{commit_s:>9.2f} {spilled / 1024 / 1024:>9.1f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--keys', type=int, default=500000)
+    parser.add_argument('--size', type=int, default=64)
+    parser.add_argument('--spill-bytes', type=int, default=8 * 1024 * 1024)
+    args = parser.parse_args()
+
+    print(f"{args.keys} keys of {args.size} bytes in one transaction")
+    print(f"{'layers':>7} {'peak MiB':>10} {'write s':>8} {'get us':>9} {'commit s':>9} {'disk MiB':>9}")
+    _run(args.keys, args.size, 0)
+    _run(args.keys, args.size, args.spill_bytes)
+
+if __name__ == '__main__':
+    main()
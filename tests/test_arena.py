@@ -0,0 +1,136 @@
+import sys
+from app.arena import BlobArena, BlobRef
+from app.codec import ValueCodec
+from app.config import Config
+from app.database_factory import DatabaseFactory
+from app.db import InMemoryDB
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+class TestBlobArena:
+    def setup_method(self):
+        """Create a small arena before each test"""
+        self.arena = BlobArena(NullLogger(), threshold=8, segment_size=64)
+
+    def test_store_and_free(self):
+        """Test that blobs round-trip and an emptied segment is dropped"""
+        first = self.arena.store(b'a' * 40)
+        second = self.arena.store(b'b' * 40)  # does not fit: new segment
+        assert self.arena.load(first) == b'a' * 40
+        assert bytes(self.arena.view(second)) == b'b' * 40
+        assert self.arena.stats()['segments'] == 2
+        self.arena.free(first)
+        self.arena.free(first)  # freeing twice is harmless
+        assert self.arena.stats()['segments'] == 1
+        assert self.arena.stats()['live'] == 40
+
+    def test_oversized_blob_gets_own_segment(self):
+        """Test values larger than a segment"""
+        ref = self.arena.store(b'x' * 100)
+        assert self.arena.load(ref) == b'x' * 100
+        self.arena.free(ref)
+        assert self.arena.stats()['segments'] == 0
+
+    def test_compaction_moves_live_blobs(self):
+        """Test that compaction relocates survivors and drops the old segment"""
+        refs = [self.arena.store(bytes([i]) * 16) for i in range(4)]
+        self.arena.store(b'z' * 16)  # next segment becomes current
+        for ref in refs[:3]:
+            self.arena.free(ref)
+        old_segment = refs[3].segment
+        assert self.arena.compact() == 64
+        assert refs[3].segment is not old_segment
+        assert self.arena.load(refs[3]) == bytes([3]) * 16
+        assert self.arena.stats()['garbage'] == 0
+
+    def test_refs_compare_by_content(self):
+        """Test ref equality and size accounting"""
+        ref = self.arena.store(b'payload!')
+        assert ref == b'payload!'
+        assert ref == self.arena.store(b'payload!')
+        assert ref != b'payload?'
+        assert sys.getsizeof(ref) >= 8
+
+class TestArenaDB:
+    def setup_method(self):
+        """Create a database with an arena before each test"""
+        logger = NullLogger()
+        self.arena = BlobArena(logger, threshold=16, segment_size=4096)
+        self.db = InMemoryDB(TransactionManager(logger), logger, arena=self.arena)
+        self.big = 'v' * 100
+
+    def test_large_values_live_in_arena(self):
+        """Test that only large values become refs"""
+        self.db.set('A', self.big)
+        self.db.set('B', 'small')
+        base = self.db._transaction_manager.get_all_layers()[0]
+        assert isinstance(base['A'], BlobRef) and base['B'] == 'small'
+        assert self.db.get('A') == self.big
+        assert self.db.snapshot() == {'A': self.big, 'B': 'small'}
+
+    def test_overwrite_and_unset_release_space(self):
+        """Test that replaced and removed values free their blobs"""
+        self.db.set('A', self.big)
+        self.db.set('A', 'w' * 100)
+        assert self.arena.stats()['blobs'] == 1
+        self.db.unset('A')
+        assert self.arena.stats()['blobs'] == 0
+
+    def test_rollback_releases_layer(self):
+        """Test that popping a layer frees the blobs written in it"""
+        self.db.set('A', self.big)
+        self.db.begin()
+        for i in range(10):
+            self.db.set(f'k{i}', str(i) * 50)
+        assert self.arena.stats()['blobs'] == 11
+        self.db.rollback()
+        assert self.arena.stats()['blobs'] == 1
+        assert self.db.get('A') == self.big
+
+    def test_commit_releases_overwritten(self):
+        """Test that committing frees the parent values it replaces"""
+        self.db.set('A', self.big)
+        self.db.begin()
+        self.db.set('A', 'w' * 100)
+        self.db.commit()
+        assert self.arena.stats()['blobs'] == 1
+        assert self.db.get('A') == 'w' * 100
+
+    def test_counts_and_find(self):
+        """Test that COUNTS/FIND match arena values without decoding them"""
+        self.db.set('A', self.big)
+        self.db.set('B', self.big)
+        self.db.begin()
+        self.db.unset('A')
+        assert self.db.counts(self.big) == 1
+        assert self.db.find(self.big) == ['B']
+
+    def test_with_codec(self):
+        """Test that values round-trip through codec and arena together"""
+        logger = NullLogger()
+        db = InMemoryDB(TransactionManager(logger), logger,
+                        codec=ValueCodec(threshold=16), arena=self.arena)
+        value = ''.join(chr(65 + i % 26) for i in range(200))
+        db.set('A', value)
+        assert db.get('A') == value
+        assert db.counts(value) == 1
+
+    def test_binary_view_is_zero_copy(self):
+        """Test that get_view returns a view over the arena segment"""
+        logger = NullLogger()
+        db = InMemoryDB(TransactionManager(logger), logger, binary=True, arena=self.arena)
+        payload = bytes(range(200))
+        db.set(b'A', payload)
+        view = db.get_view(b'A')
+        assert view == payload and view.readonly
+        assert view.obj is db._transaction_manager.get_all_layers()[0][b'A'].segment.buffer
+
+    def test_info_and_factory(self):
+        """Test INFO counters and enabling the arena through configuration"""
+        self.db.set('A', self.big)
+        assert self.db.info()['arena']['live'] == 100
+        config = Config('nonexistent.yaml')
+        config.set('database.arena.enabled', True)
+        config.set('database.arena.compact_interval', 0)
+        db = DatabaseFactory.create_database(config, NullLogger())
+        assert isinstance(db._arena, BlobArena)  # type: ignore
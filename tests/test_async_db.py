@@ -0,0 +1,175 @@
+import asyncio
+import pytest
+from app.async_db import AsyncDatabase
+from app.config import Config
+from app.database_factory import DatabaseFactory
+from app.db import InMemoryDB
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+def run(coro):
+    return asyncio.run(coro)
+
+class TestAsyncDatabase:
+    def setup_method(self):
+        """Create a new async DB before each test"""
+        logger = NullLogger()
+        self.db = InMemoryDB(TransactionManager(logger), logger)
+        self.adb = AsyncDatabase(self.db, logger, chunk_size=2)  # type: ignore
+
+    def test_set_get_unset(self):
+        """Test basic awaitable operations"""
+        async def scenario():
+            await self.adb.set('A', '10')
+            assert await self.adb.get('A') == '10'
+            await self.adb.unset('A')
+            assert await self.adb.get('A') is None
+        run(scenario())
+
+    def test_chunked_counts_and_find(self):
+        """Test scans spanning several chunks"""
+        for i in range(7):
+            self.db.set(f'k{i}', 'x' if i % 2 else 'y')
+        async def scenario():
+            assert await self.adb.counts('x') == 3
+            assert sorted(await self.adb.find('y')) == ['k0', 'k2', 'k4', 'k6']
+        run(scenario())
+
+    def test_scan_yields_to_event_loop(self):
+        """Test that other tasks run while a scan is in progress"""
+        for i in range(10):
+            self.db.set(f'k{i}', 'v')
+        ticks = []
+        async def ticker():
+            for _ in range(3):
+                ticks.append(len(ticks))
+                await asyncio.sleep(0)
+        async def scenario():
+            task = asyncio.create_task(ticker())
+            assert await self.adb.counts('v') == 10
+            await task
+        run(scenario())
+        assert ticks == [0, 1, 2]
+
+    def test_commit_is_atomic_to_scans(self):
+        """Test that a scan never sees part of a commit made while it is paused"""
+        for i in range(10):
+            self.db.set(f'k{i}', 'old')
+        async def committer():
+            async with self.adb.transaction():
+                for i in range(10):
+                    await self.adb.set(f'k{i}', 'new')
+        async def scenario():
+            values = []
+            task = None
+            async for chunk in self.adb.scan():
+                values.extend(v for _, v in chunk)
+                if task is None:
+                    task = asyncio.create_task(committer())
+                    await asyncio.sleep(0.01)
+            await task
+            assert values == ['old'] * 10
+            assert await self.adb.counts('new') == 10
+            async for _ in self.adb.scan():
+                # A task's own scan does not hold up its commit
+                async with self.adb.transaction():
+                    await self.adb.set('k0', 'own')
+            assert await self.adb.get('k0') == 'own'
+        run(scenario())
+
+    def test_reader_is_not_blocked_by_pending_commit(self):
+        """Test that a scanning task can read and write while another task commits"""
+        for i in range(6):
+            self.db.set(f'k{i}', 'old')
+        async def committer():
+            async with self.adb.transaction():
+                await self.adb.set('k5', 'new')
+        async def reader():
+            seen = []
+            async for chunk in self.adb.scan():
+                seen.extend(v for _, v in chunk)
+                assert await self.adb.get('k0') == 'old'
+                await self.adb.set('r', '1')
+                await self.adb.unset('r')
+                assert await self.adb.snapshot()
+                async for _ in self.adb.scan():
+                    break
+                await asyncio.sleep(0.001)
+            return seen
+        async def scenario():
+            seen, _ = await asyncio.wait_for(asyncio.gather(reader(), committer()), 3)
+            assert seen == ['old'] * 6
+            assert await self.adb.get('k5') == 'new'
+        run(scenario())
+
+    def test_transactions_are_per_task(self):
+        """Test that a task's open transaction is invisible to other tasks"""
+        self.db.set('A', '1')
+        seen = {}
+        async def writer(started, release):
+            async with self.adb.transaction():
+                await self.adb.set('A', '2')
+                assert await self.adb.get('A') == '2'
+                assert await self.adb.counts('2') == 1
+                started.set()
+                await release.wait()
+        async def reader(started, release):
+            await started.wait()
+            seen['during'] = await self.adb.get('A')
+            seen['depth'] = await self.adb.get_transaction_depth()
+            release.set()
+        async def scenario():
+            started, release = asyncio.Event(), asyncio.Event()
+            await asyncio.gather(writer(started, release), reader(started, release))
+            seen['after'] = await self.adb.get('A')
+        run(scenario())
+        assert seen == {'during': '1', 'depth': 0, 'after': '2'}
+
+    def test_child_task_cannot_commit_parent_transaction(self):
+        """Test that a task started inside a transaction does not share it"""
+        seen = {}
+        async def child():
+            seen['get'] = await self.adb.get('P')
+            seen['depth'] = await self.adb.get_transaction_depth()
+            seen['commit'] = await self.adb.commit()
+            await self.adb.set('C', '1')
+        async def scenario():
+            await self.adb.begin()
+            await self.adb.set('P', '1')
+            await asyncio.create_task(child())
+            assert await self.adb.get('P') == '1'
+            await self.adb.rollback()
+        run(scenario())
+        assert seen == {'get': None, 'depth': 0, 'commit': False}
+        assert self.db.get('P') is None and self.db.get('C') == '1'
+
+    def test_nested_rollback_and_large_commit(self):
+        """Test nested task transactions and an executor-applied commit"""
+        async def scenario():
+            await self.adb.begin()
+            for i in range(5):
+                await self.adb.set(f'k{i}', 'v')
+            await self.adb.begin()
+            await self.adb.unset('k0')
+            assert await self.adb.get('k0') is None
+            assert await self.adb.rollback()
+            assert await self.adb.commit()
+            assert not await self.adb.commit()
+        run(scenario())
+        assert self.db.counts('v') == 5
+
+    def test_transaction_context_rolls_back_on_error(self):
+        """Test that an exception in a transaction block rolls back"""
+        async def scenario():
+            with pytest.raises(RuntimeError):
+                async with self.adb.transaction():
+                    await self.adb.set('A', '10')
+                    raise RuntimeError('boom')
+            assert await self.adb.get('A') is None
+        run(scenario())
+
+    def test_factory(self):
+        """Test building the facade through DatabaseFactory"""
+        adb = DatabaseFactory.create_async_database(Config('nonexistent.yaml'), NullLogger())
+        assert isinstance(adb, AsyncDatabase)
+        assert run(adb.snapshot()) == {}
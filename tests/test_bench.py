@@ -0,0 +1,53 @@
+import pytest
+from app import bench
+from app.commands import CommandRegistry
+from app.db import InMemoryDB
+from app.server import Server
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+class TestBench:
+    def setup_method(self):
+        """Create a new database and registry before each test"""
+        self.logger = NullLogger()
+        self.db = InMemoryDB(TransactionManager(self.logger), self.logger)
+        self.registry = CommandRegistry(self.db, self.logger)  # type: ignore
+
+    def test_generate(self):
+        """Test the command mix and key space"""
+        commands = bench.generate(1000, 50, 'zipf', seed=3)
+        assert commands == bench.generate(1000, 50, 'zipf', seed=3)
+        names = {c[0] for c in commands}
+        assert names == {'set', 'get', 'unset', 'counts', 'find', 'begin', 'commit'}
+        keys = [c[1] for c in commands if c[0] == 'get']
+        assert all(0 <= int(k.split(':')[1]) < 50 for k in keys)
+        # Zipf favours low key indexes
+        assert keys.count('key:0') > keys.count('key:40')
+
+    def test_parse_mix(self):
+        """Test command weights parsing"""
+        assert bench.parse_mix('set=3, get=7') == {'set': 3, 'get': 7}
+        with pytest.raises(ValueError):
+            bench.parse_mix('drop=1')
+
+    def test_in_process_concurrent(self):
+        """Test concurrent pipelined runs keep transactions on one worker"""
+        commands = bench.generate(2000, 100)
+        result = bench.run(commands, bench.in_process(self.registry, self.db),
+                           concurrency=4, pipeline=8)
+        assert result.commands == len(commands)
+        assert result.errors == 0
+        assert self.db.get_transaction_depth() == 0
+        assert 'p99' in result.report()
+
+    def test_against_server(self):
+        """Test a run against a local server"""
+        server = Server(self.registry, self.db, self.logger, '127.0.0.1:0')  # type: ignore
+        server.start()
+        try:
+            commands = bench.generate(500, 100)
+            result = bench.run(commands, bench.remote(server.address), concurrency=2, pipeline=4)
+        finally:
+            server.stop()
+        assert result.errors == 0
+        assert result.throughput > 0
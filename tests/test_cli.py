@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 import pytest
 from click.testing import CliRunner
 from app.cli import cli
@@ -49,6 +52,10 @@ class TestCLI:
         result = self.runner.invoke(cli, ['counts', '10'])
         assert result.exit_code == 0
         assert result.output.strip() == '2'
+        result = self.runner.invoke(cli, ['counts', '10', '20', '30'])
+        assert result.exit_code == 0
+        assert result.output.strip() == '10 2\n20 1\n30 0'
+        assert self.runner.invoke(cli, ['counts']).exit_code != 0
 
     def test_find_command(self):
         """Test CLI FIND command"""
@@ -106,4 +113,30 @@ class TestCLI:
     def test_interactive_command(self):
         """Test interactive command exists"""
         result = self.runner.invoke(cli, ['interactive', '--help'])
-        assert result.exit_code == 0 
\ No newline at end of file
+        assert result.exit_code == 0 
+
+    def test_sqlite_write_survives_exit(self, tmp_path):
+        """Test that a one-shot SET on the sqlite engine is committed when the process exits"""
+        (tmp_path / 'config.yaml').write_text(
+            f"database:\n  type: sqlite\n  sqlite:\n    path: {tmp_path / 'db.sqlite'}\n")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        main = [sys.executable, os.path.join(root, 'main.py')]
+        env = dict(os.environ, PYTHONPATH=root)
+        subprocess.run(main + ['set', 'k', '1'], cwd=tmp_path, env=env, check=True)
+        result = subprocess.run(main + ['get', 'k'], cwd=tmp_path, env=env, check=True,
+                                capture_output=True, text=True)
+        assert result.stdout.strip() == '1'
+
+    def test_one_shot_command_skips_optional_modules(self, tmp_path):
+        """Test that a one-shot GET imports no server, pool or plugin modules"""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        probe = ("import sys; from app.cli import cli\n"
+                 "try:\n    cli(['get', 'A'])\nexcept SystemExit:\n    pass\n"
+                 "print(' '.join(sorted(m for m in sys.modules if m.startswith('app.'))))")
+        result = subprocess.run([sys.executable, '-c', probe], cwd=tmp_path, check=True,
+                                env=dict(os.environ, PYTHONPATH=root), capture_output=True, text=True)
+        loaded = result.stdout.split('\n')[-2].split()
+        for module in ('app.offload', 'app.server', 'app.bench', 'app.replication', 'app.trace',
+                       'app.hotkeys', 'app.shm_replica', 'app.plugins.echo_plugin',
+                       'app.mmap_db', 'app.sqlite_db', 'app.async_db', 'app.arena', 'app.codec'):
+            assert module not in loaded
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import pytest
+from app.async_client import AsyncClient
+from app.client import Client, ConnectionPool
+from app.commands import CommandRegistry
+from app.db import InMemoryDB
+from app.protocol import ReplyError, encode_command, encode_command_into
+from app.server import Server
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+class TestClient:
+    def setup_method(self):
+        """Start a server on a free port before each test"""
+        logger = NullLogger()
+        self.db = InMemoryDB(TransactionManager(logger), logger)
+        self.server = Server(CommandRegistry(self.db, logger), self.db, logger, '127.0.0.1:0')  # type: ignore
+        self.server.start()
+        self.client = Client(self.server.address, max_connections=2)
+
+    def teardown_method(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_commands(self):
+        """Test single commands and error replies"""
+        assert self.client.ping() == 'PONG'
+        self.client.set('A', '10')
+        self.client.set('B', '10')
+        assert self.client.get('A') == '10'
+        assert self.client.get('missing') is None
+        assert self.client.counts('10') == 2
+        assert sorted(self.client.find('10')) == ['A', 'B']
+        with pytest.raises(ReplyError):
+            self.client.execute_command('bogus')
+        assert self.client.get('A') == '10'  # the connection is still usable
+
+    def test_pipeline(self):
+        """Test that a pipeline returns replies in order and can keep errors"""
+        pipe = self.client.pipeline()
+        for i in range(100):
+            pipe.set(f'k{i}', str(i))
+        pipe.get('k42').counts('7')
+        assert len(pipe) == 102
+        replies = pipe.execute()
+        assert replies[-2:] == ['42', 1]
+        assert len(pipe) == 0
+        replies = pipe.get('k1').execute_command('bogus').get('k2').execute(raise_on_error=False)
+        assert replies[0] == '1' and isinstance(replies[1], ReplyError) and replies[2] == '2'
+        with pytest.raises(ReplyError):
+            pipe.execute_command('bogus').execute()
+
+    def test_transaction(self):
+        """Test that a transaction block commits, or rolls back on error"""
+        with self.client.transaction() as tx:
+            tx.set('A', '1').set('B', '2')
+            assert self.db.get_transaction_depth() == 0  # nothing sent yet
+            tx.get('A')
+            assert tx.execute() == [None, None, '1']
+            tx.set('C', '3')
+        assert tx.results == [None, None, '1', None]
+        assert self.client.get('C') == '3'
+        with pytest.raises(KeyError):
+            with self.client.transaction() as tx:
+                tx.set('A', 'changed')
+                tx.execute()
+                raise KeyError('abort')
+        assert self.client.get('A') == '1'
+        assert self.db.get_transaction_depth() == 0
+
+    def test_pool_limits_connections(self):
+        """Test that threads share at most max_connections connections"""
+        pool = self.client.pool
+        errors = []
+
+        def work():
+            try:
+                for i in range(50):
+                    self.client.set(f'{threading.get_ident()}:{i}', 'v')
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert pool._open <= 2
+        assert self.client.counts('v') == 250
+
+    def test_broken_connection_is_discarded(self):
+        """Test that a failed connection does not go back to the pool"""
+        pool = ConnectionPool(self.server.address, max_connections=1)
+        with pytest.raises(ConnectionError):
+            with pool.connection():
+                raise ConnectionError('lost')
+        assert (pool._open, pool._idle) == (0, [])
+        with pool.connection() as connection:
+            assert connection.execute([['ping']]) == ['PONG']
+
+    def test_async_client(self):
+        """Test the asyncio client, pipeline and transaction"""
+        async def scenario():
+            client = AsyncClient(self.server.address, max_connections=2)
+            await client.set('A', '1')
+            results = await asyncio.gather(*(client.get('A') for _ in range(10)))
+            pipe = client.pipeline()
+            for i in range(10):
+                pipe.set(f'k{i}', 'x')
+            pipe.counts('x')
+            replies = await pipe.execute()
+            async with client.transaction() as tx:
+                tx.set('B', '2').get('B')
+            await client.close()
+            return results, replies[-1], tx.results
+
+        results, count, tx_results = asyncio.run(scenario())
+        assert results == ['1'] * 10
+        assert count == 10
+        assert tx_results == [None, '2']
+        assert self.db.get('B') == '2'
+
+class TestEncoding:
+    def test_encode_into_reuses_buffer(self):
+        """Test that requests appended to a buffer match encode_command"""
+        buffer = bytearray()
+        encode_command_into(buffer, ['set', 'A', 'значение'])
+        encode_command_into(buffer, ['get', 'A'])
+        assert bytes(buffer) == encode_command(['set', 'A', 'значение']) + encode_command(['get', 'A'])
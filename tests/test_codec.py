@@ -0,0 +1,131 @@
+import json
+import pytest
+from app.codec import ValueCodec, CompressedValue
+from app.config import Config
+from app.database_factory import DatabaseFactory
+from app.db import InMemoryDB
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+def document(i):
+    return json.dumps({'id': i % 3, 'name': 'user', 'tags': ['a', 'b', 'c'] * 40})
+
+class TestValueCodec:
+    def setup_method(self):
+        """Create a new codec before each test"""
+        self.codec = ValueCodec(threshold=64)
+
+    def test_small_values_stay_text(self):
+        """Test that values below the threshold are stored as is"""
+        assert self.codec.encode('short') == 'short'
+        assert self.codec.decode('short') == 'short'
+        assert self.codec.decode(None) is None
+
+    def test_round_trip(self):
+        """Test compressing and decompressing a large value"""
+        value = document(1)
+        stored = self.codec.encode(value)
+        assert isinstance(stored, CompressedValue)
+        assert len(stored.data) < len(value)
+        assert self.codec.decode(stored) == value
+
+    def test_incompressible_value_is_kept_raw(self):
+        """Test that values that don't shrink still compare by digest"""
+        value = ''.join(chr(0x4e00 + (i * 7919) % 20000) for i in range(100))
+        stored = self.codec.encode(value)
+        assert self.codec.decode(stored) == value
+        assert stored == self.codec.probe(value)
+
+    def test_probe_matches_stored_form(self):
+        """Test that probes compare equal without compressing"""
+        stored = self.codec.encode(document(1))
+        assert stored == self.codec.probe(document(1))
+        assert stored != self.codec.probe(document(2))
+
+    def test_lzma(self):
+        """Test the lzma algorithm"""
+        codec = ValueCodec(threshold=64, algorithm='lzma')
+        value = document(1)
+        assert codec.decode(codec.encode(value)) == value
+
+    def test_unknown_algorithm(self):
+        """Test that an unknown algorithm is rejected"""
+        with pytest.raises(ValueError):
+            ValueCodec(algorithm='brotli')
+
+    def test_trained_dictionary(self):
+        """Test that a trained dictionary improves compression of similar values"""
+        samples = [document(i) for i in range(20)]
+        dictionary = ValueCodec.train(samples)
+        assert dictionary
+        codec = ValueCodec(threshold=64, dictionary=dictionary)
+        plain = self.codec.encode(document(7))
+        trained = codec.encode(document(7))
+        assert len(trained.data) < len(plain.data)  # type: ignore
+        assert codec.decode(trained) == document(7)
+
+    def test_stats(self):
+        """Test memory saved and CPU cost counters"""
+        self.codec.decode(self.codec.encode(document(1)))
+        stats = self.codec.stats()
+        assert stats['values_encoded'] == 1
+        assert stats['values_decoded'] == 1
+        assert stats['saved_bytes'] > 0
+        assert stats['raw_bytes'] == len(document(1))
+
+class TestCompressedDB:
+    def setup_method(self):
+        """Create a new database with compression before each test"""
+        logger = NullLogger()
+        self.codec = ValueCodec(threshold=64)
+        self.db = InMemoryDB(TransactionManager(logger), logger, codec=self.codec)
+
+    def test_set_get(self):
+        """Test that compression is transparent to GET"""
+        self.db.set('a', document(1))
+        self.db.set('b', 'small')
+        assert self.db.get('a') == document(1)
+        assert self.db.get('b') == 'small'
+
+    def test_counts_find_do_not_decompress(self):
+        """Test that COUNTS and FIND compare by content hash"""
+        for i in range(6):
+            self.db.set(f'k{i}', document(i))
+        assert self.db.counts(document(0)) == 2
+        assert sorted(self.db.find(document(1))) == ['k1', 'k4']
+        assert self.codec.values_decoded == 0
+
+    def test_transactions(self):
+        """Test compressed values in nested transactions"""
+        self.db.set('a', document(0))
+        self.db.begin()
+        self.db.set('a', document(1))
+        assert self.db.counts(document(0)) == 0
+        self.db.rollback()
+        assert self.db.get('a') == document(0)
+        self.db.begin()
+        self.db.unset('a')
+        self.db.commit()
+        assert self.db.get('a') is None
+
+    def test_scan_snapshot_and_listeners_decode(self):
+        """Test that values leaving the database are text"""
+        changes = []
+        self.db.add_listener(changes.append)
+        self.db.set('a', document(0))
+        assert changes == [{'a': document(0)}]
+        assert self.db.snapshot() == {'a': document(0)}
+        assert list(self.db.scan()) == [[('a', document(0))]]
+        self.db.remove_listener(changes.append)
+        self.db.set('b', document(1))
+        assert len(changes) == 1
+
+    def test_factory(self):
+        """Test enabling compression through configuration"""
+        config = Config('nonexistent.yaml')
+        config._config['database']['compression']['enabled'] = True
+        config._config['database']['compression']['threshold'] = 64
+        db = DatabaseFactory.create_database(config, NullLogger())
+        db.set('a', document(0))
+        assert db.get('a') == document(0)
+        assert db.codec_stats()['values_encoded'] == 1  # type: ignore
@@ -0,0 +1,125 @@
+import pytest
+from app.columnar import NumericColumn, parse_number
+from app.commands import CommandRegistry
+from app.db import InMemoryDB
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+def numpy_mode():
+    pytest.importorskip('numpy')
+    return True
+
+class TestNumericColumn:
+    use_numpy = False
+
+    def setup_method(self):
+        """Create a database mirrored by a numeric column before each test"""
+        logger = NullLogger()
+        self.db = InMemoryDB(TransactionManager(logger), logger)
+        self.db.set('price:a', '10')
+        self.db.set('price:b', '2.5')
+        self.db.set('qty:a', '-3')
+        self.db.set('name', 'widget')
+        self.column = NumericColumn(logger, use_numpy=self.use_numpy)
+        self.column.attach(self.db)
+
+    def test_parse_number(self):
+        """Test which values are numeric"""
+        assert parse_number('1e3') == 1000.0
+        assert parse_number('abc') is None
+        assert parse_number('nan') is None
+        assert parse_number(None) is None
+
+    def test_aggregates(self):
+        """Test SUM/AVG/MIN/MAX with and without a prefix"""
+        assert len(self.column) == 3
+        assert self.column.sum() == 9.5
+        assert self.column.sum('price:') == 12.5
+        assert self.column.avg('price:') == 6.25
+        assert self.column.min() == -3
+        assert self.column.max('qty:') == -3
+        assert self.column.avg('missing:') is None
+        assert self.column.sum('missing:') == 0
+
+    def test_follows_commits(self):
+        """Test incremental updates, including removals and overwrites"""
+        self.db.begin()
+        self.db.set('price:c', '100')
+        assert self.column.sum('price:') == 12.5  # not committed yet
+        self.db.commit()
+        assert self.column.sum('price:') == 112.5
+        self.db.unset('price:a')
+        self.db.set('price:b', 'n/a')
+        self.db.set('qty:a', '4')
+        assert self.column.sum() == 104
+        assert len(self.column) == 2
+        self.db.begin()
+        self.db.set('price:d', '1')
+        self.db.rollback()
+        assert self.column.max() == 100
+
+    def test_histogram(self):
+        """Test equal-width buckets"""
+        buckets = self.column.histogram(2)
+        assert [count for _, _, count in buckets] == [2, 1]
+        assert buckets[0][0] == -3 and buckets[-1][1] == 10
+        assert self.column.histogram(3, 'missing:') == []
+        with pytest.raises(ValueError):
+            self.column.histogram(0)
+
+    def test_prefix_ranges(self):
+        """Test prefix filters as keys are added and removed out of order"""
+        for i in (5, 1, 9, 3, 7):
+            self.db.set(f'price:{i}', str(i))
+        self.db.set('price', '1000')
+        self.db.set('pricey', '2000')
+        assert self.column.sum('price:') == 37.5
+        self.db.unset('price:a')
+        self.db.unset('price:9')
+        assert self.column.sum('price:') == 18.5
+        assert self.column.sum('price') == 3018.5
+        assert self.column.sum('pricez') == 0
+
+    def test_listener_registered_before_snapshot(self):
+        """Test that attach follows commits before loading the snapshot"""
+        events = []
+        add_listener, snapshot = self.db.add_listener, self.db.snapshot
+        self.db.add_listener = lambda listener: events.append('listen') or add_listener(listener)
+        self.db.snapshot = lambda: events.append('snapshot') or snapshot()
+        NumericColumn(NullLogger(), use_numpy=self.use_numpy).attach(self.db)
+        assert events == ['listen', 'snapshot']
+
+    def test_detach(self):
+        """Test that a detached column stops following commits"""
+        self.column.detach()
+        self.db.set('price:z', '1000')
+        assert self.column.max() == 10
+
+class TestNumericColumnNumpy(TestNumericColumn):
+    use_numpy = None
+
+    def setup_method(self):
+        """Create a NumPy-backed column before each test"""
+        self.use_numpy = numpy_mode()
+        super().setup_method()
+        assert self.column.vectorized
+
+class TestAggregateCommands:
+    def setup_method(self):
+        """Create a new database and registry before each test"""
+        logger = NullLogger()
+        self.db = InMemoryDB(TransactionManager(logger), logger)
+        self.registry = CommandRegistry(self.db, logger)  # type: ignore
+
+    def test_commands(self):
+        """Test the aggregate commands end to end"""
+        assert self.registry.dispatch('sum', []) == '0'
+        assert self.registry.dispatch('avg', []) == 'NULL'
+        for i in range(1, 5):
+            self.registry.dispatch('set', [f'n{i}', str(i)])
+        self.registry.dispatch('set', ['x', '0.5'])
+        assert self.registry.dispatch('sum', ['n']) == '10'
+        assert self.registry.dispatch('avg', []) == '2.1'
+        assert self.registry.dispatch('min', []) == '0.5'
+        assert self.registry.dispatch('max', ['n']) == '4'
+        assert self.registry.dispatch('histogram', ['2', 'n']) == '1..2.5 2\n2.5..4 2'
@@ -1,8 +1,8 @@
 import pytest
-from app.commands import CommandRegistry
+from app.commands import CommandRegistry, CommandSpec, INVALID_ARGUMENTS, UNKNOWN_COMMAND
 from app.db import InMemoryDB
 from app.transaction_manager import TransactionManager
-from app.logger import ConsoleLogger
+from app.logger import ConsoleLogger, NullLogger
 
 class TestCommandRegistry:
     def setup_method(self):
@@ -97,6 +97,17 @@ class TestCommandRegistry:
         with pytest.raises(ValueError, match="Unknown command: unknown"):
             self.registry.execute('unknown')
 
+    def test_info(self):
+        """Test the INFO report"""
+        self.registry.execute('set', 'A', '10')
+        self.registry.execute('begin')
+        self.registry.execute('unset', 'A')
+        text = self.registry.dispatch('info', [])
+        lines = text.splitlines()  # type: ignore
+        assert lines[0] == 'depth: 1'
+        assert lines[1].startswith('base: keys=1 tombstones=0 bytes=')
+        assert lines[2].startswith('layer 1: keys=0 tombstones=1 bytes=')
+
     def test_help_text(self):
         """Test help text generation"""
         help_text = self.registry.get_help()
@@ -123,4 +134,139 @@ class TestCommandRegistry:
         
         assert 'custom' in self.registry.list_commands()
         result = self.registry.execute('custom', 'test')
-        assert result == 'Custom: test' 
\ No newline at end of file
+        assert result == 'Custom: test' 
+
+    def test_atomic_update_commands(self):
+        """Test INCR/DECR/APPEND/GETSET through dispatch"""
+        assert self.registry.dispatch('incr', ['hits']) == '1'
+        assert self.registry.dispatch('incr', ['hits', '9']) == '10'
+        assert self.registry.dispatch('decr', ['hits', '3']) == '7'
+        assert self.registry.dispatch('incr', ['hits', 'x']) == INVALID_ARGUMENTS
+        assert self.registry.dispatch('append', ['log', 'ab']) == '2'
+        assert self.registry.dispatch('getset', ['log', 'c']) == 'ab'
+        assert self.registry.dispatch('getset', ['other', 'c']) == 'NULL'
+        assert self.registry.execute('sum') == 7
+
+    def test_find_with_cursor(self):
+        """Test that FIND pages are stable while keys change between calls"""
+        for i in range(10):
+            self.database.set(f'k{i}', 'x')
+        cursor, first = self.registry.execute('find', 'x', 'COUNT', '4')
+        self.database.set('new', 'x')
+        self.database.unset(first[0])
+        self.database.unset('k9')
+        seen = list(first)
+        while cursor:
+            cursor, keys = self.registry.execute('find', 'x', 'cursor', str(cursor), 'count', '4')
+            seen.extend(keys)
+        assert sorted(seen) == [f'k{i}' for i in range(9)]
+        assert self.registry.dispatch('find', ['x', 'count', '2']).split('\n')[1] == 'k1 k2'
+        with pytest.raises(ValueError):
+            self.registry.execute('find', 'x', 'limit', '2')
+
+    def test_scan(self):
+        """Test that SCAN visits every key once"""
+        for i in range(5):
+            self.database.set(f'k{i}', str(i))
+        cursor, keys = self.registry.execute('scan', '0', 'COUNT', '3')
+        assert len(keys) == 3
+        assert self.registry.execute('scan', str(cursor)) == (0, ['k3', 'k4'])
+
+    def test_dispatch_stream(self):
+        """Test that FIND output is streamed in fragments with the same text"""
+        for i in range(2500):
+            self.database.set(f'k{i}', 'x')
+        fragments = list(self.registry.dispatch_stream('find', ['x']))
+        assert len(fragments) == 3
+        assert ''.join(fragments) == self.registry.dispatch('find', ['x'])
+        assert list(self.registry.dispatch_stream('find', ['missing'])) == ['NULL']
+        assert list(self.registry.dispatch_stream('get', ['k1'])) == ['x']
+        assert list(self.registry.dispatch_stream('set', ['A', '1'])) == []
+
+    def test_dispatch_stream_with_hooks(self):
+        """Test that installed hooks keep FIND streaming and see the key count"""
+        for i in range(2500):
+            self.database.set(f'k{i}', 'x')
+        calls = []
+        self.registry.add_hook(pre=lambda name, args: calls.append(('pre', name)),
+                               post=lambda name, args, result: calls.append(('post', name, result)))
+        fragments = list(self.registry.dispatch_stream('find', ['x']))
+        assert len(fragments) == 3
+        assert calls == [('pre', 'find'), ('post', 'find', 2500)]
+        calls.clear()
+        assert list(self.registry.dispatch_stream('find', ['x', 'count', '1']))[0].count('\n') == 1
+        assert calls[1][2][1] and len(calls[1][2][1]) == 1
+
+    def test_multi_counts_and_values(self):
+        """Test COUNTS with several values and VALUES TOP"""
+        for key, value in (('A', '10'), ('B', '20'), ('C', '10')):
+            self.database.set(key, value)
+        assert self.registry.execute('counts', '10', '20', '30') == {'10': 2, '20': 1, '30': 0}
+        assert self.registry.dispatch('counts', ['10', '20']) == '10 2\n20 1'
+        assert self.registry.dispatch('counts', ['10']) == '2'
+        assert self.registry.dispatch('values', ['top', '1']) == '10 2'
+        assert self.registry.execute('values', 'TOP') == [('10', 2), ('20', 1)]
+        with pytest.raises(ValueError):
+            self.registry.execute('values', 'bottom')
+
+class TestCommandSpec:
+    def setup_method(self):
+        """Create test dependencies before each test"""
+        self.logger = NullLogger()
+        self.transaction_manager = TransactionManager(self.logger)
+        self.database = InMemoryDB(self.transaction_manager, self.logger)  # type: ignore
+        self.registry = CommandRegistry(self.database, self.logger)
+
+    def test_wrong_arity_rejected_before_handler(self):
+        """Test that bad arity is detected without calling the handler"""
+        calls = []
+        self.registry.register('one', lambda key: calls.append(key), 'One arg')
+
+        with pytest.raises(TypeError):
+            self.registry.execute('one')
+        with pytest.raises(TypeError):
+            self.registry.execute('one', 'a', 'b')
+        assert calls == []
+
+    def test_spec_converts_arguments(self):
+        """Test that argument converters run before the handler"""
+        self.registry.register('double', lambda n: n * 2, 'Double', CommandSpec((int,)))
+
+        assert self.registry.execute('double', '21') == 42
+        assert self.registry.dispatch('double', ['x']) == INVALID_ARGUMENTS
+
+    def test_optional_and_varargs(self):
+        """Test optional and variadic arguments"""
+        self.registry.register('opt', lambda a, b='-': a + b, 'Opt', CommandSpec((str,), (str,)))
+        self.registry.register('join', lambda *parts: ','.join(parts), 'Join', CommandSpec(varargs=str))
+
+        assert self.registry.dispatch('opt', ['a']) == 'a-'
+        assert self.registry.dispatch('opt', ['a', 'b']) == 'ab'
+        assert self.registry.dispatch('opt', ['a', 'b', 'c']) == INVALID_ARGUMENTS
+        assert self.registry.dispatch('join', []) == ''
+        assert self.registry.dispatch('join', ['a', 'b']) == 'a,b'
+
+    def test_spec_derived_from_signature(self):
+        """Test arity derived from handler signature"""
+        def handler(key, value='x', *rest):
+            return key
+        spec = CommandSpec.from_handler(handler)
+        assert spec.args == (str,)
+        assert spec.optional == (str,)
+        assert spec.varargs is str
+
+    def test_dispatch_formats_builtin_results(self):
+        """Test formatting of built-in command results"""
+        assert self.registry.dispatch('set', ['A', '10']) is None
+        assert self.registry.dispatch('get', ['A']) == '10'
+        assert self.registry.dispatch('get', ['B']) == 'NULL'
+        assert self.registry.dispatch('counts', ['10']) == '1'
+        assert self.registry.dispatch('find', ['10']) == 'A'
+        assert self.registry.dispatch('find', ['20']) == 'NULL'
+        assert self.registry.dispatch('commit', []) == 'NO TRANSACTION'
+        assert self.registry.dispatch('status', []) == 'Transaction depth: 0'
+
+    def test_dispatch_unknown_command(self):
+        """Test unknown commands are reported as text"""
+        assert self.registry.dispatch('unknown', []) == UNKNOWN_COMMAND
+        assert self.registry.dispatch('get', []) == INVALID_ARGUMENTS
@@ -0,0 +1,61 @@
+import time
+import pytest
+from app.cursors import CursorTable
+
+class TestCursorTable:
+    def setup_method(self):
+        """Create a small cursor table before each test"""
+        self.table = CursorTable(max_cursors=2)
+
+    def test_pages_until_exhausted(self):
+        """Test that a cursor continues an iteration and ends with 0"""
+        cursor, items = self.table.page(0, 4, lambda: range(10))
+        assert items == [0, 1, 2, 3] and cursor
+        cursor, items = self.table.page(cursor, 4, lambda: range(10))
+        assert items == [4, 5, 6, 7]
+        assert self.table.page(cursor, 4, lambda: range(10)) == (0, [8, 9])
+        assert len(self.table) == 0
+        with pytest.raises(ValueError):
+            self.table.page(cursor, 4, lambda: range(10))
+
+    def test_oldest_cursor_expires(self):
+        """Test that the table keeps a bounded number of cursors"""
+        first, _ = self.table.page(0, 1, lambda: range(10))
+        for _ in range(2):
+            self.table.page(0, 1, lambda: range(10))
+        assert len(self.table) == 2
+        with pytest.raises(ValueError):
+            self.table.page(first, 1, lambda: range(10))
+
+    def test_rejects_bad_count(self):
+        """Test COUNT validation"""
+        with pytest.raises(ValueError):
+            self.table.page(0, 0, lambda: range(10))
+
+    def test_cursor_belongs_to_its_owner(self):
+        """Test that only the opening owner continues a cursor and closing it drops its cursors"""
+        owner, other = object(), object()
+        with self.table.owned_by(owner):
+            cursor, _ = self.table.page(0, 1, lambda: range(10))
+        with self.table.owned_by(other):
+            with pytest.raises(ValueError):
+                self.table.page(cursor, 1, lambda: range(10))
+        with self.table.owned_by(owner):
+            assert self.table.page(cursor, 1, lambda: range(10))[1] == [1]
+        assert self.table.close_owner(owner) == 1
+        assert len(self.table) == 0
+
+    def test_idle_cursor_expires_and_is_closed(self):
+        """Test that unused cursors are dropped and their generators closed"""
+        closed = []
+        def numbers():
+            try:
+                yield from range(10)
+            finally:
+                closed.append(True)
+        table = CursorTable(idle_timeout=0.01)
+        cursor, _ = table.page(0, 1, numbers)
+        time.sleep(0.02)
+        with pytest.raises(ValueError):
+            table.page(cursor, 1, numbers)
+        assert closed == [True] and len(table) == 0
@@ -3,6 +3,7 @@ from app.db import InMemoryDB
 from app.base import BaseDB
 from app.transaction_manager import TransactionManager
 from app.logger import ConsoleLogger
+from app.codec import ValueCodec
 
 class TestInMemoryDB:
     def setup_method(self):
@@ -150,4 +151,323 @@ class TestInMemoryDB:
         self.db.commit()  # Commit inner transaction
         assert self.db.get("A") is None  # Should still be None
         self.db.commit()  # Commit outer transaction
-        assert self.db.get("A") is None  # Should still be None after all commits 
\ No newline at end of file
+        assert self.db.get("A") is None  # Should still be None after all commits 
+
+    def test_nested_commit_of_unset_keeps_outer_rollback(self):
+        """Committing an inner UNSET must not touch data below the outer transaction"""
+        self.db.set("A", "1")
+        self.db.begin()
+        self.db.begin()
+        self.db.unset("A")
+        self.db.commit()
+        assert self.db.get("A") is None
+        self.db.rollback()
+        assert self.db.get("A") == "1"
+
+class TestLayerAccounting:
+    def setup_method(self):
+        """Create a new database with transaction limits before each test"""
+        logger = ConsoleLogger()
+        self.tm = TransactionManager(logger, max_depth=3, max_bytes=1000)
+        self.db = InMemoryDB(self.tm, logger)
+
+    def test_counters_follow_writes(self):
+        """Test that key, tombstone and byte counters are kept per layer"""
+        self.db.set("A", "1")
+        self.db.set("B", "2")
+        self.db.begin()
+        self.db.set("A", "3")
+        self.db.unset("B")
+        self.db.unset("B")
+        base, top = self.tm.layer_stats()
+        assert (base['keys'], base['tombstones']) == (2, 0)
+        assert (top['keys'], top['tombstones']) == (1, 1)
+        assert top['bytes'] > 0
+
+    def test_counters_after_commit_and_rollback(self):
+        """Test that merging layers keeps the counters exact"""
+        self.db.set("A", "1")
+        self.db.begin()
+        self.db.set("B", "2")
+        self.db.begin()
+        self.db.unset("A")
+        self.db.commit()
+        outer = self.tm.layer_stats()[1]
+        assert (outer['keys'], outer['tombstones']) == (1, 1)
+        self.db.commit()
+        base = self.tm.layer_stats()[0]
+        assert (base['keys'], base['tombstones']) == (1, 0)
+        self.db.begin()
+        self.db.set("C", "3")
+        self.db.rollback()
+        assert self.tm.layer_stats() == [base]
+
+    def test_max_depth(self):
+        """Test that BEGIN fails beyond max_depth"""
+        for _ in range(3):
+            self.db.begin()
+        with pytest.raises(RuntimeError):
+            self.db.begin()
+        assert self.db.get_transaction_depth() == 3
+
+    def test_max_bytes(self):
+        """Test that a transaction cannot grow beyond max_bytes"""
+        self.db.set("big", "x" * 2000)  # no limit outside transactions
+        self.db.begin()
+        with pytest.raises(RuntimeError):
+            self.db.set("A", "x" * 2000)
+        assert self.db.get("A") is None
+        self.db.set("A", "1")
+        assert self.db.get("A") == "1"
+
+class TestTombstones:
+    def setup_method(self):
+        """Create a new DB instance before each test"""
+        logger = ConsoleLogger()
+        self.tm = TransactionManager(logger)
+        self.db = InMemoryDB(self.tm, logger)
+
+    def test_base_layer_holds_no_tombstones(self):
+        """Test that UNSET outside a transaction deletes the key"""
+        changes = []
+        self.db.add_listener(changes.append)
+        self.db.set("A", "1")
+        self.db.unset("A")
+        self.db.unset("B")
+        assert self.tm.get_all_layers()[0] == {}
+        assert self.tm.layer_stats()[0] == {'keys': 0, 'tombstones': 0, 'bytes': 0}
+        assert changes == [{"A": "1"}, {"A": None}]
+
+    def test_tombstone_only_when_hiding(self):
+        """Test that a transaction only keeps tombstones for keys visible below it"""
+        self.db.set("A", "1")
+        self.db.begin()
+        self.db.set("B", "2")
+        self.db.unset("B")
+        self.db.unset("C")
+        self.db.unset("A")
+        assert self.tm.get_current_layer() == {"A": None}
+        assert self.db.get("A") is None
+        self.db.rollback()
+        assert self.db.get("A") == "1"
+
+    def test_compaction_after_nested_commit(self):
+        """Test that merged entries that hide nothing are compacted away"""
+        self.db.begin()
+        self.db.set("A", "1")
+        self.db.set("B", "2")
+        self.db.begin()
+        self.db.unset("A")
+        self.db.set("B", "2")
+        self.db.commit()
+        outer = self.tm.get_current_layer()
+        assert outer == {"A": None, "B": "2"}
+        assert self.tm.compact() == 1  # A was never committed below
+        assert outer == {"B": "2"}
+        self.db.begin()
+        self.db.set("X", "1")
+        self.db.begin()
+        self.db.set("B", "2")
+        self.db.commit()
+        layer = self.tm.get_current_layer()
+        assert layer == {"X": "1", "B": "2"}
+        assert self.tm.compact() == 1
+        assert layer == {"X": "1"}
+        assert self.tm.layer_stats()[2]['keys'] == 1
+        assert (self.db.get("A"), self.db.get("B")) == (None, "2")
+
+    def test_compaction_runs_on_writes(self):
+        """Test that later writes compact pending keys a few at a time"""
+        self.db.set("A", "1")
+        self.db.begin()
+        self.db.unset("A")
+        self.db.begin()
+        for i in range(100):
+            self.db.set(f"k{i}", "v")
+            self.db.unset(f"k{i}")
+            self.db.set(f"k{i}", "v")
+        self.db.begin()
+        for i in range(100):
+            self.db.unset(f"k{i}")
+        self.db.commit()
+        assert self.tm.layer_stats()[2]['tombstones'] == 100
+        for i in range(10):
+            self.db.set("other", str(i))
+        assert self.tm.layer_stats()[2]['tombstones'] == 0
+        assert self.db.get("A") is None
+        self.db.commit()
+        self.db.commit()
+        assert self.db.snapshot() == {"other": "9"}
+
+class TestBinaryMode:
+    def setup_method(self):
+        """Create a new DB instance in binary mode before each test"""
+        logger = ConsoleLogger()
+        self.db = InMemoryDB(TransactionManager(logger), logger, binary=True)
+
+    def test_bytes_round_trip(self):
+        """Test that arbitrary bytes are stored and returned unchanged"""
+        payload = bytes(range(256))
+        self.db.set(b'\x00key', payload)
+        assert self.db.get(b'\x00key') is payload
+        self.db.set('text', 'значение')
+        assert self.db.get(b'text') == 'значение'.encode('utf-8')
+        assert self.db.counts(payload) == 1
+        assert self.db.find(bytearray(payload)) == [b'\x00key']
+        self.db.unset('text')
+        assert self.db.get('text') is None
+
+    def test_buffers_are_copied_on_set(self):
+        """Test that later changes to a mutable buffer do not reach the stored value"""
+        buffer = bytearray(b'abc')
+        self.db.set(b'A', memoryview(buffer))
+        buffer[0] = ord('x')
+        assert self.db.get(b'A') == b'abc'
+
+    def test_get_view_is_zero_copy(self):
+        """Test that GET views share memory with the stored value"""
+        payload = b'v' * 100000
+        self.db.set(b'A', payload)
+        view = self.db.get_view(b'A')
+        assert view.readonly and view.obj is payload  # type: ignore
+        assert self.db.get_view(b'missing') is None
+
+    def test_get_view_needs_binary_mode(self):
+        """Test that views are refused for text databases"""
+        logger = ConsoleLogger()
+        db = InMemoryDB(TransactionManager(logger), logger)
+        db.set('A', '1')
+        with pytest.raises(TypeError):
+            db.get_view('A')
+
+    def test_compressed_bytes(self):
+        """Test that compressed values come back as bytes"""
+        from app.codec import ValueCodec
+        logger = ConsoleLogger()
+        db = InMemoryDB(TransactionManager(logger), logger, codec=ValueCodec(threshold=16), binary=True)
+        payload = b'\xff\x00' * 1000
+        db.set(b'A', payload)
+        assert db.get(b'A') == payload
+        assert bytes(db.get_view(b'A')) == payload  # type: ignore
+        assert db.counts(payload) == 1
+
+class TestReadModifyWrite:
+    def setup_method(self):
+        """Create a new DB instance before each test"""
+        logger = ConsoleLogger()
+        self.db = InMemoryDB(TransactionManager(logger), logger)
+
+    def test_incr_and_decr(self):
+        """Test counters, starting from a missing key"""
+        assert self.db.incr('n') == 1
+        assert self.db.incr('n', 10) == 11
+        assert self.db.decr('n') == 10
+        assert self.db.decr('n', 15) == -5
+        assert self.db.get('n') == '-5'
+        self.db.set('text', 'abc')
+        with pytest.raises(ValueError):
+            self.db.incr('text')
+        assert self.db.get('text') == 'abc'
+
+    def test_append_and_getset(self):
+        """Test APPEND and GETSET return values"""
+        assert self.db.append('A', 'foo') == 3
+        assert self.db.append('A', 'bar') == 6
+        assert self.db.getset('A', 'new') == 'foobar'
+        assert self.db.getset('B', 'x') is None
+        assert self.db.get('A') == 'new'
+
+    def test_in_transaction(self):
+        """Test that changes go to the current layer and roll back"""
+        self.db.set('n', '5')
+        self.db.begin()
+        assert self.db.incr('n') == 6
+        self.db.begin()
+        assert self.db.incr('n') == 7
+        self.db.rollback()
+        assert self.db.get('n') == '6'
+        assert self.db.counts('6') == 1
+        self.db.rollback()
+        assert self.db.get('n') == '5'
+
+    def test_binary_mode(self):
+        """Test that binary databases keep bytes values"""
+        logger = ConsoleLogger()
+        db = InMemoryDB(TransactionManager(logger), logger, binary=True)
+        assert db.incr(b'n', 2) == 2
+        assert db.get(b'n') == b'2'
+        assert db.append(b'A', b'\x00') == 1
+        assert db.append('A', b'\xff') == 2
+        assert db.getset(b'A', b'z') == b'\x00\xff'
+
+class TestIterFind:
+    def setup_method(self):
+        """Create a new DB instance before each test"""
+        logger = ConsoleLogger()
+        self.db = InMemoryDB(TransactionManager(logger), logger)
+
+    def test_yields_lazily(self):
+        """Test that keys are produced one by one and skip later changes"""
+        for i in range(5):
+            self.db.set(f'k{i}', 'x')
+        keys = self.db.iter_find('x')
+        assert next(keys) == 'k0'
+        self.db.set('k1', 'y')
+        self.db.set('k5', 'x')
+        assert list(keys) == ['k2', 'k3', 'k4']
+
+    def test_sees_transaction_layers(self):
+        """Test matches in nested transactions"""
+        self.db.set('A', 'x')
+        self.db.begin()
+        self.db.set('B', 'x')
+        self.db.unset('A')
+        assert list(self.db.iter_find('x')) == ['B']
+
+    def test_committed_keys_come_first(self):
+        """Test that FIND lists base keys before transaction keys, each once"""
+        self.db.set('A', 'x')
+        self.db.set('C', 'y')
+        self.db.begin()
+        self.db.set('B', 'x')
+        self.db.set('A', 'x')
+        self.db.begin()
+        self.db.set('C', 'x')
+        assert self.db.find('x') == ['A', 'C', 'B']
+        assert self.db.counts('x') == 3
+
+class TestValueDistribution:
+    def setup_method(self):
+        """Create a new DB instance before each test"""
+        logger = ConsoleLogger()
+        self.db = InMemoryDB(TransactionManager(logger), logger)
+        for i in range(10):
+            self.db.set(f'k{i}', ['ok', 'ok', 'fail', 'ok', 'retry'][i % 5])
+
+    def test_counts_many(self):
+        """Test several values counted in one pass"""
+        assert self.db.counts_many(['ok', 'fail', 'missing']) == {'ok': 6, 'fail': 2, 'missing': 0}
+
+    def test_nested_transactions(self):
+        """Test that counts reflect the innermost transaction view"""
+        self.db.begin()
+        self.db.set('k0', 'fail')
+        self.db.begin()
+        self.db.unset('k1')
+        self.db.set('new', 'retry')
+        assert self.db.counts_many(['ok', 'fail', 'retry']) == {'ok': 4, 'fail': 3, 'retry': 3}
+        assert self.db.value_counts(1) == [('ok', 4)]
+        self.db.rollback()
+        self.db.rollback()
+        assert self.db.value_counts() == [('ok', 6), ('fail', 2), ('retry', 2)]
+
+    def test_with_codec(self):
+        """Test that compressed values are counted and decoded for display"""
+        logger = ConsoleLogger()
+        db = InMemoryDB(TransactionManager(logger), logger, codec=ValueCodec(threshold=8))
+        long_value = 'status:' + 'x' * 50
+        db.set('A', long_value)
+        db.set('B', long_value)
+        db.set('C', 'short')
+        assert db.counts_many([long_value, 'short']) == {long_value: 2, 'short': 1}
+        assert db.value_counts(1) == [(long_value, 2)]
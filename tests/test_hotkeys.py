@@ -0,0 +1,92 @@
+import pytest
+from app.commands import CommandRegistry
+from app.db import InMemoryDB
+from app.hotkeys import CountMinSketch, HotKeyTracker, TopKeys
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+class TestCountMinSketch:
+    def test_never_undercounts(self):
+        """Test estimates against exact counts with collisions"""
+        sketch = CountMinSketch(width=16, depth=3)
+        for i in range(200):
+            sketch.add(f'k{i % 50}')
+        assert all(sketch.estimate(f'k{i}') >= 4 for i in range(50))
+        assert sketch.estimate('absent') <= 200
+
+class TestTopKeys:
+    def test_ranks_heavy_hitters(self):
+        """Test that the hottest keys survive among many cold ones"""
+        top = TopKeys(k=3, half_life=0)
+        for i in range(3000):
+            top.add(f'cold{i}')
+            if i % 3 == 0:
+                top.add('hot')
+            if i % 10 == 0:
+                top.add('warm')
+        ranked = top.top()
+        assert [key for key, _ in ranked[:2]] == ['hot', 'warm']
+        assert ranked[0][1] >= 1000
+
+    def test_decay(self):
+        """Test that old hits weigh less than recent ones"""
+        top = TopKeys(k=2, half_life=1.0)
+        for _ in range(10):
+            top.add('old', now=top._origin)
+        for _ in range(4):
+            top.add('new', now=top._origin + 2)
+        ranked = dict(top.top(now=top._origin + 2))
+        assert ranked['new'] == pytest.approx(4, rel=0.01)
+        assert ranked['old'] == pytest.approx(2.5, rel=0.01)
+
+    def test_rescale_keeps_ranking(self):
+        """Test that renormalizing the decay weights keeps relative counts"""
+        top = TopKeys(k=2, half_life=1.0)
+        top.add('a', now=top._origin)
+        top.add('b', now=top._origin + 50)
+        top.add('b', now=top._origin + 50)
+        assert top.top(1, now=top._origin)[0][0] == 'b'
+
+class TestHotKeyTracker:
+    def setup_method(self):
+        """Create a registry and a tracker that counts every command"""
+        logger = NullLogger()
+        self.database = InMemoryDB(TransactionManager(logger), logger)
+        self.registry = CommandRegistry(self.database, logger)
+        self.registry.attach_hotkeys(HotKeyTracker(self.registry, logger, sample_rate=1, half_life=0))
+
+    def test_reads_and_writes(self):
+        """Test HOTKEYS rankings through dispatch"""
+        assert self.registry.dispatch('hotkeys', ['start']) == 'TRACKING'
+        for i in range(20):
+            self.registry.dispatch('set', ['counter', str(i)])
+            self.registry.dispatch('get', ['user:1'])
+        self.registry.dispatch('get', ['user:2'])
+        self.registry.dispatch('incr', ['counter'])
+        result = self.registry.execute('hotkeys', '2')
+        assert result['reads'] == [('user:1', 20), ('user:2', 1)]
+        assert result['writes'] == [('counter', 21)]
+        assert self.registry.dispatch('hotkeys', ['1']) == 'reads:\n  user:1 20\nwrites:\n  counter 21'
+
+    def test_switch_at_runtime(self):
+        """Test that a stopped tracker removes its hook and keeps counts"""
+        tracker = self.registry.hotkeys()
+        tracker.start()
+        self.registry.execute('get', 'A')
+        self.registry.dispatch('hotkeys', ['stop'])
+        assert not self.registry._hooked
+        self.registry.execute('get', 'A')
+        assert tracker.top()['reads'] == [('A', 1)]
+        self.registry.dispatch('hotkeys', ['reset'])
+        assert tracker.top()['reads'] == []
+        with pytest.raises(ValueError):
+            self.registry.execute('hotkeys', 'start', '2')
+
+    def test_sampling(self):
+        """Test that sampled counts are scaled back to command counts"""
+        tracker = self.registry.hotkeys()
+        tracker.start(0.1)
+        for _ in range(5000):
+            self.registry.execute('get', 'A')
+        count = tracker.top()['reads'][0][1]
+        assert 3500 < count < 6500
@@ -0,0 +1,86 @@
+import os
+import pytest
+import tempfile
+import tracemalloc
+from app.commands import CommandRegistry
+from app.db import InMemoryDB
+from app.memory import MemoryProfiler
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+class TestMemoryCommands:
+    def setup_method(self):
+        """Create a new database and registry before each test"""
+        self.logger = NullLogger()
+        self.db = InMemoryDB(TransactionManager(self.logger), self.logger)
+        self.registry = CommandRegistry(self.db, self.logger)  # type: ignore
+
+    def test_usage_counts_every_layer(self):
+        """Test that MEMORY USAGE includes shadowed versions"""
+        self.db.set('A', 'x' * 1000)
+        single = self.db.memory_usage('A')
+        assert single > 1000  # type: ignore
+        self.db.begin()
+        self.db.set('A', 'y' * 1000)
+        assert self.db.memory_usage('A') > 2 * 1000  # type: ignore
+        assert self.db.memory_usage('missing') is None
+        assert self.registry.dispatch('memory', ['usage', 'missing']) == 'NULL'
+
+    def test_top(self):
+        """Test that MEMORY TOP lists the largest keys first"""
+        self.db.set('small', 'x')
+        self.db.set('big', 'x' * 5000)
+        self.db.set('medium', 'x' * 500)
+        lines = self.registry.dispatch('memory', ['top', '2']).splitlines()  # type: ignore
+        assert [line.split()[0] for line in lines] == ['big', 'medium']
+        assert len(self.db.memory_top(10, samples=2)) == 2
+
+    def test_top_samples_each_key_once(self):
+        """Test that MEMORY TOP samples visible keys once, whatever layers hold them"""
+        for i in range(50):
+            self.db.set(f'k{i}', 'x' * i)
+        self.db.begin()
+        for i in range(0, 50, 2):
+            self.db.set(f'k{i}', 'y' * 100)
+        top = self.db.memory_top(100)
+        assert len(top) == 50 and len({k for k, _ in top}) == 50
+        sampled = self.db.memory_top(100, samples=10)
+        assert len(sampled) == 10 and len({k for k, _ in sampled}) == 10
+
+    def test_invalid_arguments(self):
+        """Test that unknown subcommands are errors"""
+        for args in (['bogus'], ['usage'], ['profile', 'stop']):
+            with pytest.raises(ValueError):
+                self.registry.dispatch('memory', args)
+
+    def test_profile_report(self):
+        """Test that PROFILE attributes allocations to commands and writes a report"""
+        path = os.path.join(tempfile.mkdtemp(), 'profile.txt')
+        assert self.registry.dispatch('memory', ['profile', 'start']) == 'PROFILING'
+        for i in range(200):
+            self.registry.dispatch('set', [f'k{i}', 'v' * 100])
+        self.registry.dispatch('get', ['k1'])
+        assert self.registry.dispatch('memory', ['profile', 'stop', path]) == path
+        assert not tracemalloc.is_tracing()
+        with open(path) as f:
+            report = f.read().splitlines()
+        rows = {line.split()[0]: line.split()[1:] for line in report if not line.startswith('#')
+                and len(line.split()) == 4}
+        assert rows['set'][0] == '200'
+        assert int(rows['set'][1]) > 0
+        assert 'get' in rows
+        assert not self.registry._hooked
+
+class TestMemoryProfiler:
+    def test_keeps_existing_tracing(self):
+        """Test that a profile does not stop tracing it did not start"""
+        logger = NullLogger()
+        registry = CommandRegistry(InMemoryDB(TransactionManager(logger), logger), logger)  # type: ignore
+        profiler = MemoryProfiler(registry, logger)
+        tracemalloc.start()
+        try:
+            profiler.start()
+            profiler.stop(os.path.join(tempfile.mkdtemp(), 'p.txt'))
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
@@ -0,0 +1,178 @@
+import os
+import shutil
+import tempfile
+import pytest
+from app.base import BaseDB
+from app.commands import CommandRegistry
+from app.config import Config
+from app.database_factory import DatabaseFactory
+from app.mmap_db import MmapDB
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+class TestMmapDB:
+    def setup_method(self):
+        """Create a new database file before each test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'test.mmap')
+        self.db = self.open()
+
+    def teardown_method(self):
+        self.db.close()
+        shutil.rmtree(self.temp_dir)
+
+    def open(self):
+        logger = NullLogger()
+        return MmapDB(self.path, TransactionManager(logger), logger)
+
+    def reopen(self):
+        self.db.close()
+        self.db = self.open()
+
+    def test_inheritance(self):
+        """Test that MmapDB implements BaseDB"""
+        assert isinstance(self.db, BaseDB)
+
+    def test_set_get_unset(self):
+        """Test basic operations"""
+        self.db.set('A', '10')
+        self.db.set('A', '20')
+        self.db.set('ключ', 'значение')
+        assert self.db.get('A') == '20'
+        assert self.db.get('ключ') == 'значение'
+        self.db.unset('A')
+        assert self.db.get('A') is None
+        self.db.unset('missing')
+        assert len(self.db) == 1
+
+    def test_counts_and_find(self):
+        """Test COUNTS and FIND, including uncommitted overlay"""
+        self.db.set('A', '10')
+        self.db.set('B', '20')
+        self.db.set('C', '10')
+        self.db.begin()
+        self.db.set('B', '10')
+        self.db.unset('A')
+        assert self.db.counts('10') == 2
+        assert sorted(self.db.find('10')) == ['B', 'C']
+        self.db.rollback()
+        assert sorted(self.db.find('10')) == ['A', 'C']
+
+    def test_nested_transactions(self):
+        """Test nested transaction semantics over the file"""
+        self.db.set('A', '10')
+        self.db.begin()
+        self.db.set('A', '20')
+        self.db.begin()
+        self.db.unset('A')
+        self.db.commit()
+        assert self.db.get('A') is None
+        self.db.rollback()
+        assert self.db.get('A') == '10'
+        self.db.begin()
+        self.db.set('B', '1')
+        self.db.commit()
+        assert self.db.snapshot() == {'A': '10', 'B': '1'}
+
+    def test_uncommitted_changes_not_persisted(self):
+        """Test that only committed data reaches the file"""
+        self.db.set('A', '1')
+        self.db.begin()
+        self.db.set('B', '2')
+        self.reopen()
+        assert self.db.get('A') == '1'
+        assert self.db.get('B') is None
+
+    def test_reopen_and_grow(self):
+        """Test table growth and reopening a populated file"""
+        for i in range(3000):
+            self.db.set(f'key{i}', f'value{i % 7}')
+        for i in range(0, 3000, 2):
+            self.db.unset(f'key{i}')
+        self.reopen()
+        assert len(self.db) == 1500
+        assert self.db.get('key1') == 'value1'
+        assert self.db.get('key2') is None
+        assert self.db.counts('value3') == len([i for i in range(1, 3000, 2) if i % 7 == 3])
+
+    def test_scan_cursor_survives_file_growth(self):
+        """Test that a SCAN cursor continues after the file grows and is rebuilt"""
+        registry = CommandRegistry(self.db, NullLogger())
+        for i in range(200):
+            self.db.set(f'key{i}', 'v')
+        cursor, seen = registry.execute('scan', '0', 'COUNT', '50')
+        size = os.path.getsize(self.path)
+        for i in range(200, 3000):
+            self.db.set(f'key{i}', 'x' * 100)
+        assert os.path.getsize(self.path) > size
+        while cursor:
+            cursor, keys = registry.execute('scan', str(cursor), 'COUNT', '50')
+            seen.extend(keys)
+        assert len(seen) == len(set(seen))
+        assert {f'key{i}' for i in range(200)} <= set(seen)
+
+    def test_compact(self):
+        """Test that compaction drops overwritten values"""
+        for i in range(100):
+            self.db.set('A', str(i))
+        size_before = self.db._heap_end
+        self.db.compact()
+        assert self.db._heap_end < size_before
+        assert self.db.get('A') == '99'
+
+    def test_unset_in_transaction(self):
+        """Test that tombstones are kept only for keys stored in the file"""
+        self.db.set('A', '1')
+        self.db.begin()
+        self.db.unset('A')
+        self.db.unset('missing')
+        assert self.db._overlay() == [{'A': None}]
+        self.db.commit()
+        self.reopen()
+        assert self.db.get('A') is None
+
+    def test_binary_mode(self):
+        """Test that bytes are written to the file and read back without decoding"""
+        self.db.close()
+        logger = NullLogger()
+        self.db = MmapDB(self.path, TransactionManager(logger), logger, binary=True)
+        payload = bytes(range(256))
+        self.db.set(b'\xffkey', payload)
+        self.db.begin()
+        self.db.unset(b'\xffkey')
+        assert self.db.get(b'\xffkey') is None
+        self.db.rollback()
+        self.db.close()
+        self.db = MmapDB(self.path, TransactionManager(logger), logger, binary=True)
+        assert self.db.get(b'\xffkey') == payload
+        assert self.db.find(payload) == [b'\xffkey']
+        assert self.db.snapshot() == {b'\xffkey': payload}
+
+    def test_info(self):
+        """Test that INFO reports the file as the base layer"""
+        self.db.set('A', '1')
+        self.db.set('B', '2')
+        self.db.begin()
+        self.db.unset('A')
+        base, top = self.db.info()['layers']
+        assert (base['keys'], base['tombstones']) == (2, 0)
+        assert (top['keys'], top['tombstones']) == (0, 1)
+
+    def test_factory(self):
+        """Test selecting the engine through database.type"""
+        config = Config('nonexistent.yaml')
+        config._config['database']['type'] = 'mmap'
+        config._config['database']['storage']['path'] = os.path.join(self.temp_dir, 'f.mmap')
+        db = DatabaseFactory.create_database(config, NullLogger())
+        try:
+            assert isinstance(db, MmapDB)
+        finally:
+            db.close()  # type: ignore
+
+    def test_rejects_foreign_file(self):
+        """Test opening a file that is not a database"""
+        path = os.path.join(self.temp_dir, 'other')
+        with open(path, 'wb') as f:
+            f.write(b'x' * 100)
+        with pytest.raises(ValueError):
+            MmapDB(path, TransactionManager(NullLogger()), NullLogger())
@@ -0,0 +1,118 @@
+import time
+import pytest
+from app.commands import CommandRegistry, CommandSpec
+from app.db import InMemoryDB
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+from app.offload import OffloadExecutor, OffloadQueueFull
+from app.plugins.stats_plugin import value_stats
+
+def count_keys(snapshot, prefix=''):
+    return sum(1 for k in snapshot if k.startswith(prefix))
+
+def describe(snapshot):
+    return type(snapshot).__name__, snapshot.get(b'k'), dict(snapshot.items())
+
+def slow(snapshot, seconds):
+    time.sleep(seconds)
+    return len(snapshot)
+
+class TestOffload:
+    def setup_method(self):
+        """Create test dependencies before each test"""
+        self.logger = NullLogger()
+        self.database = InMemoryDB(TransactionManager(self.logger), self.logger)  # type: ignore
+        self.registry = CommandRegistry(self.database, self.logger)
+        self.registry.register('countkeys', count_keys, 'Count keys',
+                               CommandSpec(optional=(str,), offload=True))
+        self.database.set('a1', '1')
+        self.database.set('a2', '2')
+        self.database.set('b1', '3')
+
+    def test_inline_without_executor(self):
+        """Test that offloaded commands run inline when no pool is attached"""
+        assert self.registry.execute('countkeys', 'a') == 2
+
+    def test_snapshot_excludes_open_transaction(self):
+        """Test that workers only see committed data"""
+        self.database.begin()
+        self.database.set('a3', '4')
+        self.database.unset('a1')
+        assert self.registry.execute('countkeys', 'a') == 2
+
+    def test_runs_in_process_pool(self):
+        """Test submitting a job and collecting its result"""
+        executor = OffloadExecutor(self.logger, max_workers=1)
+        self.registry.attach_offload(executor)
+        try:
+            assert self.registry.dispatch('countkeys', ['a']) == 'JOB 1'
+            assert self.registry.dispatch('result', ['1', '30']) == '2'
+            assert self.registry.dispatch('result', ['1']) == 'UNKNOWN'
+        finally:
+            executor.shutdown()
+
+    def test_bounded_queue_and_cancel(self):
+        """Test that the pending queue is bounded and pending jobs can be cancelled"""
+        executor = OffloadExecutor(self.logger, max_workers=1, max_pending=3)
+        try:
+            jobs = [executor.submit('slow', slow, {}, (0.3,), str) for _ in range(3)]
+            with pytest.raises(OffloadQueueFull):
+                executor.submit('slow', slow, {}, (0.3,), str)
+            # The pool prefetches one call per worker plus one; the last job is still queued
+            assert executor.cancel(jobs[2].id)
+            assert executor.result(jobs[2].id) == ('CANCELLED', None)
+            assert executor.result(jobs[0].id, timeout=30) == ('DONE', 0)
+        finally:
+            executor.shutdown()
+
+    def test_failed_submit_frees_slot(self):
+        """Test that a snapshot that cannot be pickled does not use up the queue"""
+        executor = OffloadExecutor(self.logger, max_workers=1, max_pending=1)
+        try:
+            for _ in range(3):
+                failed = executor.submit('slow', slow, {'k': lambda: None}, (0,), str)
+                assert executor.result(failed.id, timeout=30)[0] == 'FAILED'
+            job = executor.submit('slow', slow, {}, (0,), str)
+            assert executor.result(job.id, timeout=30) == ('DONE', 0)
+        finally:
+            executor.shutdown()
+
+    def test_large_snapshot(self):
+        """Test that a large snapshot reaches the worker whole"""
+        executor = OffloadExecutor(self.logger, max_workers=1)
+        try:
+            snapshot = {f'k{i}': str(i) for i in range(20000)}
+            job = executor.submit('count', count_keys, snapshot, ('k',), str)
+            assert executor.result(job.id, timeout=30) == ('DONE', len(snapshot))
+        finally:
+            executor.shutdown()
+
+    def test_worker_reads_shared_image(self):
+        """Test that the worker gets a mapping over the image, not a copied dict"""
+        executor = OffloadExecutor(self.logger, max_workers=1)
+        try:
+            job = executor.submit('describe', describe, {b'k': b'\x00v', b'j': b''}, (), str)
+            assert executor.result(job.id, timeout=30) == (
+                'DONE', ('ImageView', b'\x00v', {b'k': b'\x00v', b'j': b''}))
+        finally:
+            executor.shutdown()
+
+    def test_uncollected_results_expire(self):
+        """Test that finished jobs are forgotten after result_ttl"""
+        executor = OffloadExecutor(self.logger, max_workers=1, result_ttl=0.05)
+        try:
+            job = executor.submit('slow', slow, {}, (0,), str)
+            job.future.result(timeout=30)
+            assert [j.id for j in executor.jobs()] == [job.id]
+            time.sleep(0.1)
+            assert executor.jobs() == []
+            assert executor.result(job.id) == ('UNKNOWN', None)
+        finally:
+            executor.shutdown()
+
+    def test_value_stats(self):
+        """Test the value statistics plugin function"""
+        result = value_stats({'a': '1', 'b': '1', 'c': 'x'})
+        assert 'keys=3' in result
+        assert 'distinct=2' in result
+        assert 'top=1:2,x:1' in result
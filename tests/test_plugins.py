@@ -0,0 +1,88 @@
+import sys
+import pytest
+from app.commands import CommandRegistry
+from app.config import Config
+from app.db import InMemoryDB
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+from app.plugins.plugin_manager import PluginManager, discover_commands
+
+class TestPluginManager:
+    def setup_method(self):
+        """Create test dependencies before each test"""
+        self.logger = NullLogger()
+        self.database = InMemoryDB(TransactionManager(self.logger), self.logger)  # type: ignore
+        self.registry = CommandRegistry(self.database, self.logger)
+        self.manager = PluginManager()
+
+    def test_builtin_plugins_discovered(self):
+        """Test that shipped plugins are discovered without importing them"""
+        assert discover_commands()['echo'] == 'app.plugins.echo_plugin:EchoPlugin'
+
+    def test_plugin_loaded_on_first_use(self, monkeypatch):
+        """Test that a lazy plugin is imported only when its command runs"""
+        monkeypatch.delitem(sys.modules, 'app.plugins.echo_plugin', raising=False)
+        self.manager.register_lazy('app.plugins.echo_plugin:EchoPlugin', ['echo'])
+        self.manager.initialize_all(Config(), self.registry)
+
+        assert 'echo' in self.registry.list_commands()
+        assert 'app.plugins.echo_plugin' not in sys.modules
+        assert self.manager.loaded() == []
+
+        assert self.registry.execute('echo', 'a', 'b') == 'a b'
+        assert 'app.plugins.echo_plugin' in sys.modules
+        assert self.manager.loaded() == ['echo']
+
+    def test_failed_load_is_retried(self):
+        """Test that a plugin import error is reported and the command kept"""
+        attempts = []
+        def loader():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ImportError('missing dependency')
+            self.registry.register('flaky', lambda: 'ok', 'Flaky command')
+        self.registry.register_lazy('flaky', loader)
+        with pytest.raises(ImportError, match='missing dependency'):
+            self.registry.execute('flaky')
+        assert 'flaky' in self.registry.list_commands()
+        assert self.registry.dispatch('flaky', []) == 'ok'
+        assert len(attempts) == 2
+
+    def test_lazy_command_in_help(self):
+        """Test that lazy commands show up in help before loading"""
+        self.manager.register_lazy('app.plugins.echo_plugin:EchoPlugin', ['echo'])
+        self.manager.initialize_all(Config(), self.registry)
+        assert 'ECHO' in self.registry.get_help()
+
+class TestCommandHooks:
+    def setup_method(self):
+        """Create test dependencies before each test"""
+        self.logger = NullLogger()
+        self.database = InMemoryDB(TransactionManager(self.logger), self.logger)  # type: ignore
+        self.registry = CommandRegistry(self.database, self.logger)
+
+    def test_pre_and_post_hooks(self):
+        """Test that hooks see every command and its result"""
+        calls = []
+        self.registry.add_hook(pre=lambda name, args: calls.append(('pre', name, args)),
+                               post=lambda name, args, result: calls.append(('post', name, result)))
+        self.registry.execute('set', 'A', '10')
+        assert self.registry.dispatch('get', ['A']) == '10'
+        assert calls == [('pre', 'set', ('A', '10')), ('post', 'set', None),
+                         ('pre', 'get', ('A',)), ('post', 'get', '10')]
+
+    def test_pre_hook_short_circuits(self):
+        """Test that a pre hook returning a value replaces the handler"""
+        self.registry.add_hook(pre=lambda name, args: 'cached' if name == 'get' else None)
+        assert self.registry.execute('get', 'A') == 'cached'
+
+    def test_remove_hook(self):
+        """Test removing hooks restores plain dispatch"""
+        calls = []
+        def post(name, args, result):
+            calls.append(name)
+        self.registry.add_hook(post=post)
+        self.registry.execute('status')
+        self.registry.remove_hook(post=post)
+        self.registry.execute('status')
+        assert calls == ['status']
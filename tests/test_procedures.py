@@ -0,0 +1,91 @@
+import time
+import pytest
+from app.commands import CommandRegistry
+from app.config import Config
+from app.db import InMemoryDB
+from app.procedures import ProcedureTimeout
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+from app.plugins.plugin_manager import PluginManager
+
+def transfer(db, source: str, target: str, amount: str) -> int:
+    """Move an amount between two counters, refusing overdrafts."""
+    amount_ = int(amount)
+    if db.decr(source, amount_) < 0:
+        raise ValueError('insufficient funds')
+    return db.incr(target, amount_)
+
+class TransferPlugin:
+    name = "transfer"
+    def initialize(self, config: Config) -> None:
+        pass
+    def register(self, registry):
+        registry.register_procedure('transfer', transfer, 'Move an amount between counters')
+    def cleanup(self) -> None:
+        pass
+
+class TestProcedures:
+    def setup_method(self):
+        """Create a registry with the transfer procedure before each test"""
+        self.logger = NullLogger()
+        self.database = InMemoryDB(TransactionManager(self.logger), self.logger)
+        self.registry = CommandRegistry(self.database, self.logger)
+        manager = PluginManager()
+        manager.register(TransferPlugin())
+        manager.initialize_all(Config('nonexistent.yaml'), self.registry)
+        self.database.set('a', '10')
+
+    def test_call_commits(self):
+        """Test that CALL runs the procedure and commits its writes"""
+        assert self.registry.dispatch('call', ['transfer', 'a', 'b', '4']) == '4'
+        assert (self.database.get('a'), self.database.get('b')) == ('6', '4')
+        assert self.database.get_transaction_depth() == 0
+
+    def test_error_rolls_back(self):
+        """Test that a failing procedure leaves no partial writes"""
+        with pytest.raises(ValueError):
+            self.registry.execute('call', 'transfer', 'a', 'b', '11')
+        assert (self.database.get('a'), self.database.get('b')) == ('10', None)
+        assert self.database.get_transaction_depth() == 0
+
+    def test_nested_in_open_transaction(self):
+        """Test that a CALL inside BEGIN is undone by ROLLBACK"""
+        self.database.begin()
+        self.registry.execute('call', 'transfer', 'a', 'b', '1')
+        assert self.database.get_transaction_depth() == 1
+        self.database.rollback()
+        assert self.database.get('a') == '10'
+
+    def test_time_budget(self):
+        """Test that a procedure past its budget is stopped and rolled back"""
+        def slow(db):
+            db.set('partial', '1')
+            time.sleep(0.05)
+            db.set('never', '1')
+
+        self.registry.register_procedure('slow', slow, budget=0.01)
+        with pytest.raises(ProcedureTimeout):
+            self.registry.execute('call', 'slow')
+        assert self.database.get('partial') is None
+        stats = self.registry.procedures().stats()['slow']
+        assert (stats['calls'], stats['timeouts'], stats['errors']) == (1, 1, 0)
+
+    def test_handle_is_restricted(self):
+        """Test that procedures cannot control transactions"""
+        def escape(db):
+            db.commit()
+
+        self.registry.register_procedure('escape', escape)
+        with pytest.raises(AttributeError):
+            self.registry.execute('call', 'escape')
+        assert self.database.get_transaction_depth() == 0
+
+    def test_stats_and_unknown(self):
+        """Test PROCEDURES output and calling a missing procedure"""
+        self.registry.execute('call', 'transfer', 'a', 'b', '1')
+        with pytest.raises(ValueError):
+            self.registry.execute('call', 'transfer', 'a', 'b', '100')
+        output = self.registry.dispatch('procedures', [])
+        assert output.startswith('transfer calls=2 errors=1 timeouts=0')
+        with pytest.raises(ValueError):
+            self.registry.execute('call', 'missing')
@@ -0,0 +1,108 @@
+import threading
+import pytest
+from app.commands import CommandRegistry
+from app.db import InMemoryDB
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+from app.pubsub import ChangeFeed, DROP_NEWEST, DISCONNECT
+
+class TestSubscriptions:
+    def setup_method(self):
+        """Create a new DB instance before each test"""
+        logger = NullLogger()
+        self.db = InMemoryDB(TransactionManager(logger), logger)
+
+    def events(self, subscription):
+        return [(e.op, e.key, e.value) for e in subscription.poll()]
+
+    def test_committed_changes_only(self):
+        """Test that rolled back writes are never published"""
+        sub = self.db.subscribe()
+        self.db.set('A', '1')
+        self.db.begin()
+        self.db.set('B', '2')
+        self.db.rollback()
+        self.db.begin()
+        self.db.set('C', '3')
+        self.db.begin()
+        self.db.unset('A')
+        self.db.commit()
+        assert self.events(sub) == [('SET', 'A', '1')]
+        self.db.commit()
+        assert sorted(self.events(sub)) == [('SET', 'C', '3'), ('UNSET', 'A', None)]
+
+    def test_unset_of_missing_key_not_published(self):
+        """Test that UNSET publishes only when it removes a committed key"""
+        sub = self.db.subscribe()
+        self.db.unset('missing')
+        self.db.set('A', '1')
+        self.db.unset('A')
+        assert self.events(sub) == [('SET', 'A', '1'), ('UNSET', 'A', None)]
+
+    def test_prefix_filter(self):
+        """Test key prefix filtering"""
+        users = self.db.subscribe('user:')
+        nested = self.db.subscribe('user:1')
+        everything = self.db.subscribe()
+        self.db.set('user:1', 'a')
+        self.db.set('user:2', 'b')
+        self.db.set('us', 'c')
+        assert [e.key for e in users.poll()] == ['user:1', 'user:2']
+        assert [e.key for e in nested.poll()] == ['user:1']
+        assert [e.key for e in everything.poll()] == ['user:1', 'user:2', 'us']
+
+    def test_drop_oldest(self):
+        """Test that a full buffer overwrites the oldest events by default"""
+        sub = self.db.subscribe(capacity=2)
+        for i in range(5):
+            self.db.set(f'k{i}', 'v')
+        assert [e.key for e in sub.poll()] == ['k3', 'k4']
+        assert sub.dropped == 3
+
+    def test_drop_newest(self):
+        """Test the drop_newest slow consumer policy"""
+        sub = self.db.subscribe(capacity=2, policy=DROP_NEWEST)
+        for i in range(5):
+            self.db.set(f'k{i}', 'v')
+        assert [e.key for e in sub.poll()] == ['k0', 'k1']
+
+    def test_disconnect_slow_consumer(self):
+        """Test that the disconnect policy closes the subscription without stalling writers"""
+        slow = self.db.subscribe(capacity=1, policy=DISCONNECT)
+        fast = self.db.subscribe(capacity=10)
+        for i in range(3):
+            self.db.set(f'k{i}', 'v')
+        assert slow.closed
+        assert self.db.get_subscription(slow.id) is None
+        assert len(fast.poll()) == 3
+
+    def test_poll_waits_for_events(self):
+        """Test blocking poll with a timeout"""
+        sub = self.db.subscribe()
+        timer = threading.Timer(0.05, self.db.set, ('A', '1'))
+        timer.start()
+        assert [e.key for e in sub.poll(timeout=5)] == ['A']
+        timer.join()
+        assert sub.poll(timeout=0.01) == []
+
+    def test_unsubscribe_detaches_feed(self):
+        """Test that the last unsubscribe removes the change listener"""
+        sub = self.db.subscribe()
+        assert self.db.unsubscribe(sub.id)
+        assert not self.db.unsubscribe(sub.id)
+        assert self.db._feed is None
+
+    def test_invalid_policy(self):
+        """Test rejecting unknown slow consumer policies"""
+        with pytest.raises(ValueError):
+            ChangeFeed(NullLogger()).subscribe(policy='block')
+
+    def test_commands(self):
+        """Test SUBSCRIBE/POLL/UNSUBSCRIBE commands"""
+        registry = CommandRegistry(self.db, NullLogger())
+        assert registry.dispatch('subscribe', ['a']) == '1'
+        registry.dispatch('set', ['a1', 'x'])
+        registry.dispatch('unset', ['a1'])
+        assert registry.dispatch('poll', ['1']) == 'SET a1 x\nUNSET a1'
+        assert registry.dispatch('poll', ['1']) == 'NULL'
+        assert registry.dispatch('unsubscribe', ['1']) is None
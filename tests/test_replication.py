@@ -0,0 +1,156 @@
+import os
+import tempfile
+import time
+import pytest
+from app.db import InMemoryDB
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+from app.replication import (ReplicationBacklog, ReplicationPrimary, Replica,
+                             ReadOnlyError)
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+class TestReplicationBacklog:
+    def test_since(self):
+        """Test partial resync ranges and backlog overflow"""
+        backlog = ReplicationBacklog(3)
+        for i in range(5):
+            backlog.append([(f'k{i}', 'v')])
+        assert backlog.since(5) == []
+        assert [offset for offset, _ in backlog.since(2)] == [3, 4, 5]
+        assert backlog.since(1) is None
+        assert backlog.since(6) is None
+
+class TestReplication:
+    def setup_method(self):
+        """Start a primary on a free TCP port before each test"""
+        self.logger = NullLogger()
+        self.db = InMemoryDB(TransactionManager(self.logger), self.logger)
+        self.db.set('A', '1')
+        self.primary = ReplicationPrimary(self.db, self.logger, '127.0.0.1:0',
+                                          backlog_size=100, ping_interval=0.05)
+        self.primary.start()
+        self.replica = Replica(self.primary.address, self.logger, reconnect_delay=0.05)
+
+    def teardown_method(self):
+        self.replica.stop()
+        self.primary.stop()
+
+    def test_full_sync_then_stream(self):
+        """Test initial snapshot transfer followed by streamed commits"""
+        self.replica.start()
+        assert self.replica.wait_for_offset(0, timeout=5)
+        assert wait_until(lambda: self.replica.database.get('A') == '1')
+
+        self.db.set('B', '2')
+        self.db.begin()
+        self.db.set('C', '3')
+        self.db.unset('A')
+        self.db.commit()
+        assert self.replica.wait_for_offset(self.primary.offset, timeout=5)
+        assert self.replica.database.get('A') is None
+        assert self.replica.database.find('3') == ['C']
+        assert self.replica.database.counts('2') == 1
+
+    def test_rolled_back_writes_not_replicated(self):
+        """Test that only committed changes reach the replica"""
+        self.replica.start()
+        self.db.begin()
+        self.db.set('X', '1')
+        self.db.rollback()
+        self.db.set('Y', '1')
+        assert self.replica.wait_for_offset(self.primary.offset, timeout=5)
+        assert self.replica.database.get('X') is None
+        assert self.replica.database.get('Y') == '1'
+
+    def test_partial_resync_after_disconnect(self):
+        """Test that a short disconnect resumes from the backlog"""
+        self.replica.start()
+        assert wait_until(lambda: self.replica.full_syncs == 1)
+        self.replica.disconnect()
+        self.db.set('B', '2')
+        assert self.replica.wait_for_offset(self.primary.offset, timeout=5)
+        assert self.replica.database.get('B') == '2'
+        assert self.replica.full_syncs == 1
+
+    def test_lag_reporting(self):
+        """Test replica lag reporting"""
+        self.replica.start()
+        self.db.set('B', '2')
+        assert self.replica.wait_for_offset(self.primary.offset, timeout=5)
+        lag = self.replica.lag()
+        assert lag['connected'] is True
+        assert lag['lag'] == 0
+        assert lag['primary_offset'] == self.primary.offset
+        assert lag['seconds_since_contact'] is not None
+
+    def test_replica_is_read_only(self):
+        """Test that writes on a replica are rejected"""
+        with pytest.raises(ReadOnlyError):
+            self.replica.database.set('A', '2')
+        with pytest.raises(ReadOnlyError):
+            self.replica.database.begin()
+
+    @pytest.mark.parametrize('mutate', [
+        lambda db: db.unset('A'),
+        lambda db: db.incr('A'),
+        lambda db: db.decr('A', 2),
+        lambda db: db.append('A', 'x'),
+        lambda db: db.getset('A', 'z'),
+    ])
+    def test_replica_rejects_every_mutator(self, mutate):
+        """Test that atomic commands cannot change a replica either"""
+        self.replica.start()
+        self.db.set('A', '2')
+        assert self.replica.wait_for_offset(self.primary.offset, timeout=5)
+        with pytest.raises(ReadOnlyError):
+            mutate(self.replica.database)
+        assert self.replica.database.get('A') == '2'
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires Unix sockets")
+def test_unix_socket_replication():
+    """Test replication over a Unix socket"""
+    logger = NullLogger()
+    db = InMemoryDB(TransactionManager(logger), logger)
+    path = os.path.join(tempfile.mkdtemp(), 'primary.sock')
+    primary = ReplicationPrimary(db, logger, f'unix:{path}', ping_interval=0.05)
+    primary.start()
+    replica = Replica(f'unix:{path}', logger)
+    try:
+        replica.start()
+        db.set('A', '1')
+        assert replica.wait_for_offset(primary.offset, timeout=5)
+        assert replica.database.get('A') == '1'
+    finally:
+        replica.stop()
+        primary.stop()
+
+def test_binary_database_replication():
+    """Test that bytes keys and values survive the full sync and streamed batches"""
+    logger = NullLogger()
+    db = InMemoryDB(TransactionManager(logger), logger, binary=True)
+    db.set(b'\xff\x00key', b'\x00\x01')
+    primary = ReplicationPrimary(db, logger, '127.0.0.1:0', ping_interval=0.05)
+    primary.start()
+    replica = Replica(primary.address, logger, reconnect_delay=0.05, binary=True)
+    try:
+        replica.start()
+        assert wait_until(lambda: replica.full_syncs == 1)
+        assert replica.database.get(b'\xff\x00key') == b'\x00\x01'
+        db.set(b'k', b'\xfe')
+        db.set('text', 'ok')
+        db.unset(b'\xff\x00key')
+        assert replica.wait_for_offset(primary.offset, timeout=5)
+        assert replica.database.get(b'k') == b'\xfe'
+        assert replica.database.get(b'text') == b'ok'
+        assert replica.database.get(b'\xff\x00key') is None
+        assert replica.database.snapshot() == db.snapshot()
+    finally:
+        replica.stop()
+        primary.stop()
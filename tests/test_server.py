@@ -0,0 +1,136 @@
+import socket
+import threading
+import pytest
+from app.commands import CommandRegistry
+from app.db import InMemoryDB
+from app.protocol import INCOMPLETE, ProtocolError, Reader, ReplyError, encode_command, encode_reply
+from app.server import Server
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+def read_replies(sock, reader, count):
+    replies = []
+    while len(replies) < count:
+        reply = reader.get()
+        if reply is INCOMPLETE:
+            reader.feed(sock.recv(65536))
+        else:
+            replies.append(reply)
+    return replies
+
+class TestProtocol:
+    def test_round_trip(self):
+        """Test that requests and replies survive encoding and split reads"""
+        data = encode_command(['SET', 'ключ', 'a b']) + encode_reply([1, None, 'x', True])
+        reader = Reader()
+        for i in range(len(data)):
+            reader.feed(data[i:i + 1])
+        assert reader.get() == ['SET', 'ключ', 'a b']
+        assert reader.get() == [1, None, 'x', 1]
+        assert reader.get() is INCOMPLETE
+
+    def test_errors_and_inline(self):
+        """Test error replies and hand-typed inline requests"""
+        reader = Reader()
+        reader.feed(encode_reply(ValueError('bad\nthing')) + b'get A\r\n')
+        error = reader.get()
+        assert isinstance(error, ReplyError) and str(error) == 'ERR bad thing'
+        assert reader.get(inline=True) == ['get', 'A']
+        reader.feed(b'?')
+        with pytest.raises(ProtocolError):
+            reader.get()
+
+class TestServer:
+    def setup_method(self):
+        """Start a server on a free port before each test"""
+        logger = NullLogger()
+        self.db = InMemoryDB(TransactionManager(logger), logger)
+        registry = CommandRegistry(self.db, logger)  # type: ignore
+        self.server = Server(registry, self.db, logger, '127.0.0.1:0')  # type: ignore
+        self.server.start()
+
+    def teardown_method(self):
+        self.server.stop()
+
+    def connect(self):
+        host, port = self.server.address.split(':')
+        return socket.create_connection((host, int(port))), Reader()
+
+    def test_pipelined_commands(self):
+        """Test a pipelined batch and typed replies"""
+        sock, reader = self.connect()
+        commands = [['SET', 'A', '10'], ['SET', 'B', '10'], ['GET', 'A'], ['GET', 'C'],
+                    ['COUNTS', '10'], ['FIND', '10'], ['PING'], ['NOPE']]
+        sock.sendall(b''.join(encode_command(c) for c in commands))
+        replies = read_replies(sock, reader, len(commands))
+        assert replies[2:7] == ['10', None, 2, ['A', 'B'], 'PONG']
+        assert isinstance(replies[7], ReplyError)
+        sock.close()
+
+    def test_transaction_is_isolated(self):
+        """Test that another client waits while a transaction is open"""
+        first, first_reader = self.connect()
+        second, second_reader = self.connect()
+        first.sendall(encode_command(['BEGIN']) + encode_command(['SET', 'A', '1']))
+        read_replies(first, first_reader, 2)
+        got = []
+        def read_a():
+            second.sendall(encode_command(['GET', 'A']))
+            got.extend(read_replies(second, second_reader, 1))
+        thread = threading.Thread(target=read_a)
+        thread.start()
+        thread.join(0.2)
+        assert got == []  # blocked until the transaction ends
+        first.sendall(encode_command(['ROLLBACK']))
+        read_replies(first, first_reader, 1)
+        thread.join(5)
+        assert got == [None]
+        first.close()
+        second.close()
+
+    def test_disconnect_rolls_back(self):
+        """Test that an abandoned transaction is rolled back"""
+        sock, reader = self.connect()
+        sock.sendall(encode_command(['BEGIN']) + encode_command(['SET', 'A', '1']))
+        read_replies(sock, reader, 2)
+        sock.close()
+        other, other_reader = self.connect()
+        other.sendall(encode_command(['GET', 'A']))
+        assert read_replies(other, other_reader, 1) == [None]
+        assert self.db.get_transaction_depth() == 0
+        other.close()
+
+    def test_idle_transaction_times_out(self):
+        """Test that a client idle in a transaction stops blocking the others"""
+        self.server.stop()
+        logger = NullLogger()
+        registry = CommandRegistry(self.db, logger)  # type: ignore
+        self.server = Server(registry, self.db, logger, '127.0.0.1:0',  # type: ignore
+                             transaction_timeout=0.2)
+        self.server.start()
+        idle, idle_reader = self.connect()
+        idle.sendall(encode_command(['BEGIN']) + encode_command(['SET', 'A', '1']))
+        read_replies(idle, idle_reader, 2)
+        other, other_reader = self.connect()
+        other.settimeout(5)
+        other.sendall(encode_command(['GET', 'A']))
+        assert read_replies(other, other_reader, 1) == [None]
+        assert self.db.get_transaction_depth() == 0
+        idle.settimeout(5)
+        assert idle.recv(1) == b''  # disconnected
+        idle.close()
+        other.close()
+
+    def test_session_after_timeout(self):
+        """Test that a timed out session rejects further commands"""
+        server = Server(CommandRegistry(self.db, NullLogger()), self.db, NullLogger(),  # type: ignore
+                        '127.0.0.1:0', transaction_timeout=0.05)
+        expired = threading.Event()
+        session = server.session(expired.set)
+        session.execute([['BEGIN'], ['SET', 'A', '1']])
+        assert expired.wait(5)
+        results = session.execute([['SET', 'B', '1'], ['COMMIT']])
+        assert all(isinstance(r, TimeoutError) for r in results)
+        assert self.db.get('A') is None and self.db.get('B') is None
+        assert server.session().execute([['GET', 'A']]) == [None]
+        session.close()
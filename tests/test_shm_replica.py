@@ -0,0 +1,125 @@
+import multiprocessing
+import time
+import uuid
+import pytest
+from app.db import InMemoryDB
+from app.replication import ReadOnlyError
+from app.shm_replica import ImageView, SharedMemoryPublisher, SharedMemoryReader, build_image
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+def read_in_child(name, queue):
+    reader = SharedMemoryReader(name)
+    queue.put((reader.get('A'), reader.counts('10'), sorted(reader.find('10'))))
+    reader.close()
+
+class TestSharedMemoryReplica:
+    def setup_method(self):
+        """Publish a database under a unique name before each test"""
+        logger = NullLogger()
+        self.db = InMemoryDB(TransactionManager(logger), logger)
+        self.db.set('A', '10')
+        self.db.set('B', '10')
+        self.db.set('ключ', 'значение')
+        self.name = f"imdb_test_{uuid.uuid4().hex[:8]}"
+        self.publisher = SharedMemoryPublisher(self.db, logger, self.name)
+        self.publisher.publish()
+        self.reader = SharedMemoryReader(self.name)
+
+    def teardown_method(self):
+        self.reader.close()
+        self.publisher.close()
+
+    def test_reads(self):
+        """Test GET/COUNTS/FIND against the image"""
+        assert self.reader.get('A') == '10'
+        assert self.reader.get('ключ') == 'значение'
+        assert self.reader.get('missing') is None
+        assert self.reader.counts('10') == 2
+        assert self.reader.counts('nope') == 0
+        assert sorted(self.reader.find('10')) == ['A', 'B']
+        assert self.reader.find('nope') == []
+        assert self.reader.snapshot() == self.db.snapshot()
+        assert len(self.reader) == 3
+
+    def test_only_committed_data(self):
+        """Test that open transactions are not published"""
+        self.db.begin()
+        self.db.set('A', '20')
+        self.publisher.publish()
+        assert self.reader.get('A') == '10'
+        self.db.rollback()
+
+    def test_epoch_swap(self):
+        """Test that readers switch to a republished image"""
+        self.db.set('A', '20')
+        self.db.unset('B')
+        assert self.reader.get('A') == '10'
+        assert self.publisher.publish() == 2
+        assert self.reader.get('A') == '20'
+        assert self.reader.counts('10') == 0
+        assert self.reader.epoch == 2
+
+    def test_paused_scan_keeps_its_epoch(self):
+        """Test that a scan survives an epoch swap that happens while it is paused"""
+        scan = self.reader.scan(chunk_size=1)
+        first = next(scan)
+        self.db.set('C', '30')
+        self.publisher.publish()
+        assert self.reader.get('C') == '30'  # the reader moved to the new epoch
+        rest = [pair for chunk in scan for pair in chunk]
+        assert dict(first + rest) == {'A': '10', 'B': '10', 'ключ': 'значение'}
+        assert self.reader._retired == []
+
+    def test_background_republish(self):
+        """Test republishing after commits"""
+        self.publisher.start(interval=0.01)
+        self.db.set('C', '10')
+        for _ in range(500):
+            if self.reader.get('C') == '10':
+                break
+            time.sleep(0.01)
+        assert self.reader.counts('10') == 3
+
+    def test_read_only(self):
+        """Test that the reader rejects writes"""
+        with pytest.raises(ReadOnlyError):
+            self.reader.set('A', '1')
+        with pytest.raises(ReadOnlyError):
+            self.reader.begin()
+
+    def test_other_process(self):
+        """Test attaching from another process"""
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=read_in_child, args=(self.name, queue))
+        process.start()
+        assert queue.get(timeout=30) == ('10', 2, ['A', 'B'])
+        process.join()
+
+    def test_empty_database(self):
+        """Test publishing an empty database"""
+        logger = NullLogger()
+        publisher = SharedMemoryPublisher(InMemoryDB(TransactionManager(logger), logger), logger,
+                                          self.name + '_e')
+        publisher.publish()
+        reader = SharedMemoryReader(self.name + '_e')
+        try:
+            assert reader.get('A') is None
+            assert len(reader) == 0
+        finally:
+            reader.close()
+            publisher.close()
+
+class TestImageView:
+    def test_mapping(self):
+        """Test reading an image as a mapping without copying it"""
+        data = {f'k{i}': str(i % 3) for i in range(50)}
+        view = ImageView(memoryview(build_image(data)))
+        assert len(view) == 50 and dict(view.items()) == data
+        assert view['k7'] == '1' and view.get('nope') is None and b'k7' not in view
+        assert sorted(view) == sorted(data) and sorted(view.values()) == sorted(data.values())
+
+    def test_binary_image(self):
+        """Test that an image of a binary-mode snapshot returns bytes"""
+        view = ImageView(memoryview(build_image({b'\xffk': b'\x00'})))
+        assert view[b'\xffk'] == b'\x00' and 'k' not in view
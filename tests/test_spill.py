@@ -0,0 +1,196 @@
+import os
+from app.arena import BlobArena, BlobRef
+from app.config import Config
+from app.database_factory import DatabaseFactory
+from app.db import InMemoryDB
+from app.spill import MAX_RUNS, SortedRun, SpillLayer, encode_key, _MISSING
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+class TestSortedRun:
+    def test_lookup(self, tmp_path):
+        """Test that present keys are found and absent ones are not"""
+        records = sorted((encode_key(f'k{i}'), f'v{i}') for i in range(500))
+        records.append((encode_key(b'raw'), None))
+        run = SortedRun(str(tmp_path / 'run'), records, len(records))
+        assert run.count == 501
+        assert run.lookup(encode_key('k0')) == 'v0' and run.lookup(encode_key('k499')) == 'v499'
+        assert run.lookup(encode_key(b'raw')) is None
+        assert run.lookup(encode_key('k500')) is _MISSING and run.lookup(encode_key('a')) is _MISSING
+        assert [enc for enc, _ in run.records()] == [enc for enc, _ in records]
+        run.close()
+        assert not os.path.exists(run.path)
+
+    def test_bloom_filters_absent_keys(self, tmp_path):
+        """Test that the filter rejects nearly all absent keys"""
+        run = SortedRun(str(tmp_path / 'run'), sorted((encode_key(f'k{i}'), 'v') for i in range(1000)), 1000)
+        false_positives = sum(encode_key(f'x{i}') in run.bloom for i in range(1000))
+        assert false_positives < 50
+        run.close()
+
+class TestSpillLayer:
+    def setup_method(self):
+        """Create a layer that writes a run every 4 entries before each test"""
+        self.layer = SpillLayer(None, 4)
+
+    def teardown_method(self):
+        """Delete the layer's files after each test"""
+        self.layer.close()
+
+    def test_set_get_delete_across_runs(self):
+        """Test mapping behavior while entries move to runs"""
+        for i in range(10):
+            self.layer[f'k{i}'] = str(i)
+        assert self.layer.runs == 2 and len(self.layer) == 10
+        self.layer['k1'] = 'new'
+        self.layer['k2'] = None
+        del self.layer['k3']
+        assert self.layer['k1'] == 'new' and self.layer['k2'] is None
+        assert 'k3' not in self.layer and self.layer.get('k3', 'x') == 'x'
+        assert len(self.layer) == 9
+        assert self.layer.pop('k0') == '0' and self.layer.pop('k0', 'gone') == 'gone'
+        assert list(self.layer) == sorted(f'k{i}' for i in range(1, 10) if i != 3)
+
+    def test_runs_are_merged(self):
+        """Test that runs beyond MAX_RUNS are merged and removals dropped"""
+        expected = {}
+        for i in range(4 * (MAX_RUNS + 1)):
+            self.layer[f'k{i % 8}'] = expected[f'k{i % 8}'] = str(i)
+        assert self.layer.runs == 1
+        del self.layer['k1']
+        del expected['k1']
+        self.layer.flush()
+        assert dict(self.layer.items()) == expected
+        assert 'k1' not in self.layer
+
+    def test_non_string_values_stay_in_memory(self):
+        """Test that values that cannot be written stay resident"""
+        marker = object()
+        for i in range(7):
+            self.layer[f'k{i}'] = 'v'
+            if i == 3:
+                self.layer['a'] = marker
+        assert self.layer.runs == 2
+        assert self.layer.resident_values() == [marker]
+        assert self.layer['a'] is marker and self.layer['k0'] == 'v'
+
+class TestTransactionSpill:
+    def setup_method(self):
+        """Create a database that spills layers beyond 2 KB before each test"""
+        self.tm = TransactionManager(NullLogger(), spill_bytes=2048)
+        self.db = InMemoryDB(self.tm, NullLogger())
+        self.db.set('base', 'keep')
+        self.db.set('gone', 'x')
+
+    def test_big_transaction_spills(self):
+        """Test that reads see spilled writes and COMMIT streams them into the base"""
+        self.db.begin()
+        for i in range(200):
+            self.db.set(f'k{i}', f'v{i % 3}')
+        self.db.unset('gone')
+        layer = self.tm.get_all_layers()[1]
+        assert isinstance(layer, SpillLayer) and layer.runs
+        assert self.db.get('k7') == 'v1' and self.db.get('base') == 'keep'
+        assert self.db.get('gone') is None
+        assert self.db.counts('v0') == 67
+        assert len(self.db.find('v2')) == 66
+        assert self.db.info()['layers'][1]['spilled'] > 0
+        self.db.commit()
+        assert self.tm.get_all_layers()[0]['k199'] == 'v1'
+        assert 'gone' not in self.tm.get_all_layers()[0]
+        assert not os.path.exists(layer._directory)
+
+    def test_rollback_deletes_files(self):
+        """Test that rolling back a spilled layer restores the data and its files"""
+        self.db.begin()
+        for i in range(200):
+            self.db.set(f'k{i}', 'v')
+        self.db.set('base', 'changed')
+        layer = self.tm.get_all_layers()[1]
+        self.db.rollback()
+        assert self.db.get('base') == 'keep' and self.db.get('k0') is None
+        assert not os.path.exists(layer._directory)
+
+    def test_nested_commit(self):
+        """Test committing into a parent transaction, spilled or not"""
+        self.db.begin()
+        self.db.set('outer', '1')
+        self.db.begin()
+        for i in range(200):
+            self.db.set(f'k{i}', 'v')
+        self.db.unset('base')
+        self.db.commit()
+        assert isinstance(self.tm.get_all_layers()[1], SpillLayer)
+        assert self.db.get('outer') == '1' and self.db.get('k5') == 'v'
+        assert self.db.get('base') is None
+        self.db.rollback()
+        assert self.db.get('base') == 'keep' and self.db.get('k5') is None
+
+    def test_listeners_see_spilled_commit(self):
+        """Test that change listeners get every committed entry"""
+        seen = {}
+        self.db.add_listener(seen.update)
+        self.db.begin()
+        for i in range(200):
+            self.db.set(f'k{i}', 'v')
+        self.db.commit()
+        assert len(seen) == 200
+
+    def test_listeners_keep_spilled_changes(self):
+        """Test that published changes outlive the spilled layer, even if a listener fails"""
+        kept = []
+        def failing(changes):
+            raise RuntimeError('listener failed')
+        self.db.add_listener(kept.append)
+        self.db.add_listener(failing)
+        self.db.begin()
+        for i in range(200):
+            self.db.set(f'k{i}', 'v')
+        layer = self.tm.get_all_layers()[1]
+        try:
+            self.db.commit()
+        except RuntimeError:
+            pass
+        assert not os.path.exists(layer._directory)
+        assert type(kept[0]) is dict and kept[0]['k199'] == 'v'
+
+    def test_scan_streams_spilled_layers(self):
+        """Test scans over spilled layers: each key once, even if the layer is committed meanwhile"""
+        self.db.begin()
+        for i in range(200):
+            self.db.set(f'k{i}', 'a')
+        self.db.begin()
+        for i in range(100, 300):
+            self.db.set(f'k{i}', 'b')
+        self.db.set('base', 'b')
+        assert all(isinstance(layer, SpillLayer) for layer in self.tm.get_all_layers()[1:])
+        assert self.db.counts('a') == 100 and self.db.counts('b') == 201
+        chunks = self.db.scan(50)
+        keys = [k for k, _ in next(chunks)]
+        self.db.commit()
+        self.db.commit()
+        keys.extend(k for chunk in chunks for k, _ in chunk)
+        assert len(keys) == len(set(keys)) == 302
+
+    def test_arena_values_stay_resident(self):
+        """Test that arena refs are kept in memory and released on rollback"""
+        logger = NullLogger()
+        arena = BlobArena(logger, threshold=64, segment_size=4096)
+        db = InMemoryDB(TransactionManager(logger, spill_bytes=2048), logger, arena=arena)
+        db.begin()
+        db.set('big', 'b' * 100)
+        for i in range(200):
+            db.set(f'k{i}', 'v')
+        layer = db._transaction_manager.get_all_layers()[1]
+        assert isinstance(layer, SpillLayer)
+        assert any(isinstance(v, BlobRef) for v in layer.resident_values())
+        assert db.get('big') == 'b' * 100
+        db.rollback()
+        assert arena.stats()['blobs'] == 0
+
+    def test_factory(self):
+        """Test enabling spilling through configuration"""
+        config = Config('nonexistent.yaml')
+        config.set('database.transaction.spill_bytes', 1024)
+        db = DatabaseFactory.create_database(config, NullLogger())
+        assert db._transaction_manager.spill_bytes == 1024  # type: ignore
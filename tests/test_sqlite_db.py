@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import pytest
+from app.base import BaseDB
+from app.config import Config
+from app.database_factory import DatabaseFactory
+from app.sqlite_db import SQLiteDB
+from app.transaction_manager import TransactionLimitError
+from app.logger import NullLogger
+
+class TestSQLiteDB:
+    def setup_method(self):
+        """Create a new database file before each test"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'test.sqlite')
+        self.db = SQLiteDB(self.path, NullLogger(), batch_size=3)
+
+    def teardown_method(self):
+        self.db.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_inheritance(self):
+        """Test that SQLiteDB implements BaseDB"""
+        assert isinstance(self.db, BaseDB)
+
+    def test_set_get_unset(self):
+        """Test basic operations"""
+        self.db.set('A', '10')
+        self.db.set('A', '20')
+        assert self.db.get('A') == '20'
+        self.db.unset('A')
+        assert self.db.get('A') is None
+        self.db.unset('missing')
+
+    def test_counts_and_find(self):
+        """Test indexed COUNTS and FIND"""
+        self.db.set('A', '10')
+        self.db.set('B', '20')
+        self.db.set('C', '10')
+        assert self.db.counts('10') == 2
+        assert sorted(self.db.find('10')) == ['A', 'C']
+        assert self.db.find('30') == []
+
+    def test_savepoint_transactions(self):
+        """Test nested transactions mapped to savepoints"""
+        self.db.set('A', '10')
+        self.db.begin()
+        self.db.set('A', '20')
+        self.db.begin()
+        self.db.unset('A')
+        assert self.db.get('A') is None
+        self.db.commit()
+        assert self.db.get_transaction_depth() == 1
+        self.db.rollback()
+        assert self.db.get('A') == '10'
+        assert not self.db.commit()
+        assert not self.db.rollback()
+
+    def test_max_depth(self):
+        """Test that BEGIN beyond max_depth is refused and the stack stays usable"""
+        db = SQLiteDB(':memory:', NullLogger(), max_depth=2)
+        try:
+            db.begin()
+            db.begin()
+            with pytest.raises(TransactionLimitError):
+                db.begin()
+            assert db.get_transaction_depth() == 2
+            assert db.commit() and db.commit()
+        finally:
+            db.close()
+
+    def test_snapshot_excludes_open_transaction(self):
+        """Test that the snapshot only contains committed data"""
+        self.db.set('A', '1')
+        self.db.begin()
+        self.db.set('B', '2')
+        assert self.db.snapshot() == {'A': '1'}
+        self.db.commit()
+        assert self.db.snapshot() == {'A': '1', 'B': '2'}
+
+    def test_batched_writes_are_durable_after_close(self):
+        """Test that pending batched writes are committed on close"""
+        for i in range(5):
+            self.db.set(f'k{i}', 'v')
+        self.db.close()
+        self.db = SQLiteDB(self.path, NullLogger())
+        assert self.db.counts('v') == 5
+
+    def test_scan_chunks(self):
+        """Test chunked scanning"""
+        for i in range(5):
+            self.db.set(f'k{i}', 'v')
+        assert [len(chunk) for chunk in self.db.scan(2)] == [2, 2, 1]
+
+    def test_factory(self):
+        """Test selecting the engine through database.type"""
+        config = Config('nonexistent.yaml')
+        config._config['database']['type'] = 'sqlite'
+        config._config['database']['sqlite']['path'] = os.path.join(self.temp_dir, 'f.sqlite')
+        db = DatabaseFactory.create_database(config, NullLogger())
+        try:
+            assert isinstance(db, SQLiteDB)
+        finally:
+            db.close()  # type: ignore
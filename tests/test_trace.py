@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import threading
+import pytest
+from click.testing import CliRunner
+from app.cli import cli
+from app.commands import CommandRegistry
+from app.db import InMemoryDB
+from app.trace import TraceRecorder, read_trace, replay
+from app.transaction_manager import TransactionManager
+from app.logger import NullLogger
+
+def _registry():
+    logger = NullLogger()
+    return CommandRegistry(InMemoryDB(TransactionManager(logger), logger), logger)  # type: ignore
+
+class TestTrace:
+    def setup_method(self):
+        """Create a registry and a trace path before each test"""
+        self.registry = _registry()
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'trace.trc')
+
+    def teardown_method(self):
+        shutil.rmtree(self.temp_dir)
+
+    def record(self):
+        assert self.registry.dispatch('trace', ['start', self.path]) == 'TRACING'
+        self.registry.execute('set', 'A', '10')
+        self.registry.execute('begin')
+        self.registry.execute('set', 'B', '10')
+        self.registry.execute('commit')
+        self.registry.execute('counts', '10')
+        self.registry.execute('get', 'A')
+        with pytest.raises(ValueError):
+            self.registry.execute('poll', '99')
+        assert self.registry.dispatch('trace', ['stop']) == f"7 commands written to {self.path}"
+
+    def test_records_commands_and_replies(self):
+        """Test that requests, replies and errors are recorded in order"""
+        self.record()
+        records = list(read_trace(self.path))
+        assert [r.command for r in records] == [
+            ['set', 'A', '10'], ['begin'], ['set', 'B', '10'], ['commit'],
+            ['counts', '10'], ['get', 'A'], ['poll', '99']]
+        assert records[4].reply == b':2\r\n'
+        assert records[5].reply == b'$2\r\n10\r\n'
+        assert records[6].reply.startswith(b'-ERR ')
+        assert {r.session for r in records} == {0}
+        assert all(r.duration >= 0 for r in records)
+        assert records == sorted(records, key=lambda r: r.offset)
+        assert not self.registry._hooked
+
+    def test_sessions_are_threads(self):
+        """Test that commands from different threads get different session ids"""
+        recorder = TraceRecorder(self.registry, NullLogger())
+        recorder.start(self.path)
+        self.registry.execute('set', 'A', '1')
+        thread = threading.Thread(target=self.registry.execute, args=('get', 'A'))
+        thread.start()
+        thread.join()
+        assert recorder.stop() == (self.path, 2)
+        assert [r.session for r in read_trace(self.path)] == [0, 1]
+
+    def test_replay_without_divergence(self):
+        """Test that a fresh database reproduces every reply"""
+        self.record()
+        result = replay(read_trace(self.path), _registry())
+        assert (result.commands, result.sessions, result.divergences) == (7, 1, [])
+        assert len(result.replayed['set']) == 2
+        report = result.report()
+        assert '0 divergences' in report
+        assert 'counts' in report
+
+    def test_streamed_find_is_recorded_as_count(self):
+        """Test that streamed FIND output is traced as a count and replays cleanly"""
+        for key in ('A', 'B'):
+            self.registry.execute('set', key, 'x')
+        recorder = TraceRecorder(self.registry, NullLogger())
+        recorder.start(self.path)
+        assert ''.join(self.registry.dispatch_stream('find', ['x'])) == 'A B'
+        recorder.stop()
+        assert [r.reply for r in read_trace(self.path)] == [b':2\r\n']
+        registry = _registry()
+        for key in ('A', 'B'):
+            registry.execute('set', key, 'x')
+        assert replay(read_trace(self.path), registry).divergences == []
+
+    def test_replay_reports_divergence(self):
+        """Test that different replies are reported"""
+        self.record()
+        registry = _registry()
+        registry.execute('set', 'C', '10')
+        result = replay(read_trace(self.path), registry, timing='original', speed=100)
+        assert len(result.divergences) == 1
+        divergence = result.divergences[0]
+        assert (divergence.command, divergence.expected, divergence.actual) == (['counts', '10'], 2, 3)
+
+    def test_invalid_arguments(self):
+        """Test TRACE argument errors"""
+        for args in (['stop'], ['bogus']):
+            with pytest.raises(ValueError):
+                self.registry.dispatch('trace', args)
+        with pytest.raises(ValueError):
+            replay(iter([]), self.registry, timing='slow')
+
+    def test_cli_replay(self):
+        """Test the replay subcommand on another engine"""
+        self.record()
+        result = CliRunner().invoke(cli, ['replay', self.path, '--engine', 'sqlite'])
+        assert result.exit_code == 0, result.output
+        assert 'on sqlite' in result.output
+        assert '7 commands from 1 sessions' in result.output